@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Benchmark history store and regression gate
+
+Normalises every benchmark's output into one run schema, appends runs to a
+SQLite history keyed by commit and machine fingerprint, and compares two
+runs metric by metric, flagging statistically significant regressions in
+latency, throughput or retrieval quality.
+
+Usage:
+    python benchmarks/bench_history.py record benchmark_results.json
+    python benchmarks/bench_history.py list --benchmark search_quality
+    python benchmarks/bench_history.py compare main HEAD --benchmark search_quality
+
+compare exits with status 1 when a regression is found, so it can gate CI.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from ir_metrics import randomization_p_value
+except ImportError:  # NumPy not installed: pure-Python loop below
+    randomization_p_value = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HISTORY_PATH = Path(os.environ.get(
+    "ZMCP_BENCH_HISTORY", Path.home() / ".mcptools" / "benchmarks" / "history.db"))
+
+RUN_SCHEMA = "zmcp-benchmark-run"
+RUN_SCHEMA_VERSION = 1
+
+HISTORY_DDL = """
+CREATE TABLE IF NOT EXISTS machines (
+  fingerprint TEXT PRIMARY KEY,
+  info TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  benchmark TEXT NOT NULL,
+  commit_sha TEXT,
+  dirty INTEGER NOT NULL DEFAULT 0,
+  machine TEXT NOT NULL REFERENCES machines(fingerprint),
+  recorded_at TEXT NOT NULL,
+  config TEXT NOT NULL DEFAULT '{}',
+  source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_lookup ON runs(benchmark, commit_sha, machine);
+CREATE TABLE IF NOT EXISTS metrics (
+  run_id INTEGER NOT NULL REFERENCES runs(id),
+  name TEXT NOT NULL,
+  unit TEXT NOT NULL,
+  direction TEXT NOT NULL CHECK (direction IN ('lower', 'higher')),
+  value REAL NOT NULL,
+  samples TEXT,
+  sample_ids TEXT,
+  PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS runs_append_only_update BEFORE UPDATE ON runs
+BEGIN SELECT RAISE(ABORT, 'benchmark history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS runs_append_only_delete BEFORE DELETE ON runs
+BEGIN SELECT RAISE(ABORT, 'benchmark history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS metrics_append_only_update BEFORE UPDATE ON metrics
+BEGIN SELECT RAISE(ABORT, 'benchmark history is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS metrics_append_only_delete BEFORE DELETE ON metrics
+BEGIN SELECT RAISE(ABORT, 'benchmark history is append-only'); END;
+"""
+
+
+# ----------------------------------------------------------------------------
+# Run schema
+# ----------------------------------------------------------------------------
+
+def metric(values: List[float], unit: str, direction: str,
+           ids: Optional[List[str]] = None, value: Optional[float] = None) -> Dict[str, Any]:
+    """One metric: its summary value plus the samples significance tests need.
+
+    sample_ids (e.g. query ids) let two runs be compared pairwise.
+    """
+    samples = [float(v) for v in values if v is not None and not math.isnan(float(v))]
+    if value is None:
+        value = statistics.mean(samples) if samples else 0.0
+    entry = {"unit": unit, "direction": direction, "value": float(value), "samples": samples}
+    if ids is not None and len(ids) == len(samples):
+        entry["sample_ids"] = [str(i) for i in ids]
+    return entry
+
+
+def git_state() -> Tuple[Optional[str], bool]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def machine_info() -> Dict[str, Any]:
+    """Hardware/OS facts that make timings comparable; hashed into the fingerprint"""
+    cpu = platform.processor() or platform.machine()
+    memory_gb = None
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+        with open("/proc/meminfo") as f:
+            memory_gb = round(int(f.readline().split()[1]) / 1024 / 1024)
+    except OSError:
+        pass
+    info = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": cpu,
+        "cpu_count": os.cpu_count(),
+        "memory_gb": memory_gb,
+        "hostname": platform.node(),
+    }
+    info["fingerprint"] = hashlib.sha256(json.dumps(info, sort_keys=True).encode()).hexdigest()[:16]
+    return info
+
+
+def new_run(benchmark: str, metrics: Dict[str, Dict[str, Any]], config: Optional[Dict[str, Any]] = None,
+            commit: Optional[str] = None, timestamp: Optional[str] = None) -> Dict[str, Any]:
+    head, dirty = git_state()
+    return {
+        "schema": RUN_SCHEMA,
+        "schema_version": RUN_SCHEMA_VERSION,
+        "benchmark": benchmark,
+        "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+        "commit": commit or head,
+        "dirty": dirty if commit is None else False,
+        "machine": machine_info(),
+        "config": config or {},
+        "metrics": metrics,
+    }
+
+
+# ----------------------------------------------------------------------------
+# Adapters from each benchmark's own output
+# ----------------------------------------------------------------------------
+
+def _search_quality(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """reproducible_search_benchmark.py / real_search_benchmark.py"""
+    metrics = {}
+    by_method: Dict[str, List[Dict[str, Any]]] = {}
+    for result in data.get("all_results", []):
+        by_method.setdefault(result["method_name"], []).append(result)
+    for method, results in by_method.items():
+        ids = [r["query_id"] for r in results]
+        for name in results[0]["metrics"]:
+            metrics[f"{method}.{name}"] = metric([r["metrics"][name] for r in results], "score", "higher", ids)
+        metrics[f"{method}.latency_ms"] = metric([r["timing_ms"] for r in results], "ms", "lower", ids)
+    return metrics
+
+
+def _unified_search(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """unified_search_benchmark.py"""
+    metrics = {}
+    samples: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+    for result in data.get("raw_results", []):
+        if result.get("success", True):
+            samples.setdefault((result["config"]["name"], result.get("concurrency", 1)), []).append(result)
+    for (config, concurrency), results in samples.items():
+        prefix = f"{config}.c{concurrency}"
+        metrics[f"{prefix}.latency_ms"] = metric([r["client_time_ms"] for r in results], "ms", "lower")
+        stages = {key for r in results for key in r.get("stage_timings", {})}
+        for stage in sorted(stages):
+            metrics[f"{prefix}.{stage}"] = metric(
+                [r["stage_timings"][stage] for r in results if stage in r["stage_timings"]], "ms", "lower")
+    for config, levels in data.get("latency", {}).items():
+        for concurrency, summary in levels.items():
+            metrics[f"{config}.c{concurrency}.throughput_qps"] = metric(
+                [], "qps", "higher", value=summary["throughput_qps"])
+    return metrics
+
+
+def _indexing_throughput(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """indexing_throughput_benchmark.py"""
+    runs = data.get("runs", [])
+    metrics = {
+        "files_per_second": metric([r["files_per_second"] for r in runs], "files/s", "higher"),
+        "chunks_per_second": metric([r["chunks_per_second"] for r in runs], "chunks/s", "higher"),
+        "indexing_seconds": metric([r["indexing_seconds"] for r in runs], "s", "lower"),
+        "embedder_idle_fraction": metric([r["embedder_idle_fraction"] for r in runs], "fraction", "lower"),
+    }
+    for stage in (runs[0]["stage_timings_ms"] if runs else {}):
+        metrics[f"stage.{stage}"] = metric([r["stage_timings_ms"][stage] for r in runs], "ms", "lower")
+    return metrics
+
+
+def _content_type(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """content_type_benchmark.py"""
+    results = data.get("results", {})
+    ids = list(results)
+    return {
+        f"{method}.relevant_found": metric([results[q][f"{key}_relevant"] for q in ids], "docs", "higher", ids)
+        for method, key in (("BM25", "bm25"), ("Semantic", "semantic"))
+    }
+
+
+def _granular(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """granular_search_benchmark.py"""
+    results = data.get("results", {})
+    ids = list(results)
+    return {
+        f"{method}.relevant_found": metric([results[q][f"{key}_relevant"] for q in ids], "docs", "higher", ids)
+        for method, key in (("BM25", "bm25"), ("Old_KG", "old_kg"), ("Semantic", "semantic"))
+    }
+
+
+def _local_vs_upstream(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """local_vs_upstream_comparison.py"""
+    metrics = {}
+    for side, results in data.items():
+        ids = [str(i) for i in range(len(results))]
+        metrics[f"{side}.latency_s"] = metric([r["time"] for r in results], "s", "lower", ids)
+        metrics[f"{side}.avg_similarity"] = metric([r["avg_similarity"] for r in results], "score", "higher", ids)
+    return metrics
+
+
+# Benchmark name, detector and adapter per known result file layout
+ADAPTERS = [
+    ("search_quality", lambda d: "method_aggregates" in d and "all_results" in d, _search_quality),
+    ("unified_search", lambda d: "latency" in d and "raw_results" in d, _unified_search),
+    ("indexing_throughput", lambda d: d.get("benchmark") == "indexing_throughput", _indexing_throughput),
+    ("granular_search", lambda d: "method_wins" in d and "results" in d, _granular),
+    ("content_type", lambda d: "results" in d and "summary" in d, _content_type),
+    ("local_vs_upstream", lambda d: {"local_gpu", "upstream_cpu"} <= set(d), _local_vs_upstream),
+]
+
+
+def normalize(data: Dict[str, Any], benchmark: Optional[str] = None) -> Dict[str, Any]:
+    """Convert any known benchmark output (or an existing run) to the run schema"""
+    if data.get("schema") == RUN_SCHEMA:
+        return data
+    for name, detect, adapt in ADAPTERS:
+        if detect(data):
+            config = {key: data[key] for key in ("dataset", "random_seed", "query_count", "corpus", "embedder")
+                      if key in data}
+            timestamp = data.get("timestamp")
+            if isinstance(timestamp, (int, float)):
+                timestamp = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+            return new_run(benchmark or name, adapt(data), config, data.get("commit"), timestamp)
+    raise ValueError("Unrecognised benchmark result layout")
+
+
+# ----------------------------------------------------------------------------
+# History store
+# ----------------------------------------------------------------------------
+
+class BenchmarkHistory:
+    """Append-only SQLite history of normalised runs"""
+
+    def __init__(self, path: Path = DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(HISTORY_DDL)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, run: Dict[str, Any], source: Optional[str] = None) -> int:
+        machine = run["machine"]
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO machines(fingerprint, info) VALUES (?, ?)",
+                              (machine["fingerprint"], json.dumps(machine, sort_keys=True)))
+            cursor = self.conn.execute(
+                "INSERT INTO runs(benchmark, commit_sha, dirty, machine, recorded_at, config, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run["benchmark"], run.get("commit"), int(bool(run.get("dirty"))), machine["fingerprint"],
+                 run["timestamp"], json.dumps(run.get("config", {}), sort_keys=True), source))
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO metrics(run_id, name, unit, direction, value, samples, sample_ids) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, name, m["unit"], m["direction"], m["value"], json.dumps(m.get("samples", [])),
+                  json.dumps(m["sample_ids"]) if "sample_ids" in m else None)
+                 for name, m in run["metrics"].items()])
+        return run_id
+
+    def list_runs(self, benchmark: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
+        query = "SELECT r.*, COUNT(m.name) AS metric_count FROM runs r LEFT JOIN metrics m ON m.run_id = r.id"
+        params: List[Any] = []
+        if benchmark:
+            query += " WHERE r.benchmark = ?"
+            params.append(benchmark)
+        query += " GROUP BY r.id ORDER BY r.id DESC LIMIT ?"
+        return self.conn.execute(query, params + [limit]).fetchall()
+
+    def resolve(self, ref: str, benchmark: Optional[str] = None, machine: Optional[str] = None) -> sqlite3.Row:
+        """Run id, 'latest', or a git ref/commit prefix (its latest run, this machine first)"""
+        filters, params = [], []
+        if benchmark:
+            filters.append("benchmark = ?")
+            params.append(benchmark)
+        where = (" AND " + " AND ".join(filters)) if filters else ""
+
+        if ref.isdigit():
+            row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (int(ref),)).fetchone()
+        elif ref == "latest":
+            row = self.conn.execute(f"SELECT * FROM runs WHERE 1{where} ORDER BY id DESC LIMIT 1",
+                                    params).fetchone()
+        else:
+            commit = self._rev_parse(ref) or ref
+            row = self.conn.execute(
+                f"SELECT * FROM runs WHERE commit_sha LIKE ?{where} "
+                f"ORDER BY machine = ? DESC, id DESC LIMIT 1",
+                [commit + "%"] + params + [machine or ""]).fetchone()
+        if row is None:
+            raise LookupError(f"No recorded run matches '{ref}'" + (f" for {benchmark}" if benchmark else ""))
+        return row
+
+    @staticmethod
+    def _rev_parse(ref: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", "rev-parse", "--verify", "--quiet", ref + "^{commit}"], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip() or None
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def metrics(self, run_id: int) -> Dict[str, Dict[str, Any]]:
+        rows = self.conn.execute("SELECT * FROM metrics WHERE run_id = ?", (run_id,)).fetchall()
+        return {
+            row["name"]: {
+                "unit": row["unit"],
+                "direction": row["direction"],
+                "value": row["value"],
+                "samples": json.loads(row["samples"] or "[]"),
+                **({"sample_ids": json.loads(row["sample_ids"])} if row["sample_ids"] else {}),
+            }
+            for row in rows
+        }
+
+
+# ----------------------------------------------------------------------------
+# Significance tests
+# ----------------------------------------------------------------------------
+
+def _normal_sf(z: float) -> float:
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney_u(a: List[float], b: List[float]) -> float:
+    """Two-sided Mann-Whitney U p-value (normal approximation with tie correction)"""
+    n1, n2 = len(a), len(b)
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return min(1.0, 2 * _normal_sf(max(z, 0.0)))
+
+
+def paired_randomization(differences: List[float], resamples: int = 5000, seed: int = 0) -> float:
+    """Two-sided sign-flip randomization test on the mean paired difference"""
+    if randomization_p_value is not None:
+        return randomization_p_value(differences, resamples, seed)
+    observed = abs(sum(differences))
+    if observed == 0:
+        return 1.0
+    rng = random.Random(seed)
+    extreme = 0
+    for _ in range(resamples):
+        if abs(sum(d if rng.random() < 0.5 else -d for d in differences)) >= observed - 1e-12:
+            extreme += 1
+    return (extreme + 1) / (resamples + 1)
+
+
+def compare_metric(base: Dict[str, Any], head: Dict[str, Any], resamples: int = 5000) -> Dict[str, Any]:
+    """Relative change in the 'good' direction convention plus a p-value when samples allow"""
+    change = (head["value"] - base["value"]) / abs(base["value"]) if base["value"] else 0.0
+    worse = change > 0 if base["direction"] == "lower" else change < 0
+
+    test, p_value = None, None
+    base_ids, head_ids = base.get("sample_ids"), head.get("sample_ids")
+    if base_ids and head_ids:
+        base_by_id = dict(zip(base_ids, base["samples"]))
+        pairs = [(base_by_id[i], v) for i, v in zip(head_ids, head["samples"]) if i in base_by_id]
+        if len(pairs) >= 2:
+            test = "paired-randomization"
+            p_value = paired_randomization([h - b for b, h in pairs], resamples)
+    if test is None and len(base["samples"]) >= 2 and len(head["samples"]) >= 2:
+        test = "mann-whitney"
+        p_value = mann_whitney_u(base["samples"], head["samples"])
+    return {"base": base["value"], "head": head["value"], "change": change, "worse": worse,
+            "unit": base["unit"], "test": test, "p_value": p_value}
+
+
+def compare_runs(base: Dict[str, Dict[str, Any]], head: Dict[str, Dict[str, Any]],
+                 alpha: float = 0.05, min_effect: float = 0.05, resamples: int = 5000) -> List[Dict[str, Any]]:
+    """Compare every shared metric; a regression is a significant change for the worse
+    of at least min_effect (relative)"""
+    rows = []
+    for name in sorted(set(base) & set(head)):
+        row = {"metric": name, **compare_metric(base[name], head[name], resamples)}
+        significant = row["p_value"] is not None and row["p_value"] < alpha
+        large = abs(row["change"]) >= min_effect
+        if significant and large:
+            row["verdict"] = "regression" if row["worse"] else "improvement"
+        elif row["p_value"] is None and large:
+            row["verdict"] = "untested"
+        else:
+            row["verdict"] = "unchanged"
+        rows.append(row)
+    return rows
+
+
+# ----------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------
+
+def cmd_record(history: BenchmarkHistory, args) -> int:
+    for path in args.files:
+        with open(path) as f:
+            run = normalize(json.load(f), args.benchmark)
+        run_id = history.record(run, source=str(Path(path).resolve()))
+        dirty = " (dirty tree)" if run.get("dirty") else ""
+        print(f"✅ Recorded run {run_id}: {run['benchmark']} @ {(run.get('commit') or 'unknown')[:10]}{dirty}, "
+              f"{len(run['metrics'])} metrics, machine {run['machine']['fingerprint']}")
+    return 0
+
+
+def cmd_normalize(history: BenchmarkHistory, args) -> int:
+    with open(args.file) as f:
+        run = normalize(json.load(f), args.benchmark)
+    json.dump(run, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+def cmd_list(history: BenchmarkHistory, args) -> int:
+    rows = history.list_runs(args.benchmark, args.limit)
+    if not rows:
+        print("No runs recorded")
+        return 0
+    for row in rows:
+        print(f"{row['id']:>5}  {row['recorded_at'][:19]}  {row['benchmark']:<20} "
+              f"{(row['commit_sha'] or '-')[:10]}{'*' if row['dirty'] else ' '}  "
+              f"{row['machine']}  {row['metric_count']} metrics")
+    return 0
+
+
+def cmd_compare(history: BenchmarkHistory, args) -> int:
+    machine = machine_info()["fingerprint"]
+    base = history.resolve(args.base, args.benchmark, machine)
+    head = history.resolve(args.head, args.benchmark or base["benchmark"], machine)
+    if base["benchmark"] != head["benchmark"]:
+        print(f"❌ Runs are from different benchmarks: {base['benchmark']} vs {head['benchmark']}")
+        return 2
+
+    print(f"📊 {base['benchmark']}: run {base['id']} ({(base['commit_sha'] or '-')[:10]}) → "
+          f"run {head['id']} ({(head['commit_sha'] or '-')[:10]})")
+    if base["machine"] != head["machine"]:
+        print(f"⚠️  Different machines ({base['machine']} vs {head['machine']}); timings may not be comparable")
+
+    rows = compare_runs(history.metrics(base["id"]), history.metrics(head["id"]),
+                        args.alpha, args.min_effect, args.resamples)
+    icons = {"regression": "❌", "improvement": "✅", "untested": "❔", "unchanged": "  "}
+    for row in rows:
+        if args.all or row["verdict"] != "unchanged":
+            p = f"p={row['p_value']:.4f}" if row["p_value"] is not None else "p=n/a"
+            print(f"{icons[row['verdict']]} {row['metric']:<45} {row['base']:>10.4g} → {row['head']:<10.4g} "
+                  f"{row['unit']:<8} {row['change']:+7.1%}  {p}")
+
+    regressions = [row for row in rows if row["verdict"] == "regression"]
+    print(f"\n{len(rows)} metrics compared: {len(regressions)} regressions, "
+          f"{sum(row['verdict'] == 'improvement' for row in rows)} improvements "
+          f"(alpha={args.alpha}, min effect={args.min_effect:.0%})")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark history store and regression gate")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY_PATH),
+                        help="History database (default: ~/.mcptools/benchmarks/history.db or $ZMCP_BENCH_HISTORY)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Append benchmark result files to the history")
+    record.add_argument("files", nargs="+", help="Result JSON written by a benchmark runner")
+    record.add_argument("--benchmark", help="Override the detected benchmark name")
+
+    norm = subparsers.add_parser("normalize", help="Print a result file in the unified run schema")
+    norm.add_argument("file")
+    norm.add_argument("--benchmark", help="Override the detected benchmark name")
+
+    listing = subparsers.add_parser("list", help="Show recorded runs")
+    listing.add_argument("--benchmark")
+    listing.add_argument("--limit", type=int, default=20)
+
+    compare = subparsers.add_parser("compare", help="Flag significant regressions between two runs")
+    compare.add_argument("base", help="Run id, 'latest', or git ref/commit of the baseline")
+    compare.add_argument("head", help="Run id, 'latest', or git ref/commit to check")
+    compare.add_argument("--benchmark", help="Benchmark to resolve git refs against")
+    compare.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    compare.add_argument("--min-effect", type=float, default=0.05, help="Smallest relative change that counts")
+    compare.add_argument("--resamples", type=int, default=5000, help="Randomization test resamples")
+    compare.add_argument("--all", action="store_true", help="Also print unchanged metrics")
+
+    args = parser.parse_args()
+    commands = {"record": cmd_record, "normalize": cmd_normalize, "list": cmd_list, "compare": cmd_compare}
+    history = BenchmarkHistory(Path(args.history))
+    try:
+        return commands[args.command](history, args)
+    except (LookupError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
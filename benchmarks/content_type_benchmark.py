@@ -8,12 +8,14 @@ Tests whether semantic search performs better on different file types:
 """
 
 import asyncio
-import os
-import re
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
+from corpus_index import CorpusIndex, tokenize
+
 @dataclass
 class ContentTypeQuery:
     query_id: str
@@ -27,29 +29,18 @@ class ContentTypeBenchmark:
 
     def __init__(self, repository_path: str):
         self.repository_path = Path(repository_path)
-        self.file_contents = {}
         self.load_file_contents()
 
     def load_file_contents(self):
-        """Load actual file contents for semantic analysis"""
+        """Load file contents (first 5k chars) through the shared, cached corpus index"""
         print("📁 Loading file contents...")
 
-        for root, dirs, files in os.walk(self.repository_path):
-            dirs[:] = [d for d in dirs if d not in ['node_modules', 'dist', 'build', '.git', 'coverage']]
-
-            for file in files:
-                if any(file.endswith(ext) for ext in ['.md', '.ts', '.py', '.js', '.json', '.txt']):
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, self.repository_path)
+        self.file_contents = CorpusIndex.load(self.repository_path,
+                                              extensions=['.md', '.ts', '.py', '.js', '.json', '.txt'],
+                                              max_chars=5000)
 
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()[:5000]  # First 5k chars
-                            self.file_contents[rel_path] = content
-                    except:
-                        pass
-
-        print(f"📄 Loaded content from {len(self.file_contents)} files")
+        source = "cached index" if self.file_contents.loaded_from_cache else "new index"
+        print(f"📄 Loaded content from {len(self.file_contents)} files ({source})")
 
     def get_content_type_queries(self) -> List[ContentTypeQuery]:
         """Queries designed to test different content types"""
@@ -113,43 +104,36 @@ class ContentTypeBenchmark:
 
     def search_bm25_content(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """BM25-style search on actual file content"""
-        results = []
-        query_words = [w.lower() for w in re.findall(r'\w+', query)]
-
-        for file_path, content in self.file_contents.items():
-            content_lower = content.lower()
-
-            # Calculate keyword density score
-            score = 0.0
-            for word in query_words:
-                # Count occurrences in content
-                word_count = content_lower.count(word)
-                if word_count > 0:
-                    # TF-IDF approximation
-                    tf = word_count / len(content_lower.split())
-                    score += tf * 10  # Boost for multiple occurrences
-
-                # Boost for filename matches
-                if word in file_path.lower():
-                    score += 2.0
-
-                # Boost for title/header matches in MD files
-                if file_path.endswith('.md'):
-                    lines = content.split('\n')[:10]  # First 10 lines
+        corpus = self.file_contents
+        query_words = tokenize(query, parts=False)
+        doc_lengths = np.maximum(np.asarray(corpus.doc_lengths, dtype=np.float64), 1.0)
+
+        scores = np.zeros(len(corpus))
+        for word in query_words:
+            # TF-IDF approximation from the indexed term counts
+            scores += corpus.term_frequency(word) / doc_lengths * 10  # Boost for multiple occurrences
+
+            # Boost for filename matches
+            scores += corpus.path_match(word) * 2.0
+
+        # Boost for title/header matches in MD files that already matched
+        for doc in np.flatnonzero(scores > 0):
+            if corpus.paths[doc].endswith('.md'):
+                lines = corpus.text(doc).split('\n')[:10]  # First 10 lines
+                for word in query_words:
                     for line in lines:
                         if word in line.lower() and ('#' in line or line.isupper()):
-                            score += 1.5
-
-            if score > 0:
-                results.append({
-                    "file_path": file_path,
-                    "score": score,
-                    "match_type": "bm25_content",
-                    "content_type": self.classify_file_type(file_path)
-                })
+                            scores[doc] += 1.5
 
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return [
+            {
+                "file_path": file_path,
+                "score": score,
+                "match_type": "bm25_content",
+                "content_type": self.classify_file_type(file_path)
+            }
+            for file_path, score in corpus.top(scores, limit)
+        ]
 
     def search_semantic_content(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Semantic search on file content"""
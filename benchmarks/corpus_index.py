@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Shared corpus loader with a cached, memory-mapped inverted index
+
+The content benchmarks used to read a whole repository into a dict and
+rescan every file for every query. CorpusIndex tokenizes the tree once and
+writes CSR postings, document lengths and the raw text under
+~/.mcptools/benchmarks/corpus_index/, keyed by a hash of the tree
+(paths, sizes, mtimes) and the load options. Later runs memory-map those
+files instead of reading and tokenizing the tree again.
+
+CorpusIndex is also a read-only mapping of relative path -> text, so code
+that iterates file_contents.items() keeps working on top of it.
+
+Usage:
+    corpus = CorpusIndex.load("/path/to/repo", extensions=(".ts", ".md"))
+    corpus.search("searchKnowledgeGraphUnified", limit=10)   # BM25
+    python benchmarks/corpus_index.py /path/to/repo "query text"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+DEFAULT_CACHE_DIR = Path(os.environ.get("ZMCP_CORPUS_INDEX_DIR",
+                                        Path.home() / ".mcptools" / "benchmarks" / "corpus_index"))
+DEFAULT_EXTENSIONS = (".md", ".ts", ".py", ".js")
+DEFAULT_EXCLUDE_DIRS = ("node_modules", "dist", "build", ".git", "coverage")
+
+# Path tokens share the postings with content tokens under this prefix
+PATH_FIELD = "@path:"
+
+_WORD_RE = re.compile(r"\w+")
+_PART_RE = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z0-9])")
+
+
+def tokenize(text: str, parts: bool = True) -> List[str]:
+    """Lowercased words plus their camelCase/snake_case parts.
+
+    "searchKnowledgeGraphUnified" yields the whole identifier and
+    search, knowledge, graph, unified, so both exact identifiers and
+    their component words match. parts=False keeps whole words only,
+    for queries that should match identifiers exactly.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        tokens.append(word.lower())
+        if not parts:
+            continue
+        parts_found = [part for piece in word.split("_") for part in _PART_RE.findall(piece)]
+        if len(parts_found) > 1:
+            tokens.extend(part.lower() for part in parts_found)
+    return tokens
+
+
+def discover_files(root: Path, extensions: Sequence[str] = DEFAULT_EXTENSIONS,
+                   exclude_dirs: Sequence[str] = DEFAULT_EXCLUDE_DIRS) -> List[str]:
+    """Relative paths of matching files, sorted so document ids are stable"""
+    found = []
+    for current, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in exclude_dirs]
+        for name in files:
+            if name.endswith(tuple(extensions)):
+                found.append(os.path.relpath(os.path.join(current, name), root))
+    return sorted(found)
+
+
+def tree_hash(root: Path, paths: Iterable[str], options: Dict) -> str:
+    """Hash of the file list, sizes, mtimes and load options"""
+    digest = hashlib.sha256(json.dumps({"version": INDEX_VERSION, **options}, sort_keys=True).encode())
+    for path in paths:
+        try:
+            stat = os.stat(root / path)
+            digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{path}\0missing\n".encode())
+    return digest.hexdigest()
+
+
+class CorpusIndex(Mapping):
+    """Inverted index over a file tree, backed by memory-mapped arrays"""
+
+    FILES = ("offsets.npy", "postings_docs.npy", "postings_tf.npy", "doc_lengths.npy",
+             "text_offsets.npy", "contents.bin", "meta.json")
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        meta = json.loads((self.directory / "meta.json").read_text())
+        self.root = Path(meta["root"])
+        self.tree_hash = meta["tree_hash"]
+        self.paths: List[str] = meta["paths"]
+        self.doc_ids = {path: doc for doc, path in enumerate(self.paths)}
+        self.term_ids = {term: term_id for term_id, term in enumerate(meta["terms"])}
+        self.offsets = np.load(self.directory / "offsets.npy", mmap_mode="r")
+        self.postings_docs = np.load(self.directory / "postings_docs.npy", mmap_mode="r")
+        self.postings_tf = np.load(self.directory / "postings_tf.npy", mmap_mode="r")
+        self.doc_lengths = np.load(self.directory / "doc_lengths.npy", mmap_mode="r")
+        self.text_offsets = np.load(self.directory / "text_offsets.npy", mmap_mode="r")
+        # np.memmap cannot map an empty file
+        self.contents = (np.memmap(self.directory / "contents.bin", dtype=np.uint8, mode="r")
+                         if self.text_offsets[-1] > 0 else np.zeros(0, dtype=np.uint8))
+        self.avg_doc_length = float(self.doc_lengths.mean()) if len(self.paths) else 0.0
+        self.loaded_from_cache = True
+        self.build_seconds: Optional[float] = None
+
+    # -- building ---------------------------------------------------------------
+
+    @classmethod
+    def load(cls, root, extensions: Sequence[str] = DEFAULT_EXTENSIONS,
+             exclude_dirs: Sequence[str] = DEFAULT_EXCLUDE_DIRS, max_chars: Optional[int] = None,
+             paths: Optional[Sequence[str]] = None, cache_dir: Optional[Path] = None,
+             rebuild: bool = False) -> "CorpusIndex":
+        """Open the cached index for this tree, building it first if it is missing or stale.
+
+        paths restricts the corpus to the given relative paths (missing
+        ones are skipped); otherwise the tree is walked for extensions.
+        max_chars truncates each file before tokenizing.
+        """
+        root = Path(root).resolve()
+        options = {"root": str(root), "max_chars": max_chars, "explicit_paths": paths is not None,
+                   "extensions": sorted(extensions), "exclude_dirs": sorted(exclude_dirs)}
+        if paths is None:
+            paths = discover_files(root, extensions, exclude_dirs)
+        else:
+            paths = sorted(p for p in set(paths) if (root / p).is_file())
+        key = tree_hash(root, paths, options)
+
+        # One cache entry per root and option set; a changed tree replaces it
+        cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        family = hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:12]
+        directory = cache_dir / f"{family}-{key[:16]}"
+        if not rebuild and all((directory / name).exists() for name in cls.FILES):
+            return cls(directory)
+
+        start_time = time.time()
+        cls.build(root, paths, directory, key, max_chars)
+        for stale in cache_dir.glob(f"{family}-*"):
+            if stale != directory and ".tmp" not in stale.name:
+                shutil.rmtree(stale, ignore_errors=True)
+        index = cls(directory)
+        index.loaded_from_cache = False
+        index.build_seconds = time.time() - start_time
+        return index
+
+    @staticmethod
+    def build(root: Path, paths: Sequence[str], directory: Path, key: str, max_chars: Optional[int] = None):
+        """Tokenize every file and write the index files into directory"""
+        term_ids: Dict[str, int] = {}
+        entry_terms, entry_docs, entry_tfs = array("i"), array("i"), array("i")
+        doc_lengths = array("i")
+        text_offsets = array("q", [0])
+
+        tmp = directory.with_name(directory.name + f".tmp{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        with open(tmp / "contents.bin", "wb") as contents:
+            for doc, path in enumerate(paths):
+                try:
+                    with open(root / path, "r", encoding="utf-8", errors="ignore") as f:
+                        text = f.read(max_chars) if max_chars else f.read()
+                except OSError:
+                    text = ""
+                tokens = tokenize(text)
+                counts = Counter(tokens)
+                counts.update(PATH_FIELD + token for token in set(tokenize(path)))
+                for term, tf in counts.items():
+                    entry_terms.append(term_ids.setdefault(term, len(term_ids)))
+                    entry_docs.append(doc)
+                    entry_tfs.append(tf)
+                doc_lengths.append(len(tokens))
+                data = text.encode("utf-8")
+                contents.write(data)
+                text_offsets.append(text_offsets[-1] + len(data))
+
+        # CSR layout with terms in sorted order and postings sorted by doc
+        terms = sorted(term_ids)
+        rank = np.empty(len(term_ids), dtype=np.int64)
+        rank[[term_ids[term] for term in terms]] = np.arange(len(terms))
+        term_rank = rank[np.frombuffer(entry_terms, dtype=np.int32)] if entry_terms else np.zeros(0, np.int64)
+        docs = np.frombuffer(entry_docs, dtype=np.int32)
+        order = np.lexsort((docs, term_rank))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_rank, minlength=len(terms)), out=offsets[1:])
+
+        np.save(tmp / "offsets.npy", offsets)
+        np.save(tmp / "postings_docs.npy", docs[order])
+        np.save(tmp / "postings_tf.npy", np.frombuffer(entry_tfs, dtype=np.int32)[order])
+        np.save(tmp / "doc_lengths.npy", np.frombuffer(doc_lengths, dtype=np.int32))
+        np.save(tmp / "text_offsets.npy", np.frombuffer(text_offsets, dtype=np.int64))
+        (tmp / "meta.json").write_text(json.dumps({
+            "version": INDEX_VERSION, "root": str(root), "tree_hash": key,
+            "max_chars": max_chars, "paths": list(paths), "terms": terms,
+        }))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    # -- mapping interface --------------------------------------------------------
+
+    def text(self, doc: int, max_bytes: Optional[int] = None) -> str:
+        start, end = int(self.text_offsets[doc]), int(self.text_offsets[doc + 1])
+        if max_bytes is not None:
+            end = min(end, start + max_bytes)
+        return self.contents[start:end].tobytes().decode("utf-8", "ignore")
+
+    def __getitem__(self, path: str) -> str:
+        return self.text(self.doc_ids[path])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    # -- queries ------------------------------------------------------------------
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc ids, term frequencies) for an already tokenized term"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.postings_docs[start:end], self.postings_tf[start:end]
+
+    def term_frequency(self, term: str) -> np.ndarray:
+        """Dense per-document frequency of one term"""
+        tf = np.zeros(len(self.paths), dtype=np.float64)
+        docs, counts = self.postings(term)
+        tf[docs] = counts
+        return tf
+
+    def path_match(self, term: str) -> np.ndarray:
+        """Boolean per-document mask of files whose path contains the token"""
+        return self.term_frequency(PATH_FIELD + term) > 0
+
+    def docs_with_all(self, terms: Iterable[str]) -> np.ndarray:
+        """Documents containing every term (candidates for phrase/exact checks)"""
+        result = None
+        for term in set(terms):
+            docs = self.postings(term)[0]
+            result = docs if result is None else np.intersect1d(result, docs, assume_unique=True)
+            if not len(result):
+                break
+        return np.asarray(result if result is not None else [], dtype=np.int64)
+
+    def docs_with_fragment(self, fragment: str) -> np.ndarray:
+        """Documents with an indexed word that contains fragment (case-insensitive)"""
+        fragment = fragment.lower()
+        term_ids = [term_id for term, term_id in self.term_ids.items()
+                    if fragment in term and not term.startswith(PATH_FIELD)]
+        if not term_ids:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate([
+            self.postings_docs[self.offsets[term_id]:self.offsets[term_id + 1]] for term_id in term_ids
+        ])).astype(np.int64)
+
+    def substring_candidates(self, text: str) -> np.ndarray:
+        """Documents that can contain text as a substring, in any case.
+
+        Every word of a file is indexed whole, so each word of text lies
+        inside some indexed word of any file containing it. Only the
+        vocabulary is scanned; the result is exact, never lossy. Text
+        without word characters matches all documents.
+        """
+        result = None
+        for fragment in set(_WORD_RE.findall(text.lower())):
+            docs = self.docs_with_fragment(fragment)
+            result = docs if result is None else np.intersect1d(result, docs, assume_unique=True)
+            if not len(result):
+                break
+        if result is None:
+            return np.arange(len(self.paths), dtype=np.int64)
+        return result
+
+    def bm25_scores(self, query: str, k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+        """Okapi BM25 score of every document for the tokenized query"""
+        scores = np.zeros(len(self.paths), dtype=np.float64)
+        if not len(self.paths):
+            return scores
+        lengths = np.asarray(self.doc_lengths, dtype=np.float64)
+        norm = k1 * (1 - b + b * lengths / (self.avg_doc_length or 1.0))
+        for term in set(tokenize(query)):
+            docs, tf = self.postings(term)
+            if not len(docs):
+                continue
+            idf = np.log(1 + (len(self.paths) - len(docs) + 0.5) / (len(docs) + 0.5))
+            tf = np.asarray(tf, dtype=np.float64)
+            scores[docs] += idf * tf * (k1 + 1) / (tf + norm[docs])
+        return scores
+
+    def top(self, scores: np.ndarray, limit: int) -> List[Tuple[str, float]]:
+        """Highest positive scores as (path, score), ties broken by path order"""
+        positive = np.flatnonzero(scores > 0)
+        if len(positive) > limit:
+            positive = positive[np.argpartition(-scores[positive], limit - 1)[:limit]]
+        ranked = sorted(positive, key=lambda doc: (-scores[doc], doc))
+        return [(self.paths[doc], float(scores[doc])) for doc in ranked]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        return self.top(self.bm25_scores(query), limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the cached benchmark corpus index")
+    parser.add_argument("root", help="Repository or corpus directory")
+    parser.add_argument("query", nargs="?", help="Run a BM25 query against the index")
+    parser.add_argument("--limit", type=int, default=10, help="Results to show")
+    parser.add_argument("--max-chars", type=int, help="Only index the first N characters of each file")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cached index")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    corpus = CorpusIndex.load(args.root, max_chars=args.max_chars, rebuild=args.rebuild)
+    source = "cache" if corpus.loaded_from_cache else "fresh build"
+    print(f"📚 {len(corpus):,} files, {len(corpus.term_ids):,} terms ({source}, {time.time() - start_time:.2f}s)")
+    print(f"   Index: {corpus.directory}")
+
+    if args.query:
+        start_time = time.time()
+        results = corpus.search(args.query, args.limit)
+        print(f"\n🔍 {args.query} ({(time.time() - start_time) * 1000:.1f}ms)")
+        for rank, (path, score) in enumerate(results, 1):
+            print(f"   {rank}. {path}: {score:.3f}")
+
+
+if __name__ == "__main__":
+    main()
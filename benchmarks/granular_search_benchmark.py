@@ -10,12 +10,15 @@ Compare BM25 vs existing knowledge graph search across different content granula
 """
 
 import asyncio
-import os
 import re
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
+from corpus_index import CorpusIndex, tokenize
+
 @dataclass
 class GranularQuery:
     query_id: str
@@ -30,29 +33,16 @@ class GranularSearchBenchmark:
 
     def __init__(self, repository_path: str):
         self.repository_path = Path(repository_path)
-        self.file_contents = {}
         self.load_file_contents()
 
     def load_file_contents(self):
-        """Load actual file contents for analysis"""
+        """Load file contents through the shared, cached corpus index"""
         print("📁 Loading file contents for granular analysis...")
 
-        for root, dirs, files in os.walk(self.repository_path):
-            dirs[:] = [d for d in dirs if d not in ['node_modules', 'dist', 'build', '.git', 'coverage']]
-
-            for file in files:
-                if any(file.endswith(ext) for ext in ['.md', '.ts', '.py', '.js']):
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, self.repository_path)
-
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            self.file_contents[rel_path] = content
-                    except:
-                        pass
+        self.file_contents = CorpusIndex.load(self.repository_path, extensions=['.md', '.ts', '.py', '.js'])
 
-        print(f"📄 Loaded content from {len(self.file_contents)} files")
+        source = "cached index" if self.file_contents.loaded_from_cache else "new index"
+        print(f"📄 Loaded content from {len(self.file_contents)} files ({source})")
 
     def get_granular_queries(self) -> List[GranularQuery]:
         """Queries testing different content granularities"""
@@ -159,19 +149,33 @@ class GranularSearchBenchmark:
 
     def search_bm25_granular(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """BM25 search optimized for exact matches and identifiers"""
-        results = []
+        corpus = self.file_contents
 
         # For exact matches, look for the query as-is
         query_exact = query.strip()
-        query_words = re.findall(r'\w+', query.lower())
-
-        for file_path, content in self.file_contents.items():
-            score = 0.0
+        query_words = [word for word in dict.fromkeys(tokenize(query, parts=False)) if len(word) > 2]  # Skip very short words
+
+        # Variable/method name matches; camelCase/snake_case parts are indexed tokens
+        scores = np.zeros(len(corpus))
+        path_match = np.zeros(len(corpus), dtype=bool)
+        for word in query_words:
+            scores += corpus.term_frequency(word) * 0.5
+            path_match |= corpus.path_match(word)
+
+        # File path relevance
+        scores += path_match * 3.0
+
+        # Exact and definition matches contain the query, so only files whose words contain its words
+        # (plus, for import queries, files with an import) are read
+        candidates = corpus.substring_candidates(query_exact)
+        if "import" in query_words:
+            candidates = np.union1d(candidates, corpus.docs_with_fragment("import"))
+        for doc in candidates:
+            content = corpus.text(doc)
 
             # Exact string match (highest priority)
             if query_exact in content:
-                exact_count = content.count(query_exact)
-                score += exact_count * 10.0
+                scores[doc] += content.count(query_exact) * 10.0
 
             # Function/class definition matches
             if any(pattern in content for pattern in [
@@ -181,78 +185,41 @@ class GranularSearchBenchmark:
                 f"export {query_exact}",
                 f"def {query_exact}"
             ]):
-                score += 20.0
+                scores[doc] += 20.0
 
             # Import statement matches
-            if f"import" in query.lower() and "import" in content.lower():
+            if "import" in query_words:
                 import_lines = [line for line in content.split('\n') if 'import' in line.lower()]
                 for line in import_lines:
                     if any(word in line.lower() for word in query_words):
-                        score += 15.0
-
-            # Variable/method name matches
-            for word in query_words:
-                if len(word) > 2:  # Skip very short words
-                    # Count occurrences
-                    word_count = content.lower().count(word)
-                    if word_count > 0:
-                        score += word_count * 0.5
-
-                    # Boost for camelCase/snake_case matches
-                    camel_patterns = [
-                        f"{word}[A-Z]",   # camelCase
-                        f"_{word}_",      # snake_case
-                        f".{word}\\(",    # method call
-                        f"\\[{word}\\]"   # array access
-                    ]
-                    for pattern in camel_patterns:
-                        if re.search(pattern, content):
-                            score += 5.0
-
-            # File path relevance
-            if any(word in file_path.lower() for word in query_words):
-                score += 3.0
-
-            if score > 0:
-                results.append({
-                    "file_path": file_path,
-                    "score": score,
-                    "match_type": "bm25_granular"
-                })
+                        scores[doc] += 15.0
 
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return [
+            {"file_path": file_path, "score": score, "match_type": "bm25_granular"}
+            for file_path, score in corpus.top(scores, limit)
+        ]
 
     def search_old_knowledge_graph_simulation(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Simulate the old knowledge graph search behavior"""
-        results = []
-        query_words = query.lower().split()
-
-        for file_path, content in self.file_contents.items():
-            score = 0.0
+        corpus = self.file_contents
+        query_words = tokenize(query, parts=False)
+        doc_lengths = np.maximum(np.asarray(corpus.doc_lengths, dtype=np.float64), 1.0)
 
-            # Simple keyword matching (what the old system likely did)
-            content_lower = content.lower()
-            for word in query_words:
-                if word in content_lower:
-                    word_frequency = content_lower.count(word)
-                    # Basic TF calculation
-                    tf = word_frequency / len(content_lower.split())
-                    score += tf * 100
+        # Simple keyword matching (what the old system likely did): basic TF calculation
+        scores = np.zeros(len(corpus))
+        path_match = np.zeros(len(corpus), dtype=bool)
+        for word in query_words:
+            scores += corpus.term_frequency(word) / doc_lengths * 100
+            path_match |= corpus.path_match(word)
 
-            # Boost for file name matches
-            if any(word in file_path.lower() for word in query_words):
-                score += 10.0
+        # Boost for file name matches
+        scores += path_match * 10.0
+        scores[scores <= 0.1] = 0.0
 
-            if score > 0.1:
-                results.append({
-                    "file_path": file_path,
-                    "score": score,
-                    "match_type": "old_knowledge_graph"
-                })
-
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return [
+            {"file_path": file_path, "score": score, "match_type": "old_knowledge_graph"}
+            for file_path, score in corpus.top(scores, limit)
+        ]
 
     def search_semantic_granular(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Semantic search optimized for concepts and explanations"""
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Indexing Throughput Benchmark
+Indexes a fixed corpus through the real MCP server (index_symbol_graph) and
+reports files/sec, chunks/sec, embedding batch sizes, time per stage and how
+long the embedder sat idle, i.e. the GPU-starvation pattern described in
+INDEXING_BOTTLENECK_ANALYSIS.md.
+
+Every run re-indexes a fresh copy of the corpus from scratch. The JSON
+output carries the commit and corpus fingerprint so runs can be compared
+across commits.
+
+Usage (build first with npm run build):
+    python benchmarks/indexing_throughput_benchmark.py --embedder stub --runs 3
+    python benchmarks/indexing_throughput_benchmark.py --embedder real --corpus /path/to/repo
+    python benchmarks/indexing_throughput_benchmark.py --profile-memory   # RSS/heap per 1k files
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from mcp_client import DEFAULT_SERVER_COMMAND, REPO_ROOT, McpClient
+from memory_profile import MemoryProfiler, format_summary, per_1k_docs
+
+RESULT_SCHEMA = "zmcp-indexing-throughput"
+RESULT_SCHEMA_VERSION = 1
+
+# The indexer and chunker talk to the embedder at this fixed address
+EMBEDDER_HOST = "127.0.0.1"
+EMBEDDER_PORT = 8765
+
+STAGES = ["discovery_ms", "ast_ms", "storage_ms", "bm25_ms", "chunking_ms", "embedding_ms", "lancedb_write_ms"]
+CORPUS_EXTENSIONS = {".ts", ".js", ".py", ".md"}
+SKIP_DIRS = {"node_modules", "dist", "build", ".git", "coverage", "__pycache__"}
+
+
+def collect_corpus(root: Path) -> List[Path]:
+    files = []
+    for dirpath, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+        for name in sorted(names):
+            path = Path(dirpath) / name
+            if path.suffix in CORPUS_EXTENSIONS:
+                files.append(path)
+    return files
+
+
+def corpus_fingerprint(root: Path, files: List[Path]) -> Dict[str, Any]:
+    """Content hash over relative paths and bytes, independent of where the corpus lives"""
+    digest = hashlib.sha256()
+    total_bytes = 0
+    for path in files:
+        data = path.read_bytes()
+        total_bytes += len(data)
+        digest.update(str(path.relative_to(root)).encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(data).digest())
+    return {"files": len(files), "bytes": total_bytes, "sha256": digest.hexdigest()}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "p50": statistics.median(ordered),
+        "mean": statistics.mean(ordered),
+        "max": ordered[-1],
+    }
+
+
+def port_in_use(host: str, port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex((host, port)) == 0
+
+
+class EmbedderProbe:
+    """Reads the embedder's /metrics counters when it exposes them (the stub does)"""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        try:
+            response = requests.get(f"{self.url}/metrics", timeout=2)
+            return response.json() if response.ok else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    @staticmethod
+    def delta(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not before or not after:
+            return None
+        sizes_before = before.get("embed_batch_sizes", {})
+        batch_sizes = {
+            int(size): count - sizes_before.get(size, 0)
+            for size, count in after.get("embed_batch_sizes", {}).items()
+            if count - sizes_before.get(size, 0) > 0
+        }
+        return {
+            "embed_requests": after["embed_requests"] - before["embed_requests"],
+            "texts_embedded": after["texts_embedded"] - before["texts_embedded"],
+            "token_count_requests": after.get("token_count_requests", 0) - before.get("token_count_requests", 0),
+            "busy_seconds": after["busy_seconds"] - before["busy_seconds"],
+            "batch_size_histogram": dict(sorted(batch_sizes.items())),
+        }
+
+
+class IndexingThroughputBenchmark:
+    """Cold-index a corpus repeatedly and summarise throughput per stage"""
+
+    def __init__(self, corpus: Path, server_command=DEFAULT_SERVER_COMMAND, runs: int = 3,
+                 embedder: str = "stub", stub_options: Optional[Dict[str, Any]] = None,
+                 timeout: float = 3600.0, profile_memory: bool = False):
+        self.corpus = corpus
+        self.server_command = server_command
+        self.runs = runs
+        self.embedder = embedder
+        self.stub_options = stub_options or {}
+        self.timeout = timeout
+        self.profile_memory = profile_memory
+        self.embedder_url = f"http://{EMBEDDER_HOST}:{EMBEDDER_PORT}"
+        self.probe = EmbedderProbe(self.embedder_url)
+        self.stub_server = None
+
+    def start_embedder(self):
+        if self.embedder != "stub":
+            return
+        if port_in_use(EMBEDDER_HOST, EMBEDDER_PORT):
+            raise RuntimeError(f"Port {EMBEDDER_PORT} is busy; stop the embedding service or use --embedder real")
+        from stub_embedding_server import start_server
+        self.stub_server = start_server(port=EMBEDDER_PORT, host=EMBEDDER_HOST, **self.stub_options)
+        print(f"🧪 Stub embedder on {self.embedder_url} {self.stub_options or ''}")
+
+    def stop_embedder(self):
+        if self.stub_server:
+            self.stub_server.shutdown()
+            self.stub_server = None
+
+    async def index_once(self, workdir: Path, run: int) -> Dict[str, Any]:
+        """Copy the corpus and index it cold through a fresh server process"""
+        target = workdir / f"run-{run}"
+        shutil.copytree(self.corpus, target, ignore=shutil.ignore_patterns(*SKIP_DIRS))
+
+        before = self.probe.snapshot()
+        async with McpClient(self.server_command, cwd=str(REPO_ROOT), client_name="indexing-benchmark",
+                             request_timeout=self.timeout) as client:
+            profiler = await MemoryProfiler(client).start() if self.profile_memory else None
+            if profiler:
+                profiler.phase("indexing")
+            started = time.perf_counter()
+            try:
+                response = await client.call_tool("index_symbol_graph", {
+                    "repository_path": str(target),
+                    "force_clean": True,
+                })
+            finally:
+                memory = await profiler.stop() if profiler else None
+            wall_seconds = time.perf_counter() - started
+        embedder = EmbedderProbe.delta(before, self.probe.snapshot())
+
+        if response.get("status") not in ("completed", "partial"):
+            raise RuntimeError(f"Indexing failed: {response.get('errors') or response.get('error')}")
+        run = self.summarize_run(response, wall_seconds, embedder)
+        if memory:
+            memory.update(per_1k_docs(memory, run["files"]))
+            run["memory"] = memory
+        return run
+
+    def summarize_run(self, response: Dict[str, Any], wall_seconds: float,
+                      embedder: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        throughput = response.get("throughput", {})
+        stages = {stage: float((throughput.get("stage_timings") or {}).get(stage, 0)) for stage in STAGES}
+        indexing_seconds = (throughput.get("indexing_time_ms") or response.get("duration_ms", 0)) / 1000 or wall_seconds
+        files = throughput.get("files_processed", response.get("files_indexed", 0))
+        chunks = throughput.get("chunks_embedded", 0)
+        batch_sizes = throughput.get("embedding_batch_sizes", [])
+
+        # Embedder busy time as seen by the indexer, and by the stub itself when available
+        client_busy = stages["embedding_ms"] / 1000
+        run = {
+            "wall_seconds": wall_seconds,
+            "indexing_seconds": indexing_seconds,
+            "files": files,
+            "chunks": chunks,
+            "files_per_second": files / indexing_seconds if indexing_seconds else 0.0,
+            "chunks_per_second": chunks / indexing_seconds if indexing_seconds else 0.0,
+            "stage_timings_ms": stages,
+            "stage_share": {stage: (ms / 1000) / indexing_seconds if indexing_seconds else 0.0
+                            for stage, ms in stages.items()},
+            "embedding_batch_sizes": distribution(batch_sizes),
+            "embedder_idle_fraction": max(0.0, 1.0 - client_busy / indexing_seconds) if indexing_seconds else None,
+            "warnings": len(response.get("warnings", [])),
+        }
+        if embedder:
+            run["embedder"] = embedder
+            run["embedder_idle_fraction_measured"] = max(0.0, 1.0 - embedder["busy_seconds"] / indexing_seconds)
+        return run
+
+    def aggregate(self, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Medians across runs, which is what should be compared between commits"""
+        def median(pick) -> Optional[float]:
+            values = [value for value in map(pick, runs) if value is not None]
+            return statistics.median(values) if values else None
+
+        return {
+            "files_per_second": median(lambda run: run["files_per_second"]),
+            "chunks_per_second": median(lambda run: run["chunks_per_second"]),
+            "indexing_seconds": median(lambda run: run["indexing_seconds"]),
+            "embedder_idle_fraction": median(lambda run: run["embedder_idle_fraction"]),
+            "embedder_idle_fraction_measured": median(lambda run: run.get("embedder_idle_fraction_measured")),
+            "embedding_batch_size_p50": median(lambda run: run["embedding_batch_sizes"].get("p50")),
+            "stage_timings_ms": {stage: median(lambda run, s=stage: run["stage_timings_ms"][s]) for stage in STAGES},
+            **({
+                "memory": {
+                    "peak_rss_mb": median(lambda run: run["memory"].get("peak_rss_mb")),
+                    "peak_heap_used_mb": median(lambda run: run["memory"].get("peak_heap_used_mb")),
+                    "rss_mb_per_1k_docs": median(lambda run: run["memory"]["rss_mb_per_1k_docs"]),
+                    "heap_mb_per_1k_docs": median(lambda run: run["memory"]["heap_mb_per_1k_docs"]),
+                }
+            } if self.profile_memory else {}),
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        files = collect_corpus(self.corpus)
+        if not files:
+            raise RuntimeError(f"No indexable files under {self.corpus}")
+        corpus = {"path": str(self.corpus), **corpus_fingerprint(self.corpus, files)}
+
+        print("🚀 Indexing Throughput Benchmark")
+        print(f"Corpus: {self.corpus} ({corpus['files']} files, {corpus['bytes'] / 1024:.0f} KiB)")
+        print(f"Embedder: {self.embedder}, runs: {self.runs}")
+        print()
+
+        self.start_embedder()
+        runs = []
+        try:
+            with tempfile.TemporaryDirectory(prefix="zmcp-index-bench-") as workdir:
+                for run in range(1, self.runs + 1):
+                    result = await self.index_once(Path(workdir), run)
+                    runs.append(result)
+                    print(f"  Run {run}: {result['files_per_second']:.1f} files/s, "
+                          f"{result['chunks_per_second']:.1f} chunks/s, "
+                          f"embedder idle {result['embedder_idle_fraction']:.0%}")
+                    if "memory" in result:
+                        print("\n".join(format_summary(result["memory"])))
+        finally:
+            self.stop_embedder()
+
+        summary = self.aggregate(runs)
+        self.print_summary(summary)
+        return {
+            "schema": RESULT_SCHEMA,
+            "schema_version": RESULT_SCHEMA_VERSION,
+            "benchmark": "indexing_throughput",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                        "cpu_count": os.cpu_count()},
+            "corpus": corpus,
+            "embedder": {"kind": self.embedder, "url": self.embedder_url, **self.stub_options},
+            "runs": runs,
+            "summary": summary,
+        }
+
+    def print_summary(self, summary: Dict[str, Any]):
+        print()
+        print("📊 INDEXING THROUGHPUT (median of runs)")
+        print("=" * 50)
+        print(f"  Files/sec:  {summary['files_per_second']:.1f}")
+        print(f"  Chunks/sec: {summary['chunks_per_second']:.1f}")
+        print(f"  Embedder idle: {summary['embedder_idle_fraction']:.1%}")
+        total = sum(v or 0 for v in summary["stage_timings_ms"].values()) or 1
+        for stage, ms in summary["stage_timings_ms"].items():
+            ms = ms or 0
+            print(f"  {stage[:-3]:<14} {ms:>9.0f}ms  {ms / total:6.1%}")
+        memory = summary.get("memory")
+        if memory:
+            def mb(value):
+                return f"{value:.1f} MB" if value is not None else "n/a"
+            print(f"  Peak RSS: {mb(memory['peak_rss_mb'])}, peak heap: {mb(memory['peak_heap_used_mb'])}")
+            print(f"  Per 1k files: RSS {mb(memory['rss_mb_per_1k_docs'])}, heap {mb(memory['heap_mb_per_1k_docs'])}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Indexing throughput benchmark for index_symbol_graph")
+    parser.add_argument("--corpus", default=str(REPO_ROOT / "src"), help="Directory to index (default: this repo's src/)")
+    parser.add_argument("--runs", type=int, default=3, help="Cold indexing runs")
+    parser.add_argument("--embedder", choices=["stub", "real"], default="stub",
+                        help="Start the stand-in embedder on :8765, or use the service already running there")
+    parser.add_argument("--stub-latency-ms", type=float, default=5.0, help="Stub service time per request")
+    parser.add_argument("--stub-per-item-ms", type=float, default=1.0, help="Stub service time per text")
+    parser.add_argument("--server-command", default=os.environ.get("ZMCP_SERVER_COMMAND", " ".join(DEFAULT_SERVER_COMMAND)),
+                        help="Command that starts the MCP server on stdio")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Sample server RSS and V8 heap while indexing and report MB per 1k files")
+    parser.add_argument("--output", default="indexing_throughput_results.json", help="Results JSON path")
+    args = parser.parse_args()
+
+    benchmark = IndexingThroughputBenchmark(
+        corpus=Path(args.corpus).resolve(),
+        server_command=args.server_command,
+        runs=args.runs,
+        embedder=args.embedder,
+        stub_options={"latency_ms": args.stub_latency_ms, "per_item_ms": args.stub_per_item_ms,
+                      "max_concurrency": 1} if args.embedder == "stub" else {},
+        profile_memory=args.profile_memory,
+    )
+
+    try:
+        results = await benchmark.run()
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📁 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(asyncio.run(main()))
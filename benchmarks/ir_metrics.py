@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Vectorized IR metrics and paired significance tests
+
+Rankings from every method for every query are packed once into
+(method, query, rank) matrices of binary relevance and graded gain; all
+cutoff metrics then fall out of a few cumulative sums. The paired tests
+resample in blocks of matrix operations, so tens of thousands of
+bootstrap or sign-flip resamples over thousands of queries take seconds.
+
+Metric names match the benchmarks' per-query dicts:
+precision_{1,3,5,10}, recall_{3,5,10}, mrr and ndcg_{3,5,10}.
+
+Usage:
+    matrices = build_run_matrices({"bm25": {"q1": ["a.ts", "b.md"]}}, {"q1": {"a.ts": 3.0}})
+    scores = evaluate(matrices)                   # {"ndcg_10": array(methods, queries), ...}
+    compare_methods(scores["ndcg_10"], matrices.methods, baseline="bm25")
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+PRECISION_CUTOFFS = (1, 3, 5, 10)
+RECALL_CUTOFFS = (3, 5, 10)
+NDCG_CUTOFFS = (3, 5, 10)
+
+# Upper bound on resample-matrix entries held at once (~32 MB of float64)
+_BLOCK_ELEMENTS = 1 << 22
+
+
+@dataclass
+class RunMatrices:
+    """Rankings of several methods over the same queries, padded to a common depth"""
+    methods: List[str]
+    query_ids: List[str]
+    relevant: np.ndarray      # (methods, queries, depth) bool: result at rank is in the relevant set
+    gains: np.ndarray         # (methods, queries, depth) graded relevance of result at rank
+    retrieved: np.ndarray     # (methods, queries) number of results returned
+    num_relevant: np.ndarray  # (queries,) size of the relevant set
+    ideal_gains: np.ndarray   # (queries, depth) all judged grades sorted descending
+
+
+def build_run_matrices(runs: Mapping[str, Mapping[str, Sequence[str]]],
+                       qrels: Mapping[str, Mapping[str, float]],
+                       relevant_docs: Optional[Mapping[str, Sequence[str]]] = None,
+                       query_ids: Optional[Sequence[str]] = None) -> RunMatrices:
+    """Pack runs ({method: {query_id: ranked doc ids}}) and graded qrels into matrices.
+
+    The relevant set of a query is relevant_docs[query_id] when given,
+    otherwise every judged document with a positive grade. Queries a
+    method did not answer count as empty rankings.
+    """
+    methods = list(runs)
+    if query_ids is None:
+        query_ids = list(qrels)
+    query_ids = list(query_ids)
+    cutoff = max(PRECISION_CUTOFFS + RECALL_CUTOFFS + NDCG_CUTOFFS)
+    depth = max([cutoff] + [len(ranking) for run in runs.values() for ranking in run.values()])
+
+    shape = (len(methods), len(query_ids), depth)
+    relevant = np.zeros(shape, dtype=bool)
+    gains = np.zeros(shape, dtype=np.float64)
+    retrieved = np.zeros(shape[:2], dtype=np.int64)
+    num_relevant = np.zeros(len(query_ids), dtype=np.int64)
+    ideal_gains = np.zeros((len(query_ids), depth), dtype=np.float64)
+
+    for q, query_id in enumerate(query_ids):
+        grades = qrels.get(query_id, {})
+        if relevant_docs is not None:
+            relevant_set = set(relevant_docs.get(query_id, ()))
+        else:
+            relevant_set = {doc for doc, grade in grades.items() if grade > 0}
+        num_relevant[q] = len(relevant_set)
+        ideal = sorted(grades.values(), reverse=True)[:depth]
+        ideal_gains[q, :len(ideal)] = ideal
+        for m, method in enumerate(methods):
+            ranking = runs[method].get(query_id, ())
+            retrieved[m, q] = len(ranking)
+            for rank, doc in enumerate(ranking):
+                relevant[m, q, rank] = doc in relevant_set
+                gains[m, q, rank] = grades.get(doc, 0.0)
+
+    return RunMatrices(methods, query_ids, relevant, gains, retrieved, num_relevant, ideal_gains)
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=np.float64),
+                                                 np.asarray(denominator, dtype=np.float64))
+    return np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator > 0)
+
+
+def evaluate(matrices: RunMatrices) -> Dict[str, np.ndarray]:
+    """Every metric for every method and query, each as a (methods, queries) array.
+
+    precision@k divides by min(k, results returned); NDCG uses the log2
+    discount with the ideal ranking taken from all judged grades.
+    """
+    hits = np.cumsum(matrices.relevant, axis=2)
+    scores: Dict[str, np.ndarray] = {}
+
+    for k in PRECISION_CUTOFFS:
+        scores[f"precision_{k}"] = _safe_divide(hits[..., k - 1], np.minimum(k, matrices.retrieved))
+    for k in RECALL_CUTOFFS:
+        scores[f"recall_{k}"] = _safe_divide(hits[..., k - 1], matrices.num_relevant[None, :])
+
+    first_hit = np.argmax(matrices.relevant, axis=2)
+    scores["mrr"] = np.where(matrices.relevant.any(axis=2), 1.0 / (first_hit + 1), 0.0)
+
+    discounts = 1.0 / np.log2(np.arange(2, matrices.gains.shape[2] + 2))
+    dcg = np.cumsum(matrices.gains * discounts, axis=2)
+    idcg = np.cumsum(matrices.ideal_gains * discounts, axis=1)
+    for k in NDCG_CUTOFFS:
+        ndcg = _safe_divide(dcg[..., k - 1], idcg[None, :, k - 1])
+        scores[f"ndcg_{k}"] = np.where(matrices.retrieved > 0, ndcg, 0.0)
+
+    return scores
+
+
+def query_metrics(ranked_docs: Sequence[str], relevant_docs: Sequence[str],
+                  relevance_scores: Mapping[str, float]) -> Dict[str, float]:
+    """All metrics for a single ranking, as the benchmarks' per-query dict"""
+    matrices = build_run_matrices({"run": {"q": list(ranked_docs)}}, {"q": relevance_scores},
+                                  relevant_docs={"q": relevant_docs})
+    return {name: float(values[0, 0]) for name, values in evaluate(matrices).items()}
+
+
+# ----------------------------------------------------------------------------
+# Paired significance tests
+# ----------------------------------------------------------------------------
+
+def _blocks(resamples: int, n: int):
+    block = max(1, _BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, resamples, block):
+        yield min(block, resamples - start)
+
+
+def randomization_p_value(differences: Sequence[float], resamples: int = 10000, seed: int = 0) -> float:
+    """Two-sided sign-flip randomization test on the mean paired difference"""
+    d = np.asarray(differences, dtype=np.float64)
+    observed = abs(d.sum())
+    if observed == 0:
+        return 1.0
+    rng = np.random.default_rng(seed)
+    extreme = 0
+    for size in _blocks(resamples, len(d)):
+        signs = rng.integers(0, 2, size=(size, len(d)), dtype=np.int8) * 2 - 1
+        extreme += int(np.count_nonzero(np.abs(signs @ d) >= observed - 1e-12))
+    return (extreme + 1) / (resamples + 1)
+
+
+def paired_randomization_test(a: Sequence[float], b: Sequence[float],
+                              resamples: int = 10000, seed: int = 0) -> float:
+    """p-value for per-query scores a and b (same queries, same order) having equal means"""
+    return randomization_p_value(np.asarray(b, dtype=np.float64) - np.asarray(a, dtype=np.float64),
+                                 resamples, seed)
+
+
+def paired_bootstrap(a: Sequence[float], b: Sequence[float], resamples: int = 10000,
+                     seed: int = 0, confidence: float = 0.95) -> Dict[str, float]:
+    """Bootstrap over queries of mean(b - a): confidence interval and two-sided p-value"""
+    d = np.asarray(b, dtype=np.float64) - np.asarray(a, dtype=np.float64)
+    if len(d) == 0:
+        return {"delta": 0.0, "ci_low": 0.0, "ci_high": 0.0, "p_value": 1.0}
+    rng = np.random.default_rng(seed)
+    means = np.concatenate([
+        d[rng.integers(0, len(d), size=(size, len(d)))].mean(axis=1)
+        for size in _blocks(resamples, len(d))
+    ])
+    alpha = 1.0 - confidence
+    low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2])
+    # Share of resampled means on the far side of zero, doubled; floored at
+    # 1 / (resamples + 1) like randomization_p_value, never exactly zero
+    if d.any():
+        p_value = max(2 * min(np.mean(means <= 0), np.mean(means >= 0)), 1.0 / (len(means) + 1))
+    else:
+        p_value = 1.0
+    return {"delta": float(d.mean()), "ci_low": float(low), "ci_high": float(high),
+            "p_value": float(min(1.0, p_value))}
+
+
+def holm_adjust(p_values: Sequence[float]) -> List[float]:
+    """Holm-Bonferroni step-down adjusted p-values (same order as given)"""
+    p = np.asarray(p_values, dtype=np.float64)
+    order = np.argsort(p)
+    adjusted = np.maximum.accumulate((len(p) - np.arange(len(p))) * p[order])
+    result = np.empty_like(p)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result.tolist()
+
+
+def compare_methods(scores: np.ndarray, methods: Sequence[str], baseline: Optional[str] = None,
+                    resamples: int = 10000, seed: int = 0, confidence: float = 0.95) -> List[Dict[str, float]]:
+    """Every method against a baseline on one metric's (methods, queries) score matrix.
+
+    The baseline defaults to the method with the best mean. p-values are
+    Holm-adjusted across the comparisons made.
+    """
+    methods = list(methods)
+    means = scores.mean(axis=1)
+    base = methods.index(baseline) if baseline is not None else int(np.argmax(means))
+    rows = []
+    for m, method in enumerate(methods):
+        if m == base:
+            continue
+        bootstrap = paired_bootstrap(scores[base], scores[m], resamples, seed, confidence)
+        rows.append({
+            "method": method,
+            "baseline": methods[base],
+            "mean": float(means[m]),
+            "baseline_mean": float(means[base]),
+            "delta": bootstrap["delta"],
+            "ci_low": bootstrap["ci_low"],
+            "ci_high": bootstrap["ci_high"],
+            "p_bootstrap": bootstrap["p_value"],
+            "p_randomization": paired_randomization_test(scores[base], scores[m], resamples, seed),
+        })
+    for row, adjusted in zip(rows, holm_adjust([row["p_randomization"] for row in rows])):
+        row["p_holm"] = adjusted
+    return rows
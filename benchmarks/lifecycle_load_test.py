@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Agent Lifecycle Load Test
+Simulates hundreds of lightweight agents writing to one throwaway SQLite
+database the way real agents do: a heartbeat and a tool_call_logs row per
+tool call, chat messages in a shared room, and status transitions, each
+at a randomised (Poisson) rate per agent.
+
+Agents run as threads spread over several processes, so the write lock is
+contended across processes as in production. Every write opens its own
+connection with SQLite's busy handler disabled and retries SQLITE_BUSY
+itself with the same backoff steps, which makes lock-wait time and the
+busy rate directly measurable.
+
+Reports per agent count and operation: p50/p99 write latency, p99 lock
+wait, share of writes that hit SQLITE_BUSY, and writes that gave up.
+
+Usage:
+    python benchmarks/lifecycle_load_test.py --agents 100,250,500,1000 --duration 20
+    python benchmarks/lifecycle_load_test.py --agents 1000 --heartbeats aggregated
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "python"))
+from heartbeat_aggregator import HeartbeatAggregator  # noqa: E402
+
+OPERATIONS = ["heartbeat", "tool_call", "room_message", "status"]
+
+# SQLite's own busy-handler sleep schedule (ms)
+BUSY_BACKOFF_MS = [1, 2, 5, 10, 15, 20, 25, 25, 25, 50, 50, 100]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_sessions (
+    id TEXT PRIMARY KEY,
+    agentName TEXT,
+    agentType TEXT,
+    repositoryPath TEXT,
+    status TEXT,
+    process_pid INTEGER,
+    last_activity_at TIMESTAMP,
+    timeout_seconds INTEGER DEFAULT 1500
+);
+CREATE INDEX IF NOT EXISTS idx_agent_activity ON agent_sessions(last_activity_at, status);
+CREATE TABLE IF NOT EXISTS tool_call_logs (
+    id TEXT PRIMARY KEY,
+    repositoryPath TEXT NOT NULL,
+    agentId TEXT NOT NULL,
+    taskId TEXT,
+    toolName TEXT NOT NULL,
+    parameters TEXT,
+    result TEXT,
+    status TEXT NOT NULL,
+    executionTime REAL,
+    errorMessage TEXT,
+    createdAt TEXT NOT NULL DEFAULT (current_timestamp)
+);
+CREATE TABLE IF NOT EXISTS chat_rooms (
+    name TEXT PRIMARY KEY,
+    description TEXT,
+    repositoryPath TEXT NOT NULL,
+    isGeneral INTEGER NOT NULL DEFAULT 0,
+    createdAt TEXT NOT NULL DEFAULT (current_timestamp),
+    updatedAt TEXT NOT NULL DEFAULT (current_timestamp)
+);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id TEXT PRIMARY KEY,
+    roomId TEXT NOT NULL,
+    agentName TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp TEXT NOT NULL DEFAULT (current_timestamp),
+    mentions TEXT,
+    messageType TEXT NOT NULL DEFAULT 'standard'
+);
+CREATE INDEX IF NOT EXISTS chat_messages_room_idx ON chat_messages(roomId);
+"""
+
+TOOL_NAMES = ["Read", "Edit", "Bash", "Grep", "search_knowledge_graph", "join_room", "report_progress"]
+
+
+@dataclass
+class LoadProfile:
+    """Mean seconds between events, per agent"""
+    tool_call_interval: float = 3.0
+    message_interval: float = 20.0
+    status_interval: float = 60.0
+    busy_deadline: float = 30.0         # give up after this long, like busy_timeout
+    heartbeats: str = "direct"          # direct: UPDATE per tool call; aggregated: HeartbeatAggregator
+    flush_interval: float = 1.0
+
+
+def create_database(db_path: Path, num_agents: int, journal_mode: str = "wal") -> List[str]:
+    """Fresh schema with num_agents active sessions and one shared room"""
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.executescript(SCHEMA)
+    agent_ids = [f"load-agent-{i:04d}" for i in range(num_agents)]
+    conn.executemany("""
+        INSERT INTO agent_sessions
+        (id, agentName, agentType, repositoryPath, status, process_pid, last_activity_at, timeout_seconds)
+        VALUES (?, ?, 'testing', '/tmp/load', 'active', ?, datetime('now'), 1500)
+    """, [(agent_id, agent_id, 100000 + i) for i, agent_id in enumerate(agent_ids)])
+    conn.execute("INSERT INTO chat_rooms (name, repositoryPath, isGeneral) VALUES ('load-room', '/tmp/load', 1)")
+    conn.commit()
+    conn.close()
+    return agent_ids
+
+
+def is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error)
+    return "database is locked" in message or "database is busy" in message
+
+
+def with_busy_retry(write: Callable[[], Any], deadline: float) -> Dict[str, Any]:
+    """Call write() until it gets the write lock, backing off on SQLITE_BUSY.
+
+    write must fail fast (busy timeout 0) and leave nothing half-applied.
+    Returns latency (call to commit), lock wait (time before the attempt
+    that got the lock), busy count and whether the write succeeded.
+    """
+    started = time.perf_counter()
+    busy = 0
+    while True:
+        attempt = time.perf_counter()
+        try:
+            write()
+            return {"latency": time.perf_counter() - started, "lock_wait": attempt - started if busy else 0.0,
+                    "busy": busy, "ok": True}
+        except sqlite3.OperationalError as e:
+            if not is_busy(e):
+                raise
+            busy += 1
+            elapsed = time.perf_counter() - started
+            if elapsed > deadline:
+                return {"latency": elapsed, "lock_wait": elapsed, "busy": busy, "ok": False}
+            time.sleep(BUSY_BACKOFF_MS[min(busy, len(BUSY_BACKOFF_MS)) - 1] / 1000)
+
+
+def timed_write(db_path: Path, statements: List[Tuple[str, tuple]], deadline: float) -> Dict[str, Any]:
+    """Run statements in one BEGIN IMMEDIATE transaction on a new connection (see with_busy_retry)"""
+    def write():
+        conn = sqlite3.connect(db_path, timeout=0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("BEGIN IMMEDIATE")
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    return with_busy_retry(write, deadline)
+
+
+class Recorder:
+    """Thread-safe per-operation samples"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples: Dict[str, List[Dict[str, Any]]] = {op: [] for op in OPERATIONS}
+
+    def add(self, op: str, sample: Dict[str, Any]):
+        with self.lock:
+            self.samples[op].append(sample)
+
+
+def heartbeat_sql(agent_id: str) -> Tuple[str, tuple]:
+    return "UPDATE agent_sessions SET last_activity_at = CURRENT_TIMESTAMP WHERE id = ?", (agent_id,)
+
+
+def simulate_agent(db_path: Path, agent_id: str, profile: LoadProfile, stop_at: float, seed: int,
+                   recorder: Recorder, aggregator: Optional[HeartbeatAggregator]):
+    """One agent: exponential inter-arrival times for each kind of event"""
+    rng = random.Random(seed)
+    rates = {"tool_call": profile.tool_call_interval, "room_message": profile.message_interval,
+             "status": profile.status_interval}
+    # Random phase so agents do not start in lockstep
+    due = {op: time.time() + rng.uniform(0, mean) for op, mean in rates.items()}
+    status = "active"
+
+    while True:
+        op = min(due, key=due.get)
+        if due[op] >= stop_at:
+            return
+        time.sleep(max(0.0, due[op] - time.time()))
+        due[op] += rng.expovariate(1.0 / rates[op])
+
+        if op == "tool_call":
+            if aggregator is not None:
+                aggregator.beat(agent_id)
+            else:
+                recorder.add("heartbeat", timed_write(db_path, [heartbeat_sql(agent_id)], profile.busy_deadline))
+            statement = ("""
+                INSERT INTO tool_call_logs (id, repositoryPath, agentId, toolName, parameters, status, executionTime)
+                VALUES (?, '/tmp/load', ?, ?, ?, 'success', ?)
+            """, (uuid.uuid4().hex, agent_id, rng.choice(TOOL_NAMES), json.dumps({"n": rng.randint(0, 99)}),
+                  rng.uniform(0.001, 2.0)))
+        elif op == "room_message":
+            statement = ("INSERT INTO chat_messages (id, roomId, agentName, message) VALUES (?, 'load-room', ?, ?)",
+                         (uuid.uuid4().hex, agent_id, f"progress update from {agent_id}"))
+        else:
+            status = "idle" if status == "active" else "active"
+            statement = ("UPDATE agent_sessions SET status = ? WHERE id = ?", (status, agent_id))
+        recorder.add(op, timed_write(db_path, [statement], profile.busy_deadline))
+
+
+def run_worker(args: Tuple[str, List[str], Dict[str, Any], float, int]) -> Dict[str, List[Dict[str, Any]]]:
+    """One process: its share of the agents as threads (plus a heartbeat flusher when aggregating)"""
+    db_path, agent_ids, profile_dict, stop_at, seed = args
+    db_path = Path(db_path)
+    profile = LoadProfile(**profile_dict)
+    recorder = Recorder()
+    aggregator = None
+    stop_flusher = threading.Event()
+    threads = []
+
+    if profile.heartbeats == "aggregated":
+        # busy_timeout=0: lock waits go through the same measured backoff as direct writes
+        aggregator = HeartbeatAggregator(db_path, flush_interval=profile.flush_interval,
+                                         busy_timeout=0, autostart=False)
+
+        def flusher():
+            while not stop_flusher.wait(profile.flush_interval):
+                flush_once()
+
+        def flush_once():
+            # A busy flush requeues its batch, so the retry writes it again
+            if aggregator.pending:
+                recorder.add("heartbeat", with_busy_retry(aggregator.flush, profile.busy_deadline))
+
+        threads.append(threading.Thread(target=flusher, daemon=True))
+
+    for i, agent_id in enumerate(agent_ids):
+        threads.append(threading.Thread(target=simulate_agent, daemon=True,
+                                        args=(db_path, agent_id, profile, stop_at, seed * 100003 + i,
+                                              recorder, aggregator)))
+    for thread in threads:
+        thread.start()
+    for thread in threads[1 if aggregator else 0:]:
+        thread.join()
+    if aggregator:
+        stop_flusher.set()
+        threads[0].join()
+        flush_once()
+    return recorder.samples
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    latencies = [s["latency"] * 1000 for s in samples]
+    waits = [s["lock_wait"] * 1000 for s in samples]
+    busy_writes = sum(1 for s in samples if s["busy"])
+    return {
+        "writes": len(samples),
+        "writes_per_second": len(samples) / duration if duration else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies, default=0.0),
+        "lock_wait_p99_ms": percentile(waits, 99),
+        "lock_wait_total_s": sum(waits) / 1000,
+        "busy_rate": busy_writes / len(samples) if samples else 0.0,
+        "busy_errors": sum(s["busy"] for s in samples),
+        "failed": sum(1 for s in samples if not s["ok"]),
+    }
+
+
+def run_level(num_agents: int, duration: float, processes: int, profile: LoadProfile,
+              journal_mode: str, seed: int, workdir: Path) -> Dict[str, Any]:
+    """One load level against a fresh database"""
+    db_path = workdir / f"lifecycle-load-{num_agents}.db"
+    agent_ids = create_database(db_path, num_agents, journal_mode)
+    processes = max(1, min(processes, num_agents))
+    shares = [agent_ids[i::processes] for i in range(processes)]
+    # Leave time for every process to start its threads before the clock runs
+    stop_at = time.time() + 1.0 + duration
+
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(run_worker, [(str(db_path), share, asdict(profile), stop_at, seed * 1000 + i)
+                                        for i, share in enumerate(shares)])
+
+    merged = {op: [sample for result in results for sample in result[op]] for op in OPERATIONS}
+    all_samples = [sample for op in OPERATIONS for sample in merged[op]]
+    return {
+        "agents": num_agents,
+        "processes": processes,
+        "duration_s": duration,
+        "total": summarize(all_samples, duration),
+        "operations": {op: summarize(merged[op], duration) for op in OPERATIONS if merged[op]},
+    }
+
+
+def print_level(level: Dict[str, Any]):
+    total = level["total"]
+    print(f"\n👥 {level['agents']} agents ({level['processes']} processes): "
+          f"{total['writes_per_second']:.0f} writes/s, p99 {total['p99_ms']:.1f}ms, "
+          f"busy {total['busy_rate']:.1%}, failed {total['failed']}")
+    print(f"  {'operation':<14}{'writes':>8}{'p50 ms':>9}{'p99 ms':>9}{'wait p99':>10}{'busy':>8}{'failed':>8}")
+    for op, stats in level["operations"].items():
+        print(f"  {op:<14}{stats['writes']:>8}{stats['p50_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+              f"{stats['lock_wait_p99_ms']:>10.1f}{stats['busy_rate']:>8.1%}{stats['failed']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent lifecycle write-load test against a throwaway SQLite database")
+    parser.add_argument("--agents", default="100,250,500,1000", help="Agent counts to test, comma-separated")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per agent count")
+    parser.add_argument("--processes", type=int, default=min(8, multiprocessing.cpu_count()),
+                        help="Writer processes the agents are spread over")
+    parser.add_argument("--tool-call-interval", type=float, default=3.0, help="Mean seconds between tool calls per agent")
+    parser.add_argument("--message-interval", type=float, default=20.0, help="Mean seconds between room messages per agent")
+    parser.add_argument("--status-interval", type=float, default=60.0, help="Mean seconds between status changes per agent")
+    parser.add_argument("--heartbeats", choices=["direct", "aggregated"], default="direct",
+                        help="UPDATE per tool call, or batched through HeartbeatAggregator per process")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="Aggregated heartbeat flush interval")
+    parser.add_argument("--journal-mode", choices=["wal", "delete"], default="wal",
+                        help="Journal mode (the server uses WAL)")
+    parser.add_argument("--p99-budget-ms", type=float, default=100.0, help="p99 write latency considered acceptable")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", default="lifecycle_load_results.json", help="Results JSON path")
+    args = parser.parse_args()
+
+    profile = LoadProfile(tool_call_interval=args.tool_call_interval, message_interval=args.message_interval,
+                          status_interval=args.status_interval, heartbeats=args.heartbeats,
+                          flush_interval=args.flush_interval)
+    levels = [int(value) for value in args.agents.split(",") if value.strip()]
+
+    print("🚀 Agent Lifecycle Load Test")
+    print(f"Agents: {levels}, {args.duration:.0f}s each, journal {args.journal_mode}, heartbeats {args.heartbeats}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="zmcp-lifecycle-load-") as workdir:
+        for num_agents in levels:
+            level = run_level(num_agents, args.duration, args.processes, profile, args.journal_mode,
+                              args.seed, Path(workdir))
+            print_level(level)
+            results.append(level)
+
+    breaking = next((level["agents"] for level in results
+                     if level["total"]["p99_ms"] > args.p99_budget_ms or level["total"]["failed"]), None)
+    print()
+    if breaking:
+        print(f"⚠️  p99 budget of {args.p99_budget_ms:.0f}ms exceeded at {breaking} agents")
+    else:
+        print(f"✅ Within the {args.p99_budget_ms:.0f}ms p99 budget up to {levels[-1]} agents")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "lifecycle_load",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "profile": asdict(profile),
+            "journal_mode": args.journal_mode,
+            "p99_budget_ms": args.p99_budget_ms,
+            "breaking_point_agents": breaking,
+            "levels": results,
+        }, f, indent=2)
+    print(f"📁 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
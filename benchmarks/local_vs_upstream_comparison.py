@@ -14,19 +14,22 @@ import json
 import requests
 from pathlib import Path
 import numpy as np
+import os
+
+GPU_SERVICE_URL = os.environ.get("ZMCP_GPU_SERVICE_URL", "http://localhost:8765")
 
 def test_local_gpu(query: str, docs: list) -> dict:
     """Test using our GPU service (port 8765 with Gemma-768D)"""
     start = time.time()
 
     # Get embeddings from GPU service
-    query_resp = requests.post('http://localhost:8765/embed',
+    query_resp = requests.post(f'{GPU_SERVICE_URL}/embed',
                                json={'texts': [query], 'model': 'gemma_embed'},
                                timeout=30)
     query_emb = np.array(query_resp.json()['embeddings'][0])
 
     doc_texts = [d['content'] for d in docs]
-    doc_resp = requests.post('http://localhost:8765/embed',
+    doc_resp = requests.post(f'{GPU_SERVICE_URL}/embed',
                             json={'texts': doc_texts, 'model': 'gemma_embed'},
                             timeout=60)
     doc_embs = [np.array(e) for e in doc_resp.json()['embeddings']]
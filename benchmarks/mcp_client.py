@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Persistent MCP stdio client for benchmarks and integration tests
+
+Starts the server once, performs the initialize handshake and multiplexes
+concurrent JSON-RPC requests over the same pipe by request id, so callers
+measure warm tool calls instead of a process cold start per call.
+
+Async use:
+    async with McpClient(["node", "dist/server/index.js"]) as client:
+        result = await client.call_tool("search_knowledge_graph_unified", {...})
+
+Blocking use (scripts without an event loop):
+    with SyncMcpClient(["node", "dist/server/index.js"]) as client:
+        result = client.call_tool("search_knowledge_graph_unified", {...})
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import shlex
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SERVER_COMMAND = ["node", str(REPO_ROOT / "dist" / "server" / "index.js")]
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+# JSON-RPC "method not found", returned for server-to-client requests
+METHOD_NOT_FOUND = -32601
+
+
+class McpError(RuntimeError):
+    """JSON-RPC error response, or the server going away mid-request"""
+
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class McpClient:
+    """One long-lived MCP server process spoken to over newline-delimited JSON-RPC.
+
+    A reader task resolves pending requests by id, so any number of
+    requests can be in flight at once; writes are serialised by a lock.
+    """
+
+    def __init__(self, command: Union[str, Sequence[str]] = DEFAULT_SERVER_COMMAND,
+                 cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                 client_name: str = "zmcp-python-client", request_timeout: float = 120.0,
+                 on_notification: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.command = shlex.split(command) if isinstance(command, str) else list(command)
+        self.cwd = cwd or str(REPO_ROOT)
+        self.env = env
+        self.client_name = client_name
+        self.request_timeout = request_timeout
+        self.on_notification = on_notification
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.server_info: Dict[str, Any] = {}
+        self.server_capabilities: Dict[str, Any] = {}
+        self.stderr_tail: deque = deque(maxlen=50)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, timeout: Optional[float] = None) -> "McpClient":
+        """Spawn the server and complete the initialize handshake"""
+        if self.running:
+            return self
+        self._write_lock = asyncio.Lock()
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            env={**os.environ, **(self.env or {})},
+            limit=64 * 1024 * 1024,  # tool results arrive as single (possibly large) lines
+        )
+        self._tasks = [asyncio.create_task(self._read_stdout()), asyncio.create_task(self._read_stderr())]
+        try:
+            result = await self.request("initialize", {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": self.client_name, "version": "1.0.0"},
+            }, timeout=timeout)
+        except Exception:
+            await self.close()
+            raise
+        self.server_info = result.get("serverInfo", {})
+        self.server_capabilities = result.get("capabilities", {})
+        await self.notify("notifications/initialized")
+        return self
+
+    async def _send(self, message: Dict[str, Any]):
+        if not self.running:
+            raise McpError(self._exit_message())
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        async with self._write_lock:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+
+    async def _read_stdout(self):
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # stray non-protocol output
+                if "method" in message:
+                    await self._handle_server_message(message)
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future and not future.done():
+                    future.set_result(message)
+        finally:
+            await self.process.wait()
+            error = McpError(self._exit_message())
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def _handle_server_message(self, message: Dict[str, Any]):
+        if "id" in message:
+            # Server-to-client requests (sampling, roots, ...) are not supported
+            await self._send({"jsonrpc": "2.0", "id": message["id"],
+                              "error": {"code": METHOD_NOT_FOUND, "message": "Method not found"}})
+        elif self.on_notification:
+            self.on_notification(message)
+
+    async def _read_stderr(self):
+        # Keep the pipe drained so server logging never blocks it
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                break
+            self.stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+
+    def _exit_message(self) -> str:
+        code = self.process.returncode if self.process else None
+        tail = "\n".join(list(self.stderr_tail)[-5:])
+        return f"MCP server exited (code {code})" + (f":\n{tail}" if tail else "")
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a request and wait for its result; raises McpError on error responses"""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            await self._send(message)
+            response = await asyncio.wait_for(future, timeout or self.request_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in response:
+            error = response["error"]
+            raise McpError(f"{method} failed: {error.get('message', error)}",
+                           error.get("code"), error.get("data"))
+        return response.get("result", {})
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        return (await self.request("tools/list", {})).get("tools", [])
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Call a tool and decode its JSON text content.
+
+        Tool-level failures (isError, non-JSON output) come back as
+        {"success": False, "error": ...} like the tools' own error results.
+        """
+        result = await self.request("tools/call", {"name": name, "arguments": arguments}, timeout=timeout)
+        text = (result.get("content") or [{}])[0].get("text", "")
+        if result.get("isError"):
+            return {"success": False, "error": text}
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return {"success": False, "error": f"Non-JSON tool output: {text[:200]}"}
+
+    async def close(self, timeout: float = 5.0):
+        """Close stdin so the server exits, killing it if it does not"""
+        if not self.process:
+            return
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.process = None
+
+    async def __aenter__(self) -> "McpClient":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class SyncMcpClient:
+    """Blocking facade over McpClient, running its event loop in a daemon thread.
+
+    Calls from several threads still share the one session and are
+    multiplexed like concurrent async calls.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.client = McpClient(*args, **kwargs)
+
+    def run(self, coroutine):
+        """Run a coroutine on the client's loop, e.g. one using self.client directly"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def start(self, timeout: Optional[float] = None) -> "SyncMcpClient":
+        self.run(self.client.start(timeout))
+        return self
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.run(self.client.request(method, params, timeout))
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        return self.run(self.client.list_tools())
+
+    def call_tool(self, name: str, arguments: Dict[str, Any],
+                  timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.run(self.client.call_tool(name, arguments, timeout))
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> "SyncMcpClient":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Memory profiling mode for the benchmark runners
+
+Samples the MCP server process while it indexes or answers queries:
+resident set size from /proc/<pid>/status, and V8 heap usage through the
+server's debug_memory_stats tool. tracemalloc can additionally trace the
+benchmark's own Python process (corpus loading, in-process baselines).
+Samples are tagged with the current phase so indexing and querying peaks
+are reported separately, and growth is normalised to MB per 1k documents
+for capacity planning.
+
+Usage:
+    async with McpClient(command) as client:
+        profiler = MemoryProfiler(client)
+        await profiler.start()
+        profiler.phase("indexing")
+        ...
+        summary = await profiler.stop()
+        summary.update(per_1k_docs(summary, documents=12_000))
+"""
+
+import asyncio
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from mcp_client import McpClient, McpError
+
+HEAP_TOOL = "debug_memory_stats"
+
+
+def read_process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """Current and peak RSS of a live process in MB (Linux /proc only)"""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    fields[key] = int(value.split()[0]) / 1024
+    except (OSError, ValueError):
+        return None
+    if "VmRSS" not in fields:
+        return None
+    return {"rss_mb": fields["VmRSS"], "peak_rss_mb": fields.get("VmHWM", fields["VmRSS"])}
+
+
+def python_peak_rss_mb() -> float:
+    """Peak RSS of this Python process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def per_1k_docs(summary: Dict[str, Any], documents: int, phase: str = "indexing") -> Dict[str, Optional[float]]:
+    """Memory growth of a phase per 1,000 documents (None when not measurable)"""
+    stats = summary.get("phases", {}).get(phase) or summary
+    baseline = summary.get("baseline", {})
+
+    def growth(peak_key: str, base_key: str) -> Optional[float]:
+        peak, base = stats.get(peak_key), baseline.get(base_key)
+        if peak is None or base is None or not documents:
+            return None
+        return max(0.0, peak - base) / documents * 1000
+
+    return {
+        "rss_mb_per_1k_docs": growth("peak_rss_mb", "rss_mb"),
+        "heap_mb_per_1k_docs": growth("peak_heap_used_mb", "heap_used_mb"),
+    }
+
+
+class MemoryProfiler:
+    """Background sampler of one MCP server's RSS and heap, grouped by phase.
+
+    RSS is read from /proc every interval; the heap tool is polled on its
+    own task so a busy server event loop delays heap samples without
+    stalling the RSS timeline.
+    """
+
+    def __init__(self, client: McpClient, interval: float = 0.25, heap_interval: float = 1.0,
+                 trace_python: bool = False):
+        self.client = client
+        self.interval = interval
+        self.heap_interval = heap_interval
+        self.trace_python = trace_python
+        self.current_phase = "startup"
+        self.samples: List[Dict[str, Any]] = []
+        self.heap_samples: List[Dict[str, Any]] = []
+        self.heap_available = False
+        self.baseline: Dict[str, float] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._started = 0.0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.client.process.pid if self.client.process else None
+
+    async def start(self) -> "MemoryProfiler":
+        """Record a baseline and begin sampling"""
+        self._started = time.perf_counter()
+        tools = {tool.get("name") for tool in await self.client.list_tools()}
+        self.heap_available = HEAP_TOOL in tools
+        if self.trace_python:
+            tracemalloc.start()
+
+        self.baseline = dict(read_process_memory(self.pid) or {})
+        heap = await self._read_heap()
+        if heap:
+            self.baseline.update(heap_used_mb=heap["heap_used_mb"], heap_total_mb=heap["heap_total_mb"])
+
+        self._tasks = [asyncio.create_task(self._sample_rss())]
+        if self.heap_available:
+            self._tasks.append(asyncio.create_task(self._sample_heap()))
+        return self
+
+    def phase(self, name: str):
+        """Attribute subsequent samples to a named phase (e.g. indexing, querying)"""
+        # Close the outgoing phase with a reading so short phases are never empty
+        self._record_rss()
+        self.current_phase = name
+
+    def _record_rss(self):
+        memory = read_process_memory(self.pid) if self.pid else None
+        if memory:
+            self.samples.append({"t": time.perf_counter() - self._started, "phase": self.current_phase, **memory})
+
+    async def _read_heap(self) -> Optional[Dict[str, Any]]:
+        if not self.heap_available:
+            return None
+        try:
+            stats = await self.client.call_tool(HEAP_TOOL, {}, timeout=max(30.0, self.heap_interval * 10))
+        except (McpError, asyncio.TimeoutError):
+            return None
+        return stats if "heap_used_mb" in stats else None
+
+    async def _sample_rss(self):
+        while True:
+            self._record_rss()
+            await asyncio.sleep(self.interval)
+
+    async def _sample_heap(self):
+        while True:
+            phase = self.current_phase
+            heap = await self._read_heap()
+            if heap:
+                self.heap_samples.append({
+                    "t": time.perf_counter() - self._started, "phase": phase,
+                    "heap_used_mb": heap["heap_used_mb"], "heap_total_mb": heap["heap_total_mb"],
+                    "external_mb": heap.get("external_mb", 0.0), "array_buffers_mb": heap.get("array_buffers_mb", 0.0),
+                })
+            await asyncio.sleep(self.heap_interval)
+
+    async def stop(self) -> Dict[str, Any]:
+        """Stop sampling and summarise; call before the server is closed"""
+        self._record_rss()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        summary = {
+            "pid": self.pid,
+            "interval_s": self.interval,
+            "heap_source": HEAP_TOOL if self.heap_available else None,
+            "baseline": self.baseline,
+            **self._stats(self.samples, self.heap_samples),
+            "phases": {
+                phase: self._stats([s for s in self.samples if s["phase"] == phase],
+                                   [s for s in self.heap_samples if s["phase"] == phase])
+                for phase in dict.fromkeys(s["phase"] for s in self.samples + self.heap_samples)
+            },
+            "python_peak_rss_mb": python_peak_rss_mb(),
+        }
+        if self.trace_python and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            summary["python_traced_mb"] = current / (1024 * 1024)
+            summary["python_traced_peak_mb"] = peak / (1024 * 1024)
+        return summary
+
+    @staticmethod
+    def _stats(samples: List[Dict[str, Any]], heap_samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"rss_samples": len(samples), "heap_samples": len(heap_samples)}
+        if samples:
+            stats["peak_rss_mb"] = max(s["rss_mb"] for s in samples)
+            stats["final_rss_mb"] = samples[-1]["rss_mb"]
+            # VmHWM also catches spikes between samples
+            stats["high_water_rss_mb"] = max(s["peak_rss_mb"] for s in samples)
+        if heap_samples:
+            stats["peak_heap_used_mb"] = max(s["heap_used_mb"] for s in heap_samples)
+            stats["peak_heap_total_mb"] = max(s["heap_total_mb"] for s in heap_samples)
+            stats["peak_external_mb"] = max(s["external_mb"] for s in heap_samples)
+            stats["final_heap_used_mb"] = heap_samples[-1]["heap_used_mb"]
+        return stats
+
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    """Human-readable lines for a profiler summary"""
+    def mb(value: Optional[float]) -> str:
+        return f"{value:.1f} MB" if value is not None else "n/a"
+
+    baseline = summary.get("baseline", {})
+    lines = [f"  Baseline RSS: {mb(baseline.get('rss_mb'))}, heap: {mb(baseline.get('heap_used_mb'))}"]
+    for phase, stats in summary.get("phases", {}).items():
+        lines.append(f"  {phase:<10} peak RSS {mb(stats.get('peak_rss_mb'))} "
+                     f"(high water {mb(stats.get('high_water_rss_mb'))}), "
+                     f"peak heap {mb(stats.get('peak_heap_used_mb'))}")
+    if summary.get("rss_mb_per_1k_docs") is not None:
+        lines.append(f"  Per 1k docs: RSS {mb(summary['rss_mb_per_1k_docs'])}, "
+                     f"heap {mb(summary.get('heap_mb_per_1k_docs'))}")
+    if "python_traced_peak_mb" in summary:
+        lines.append(f"  Python tracemalloc peak: {mb(summary['python_traced_peak_mb'])}")
+    if summary.get("heap_source") is None:
+        lines.append(f"  (server has no {HEAP_TOOL} tool; heap not sampled)")
+    return lines
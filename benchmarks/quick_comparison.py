@@ -4,32 +4,28 @@ Quick BM25 vs Knowledge Graph Comparison
 Focus on just the files we know exist to get fast, clear results
 """
 
-import os
 import re
 from pathlib import Path
 
+import numpy as np
+
+from corpus_index import CorpusIndex, tokenize
+
 def test_exact_searches():
     """Test exact function/class name searches"""
 
     # Files we know exist
-    test_files = {
-        "ZMCPTools/src/tools/unifiedSearchTool.ts": None,
-        "ZMCPTools/src/services/RealFileIndexingService.ts": None,
-        "ZMCPTools/src/services/EmbeddingClient.ts": None,
-        "CLAUDE.md": None,
-        "README.md": None
-    }
-
-    # Load their content
+    test_files = [
+        "ZMCPTools/src/tools/unifiedSearchTool.ts",
+        "ZMCPTools/src/services/RealFileIndexingService.ts",
+        "ZMCPTools/src/services/EmbeddingClient.ts",
+        "CLAUDE.md",
+        "README.md"
+    ]
+
+    # Load their content through the shared corpus index (missing files are skipped)
     repo_path = "/home/jw/dev/game1"
-    for file_path in test_files.keys():
-        full_path = os.path.join(repo_path, file_path)
-        if os.path.exists(full_path):
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    test_files[file_path] = f.read()
-            except:
-                pass
+    corpus = CorpusIndex.load(repo_path, paths=test_files)
 
     print("🔬 Quick BM25 vs Knowledge Graph Comparison")
     print("=" * 50)
@@ -68,8 +64,8 @@ def test_exact_searches():
         print(f"   Type: {test['type']}")
         print(f"   Expected: {test['expected_file']}")
 
-        bm25_scores = search_bm25(test['query'], test_files)
-        kg_scores = search_old_kg(test['query'], test_files)
+        bm25_scores = search_bm25(test['query'], corpus)
+        kg_scores = search_old_kg(test['query'], corpus)
 
         print(f"\n   BM25 Results:")
         for i, (file, score) in enumerate(bm25_scores[:3]):
@@ -100,78 +96,58 @@ def test_exact_searches():
 
     return True
 
-def search_bm25(query, files):
+def search_bm25(query, corpus):
     """BM25-style search with exact matching priority"""
-    results = []
     query_exact = query.strip()
-    query_words = re.findall(r'\w+', query.lower())
-
-    for file_path, content in files.items():
-        if content is None:
-            continue
+    query_words = [word for word in dict.fromkeys(tokenize(query, parts=False)) if len(word) > 2]
+
+    # Word-level matching and file name relevance from the index
+    scores = np.zeros(len(corpus))
+    path_match = np.zeros(len(corpus), dtype=bool)
+    for word in query_words:
+        scores += corpus.term_frequency(word) * 2.0
+        path_match |= corpus.path_match(word)
+    scores += path_match * 10.0
+
+    # Function/class definition matches
+    patterns = [
+        f"export.*{query_exact}",
+        f"function {query_exact}",
+        f"class {query_exact}",
+        f"const {query_exact}",
+        f"def {query_exact}"
+    ]
 
-        score = 0.0
+    # Exact and definition matches contain the query, so only files whose words contain its words are read
+    for doc in corpus.substring_candidates(query_exact):
+        content = corpus.text(doc)
 
         # Exact string match (highest priority)
         if query_exact in content:
-            exact_count = content.count(query_exact)
-            score += exact_count * 50.0
-
-        # Function/class definition matches
-        patterns = [
-            f"export.*{query_exact}",
-            f"function {query_exact}",
-            f"class {query_exact}",
-            f"const {query_exact}",
-            f"def {query_exact}"
-        ]
+            scores[doc] += content.count(query_exact) * 50.0
+
         for pattern in patterns:
             if re.search(pattern, content, re.IGNORECASE):
-                score += 100.0
+                scores[doc] += 100.0
 
-        # Word-level matching
-        for word in query_words:
-            if len(word) > 2:
-                word_count = content.lower().count(word)
-                if word_count > 0:
-                    score += word_count * 2.0
+    return corpus.top(scores, len(corpus))
 
-        # File name relevance
-        if any(word in file_path.lower() for word in query_words):
-            score += 10.0
-
-        if score > 0:
-            results.append((file_path, score))
-
-    return sorted(results, key=lambda x: x[1], reverse=True)
-
-def search_old_kg(query, files):
+def search_old_kg(query, corpus):
     """Simulate old knowledge graph search behavior"""
-    results = []
-    query_words = query.lower().split()
-
-    for file_path, content in files.items():
-        if content is None:
-            continue
-
-        score = 0.0
-        content_lower = content.lower()
-
-        # Simple TF-like scoring
-        for word in query_words:
-            if word in content_lower:
-                word_frequency = content_lower.count(word)
-                tf = word_frequency / len(content_lower.split())
-                score += tf * 1000  # Scale up for visibility
+    query_words = tokenize(query, parts=False)
+    doc_lengths = np.maximum(np.asarray(corpus.doc_lengths, dtype=np.float64), 1.0)
 
-        # File name boost
-        if any(word in file_path.lower() for word in query_words):
-            score += 50.0
+    # Simple TF-like scoring
+    scores = np.zeros(len(corpus))
+    path_match = np.zeros(len(corpus), dtype=bool)
+    for word in query_words:
+        scores += corpus.term_frequency(word) / doc_lengths * 1000  # Scale up for visibility
+        path_match |= corpus.path_match(word)
 
-        if score > 0:
-            results.append((file_path, score))
+    # File name boost
+    scores += path_match * 50.0
 
-    return sorted(results, key=lambda x: x[1], reverse=True)
+    return corpus.top(scores, len(corpus))
 
 if __name__ == "__main__":
     test_exact_searches()
\ No newline at end of file
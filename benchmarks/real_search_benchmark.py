@@ -16,6 +16,8 @@ import requests
 import subprocess
 import os
 
+from ir_metrics import build_run_matrices, compare_methods, evaluate, query_metrics
+
 @dataclass
 class QueryRelevanceSet:
     """A query with its known relevant documents"""
@@ -48,7 +50,7 @@ class RealSearchBenchmark:
 
         # Service endpoints
         self.mcp_service_url = "http://localhost:3000"
-        self.gpu_service_url = "http://localhost:8765"
+        self.gpu_service_url = os.environ.get("ZMCP_GPU_SERVICE_URL", "http://localhost:8765")
 
     def load_project_files_dataset(self) -> List[QueryRelevanceSet]:
         """Load curated dataset with real file paths that exist in the project"""
@@ -266,65 +268,28 @@ class RealSearchBenchmark:
         return candidates[:limit]
 
     def calculate_ir_metrics(self, query_set: QueryRelevanceSet, search_results: List[Dict[str, Any]]) -> Dict[str, float]:
-        """Calculate standard Information Retrieval metrics"""
-
-        def precision_at_k(results: List[Dict[str, Any]], k: int) -> float:
-            if k == 0 or len(results) == 0:
-                return 0.0
-            relevant_count = sum(1 for r in results[:k] if r["file_path"] in query_set.relevant_docs)
-            return relevant_count / min(k, len(results))
-
-        def recall_at_k(results: List[Dict[str, Any]], k: int) -> float:
-            if len(query_set.relevant_docs) == 0:
-                return 0.0
-            relevant_count = sum(1 for r in results[:k] if r["file_path"] in query_set.relevant_docs)
-            return relevant_count / len(query_set.relevant_docs)
-
-        def mrr(results: List[Dict[str, Any]]) -> float:
-            for i, result in enumerate(results):
-                if result["file_path"] in query_set.relevant_docs:
-                    return 1.0 / (i + 1)
-            return 0.0
-
-        def ndcg_at_k(results: List[Dict[str, Any]], k: int) -> float:
-            def dcg(relevances: List[float]) -> float:
-                return sum(rel / (2 ** (i + 1)) for i, rel in enumerate(relevances))
-
-            # Get relevance scores for retrieved documents
-            retrieved_relevances = []
-            for r in results[:k]:
-                rel_score = query_set.relevance_scores.get(r["file_path"], 0.0)
-                retrieved_relevances.append(rel_score)
-
-            if not retrieved_relevances:
-                return 0.0
-
-            # Calculate DCG
-            dcg_score = dcg(retrieved_relevances)
-
-            # Calculate ideal DCG
-            all_relevances = list(query_set.relevance_scores.values())
-            ideal_relevances = sorted(all_relevances, reverse=True)[:k]
-            idcg_score = dcg(ideal_relevances)
-
-            return dcg_score / idcg_score if idcg_score > 0 else 0.0
-
-        # Calculate all metrics
-        metrics = {
-            "precision_1": precision_at_k(search_results, 1),
-            "precision_3": precision_at_k(search_results, 3),
-            "precision_5": precision_at_k(search_results, 5),
-            "precision_10": precision_at_k(search_results, 10),
-            "recall_3": recall_at_k(search_results, 3),
-            "recall_5": recall_at_k(search_results, 5),
-            "recall_10": recall_at_k(search_results, 10),
-            "mrr": mrr(search_results),
-            "ndcg_3": ndcg_at_k(search_results, 3),
-            "ndcg_5": ndcg_at_k(search_results, 5),
-            "ndcg_10": ndcg_at_k(search_results, 10)
-        }
-
-        return metrics
+        """Calculate standard Information Retrieval metrics (P@k, R@k, MRR, NDCG@k) for one query"""
+        return query_metrics([r["file_path"] for r in search_results], query_set.relevant_docs,
+                             query_set.relevance_scores)
+
+    def score_all(self, query_sets: List[QueryRelevanceSet], results: List[BenchmarkResult]) -> Dict[str, Any]:
+        """Metrics for every method and query in one vectorized pass; fills each result's metrics"""
+        methods = list(dict.fromkeys(r.method_name for r in results))
+        runs = {method: {} for method in methods}
+        for r in results:
+            runs[r.method_name][r.query_id] = [doc["file_path"] for doc in r.results]
+        matrices = build_run_matrices(
+            runs,
+            {qs.query_id: qs.relevance_scores for qs in query_sets},
+            relevant_docs={qs.query_id: qs.relevant_docs for qs in query_sets},
+            query_ids=[qs.query_id for qs in query_sets],
+        )
+        scores = evaluate(matrices)
+        query_index = {query_id: q for q, query_id in enumerate(matrices.query_ids)}
+        for r in results:
+            m, q = methods.index(r.method_name), query_index[r.query_id]
+            r.metrics = {name: float(values[m, q]) for name, values in scores.items()}
+        return scores
 
     async def run_benchmark(self) -> Dict[str, Any]:
         """Run the complete real search benchmark"""
@@ -355,7 +320,6 @@ class RealSearchBenchmark:
         # Run benchmark for each method
         for method_name, search_func in search_methods.items():
             print(f"\n🔍 Testing {method_name}...")
-            method_results = []
 
             for query_set in query_sets:
                 print(f"  Query: {query_set.query_text[:50]}...")
@@ -365,46 +329,39 @@ class RealSearchBenchmark:
                 search_results = search_func(query_set.query_text)
                 timing_ms = (time.time() - start_time) * 1000
 
-                # Calculate metrics
-                metrics = self.calculate_ir_metrics(query_set, search_results)
-
-                # Store results
-                result = BenchmarkResult(
+                # Store results; metrics are computed for all methods at once below
+                all_results.append(BenchmarkResult(
                     method_name=method_name,
                     query_id=query_set.query_id,
                     query_text=query_set.query_text,
                     results=search_results,
-                    metrics=metrics,
+                    metrics={},
                     timing_ms=timing_ms,
                     method_config={"method": method_name, "top_k": 10}
-                )
+                ))
 
-                method_results.append(result)
-                all_results.append(result)
-
-                # Show immediate result
-                print(f"    NDCG@5: {metrics['ndcg_5']:.3f}, P@3: {metrics['precision_3']:.3f}, MRR: {metrics['mrr']:.3f}")
                 print(f"    Found {len([r for r in search_results if r['file_path'] in query_set.relevant_docs])} relevant files")
 
-            # Calculate aggregate metrics for this method
-            if method_results:
-                aggregates = {}
-                for metric_name in method_results[0].metrics.keys():
-                    values = [r.metrics[metric_name] for r in method_results]
-                    aggregates[metric_name] = {
-                        "mean": statistics.mean(values),
-                        "std": statistics.stdev(values) if len(values) > 1 else 0.0,
-                        "min": min(values),
-                        "max": max(values)
-                    }
-
-                avg_timing = statistics.mean([r.timing_ms for r in method_results])
-                method_aggregates[method_name] = {
-                    "metrics": aggregates,
-                    "avg_timing_ms": avg_timing,
-                    "query_count": len(method_results)
+        # Calculate metrics for every method and query, then aggregate per method
+        scores = self.score_all(query_sets, all_results)
+        for m, method_name in enumerate(search_methods):
+            aggregates = {}
+            for metric_name, values in scores.items():
+                values = values[m]
+                aggregates[metric_name] = {
+                    "mean": float(values.mean()),
+                    "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                    "min": float(values.min()),
+                    "max": float(values.max())
                 }
 
+            avg_timing = statistics.mean([r.timing_ms for r in all_results if r.method_name == method_name])
+            method_aggregates[method_name] = {
+                "metrics": aggregates,
+                "avg_timing_ms": avg_timing,
+                "query_count": len(query_sets)
+            }
+
         # Print final results
         print(f"\n📊 FINAL BENCHMARK RESULTS (REAL DATA)")
         print("=" * 50)
@@ -426,12 +383,25 @@ class RealSearchBenchmark:
                          key=lambda m: method_aggregates[m]["metrics"]["ndcg_5"]["mean"])
         print(f"\n🏆 Best Method (by NDCG@5): {best_method}")
 
+        # Paired significance of every other method against the best one
+        significance = {}
+        if len(query_sets) > 1:
+            for metric_name in ("ndcg_5", "ndcg_10", "mrr"):
+                significance[metric_name] = compare_methods(
+                    scores[metric_name], list(search_methods), baseline=best_method, seed=self.random_seed
+                )
+            for row in significance["ndcg_5"]:
+                marker = "✱" if row["p_holm"] < 0.05 else " "
+                print(f"  {marker} {row['method']}: ΔNDCG@5 {row['delta']:+.3f} "
+                      f"[{row['ci_low']:+.3f}, {row['ci_high']:+.3f}], p={row['p_holm']:.4f}")
+
         return {
             "dataset": "real_project_files",
             "random_seed": self.random_seed,
             "query_count": len(query_sets),
             "indexed_files": len(self.indexed_files),
             "method_aggregates": method_aggregates,
+            "significance": significance,
             "all_results": [asdict(r) for r in all_results],
             "best_method": best_method,
             "timestamp": time.time()
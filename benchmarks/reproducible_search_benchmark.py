@@ -7,6 +7,7 @@ Usage:
   python reproducible_search_benchmark.py --dataset project_files
   python reproducible_search_benchmark.py --dataset mteb_sample
   python reproducible_search_benchmark.py --dataset custom --data-path /path/to/docs
+  python reproducible_search_benchmark.py --dataset synthetic --scale 1000,10000,100000
 
 Features:
 - Ground truth relevance judgments
@@ -14,10 +15,15 @@ Features:
 - Statistical significance testing
 - Reproducible results with fixed seeds
 - Easy to point at different datasets
+- Seeded synthetic corpora searched through the real MCP server, with index
+  size, build time, server memory and query latency reported per corpus size
 """
 
 import argparse
 import json
+import os
+import shlex
+import shutil
 import time
 import hashlib
 import statistics
@@ -28,6 +34,22 @@ import requests
 import random
 import numpy as np
 
+from ir_metrics import build_run_matrices, compare_methods, evaluate, query_metrics
+from mcp_client import DEFAULT_SERVER_COMMAND, REPO_ROOT, SyncMcpClient
+from memory_profile import MemoryProfiler, format_summary, per_1k_docs, read_process_memory
+from synthetic_corpus import QUERIES_NAME, ensure_corpus
+
+DEFAULT_CORPUS_ROOT = Path.home() / ".mcptools" / "benchmarks" / "corpora"
+
+# Pipeline flags of search_knowledge_graph_unified for each benchmarked method
+SERVER_METHODS = {
+    "BM25_Only": {"use_bm25": True, "use_gpu_embeddings": False, "use_reranker": False},
+    "Semantic_Only": {"use_bm25": False, "use_gpu_embeddings": True, "use_reranker": False},
+    "Hybrid_BM25_Semantic": {"use_bm25": True, "use_gpu_embeddings": True, "use_reranker": False},
+    "Semantic_Reranked": {"use_bm25": False, "use_gpu_embeddings": True, "use_reranker": True},
+}
+
+
 @dataclass
 class QueryRelevanceSet:
     """A query with its known relevant documents"""
@@ -55,22 +77,48 @@ class BenchmarkResult:
     timing_ms: float
     method_config: Dict[str, Any]
 
+
+# Project-local storage for scaling runs: the server keeps the corpus's
+# index under <corpus>/var/storage and its database under <corpus>/var/db
+LOCAL_STORAGE_ENV = {"ZMCP_USE_LOCAL_STORAGE": "true", "ZMCP_USE_LOCAL_DB": "true"}
+
+
+def reset_index_state(corpus_dir: Path) -> Path:
+    """Wipe a corpus's project-local index and database so the next build starts empty"""
+    state_dir = Path(corpus_dir) / "var"
+    shutil.rmtree(state_dir, ignore_errors=True)
+    (state_dir / "storage").mkdir(parents=True)
+    (state_dir / "db").mkdir()
+    return state_dir
+
+
+def resolve_server_command(command) -> List[str]:
+    """Make repo-relative paths in a server command absolute so it can run from another cwd"""
+    parts = shlex.split(command) if isinstance(command, str) else list(command)
+    return [str(REPO_ROOT / part) if not os.path.isabs(part) and (REPO_ROOT / part).exists() else part
+            for part in parts]
+
+
 class ReproducibleSearchBenchmark:
     """Scientific benchmark for search methods with ground truth evaluation"""
 
-    def __init__(self, data_path: str, random_seed: int = 42):
+    def __init__(self, data_path: str, random_seed: int = 42, resamples: int = 10000):
         self.data_path = Path(data_path)
         self.random_seed = random_seed
+        self.resamples = resamples  # bootstrap/randomization resamples for significance tests
         random.seed(random_seed)
         np.random.seed(random_seed)
 
         # Service endpoints
-        self.gpu_service_url = "http://localhost:8765"
+        self.gpu_service_url = os.environ.get("ZMCP_GPU_SERVICE_URL", "http://localhost:8765")
         self.mcp_service_url = "http://localhost:3000"  # Adjust as needed
 
         # Benchmark datasets
         self.query_sets = {}
 
+        # Set while a synthetic corpus is being searched through the real server
+        self.mcp_client: Optional[SyncMcpClient] = None
+
     def load_project_files_dataset(self) -> List[QueryRelevanceSet]:
         """Load a curated dataset from project files with known relevance"""
 
@@ -334,70 +382,75 @@ class ReproducibleSearchBenchmark:
         # Fallback to semantic if reranker unavailable
         return candidates[:top_k]
 
-    def calculate_ir_metrics(self, query_set: QueryRelevanceSet, search_results: List[SearchResult]) -> Dict[str, float]:
-        """Calculate standard Information Retrieval metrics"""
-
-        # Precision at K
-        def precision_at_k(results: List[SearchResult], k: int) -> float:
-            if k == 0 or len(results) == 0:
-                return 0.0
-            relevant_count = sum(1 for r in results[:k] if r.doc_id in query_set.relevant_docs)
-            return relevant_count / min(k, len(results))
-
-        # Recall at K
-        def recall_at_k(results: List[SearchResult], k: int) -> float:
-            if len(query_set.relevant_docs) == 0:
-                return 0.0
-            relevant_count = sum(1 for r in results[:k] if r.doc_id in query_set.relevant_docs)
-            return relevant_count / len(query_set.relevant_docs)
-
-        # Mean Reciprocal Rank
-        def mrr(results: List[SearchResult]) -> float:
-            for i, result in enumerate(results):
-                if result.doc_id in query_set.relevant_docs:
-                    return 1.0 / (i + 1)
-            return 0.0
-
-        # NDCG (Normalized Discounted Cumulative Gain)
-        def ndcg_at_k(results: List[SearchResult], k: int) -> float:
-            def dcg(relevances: List[float]) -> float:
-                return sum(rel / np.log2(i + 2) for i, rel in enumerate(relevances))
-
-            # Get relevance scores for retrieved documents
-            retrieved_relevances = []
-            for r in results[:k]:
-                rel_score = query_set.relevance_scores.get(r.doc_id, 0.0)
-                retrieved_relevances.append(rel_score)
-
-            if not retrieved_relevances:
-                return 0.0
-
-            # Calculate DCG
-            dcg_score = dcg(retrieved_relevances)
-
-            # Calculate ideal DCG (sort relevances in descending order)
-            all_relevances = list(query_set.relevance_scores.values())
-            ideal_relevances = sorted(all_relevances, reverse=True)[:k]
-            idcg_score = dcg(ideal_relevances)
-
-            return dcg_score / idcg_score if idcg_score > 0 else 0.0
-
-        # Calculate all metrics
-        metrics = {
-            "precision_1": precision_at_k(search_results, 1),
-            "precision_3": precision_at_k(search_results, 3),
-            "precision_5": precision_at_k(search_results, 5),
-            "precision_10": precision_at_k(search_results, 10),
-            "recall_3": recall_at_k(search_results, 3),
-            "recall_5": recall_at_k(search_results, 5),
-            "recall_10": recall_at_k(search_results, 10),
-            "mrr": mrr(search_results),
-            "ndcg_3": ndcg_at_k(search_results, 3),
-            "ndcg_5": ndcg_at_k(search_results, 5),
-            "ndcg_10": ndcg_at_k(search_results, 10)
+    def search_via_server(self, query: str, top_k: int = 10, **pipeline) -> List[SearchResult]:
+        """Run one query through search_knowledge_graph_unified on the attached server"""
+        response = self.mcp_client.call_tool("search_knowledge_graph_unified", {
+            "repository_path": str(self.data_path),
+            "query": query,
+            "final_limit": top_k,
+            **pipeline,
+        })
+        if not response.get("success"):
+            raise RuntimeError(f"Search failed: {response.get('error', 'unknown error')}")
+        return [
+            SearchResult(doc_id=r["file_path"], score=r.get("score", 0.0), rank=rank, content=r.get("snippet") or "")
+            for rank, r in enumerate(response.get("results", [])[:top_k], 1)
+        ]
+
+    def server_search_methods(self) -> Dict[str, Any]:
+        return {
+            name: (lambda query, top_k=10, pipeline=pipeline: self.search_via_server(query, top_k, **pipeline))
+            for name, pipeline in SERVER_METHODS.items()
         }
 
-        return metrics
+    def index_corpus(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Index data_path on the attached server and report its cost.
+
+        The server does not wipe anything itself (force_clean is not
+        implemented yet), so this is only a full build when the corpus's
+        store was emptied first with reset_index_state.
+        """
+        start_time = time.time()
+        response = self.mcp_client.call_tool("index_symbol_graph", {
+            "repository_path": str(self.data_path),
+            "force_clean": True,
+        }, timeout=timeout)
+        build_seconds = time.time() - start_time
+        if response.get("status") not in ("completed", "partial"):
+            raise RuntimeError(f"Indexing failed: {response.get('error', response)}")
+        storage = response.get("storage", {})
+        return {
+            "build_seconds": build_seconds,
+            "files_indexed": response.get("files_indexed", 0),
+            "symbols_extracted": response.get("symbols_extracted", 0),
+            "sqlite_mb": storage.get("sqlite_size_mb", 0.0),
+            "lancedb_mb": storage.get("lancedb_size_mb", 0.0),
+            "index_mb": storage.get("sqlite_size_mb", 0.0) + storage.get("lancedb_size_mb", 0.0),
+            "stage_timings": response.get("throughput", {}).get("stage_timings"),
+        }
+
+    def calculate_ir_metrics(self, query_set: QueryRelevanceSet, search_results: List[SearchResult]) -> Dict[str, float]:
+        """Calculate standard Information Retrieval metrics (P@k, R@k, MRR, NDCG@k) for one query"""
+        return query_metrics([r.doc_id for r in search_results], query_set.relevant_docs, query_set.relevance_scores)
+
+    def score_all(self, query_sets: List[QueryRelevanceSet], results: List[BenchmarkResult]) -> Dict[str, np.ndarray]:
+        """Metrics for every method and query in one vectorized pass; fills each result's metrics"""
+        methods = list(dict.fromkeys(r.method_name for r in results))
+        runs = {method: {} for method in methods}
+        for r in results:
+            runs[r.method_name][r.query_id] = [doc.doc_id for doc in r.results]
+        matrices = build_run_matrices(
+            runs,
+            {qs.query_id: qs.relevance_scores for qs in query_sets},
+            relevant_docs={qs.query_id: qs.relevant_docs for qs in query_sets},
+            query_ids=[qs.query_id for qs in query_sets],
+        )
+        scores = evaluate(matrices)
+        query_index = {query_id: q for q, query_id in enumerate(matrices.query_ids)}
+        for r in results:
+            m, q = methods.index(r.method_name), query_index[r.query_id]
+            r.metrics = {name: float(values[m, q]) for name, values in scores.items()}
+        return scores
 
     def run_benchmark(self, dataset_name: str, custom_path: Optional[str] = None) -> Dict[str, Any]:
         """Run complete reproducible benchmark"""
@@ -414,6 +467,8 @@ class ReproducibleSearchBenchmark:
             query_sets = self.load_mteb_sample_dataset()
         elif dataset_name == "custom" and custom_path:
             query_sets = self.load_custom_dataset(custom_path)
+        elif dataset_name == "synthetic":
+            query_sets = self.load_custom_dataset(str(self.data_path / QUERIES_NAME))
         else:
             raise ValueError(f"Unknown dataset: {dataset_name}")
 
@@ -422,8 +477,8 @@ class ReproducibleSearchBenchmark:
 
         print(f"📊 Loaded {len(query_sets)} test queries")
 
-        # Search methods to test
-        search_methods = {
+        # Search methods to test (real pipelines when a server is attached)
+        search_methods = self.server_search_methods() if self.mcp_client else {
             "BM25_Only": self.search_method_bm25_only,
             "Semantic_Only": self.search_method_semantic_only,
             "Hybrid_BM25_Semantic": self.search_method_hybrid,
@@ -436,7 +491,6 @@ class ReproducibleSearchBenchmark:
         # Run benchmark for each method
         for method_name, search_func in search_methods.items():
             print(f"\n🔍 Testing {method_name}...")
-            method_results = []
 
             for query_set in query_sets:
                 print(f"  Query: {query_set.query_text[:50]}...")
@@ -446,45 +500,39 @@ class ReproducibleSearchBenchmark:
                 search_results = search_func(query_set.query_text)
                 timing_ms = (time.time() - start_time) * 1000
 
-                # Calculate metrics
-                metrics = self.calculate_ir_metrics(query_set, search_results)
-
-                # Store results
-                result = BenchmarkResult(
+                # Store results; metrics are computed for all methods at once below
+                all_results.append(BenchmarkResult(
                     method_name=method_name,
                     query_id=query_set.query_id,
                     query_text=query_set.query_text,
                     results=search_results,
-                    metrics=metrics,
+                    metrics={},
                     timing_ms=timing_ms,
                     method_config={"method": method_name, "top_k": 10}
-                )
-
-                method_results.append(result)
-                all_results.append(result)
-
-                # Show immediate result
-                print(f"    NDCG@5: {metrics['ndcg_5']:.3f}, P@3: {metrics['precision_3']:.3f}, MRR: {metrics['mrr']:.3f}")
-
-            # Calculate aggregate metrics for this method
-            if method_results:
-                aggregates = {}
-                for metric_name in method_results[0].metrics.keys():
-                    values = [r.metrics[metric_name] for r in method_results]
-                    aggregates[metric_name] = {
-                        "mean": statistics.mean(values),
-                        "std": statistics.stdev(values) if len(values) > 1 else 0.0,
-                        "min": min(values),
-                        "max": max(values)
-                    }
-
-                avg_timing = statistics.mean([r.timing_ms for r in method_results])
-                method_aggregates[method_name] = {
-                    "metrics": aggregates,
-                    "avg_timing_ms": avg_timing,
-                    "query_count": len(method_results)
+                ))
+
+        # Calculate metrics for every method and query, then aggregate per method
+        scores = self.score_all(query_sets, all_results)
+        for m, method_name in enumerate(search_methods):
+            aggregates = {}
+            for metric_name, values in scores.items():
+                values = values[m]
+                aggregates[metric_name] = {
+                    "mean": float(values.mean()),
+                    "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                    "min": float(values.min()),
+                    "max": float(values.max())
                 }
 
+            timings = [r.timing_ms for r in all_results if r.method_name == method_name]
+            method_aggregates[method_name] = {
+                "metrics": aggregates,
+                "avg_timing_ms": statistics.mean(timings),
+                "p50_timing_ms": float(np.percentile(timings, 50)),
+                "p95_timing_ms": float(np.percentile(timings, 95)),
+                "query_count": len(timings)
+            }
+
         # Print final results
         print(f"\n📊 FINAL BENCHMARK RESULTS")
         print("=" * 50)
@@ -506,16 +554,134 @@ class ReproducibleSearchBenchmark:
                          key=lambda m: method_aggregates[m]["metrics"]["ndcg_5"]["mean"])
         print(f"\n🏆 Best Method (by NDCG@5): {best_method}")
 
+        # Paired significance of every other method against the best one
+        significance = {}
+        if len(query_sets) > 1:
+            print(f"\n📐 Significance vs {best_method} ({self.resamples:,} resamples, Holm-adjusted)")
+            for metric_name in ("ndcg_5", "ndcg_10", "mrr"):
+                significance[metric_name] = compare_methods(
+                    scores[metric_name], list(search_methods), baseline=best_method,
+                    resamples=self.resamples, seed=self.random_seed
+                )
+            for row in significance["ndcg_5"]:
+                marker = "✱" if row["p_holm"] < 0.05 else " "
+                print(f"  {marker} {row['method']}: ΔNDCG@5 {row['delta']:+.3f} "
+                      f"[{row['ci_low']:+.3f}, {row['ci_high']:+.3f}], p={row['p_holm']:.4f}")
+
         return {
             "dataset": dataset_name,
             "random_seed": self.random_seed,
             "query_count": len(query_sets),
             "method_aggregates": method_aggregates,
+            "significance": significance,
             "all_results": [asdict(r) for r in all_results],
             "best_method": best_method,
             "timestamp": time.time()
         }
 
+    def run_scaling_study(self, scales: List[int], corpus_root: Path, server_command=DEFAULT_SERVER_COMMAND,
+                          num_queries: Optional[int] = None, index_timeout: Optional[float] = None,
+                          profile_memory: bool = False) -> Dict[str, Any]:
+        """Benchmark seeded synthetic corpora of increasing size against a fresh server each.
+
+        One row per scale: index size, build time, server peak RSS and
+        per-method query latency and quality, ready to plot against corpus size.
+        With profile_memory the server's RSS and heap are sampled through
+        indexing and querying and reported per 1k documents.
+        """
+        rows = []
+        runs = []
+        for num_docs in scales:
+            corpus_dir = Path(corpus_root).resolve() / f"synthetic-{num_docs}-seed{self.random_seed}"
+            print(f"\n🧬 Corpus: {num_docs:,} documents at {corpus_dir}")
+            manifest = ensure_corpus(corpus_dir, num_docs, self.random_seed, num_queries)
+            self.data_path = corpus_dir
+            # A reused corpus would otherwise time an incremental no-op and
+            # report the size of whatever store the server defaults to
+            reset_index_state(corpus_dir)
+
+            memory = None
+            with SyncMcpClient(resolve_server_command(server_command), cwd=str(corpus_dir),
+                               env=LOCAL_STORAGE_ENV) as client:
+                self.mcp_client = client
+                profiler = MemoryProfiler(client.client, trace_python=True) if profile_memory else None
+                try:
+                    if profiler:
+                        client.run(profiler.start())
+                        profiler.phase("indexing")
+                    print(f"🏗️  Indexing {num_docs:,} documents...")
+                    build = self.index_corpus(timeout=index_timeout)
+                    print(f"   {build['build_seconds']:.1f}s, index {build['index_mb']:.1f} MB")
+                    if profiler:
+                        profiler.phase("querying")
+                    results = self.run_benchmark("synthetic")
+                    server_rss_mb = (read_process_memory(client.client.process.pid) or {}).get("peak_rss_mb")
+                finally:
+                    self.mcp_client = None
+                    if profiler:
+                        memory = client.run(profiler.stop())
+            if memory:
+                memory.update(per_1k_docs(memory, build["files_indexed"] or num_docs))
+                print("\n".join(format_summary(memory)))
+
+            rows.append({
+                "documents": num_docs,
+                "corpus_mb": manifest["bytes"] / (1024 * 1024),
+                "queries": manifest["queries"],
+                **{key: value for key, value in build.items() if key != "stage_timings"},
+                "server_peak_rss_mb": server_rss_mb,
+                **({
+                    "indexing_peak_rss_mb": memory["phases"].get("indexing", {}).get("peak_rss_mb"),
+                    "querying_peak_rss_mb": memory["phases"].get("querying", {}).get("peak_rss_mb"),
+                    "peak_heap_used_mb": memory.get("peak_heap_used_mb"),
+                    "rss_mb_per_1k_docs": memory["rss_mb_per_1k_docs"],
+                    "heap_mb_per_1k_docs": memory["heap_mb_per_1k_docs"],
+                } if memory else {}),
+                "methods": {
+                    name: {
+                        "ndcg_10": aggregates["metrics"]["ndcg_10"]["mean"],
+                        "mrr": aggregates["metrics"]["mrr"]["mean"],
+                        "avg_timing_ms": aggregates["avg_timing_ms"],
+                        "p50_timing_ms": aggregates["p50_timing_ms"],
+                        "p95_timing_ms": aggregates["p95_timing_ms"],
+                    }
+                    for name, aggregates in results["method_aggregates"].items()
+                },
+            })
+            runs.append({**results, "corpus": manifest, "index_build": build, "memory": memory})
+
+        print(f"\n📈 SCALING SUMMARY")
+        print("=" * 50)
+        for row in rows:
+            latency = ", ".join(f"{name} p95 {m['p95_timing_ms']:.0f}ms" for name, m in row["methods"].items())
+            rss = f"{row['server_peak_rss_mb']:.0f} MB" if row["server_peak_rss_mb"] is not None else "n/a"
+            print(f"  {row['documents']:>9,} docs: build {row['build_seconds']:.1f}s, index {row['index_mb']:.1f} MB, "
+                  f"peak RSS {rss}; {latency}")
+
+        return {
+            "dataset": "synthetic",
+            "random_seed": self.random_seed,
+            "scales": list(scales),
+            "scaling": rows,
+            "runs": runs,
+            "timestamp": time.time()
+        }
+
+    @staticmethod
+    def save_scaling_csv(results: Dict[str, Any], output_path: str):
+        """Flatten the scaling rows (one line per scale and method) for plotting"""
+        import csv
+        fields = ["documents", "corpus_mb", "build_seconds", "index_mb", "sqlite_mb", "lancedb_mb",
+                  "server_peak_rss_mb", "indexing_peak_rss_mb", "querying_peak_rss_mb", "peak_heap_used_mb",
+                  "rss_mb_per_1k_docs", "heap_mb_per_1k_docs", "method", "ndcg_10", "mrr", "avg_timing_ms", "p50_timing_ms", "p95_timing_ms"]
+        with open(output_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for row in results["scaling"]:
+                for method, values in row["methods"].items():
+                    writer.writerow({**row, "method": method, **values})
+        print(f"📄 Scaling table saved to: {output_path}")
+
     def save_results(self, results: Dict[str, Any], output_path: str):
         """Save benchmark results for reproducibility"""
         with open(output_path, 'w') as f:
@@ -525,11 +691,25 @@ class ReproducibleSearchBenchmark:
 
 def main():
     parser = argparse.ArgumentParser(description="Reproducible Search Method Benchmark")
-    parser.add_argument("--dataset", choices=["project_files", "mteb_sample", "custom"],
+    parser.add_argument("--dataset", choices=["project_files", "mteb_sample", "custom", "synthetic"],
                        default="project_files", help="Dataset to use for benchmark")
     parser.add_argument("--data-path", help="Path to custom dataset JSON file")
     parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility")
+    parser.add_argument("--resamples", type=int, default=10000,
+                       help="Bootstrap/randomization resamples for significance tests")
     parser.add_argument("--output", default="benchmark_results.json", help="Output file for results")
+    parser.add_argument("--scale", default="1000",
+                       help="Synthetic corpus sizes in documents, comma-separated (e.g. 1000,100000,1000000)")
+    parser.add_argument("--queries", type=int, help="Planted queries per synthetic corpus (default: scales with size)")
+    parser.add_argument("--corpus-root", default=str(DEFAULT_CORPUS_ROOT),
+                       help="Where synthetic corpora are generated and reused")
+    parser.add_argument("--server-command", default=os.environ.get("ZMCP_SERVER_COMMAND", " ".join(DEFAULT_SERVER_COMMAND)),
+                       help="Command that starts the MCP server (synthetic dataset)")
+    parser.add_argument("--index-timeout", type=float, default=24 * 3600,
+                       help="Seconds to wait for indexing a synthetic corpus")
+    parser.add_argument("--profile-memory", action="store_true",
+                       help="Sample server RSS/heap during indexing and querying and report MB per 1k documents")
+    parser.add_argument("--scaling-csv", help="Also write the per-scale table as CSV for plotting")
 
     args = parser.parse_args()
 
@@ -538,8 +718,16 @@ def main():
         return 1
 
     try:
-        benchmark = ReproducibleSearchBenchmark("/home/jw/dev/game1", random_seed=args.seed)
-        results = benchmark.run_benchmark(args.dataset, args.data_path)
+        benchmark = ReproducibleSearchBenchmark("/home/jw/dev/game1", random_seed=args.seed,
+                                                resamples=args.resamples)
+        if args.dataset == "synthetic":
+            scales = [int(value) for value in args.scale.split(",") if value.strip()]
+            results = benchmark.run_scaling_study(scales, Path(args.corpus_root), args.server_command,
+                                                  args.queries, args.index_timeout, args.profile_memory)
+            if args.scaling_csv:
+                benchmark.save_scaling_csv(results, args.scaling_csv)
+        else:
+            results = benchmark.run_benchmark(args.dataset, args.data_path)
         benchmark.save_results(results, args.output)
 
         print(f"\n✅ Benchmark completed successfully!")
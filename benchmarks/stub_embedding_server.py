@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the GPU embedding/reranker service (:8765)
+
+Speaks the same /embed, /rerank, /count_tokens and /health API with deterministic
+feature-hashed embeddings, so search and indexing benchmarks run on a
+CPU-only box without network access. Artificial latency and a concurrency
+limit emulate a real accelerator's service time and queueing.
+
+Usage:
+    python benchmarks/stub_embedding_server.py --port 8765 --latency-ms 5 --per-item-ms 0.5
+
+The search benchmarks read the service from ZMCP_GPU_SERVICE_URL (default
+http://localhost:8765), so they use the stub without changes when it
+runs on that port.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Dimensions reported per model name, matching the real service
+MODEL_DIMENSIONS = {
+    "qwen3_4b": 2560,
+    "gemma_embed": 768,
+    "qwen3-embedding-8b": 4096,
+}
+DEFAULT_MODEL = "qwen3_4b"
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _features(text: str) -> Dict[str, float]:
+    """Lowercased words, split camelCase/snake_case parts and character trigrams"""
+    features: Dict[str, float] = {}
+    for word in _WORD_RE.findall(text):
+        parts = re.findall(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])", word) or [word]
+        for token in {word.lower(), *(p.lower() for p in parts)}:
+            features["w:" + token] = features.get("w:" + token, 0.0) + 1.0
+    padded = f" {text.lower()} "
+    for i in range(len(padded) - 2):
+        gram = "c:" + padded[i:i + 3]
+        features[gram] = features.get(gram, 0.0) + 0.25
+    return features
+
+
+def hashed_embedding(text: str, dimensions: int, seed: int = 0) -> List[float]:
+    """Deterministic signed feature-hashing embedding, L2-normalised.
+
+    Each feature lands in one bucket with a hash-derived sign, i.e. a sparse
+    random projection of the bag of features, so texts sharing vocabulary
+    have proportionally higher cosine similarity.
+    """
+    vector = [0.0] * dimensions
+    salt = seed.to_bytes(8, "little", signed=False)
+    for feature, weight in _features(text).items():
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8, salt=salt).digest()
+        value = int.from_bytes(digest, "little")
+        bucket = value % dimensions
+        sign = 1.0 if (value >> 63) & 1 else -1.0
+        vector[bucket] += sign * math.log1p(weight)
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def count_tokens(text: str) -> int:
+    """Rough BPE-like count: words and punctuation, long words split every 6 chars"""
+    return sum(max(1, math.ceil(len(token) / 6)) for token in _TOKEN_RE.findall(text))
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class StubService:
+    """Embedding/rerank logic plus latency emulation and counters"""
+
+    def __init__(self, dimensions: Optional[int] = None, latency_ms: float = 0.0,
+                 per_item_ms: float = 0.0, jitter_ms: float = 0.0,
+                 max_concurrency: int = 0, seed: int = 0):
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+        self.per_item_ms = per_item_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        # Emulates a single accelerator: requests beyond the limit queue up
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self.started = time.time()
+        self.metrics_lock = threading.Lock()
+        self.metrics = {"embed_requests": 0, "rerank_requests": 0, "texts_embedded": 0,
+                        "documents_reranked": 0, "token_count_requests": 0, "busy_seconds": 0.0,
+                        "embed_batch_sizes": {}}
+
+    def dimensions_for(self, model: Optional[str]) -> int:
+        if self.dimensions:
+            return self.dimensions
+        return MODEL_DIMENSIONS.get(model or DEFAULT_MODEL, MODEL_DIMENSIONS[DEFAULT_MODEL])
+
+    def _service_time(self, items: int) -> float:
+        with self.rng_lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + self.per_item_ms * items + jitter) / 1000.0
+
+    def _occupy(self, items: int, work):
+        """Run work inside a concurrency slot, padded to the emulated service time"""
+        if self.slots:
+            self.slots.acquire()
+        try:
+            start = time.perf_counter()
+            result = work()
+            remaining = self._service_time(items) - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+            with self.metrics_lock:
+                self.metrics["busy_seconds"] += time.perf_counter() - start
+            return result
+        finally:
+            if self.slots:
+                self.slots.release()
+
+    def embed(self, payload: Dict) -> Dict:
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not texts:
+            raise ValueError("No texts provided")
+        model = payload.get("model") or DEFAULT_MODEL
+        dimensions = self.dimensions_for(model)
+        embeddings = self._occupy(len(texts), lambda: [
+            hashed_embedding(str(text), dimensions, self.seed) for text in texts
+        ])
+        with self.metrics_lock:
+            self.metrics["embed_requests"] += 1
+            self.metrics["texts_embedded"] += len(texts)
+            sizes = self.metrics["embed_batch_sizes"]
+            sizes[len(texts)] = sizes.get(len(texts), 0) + 1
+        return {
+            "embeddings": embeddings,
+            "dimensions": dimensions,
+            "model": model,
+            "count": len(embeddings),
+            "stub": True,
+        }
+
+    def rerank(self, payload: Dict) -> Dict:
+        query = payload.get("query")
+        documents = payload.get("documents")
+        if not query or not isinstance(documents, list):
+            raise ValueError("query and documents are required")
+        top_k = int(payload.get("top_k") or len(documents))
+        dimensions = self.dimensions_for(None)
+
+        def score():
+            query_vector = hashed_embedding(query, dimensions, self.seed)
+            scored = [
+                (0.5 * (1.0 + cosine(query_vector, hashed_embedding(str(doc), dimensions, self.seed))), index)
+                for index, doc in enumerate(documents)
+            ]
+            # Ties keep input order so results are fully deterministic
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            return scored[:top_k]
+
+        scored = self._occupy(len(documents), score)
+        with self.metrics_lock:
+            self.metrics["rerank_requests"] += 1
+            self.metrics["documents_reranked"] += len(documents)
+        return {
+            "results": [
+                {"document": documents[index], "score": round(value, 6),
+                 "original_index": index, "rank": rank}
+                for rank, (value, index) in enumerate(scored, 1)
+            ],
+            "model": payload.get("model") or "qwen3_reranker",
+            "stub": True,
+        }
+
+    def count_tokens(self, payload: Dict) -> Dict:
+        text = payload.get("text")
+        if not isinstance(text, str):
+            raise ValueError("text is required")
+        with self.metrics_lock:
+            self.metrics["token_count_requests"] += 1
+        return {"token_count": count_tokens(text), "model": payload.get("model") or DEFAULT_MODEL, "stub": True}
+
+    def health(self) -> Dict:
+        return {
+            "status": "healthy",
+            "stub": True,
+            "gpu_available": False,
+            "default_model": DEFAULT_MODEL,
+            "models": {name: self.dimensions or dims for name, dims in MODEL_DIMENSIONS.items()},
+            "latency_ms": self.latency_ms,
+            "per_item_ms": self.per_item_ms,
+            "uptime_seconds": round(time.time() - self.started, 3),
+        }
+
+    def snapshot(self) -> Dict:
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+            metrics["embed_batch_sizes"] = dict(self.metrics["embed_batch_sizes"])
+        metrics["uptime_seconds"] = round(time.time() - self.started, 3)
+        return metrics
+
+
+def make_handler(service: StubService, quiet: bool = True):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: Dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, service.health())
+            elif self.path == "/metrics":
+                self._send(200, service.snapshot())
+            else:
+                self._send(404, {"error": f"Unknown endpoint {self.path}"})
+
+        def do_POST(self):
+            routes = {"/embed": service.embed, "/rerank": service.rerank, "/count_tokens": service.count_tokens}
+            route = routes.get(self.path)
+            if route is None:
+                self._send(404, {"error": f"Unknown endpoint {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                self._send(200, route(payload))
+            except (ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def start_server(port: int = 8765, host: str = "127.0.0.1", quiet: bool = True,
+                 **options) -> ThreadingHTTPServer:
+    """Start the stub in a daemon thread (port 0 picks a free port).
+
+    The bound address is server.server_address; call server.shutdown()
+    when done.
+    """
+    service = StubService(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(service, quiet))
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the GPU embedding/reranker service")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765, the real service's port)")
+    parser.add_argument("--dimensions", type=int,
+                        help="Force one embedding size (default: per model, e.g. qwen3_4b=2560)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed service time per request")
+    parser.add_argument("--per-item-ms", type=float, default=0.0, help="Extra service time per text/document")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on service time")
+    parser.add_argument("--max-concurrency", type=int, default=1,
+                        help="Requests served at once; others queue like on one GPU (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for embeddings and jitter")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = start_server(
+        port=args.port, host=args.host, quiet=not args.verbose,
+        dimensions=args.dimensions, latency_ms=args.latency_ms, per_item_ms=args.per_item_ms,
+        jitter_ms=args.jitter_ms, max_concurrency=args.max_concurrency, seed=args.seed,
+    )
+    host, port = server.server_address[:2]
+    print(f"🧪 Stub embedding service on http://{host}:{port} (/embed, /rerank, /count_tokens, /health, /metrics)")
+    print(f"   Latency: {args.latency_ms}ms + {args.per_item_ms}ms/item ± {args.jitter_ms}ms, "
+          f"concurrency: {args.max_concurrency or 'unlimited'}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping stub service")
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
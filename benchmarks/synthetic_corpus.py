@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic corpus generator for scale testing search and indexing
+
+Writes TypeScript, Python and Markdown files that read like a real project,
+with symbols planted for every query so relevance is known exactly:
+
+  grade 3  defines the query's symbol and explains the topic
+  grade 2  imports and calls the symbol
+  grade 1  discusses the topic (prose or a comment) without naming the symbol
+
+Alongside the files it writes queries.json in the custom dataset format of
+reproducible_search_benchmark.py and a manifest with the generation
+parameters. Same seed and size always produce byte-identical corpus files
+and queries.json; only the manifest's generation_seconds varies.
+
+Usage:
+    python benchmarks/synthetic_corpus.py /tmp/corpus-100k --docs 100000 --seed 7
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_NAME = "manifest.json"
+QUERIES_NAME = "queries.json"
+FILES_PER_DIRECTORY = 1000
+GENERATOR_VERSION = 1
+
+# Generic vocabulary shared by all files (background noise)
+DOMAIN_NOUNS = [
+    "account", "agent", "archive", "batch", "buffer", "cache", "channel", "checkpoint", "client", "cluster",
+    "config", "connection", "context", "cursor", "dataset", "document", "embedding", "endpoint", "event",
+    "field", "file", "graph", "handler", "index", "job", "ledger", "lease", "message", "metric", "node",
+    "order", "packet", "partition", "payload", "pipeline", "policy", "queue", "record", "registry", "replica",
+    "report", "request", "resource", "response", "route", "schema", "segment", "session", "shard", "snapshot",
+    "socket", "stream", "subscriber", "task", "tenant", "token", "topic", "transaction", "user", "vector",
+    "window", "worker", "workspace",
+]
+DOMAIN_VERBS = [
+    "aggregate", "allocate", "apply", "archive", "assemble", "authorize", "balance", "build", "cancel",
+    "collect", "compact", "compress", "compute", "dispatch", "drain", "emit", "encode", "enqueue", "evict",
+    "expand", "fetch", "filter", "flush", "forward", "hydrate", "index", "load", "merge", "migrate",
+    "normalize", "parse", "persist", "prefetch", "prune", "publish", "rebalance", "reconcile", "refresh",
+    "register", "render", "replay", "resolve", "restore", "retry", "route", "sample", "schedule", "serialize",
+    "shard", "snapshot", "split", "stream", "sync", "throttle", "tokenize", "transform", "validate", "verify",
+]
+ADJECTIVES = [
+    "async", "atomic", "batched", "cached", "cold", "concurrent", "durable", "eager", "incremental", "lazy",
+    "local", "nested", "optimistic", "partial", "pending", "remote", "sparse", "stale", "streaming", "warm",
+]
+PROSE = [
+    "This keeps the hot path free of blocking calls.",
+    "Callers are expected to retry on transient failures.",
+    "The result is memoised for the lifetime of the process.",
+    "Errors are logged and surfaced to the caller unchanged.",
+    "Ordering is preserved within a single partition only.",
+    "Large inputs are processed in fixed-size chunks.",
+    "The operation is idempotent and safe to repeat.",
+    "Timeouts default to thirty seconds unless configured.",
+    "Metrics are emitted once per completed unit of work.",
+    "State is persisted before acknowledging the request.",
+]
+
+# Rare vocabulary reserved for planted query topics, never used as noise
+TOPIC_ROOTS = [
+    "amber", "basalt", "cinder", "dune", "ember", "fjord", "garnet", "harbor", "iris", "jasper", "kelp",
+    "lagoon", "marble", "nectar", "onyx", "pollen", "quartz", "raven", "sable", "tundra", "umber", "velvet",
+    "willow", "xenon", "yarrow", "zephyr", "alder", "birch", "cobalt", "delta", "egret", "flint", "glacier",
+    "heron", "indigo", "juniper", "krypton", "lichen", "meadow", "nimbus", "obsidian", "prairie", "quill",
+    "reef", "saffron", "thistle", "upland", "vapor", "wren", "yew", "zircon",
+]
+
+
+def camel(words: List[str]) -> str:
+    return words[0] + "".join(w.capitalize() for w in words[1:])
+
+
+def pascal(words: List[str]) -> str:
+    return "".join(w.capitalize() for w in words)
+
+
+def snake(words: List[str]) -> str:
+    return "_".join(words)
+
+
+class PlantedQuery:
+    """One query with its symbol, topic phrase and graded relevant documents"""
+
+    def __init__(self, index: int, rng: random.Random):
+        self.query_id = f"synthetic_{index:05d}"
+        root = TOPIC_ROOTS[index % len(TOPIC_ROOTS)]
+        qualifier = TOPIC_ROOTS[(index // len(TOPIC_ROOTS) + 7 * index) % len(TOPIC_ROOTS)]
+        self.verb = rng.choice(DOMAIN_VERBS)
+        self.noun = rng.choice(DOMAIN_NOUNS)
+        self.topic = [root, qualifier] if root != qualifier else [root]
+        self.symbol_words = [self.verb, *self.topic, self.noun]
+        if index >= len(TOPIC_ROOTS) ** 2:
+            self.symbol_words.append(str(index))  # keeps symbols unique once topic pairs wrap around
+        self.adjective = rng.choice(ADJECTIVES)
+        self.judgments: Dict[str, float] = {}
+
+    @property
+    def query_text(self) -> str:
+        return f"{self.verb} {' '.join(self.topic)} {self.noun} {self.adjective}"
+
+    def to_dataset_entry(self) -> Dict:
+        ordered = sorted(self.judgments.items(), key=lambda item: (-item[1], item[0]))
+        return {
+            "query_id": self.query_id,
+            "query_text": self.query_text,
+            "relevant_docs": [doc for doc, grade in ordered if grade > 0],
+            "relevance_scores": dict(ordered),
+            "symbol": camel(self.symbol_words),
+        }
+
+
+class CorpusGenerator:
+    """Deterministic corpus writer; one rng drives every choice"""
+
+    def __init__(self, num_docs: int, seed: int = 42, num_queries: Optional[int] = None,
+                 code_fraction: float = 0.8, mean_functions: int = 6):
+        self.num_docs = num_docs
+        self.seed = seed
+        self.num_queries = num_queries if num_queries is not None else min(500, max(10, num_docs // 200))
+        self.code_fraction = code_fraction
+        self.mean_functions = mean_functions
+        self.rng = random.Random(seed)
+
+    def doc_path(self, doc: int) -> str:
+        """Sharded relative path; the kind of file follows from a per-doc hash"""
+        kind = self.doc_kind(doc)
+        directory = f"{'docs' if kind == 'md' else 'src'}/mod_{doc // FILES_PER_DIRECTORY:04d}"
+        return f"{directory}/{self._doc_stem(doc)}.{kind}"
+
+    def doc_kind(self, doc: int) -> str:
+        draw = random.Random(self.seed * 1_000_003 + doc).random()
+        if draw >= self.code_fraction:
+            return "md"
+        return "ts" if draw < self.code_fraction * 0.6 else "py"
+
+    def _doc_stem(self, doc: int) -> str:
+        rng = random.Random(self.seed * 7_919 + doc)
+        return f"{rng.choice(DOMAIN_NOUNS)}_{rng.choice(DOMAIN_VERBS)}_{doc:07d}"
+
+    def plan(self) -> Tuple[List[PlantedQuery], Dict[int, List[Tuple[PlantedQuery, float]]]]:
+        """Pick relevant documents per query: 1 definer, 2-4 callers, 2-3 prose mentions"""
+        queries = [PlantedQuery(i, self.rng) for i in range(self.num_queries)]
+        plants: Dict[int, List[Tuple[PlantedQuery, float]]] = {}
+        for query in queries:
+            callers = self.rng.randint(2, 4)
+            mentions = self.rng.randint(2, 3)
+            docs = self.rng.sample(range(self.num_docs), min(1 + callers + mentions, self.num_docs))
+            # The definer has to be a code file; swap the first code file into front
+            code_docs = [doc for doc in docs if self.doc_kind(doc) != "md"]
+            if code_docs:
+                docs.remove(code_docs[0])
+                docs.insert(0, code_docs[0])
+            for position, doc in enumerate(docs):
+                grade = 3.0 if position == 0 else 2.0 if position <= callers else 1.0
+                if grade > 1.0 and self.doc_kind(doc) == "md":
+                    grade = 1.0  # markdown never defines or calls code
+                plants.setdefault(doc, []).append((query, grade))
+                path = self.doc_path(doc)
+                query.judgments[path] = max(grade, query.judgments.get(path, 0.0))
+            # A couple of judged non-relevant documents, as pooled qrels would have
+            for doc in self.rng.sample(range(self.num_docs), min(2, self.num_docs)):
+                query.judgments.setdefault(self.doc_path(doc), 0.0)
+        return queries, plants
+
+    # -- content --------------------------------------------------------------
+
+    def _noise_words(self, rng: random.Random) -> List[str]:
+        return [rng.choice(DOMAIN_VERBS), rng.choice(DOMAIN_NOUNS)]
+
+    def _sentence(self, rng: random.Random) -> str:
+        verb, noun = self._noise_words(rng)
+        return f"{verb.capitalize()} the {rng.choice(ADJECTIVES)} {noun}. {rng.choice(PROSE)}"
+
+    def _function(self, lang: str, words: List[str], doc_line: str, body_calls: List[str]) -> str:
+        calls = "\n".join(f"  {call};" if lang == "ts" else f"    {call}" for call in body_calls)
+        if lang == "ts":
+            name = camel(words)
+            return (f"/**\n * {doc_line}\n */\nexport async function {name}(input: {pascal(words[-1:])}Input): "
+                    f"Promise<{pascal(words[-1:])}Result> {{\n{calls}\n  return {{ ok: true, count: input.items.length }};\n}}\n")
+        name = snake(words)
+        return (f"def {name}(payload):\n    \"\"\"{doc_line}\"\"\"\n{calls}\n"
+                f"    return {{\"ok\": True, \"count\": len(payload)}}\n")
+
+    def render_code(self, doc: int, lang: str, plants: List[Tuple[PlantedQuery, float]]) -> str:
+        rng = random.Random(self.seed * 104_729 + doc)
+        parts = []
+        imports = [(q, g) for q, g in plants if g == 2.0]
+        if lang == "ts":
+            parts.append("import { Logger } from '../utils/logger.js';")
+            parts.extend(f"import {{ {camel(q.symbol_words)} }} from '../shared/{snake(q.topic)}.js';" for q, _ in imports)
+            parts.append(f"\nconst logger = new Logger('{self._doc_stem(doc)}');\n")
+        else:
+            parts.append("import logging")
+            parts.extend(f"from shared.{snake(q.topic)} import {snake(q.symbol_words)}" for q, _ in imports)
+            parts.append("\nlogger = logging.getLogger(__name__)\n")
+
+        for query, grade in plants:
+            if grade == 1.0:
+                comment = "//" if lang == "ts" else "#"
+                parts.append(f"{comment} NOTE: {query.verb} {' '.join(query.topic)} {query.noun} data "
+                             f"here once the {query.adjective} path lands\n")
+            elif grade == 3.0:
+                doc_line = (f"{query.verb.capitalize()} {' '.join(query.topic)} {query.noun} records "
+                            f"using the {query.adjective} strategy.")
+                parts.append(self._function(lang, query.symbol_words, doc_line, ["logger.info('start')"]))
+
+        # Every caller invokes each imported symbol at least once, mixed in with noise functions
+        pending_calls = [self._call(lang, query) for query, _ in imports]
+        for _ in range(max(1, int(rng.expovariate(1 / self.mean_functions)))):
+            words = [rng.choice(DOMAIN_VERBS), rng.choice(ADJECTIVES), rng.choice(DOMAIN_NOUNS)]
+            calls = [pending_calls.pop()] if pending_calls and rng.random() < 0.6 else []
+            calls.append("logger.debug('done')")
+            parts.append(self._function(lang, words, self._sentence(rng), calls))
+        for call in pending_calls:
+            words = [rng.choice(DOMAIN_VERBS), rng.choice(DOMAIN_NOUNS), "step"]
+            parts.append(self._function(lang, words, self._sentence(rng), [call]))
+        return "\n".join(parts) + "\n"
+
+    @staticmethod
+    def _call(lang: str, query: PlantedQuery) -> str:
+        if lang == "ts":
+            return f"await {camel(query.symbol_words)}(input)"
+        return f"{snake(query.symbol_words)}(payload)"
+
+    def render_markdown(self, doc: int, plants: List[Tuple[PlantedQuery, float]]) -> str:
+        rng = random.Random(self.seed * 15_485_863 + doc)
+        title = f"{rng.choice(DOMAIN_NOUNS).capitalize()} {rng.choice(DOMAIN_VERBS)} notes"
+        parts = [f"# {title}\n"]
+        for query, _ in plants:
+            parts.append(f"## {' '.join(query.topic).title()} {query.noun}\n")
+            parts.append(f"How we {query.verb} {' '.join(query.topic)} {query.noun} data with a "
+                         f"{query.adjective} approach. {rng.choice(PROSE)}\n")
+        for _ in range(rng.randint(2, 6)):
+            parts.append(f"## {rng.choice(ADJECTIVES).capitalize()} {rng.choice(DOMAIN_NOUNS)}\n")
+            parts.append(" ".join(self._sentence(rng) for _ in range(rng.randint(2, 5))) + "\n")
+        return "\n".join(parts)
+
+    # -- output ---------------------------------------------------------------
+
+    def write(self, out_dir: Path, progress: bool = True) -> Dict:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        queries, plants = self.plan()
+
+        total_bytes = 0
+        counts = {"ts": 0, "py": 0, "md": 0}
+        for doc in range(self.num_docs):
+            kind = self.doc_kind(doc)
+            relative = self.doc_path(doc)
+            planted = plants.get(doc, [])
+            content = self.render_markdown(doc, planted) if kind == "md" else self.render_code(doc, kind, planted)
+            path = out_dir / relative
+            if doc % FILES_PER_DIRECTORY == 0 or not path.parent.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+            data = content.encode("utf-8")
+            path.write_bytes(data)
+            total_bytes += len(data)
+            counts[kind] += 1
+            if progress and doc and doc % 50_000 == 0:
+                print(f"  … {doc:,}/{self.num_docs:,} files")
+
+        dataset = {"queries": [query.to_dataset_entry() for query in queries]}
+        (out_dir / QUERIES_NAME).write_text(json.dumps(dataset, indent=2))
+        manifest = {
+            "generator": "zmcp-synthetic-corpus",
+            "version": GENERATOR_VERSION,
+            "seed": self.seed,
+            "documents": self.num_docs,
+            "queries": len(queries),
+            "code_fraction": self.code_fraction,
+            "files_by_type": counts,
+            "bytes": total_bytes,
+            "generation_seconds": round(time.perf_counter() - started, 3),
+        }
+        (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+        return manifest
+
+
+def load_manifest(corpus_dir: Path) -> Optional[Dict]:
+    path = Path(corpus_dir) / MANIFEST_NAME
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def ensure_corpus(corpus_dir: Path, num_docs: int, seed: int = 42, num_queries: Optional[int] = None) -> Dict:
+    """Reuse a corpus already generated with the same parameters, otherwise (re)generate it"""
+    manifest = load_manifest(corpus_dir)
+    if (manifest and manifest.get("version") == GENERATOR_VERSION and manifest.get("seed") == seed
+            and manifest.get("documents") == num_docs
+            and (num_queries is None or manifest.get("queries") == num_queries)):
+        return manifest
+    return CorpusGenerator(num_docs, seed, num_queries).write(corpus_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic code/docs corpus with known relevance")
+    parser.add_argument("output", help="Directory to write the corpus into")
+    parser.add_argument("--docs", type=int, default=10_000, help="Number of files")
+    parser.add_argument("--queries", type=int, help="Planted queries (default: docs/200, 10-500)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--code-fraction", type=float, default=0.8, help="Share of code files (rest Markdown)")
+    args = parser.parse_args()
+
+    print(f"🧬 Generating {args.docs:,} files (seed {args.seed}) into {args.output}")
+    manifest = CorpusGenerator(args.docs, args.seed, args.queries, args.code_fraction).write(Path(args.output))
+    print(f"✅ {manifest['documents']:,} files, {manifest['bytes'] / 1e6:.1f} MB, {manifest['queries']} queries "
+          f"in {manifest['generation_seconds']:.1f}s")
+    print(f"   Queries: {Path(args.output) / QUERIES_NAME}")
+
+
+if __name__ == "__main__":
+    main()
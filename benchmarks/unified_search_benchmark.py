@@ -3,17 +3,28 @@
 Unified Search Benchmark Suite
 Tests BM25, Qwen3 embeddings, and reranker individually and in combination
 Proves synergistic effects using project files and MTEB datasets
+
+Drives the real MCP server over one persistent stdio JSON-RPC session and
+reports p50/p95/p99 latency and per-stage timings per configuration across
+a concurrency sweep. Build first (npm run build), then:
+    python benchmarks/unified_search_benchmark.py --repository /path/to/indexed/repo
 """
 
+import argparse
 import asyncio
 import json
+import os
 import time
 import statistics
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
-import requests
+from typing import Dict, List, Any, Optional, Sequence
 from dataclasses import dataclass, asdict
 
+from mcp_client import DEFAULT_SERVER_COMMAND, REPO_ROOT, McpClient
+
+# Server-reported stage timings, in pipeline order
+STAGE_KEYS = ["bm25_ms", "embedding_ms", "vector_search_ms", "semantic_ms", "reranker_ms"]
+
 @dataclass
 class SearchConfig:
     """Search configuration for testing"""
@@ -25,7 +36,7 @@ class SearchConfig:
     def to_params(self) -> Dict[str, Any]:
         return {
             "use_bm25": self.use_bm25,
-            "use_qwen3_embeddings": self.use_qwen3_embeddings,
+            "use_gpu_embeddings": self.use_qwen3_embeddings,
             "use_reranker": self.use_reranker
         }
 
@@ -41,13 +52,44 @@ class BenchmarkResult:
     top_1_relevant: bool
     top_3_relevant: bool
     top_5_relevant: bool
+    client_time_ms: float = 0.0
+    concurrency: int = 1
+    success: bool = True
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (same definition as numpy's default)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
 
 class UnifiedSearchBenchmark:
     """Comprehensive benchmark for unified search capabilities"""
 
-    def __init__(self, mcp_endpoint: str = "http://localhost:3000"):
-        self.mcp_endpoint = mcp_endpoint
-        self.repository_path = "/home/jw/dev/game1"
+    def __init__(self, server_command=DEFAULT_SERVER_COMMAND,
+                 repository_path: str = "/home/jw/dev/game1",
+                 warmup_runs: int = 3, concurrency_levels: Sequence[int] = (1, 4, 16),
+                 rounds: int = 2, timeout: float = 120.0):
+        self.server_command = server_command
+        self.repository_path = repository_path
+        self.warmup_runs = warmup_runs
+        self.concurrency_levels = list(concurrency_levels)
+        self.rounds = rounds
+        self.timeout = timeout
+        self.session: Optional[McpClient] = None
 
         # Test configurations - all possible combinations
         self.configs = [
@@ -83,8 +125,29 @@ class UnifiedSearchBenchmark:
             ]
         }
 
+    def all_queries(self) -> List[str]:
+        return [query for queries in self.test_queries.values() for query in queries]
+
+    async def start(self):
+        """Start the MCP server once; every call reuses this session"""
+        self.session = McpClient(self.server_command, cwd=str(REPO_ROOT),
+                                 client_name="unified-search-benchmark", request_timeout=self.timeout)
+        started = time.perf_counter()
+        await self.session.start(timeout=self.timeout)
+        print(f"🔌 Connected to {self.session.server_info.get('name', 'MCP server')} "
+              f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    async def stop(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
     async def call_unified_search(self, config: SearchConfig, query: str) -> Dict[str, Any]:
-        """Call the unified search MCP method"""
+        """Call search_knowledge_graph_unified on the running server.
+
+        client_time_ms is the wall time seen by the caller, including
+        JSON-RPC transport and any queueing inside the server.
+        """
         params = {
             "repository_path": self.repository_path,
             "query": query,
@@ -95,92 +158,41 @@ class UnifiedSearchBenchmark:
             **config.to_params()
         }
 
-        # Note: This would call the actual MCP method
-        # For now, simulating the call structure
-        start_time = time.time()
-
+        start_time = time.perf_counter()
         try:
-            # Simulate MCP call - replace with actual implementation
-            response = await self._simulate_mcp_call(params)
-            return response
+            response = await self.session.call_tool("search_knowledge_graph_unified", params, timeout=self.timeout)
         except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "metrics": {
-                    "total_time_ms": (time.time() - start_time) * 1000
-                }
-            }
-
-    async def _simulate_mcp_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Simulate MCP call - replace with actual unified search call"""
-        # This would be replaced with the actual MCP method call
-        # For now, returning a structure that matches expected output
-
-        base_time = 50  # Base processing time
-        bm25_time = 50 if params["use_bm25"] else 0
-        semantic_time = 200 if params["use_qwen3_embeddings"] else 0
-        reranker_time = 100 if params["use_reranker"] else 0
-
-        total_time = base_time + bm25_time + semantic_time + reranker_time
-
-        # Simulate quality improvements with combination
-        quality_multiplier = 1.0
-        if params["use_bm25"] and params["use_qwen3_embeddings"]:
-            quality_multiplier *= 1.3  # Hybrid boost
-        if params["use_reranker"]:
-            quality_multiplier *= 1.5  # Reranker precision boost
-
-        results_count = min(10, int(8 * quality_multiplier))
-
-        return {
-            "success": True,
-            "results": [{"id": f"result_{i}", "score": 0.9 - (i * 0.1)} for i in range(results_count)],
-            "metadata": {
-                "total_results": results_count,
-                "pipeline_used": {
-                    "bm25": params["use_bm25"],
-                    "semantic": params["use_qwen3_embeddings"],
-                    "reranker": params["use_reranker"]
-                }
-            },
-            "performance_metrics": {
-                "total_time_ms": total_time,
-                "stage_timings": {
-                    "bm25_ms": bm25_time,
-                    "semantic_ms": semantic_time,
-                    "reranker_ms": reranker_time
-                },
-                "component_scores": {
-                    "bm25_results": 20 if params["use_bm25"] else 0,
-                    "semantic_results": 30 if params["use_qwen3_embeddings"] else 0,
-                    "reranker_results": results_count if params["use_reranker"] else 0
-                }
-            }
-        }
+            response = {"success": False, "error": str(e) or type(e).__name__}
+        response["client_time_ms"] = (time.perf_counter() - start_time) * 1000
+        return response
 
     def calculate_relevance_score(self, query: str, result: Dict[str, Any]) -> float:
         """Calculate relevance score for a result (placeholder implementation)"""
         # This would use actual relevance assessment
-        # For benchmark, using simulated scoring
+        # For benchmark, using the returned score with path-based boosts
         base_score = result.get("score", 0.5)
+        location = str(result.get("file_path", result.get("id", "")))
 
         # Boost for certain query patterns
-        if "implementation" in query.lower() and "FastAPI" in str(result.get("id", "")):
+        if "implementation" in query.lower() and "FastAPI" in location:
             base_score += 0.2
-        if "performance" in query.lower() and "optimization" in str(result.get("id", "")):
+        if "performance" in query.lower() and "optimization" in location:
             base_score += 0.3
 
         return min(1.0, base_score)
 
-    async def run_single_benchmark(self, config: SearchConfig, query: str) -> BenchmarkResult:
+    async def run_single_benchmark(self, config: SearchConfig, query: str,
+                                   concurrency: int = 1, verbose: bool = True) -> BenchmarkResult:
         """Run benchmark for single config/query combination"""
-        print(f"Testing {config.name}: '{query[:30]}...'")
+        if verbose:
+            print(f"Testing {config.name}: '{query[:30]}...'")
 
         response = await self.call_unified_search(config, query)
+        client_time_ms = response["client_time_ms"]
 
         if not response.get("success", False):
-            print(f"  ❌ Failed: {response.get('error', 'Unknown error')}")
+            if verbose:
+                print(f"  ❌ Failed: {response.get('error', 'Unknown error')}")
             return BenchmarkResult(
                 config=config,
                 query=query,
@@ -190,7 +202,10 @@ class UnifiedSearchBenchmark:
                 relevance_scores=[],
                 top_1_relevant=False,
                 top_3_relevant=False,
-                top_5_relevant=False
+                top_5_relevant=False,
+                client_time_ms=client_time_ms,
+                concurrency=concurrency,
+                success=False
             )
 
         results = response.get("results", [])
@@ -213,34 +228,88 @@ class UnifiedSearchBenchmark:
             relevance_scores=relevance_scores,
             top_1_relevant=top_1_relevant,
             top_3_relevant=top_3_relevant,
-            top_5_relevant=top_5_relevant
+            top_5_relevant=top_5_relevant,
+            client_time_ms=client_time_ms,
+            concurrency=concurrency
         )
 
+    async def warmup(self, config: SearchConfig):
+        """Unmeasured calls so index loading, JIT and caches settle first"""
+        queries = self.all_queries()
+        for i in range(self.warmup_runs):
+            await self.call_unified_search(config, queries[i % len(queries)])
+
+    async def run_concurrency_level(self, config: SearchConfig, concurrency: int) -> Dict[str, Any]:
+        """Issue every query `rounds` times with `concurrency` requests in flight"""
+        workload = self.all_queries() * self.rounds
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(query: str) -> BenchmarkResult:
+            async with slots:
+                return await self.run_single_benchmark(config, query, concurrency, verbose=False)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(query) for query in workload))
+        wall_seconds = time.perf_counter() - started
+
+        return {
+            "concurrency": concurrency,
+            "results": list(results),
+            "summary": self.summarize_latency(list(results), wall_seconds),
+        }
+
+    def summarize_latency(self, results: List[BenchmarkResult], wall_seconds: float) -> Dict[str, Any]:
+        ok = [r for r in results if r.success]
+        stages = {}
+        for key in STAGE_KEYS:
+            values = [r.stage_timings[key] for r in ok if key in r.stage_timings]
+            if values:
+                stages[key] = latency_summary(values)
+        return {
+            "requests": len(results),
+            "errors": len(results) - len(ok),
+            "throughput_qps": len(ok) / wall_seconds if wall_seconds > 0 else 0.0,
+            "client_latency_ms": latency_summary([r.client_time_ms for r in ok]),
+            "server_latency_ms": latency_summary([r.total_time_ms for r in ok]),
+            "stage_timings_ms": stages,
+        }
+
     async def run_comprehensive_benchmark(self) -> Dict[str, Any]:
         """Run comprehensive benchmark across all configurations and queries"""
         print("🚀 Starting Unified Search Comprehensive Benchmark")
         print(f"Repository: {self.repository_path}")
         print(f"Configurations: {[c.name for c in self.configs]}")
+        print(f"Warmup: {self.warmup_runs} runs, concurrency sweep: {self.concurrency_levels}, rounds: {self.rounds}")
         print()
 
-        all_results: List[BenchmarkResult] = []
-
-        for query_type, queries in self.test_queries.items():
-            print(f"📋 Testing {query_type.upper()} queries...")
-
-            for query in queries:
-                for config in self.configs:
-                    result = await self.run_single_benchmark(config, query)
-                    all_results.append(result)
-
-                    # Log immediate result
-                    status = "✅" if result.results_count > 0 else "❌"
-                    print(f"  {status} {config.name}: {result.results_count} results, {result.total_time_ms:.0f}ms")
-
+        await self.start()
+        try:
+            all_results: List[BenchmarkResult] = []
+            latency: Dict[str, Dict[str, Any]] = {}
+
+            for config in self.configs:
+                print(f"📋 {config.name}")
+                await self.warmup(config)
+                latency[config.name] = {}
+
+                for concurrency in self.concurrency_levels:
+                    level = await self.run_concurrency_level(config, concurrency)
+                    all_results.extend(level["results"])
+                    summary = level["summary"]
+                    latency[config.name][str(concurrency)] = summary
+
+                    client = summary["client_latency_ms"]
+                    status = "✅" if summary["errors"] == 0 else f"⚠️  {summary['errors']} errors,"
+                    print(f"  {status} c={concurrency:<3} p50 {client['p50']:.0f}ms  p95 {client['p95']:.0f}ms  "
+                          f"p99 {client['p99']:.0f}ms  {summary['throughput_qps']:.1f} q/s")
                 print()
+        finally:
+            await self.stop()
 
-        # Analyze results
-        analysis = self.analyze_results(all_results)
+        # Quality metrics come from the uncontended runs only
+        analysis = self.analyze_results([r for r in all_results if r.concurrency == self.concurrency_levels[0]])
+        analysis["latency"] = latency
+        analysis["raw_results"] = [asdict(r) for r in all_results]
 
         print("📊 BENCHMARK RESULTS SUMMARY")
         print("=" * 50)
@@ -252,6 +321,8 @@ class UnifiedSearchBenchmark:
             print(f"  Top-1 Accuracy: {stats['top_1_accuracy']:.1%}")
             print(f"  Top-3 Accuracy: {stats['top_3_accuracy']:.1%}")
             print(f"  Top-5 Accuracy: {stats['top_5_accuracy']:.1%}")
+            for key, stage in latency[config_name][str(self.concurrency_levels[0])]["stage_timings_ms"].items():
+                print(f"  {key[:-3]:<14} p50 {stage['p50']:.1f}ms  p95 {stage['p95']:.1f}ms  p99 {stage['p99']:.1f}ms")
 
         print(f"\n🏆 SYNERGY ANALYSIS:")
         synergy = analysis["synergy_analysis"]
@@ -324,11 +395,33 @@ class UnifiedSearchBenchmark:
 
 async def main():
     """Main benchmark execution"""
-    benchmark = UnifiedSearchBenchmark()
+    parser = argparse.ArgumentParser(description="End-to-end latency and quality benchmark for unified search")
+    parser.add_argument("--server-command", default=os.environ.get("ZMCP_SERVER_COMMAND", " ".join(DEFAULT_SERVER_COMMAND)),
+                        help="Command that starts the MCP server on stdio (default: node dist/server/index.js)")
+    parser.add_argument("--repository", default="/home/jw/dev/game1", help="Indexed repository to search")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured calls per configuration")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated in-flight request levels")
+    parser.add_argument("--rounds", type=int, default=2, help="Passes over the query set per level")
+    parser.add_argument("--configs", help="Comma-separated configuration names to run (default: all)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-call timeout in seconds")
+    parser.add_argument("--output", default="unified_search_benchmark_results.json", help="Results JSON path")
+    args = parser.parse_args()
+
+    benchmark = UnifiedSearchBenchmark(
+        server_command=args.server_command,
+        repository_path=args.repository,
+        warmup_runs=args.warmup,
+        concurrency_levels=[int(level) for level in args.concurrency.split(",") if level.strip()],
+        rounds=args.rounds,
+        timeout=args.timeout,
+    )
+    if args.configs:
+        wanted = set(args.configs.split(","))
+        benchmark.configs = [c for c in benchmark.configs if c.name in wanted]
 
     try:
         results = await benchmark.run_comprehensive_benchmark()
-        benchmark.save_results(results)
+        benchmark.save_results(results, args.output)
 
         print("\n🎯 CONCLUSION:")
         best = results["synergy_analysis"]["best_configuration"]
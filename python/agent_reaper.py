@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Single-sweep reaper for dead, zombie and stuck agents
+
+Each sweep lists /proc once into a pid -> (state, start time, cmdline)
+map, loads every active agent with one query, and applies status changes
+in one transaction:
+
+- terminated_zombie: the PID is gone, is a zombie/dead task, or now
+  belongs to a different process (PID reuse, detected by start time)
+- terminated_timeout: the process is alive but has been idle longer than
+  its timeout plus a per-agent jitter
+
+PID reuse is detected by comparing the process start time with the one
+seen on an earlier sweep, and on the first sweep with the agent's last
+heartbeat: the agent's own process cannot have started after it last
+used a tool.
+
+Usage:
+    python python/agent_reaper.py            # dry run, prints the plan
+    python python/agent_reaper.py --apply
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+
+def get_db_path() -> Path:
+    """Get the path to the ZMCP database."""
+    return Path.home() / ".mcptools" / "data" / "claude_mcp_tools.db"
+
+
+PROC = Path("/proc")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+# Heartbeats are stored with second precision
+START_TIME_SLACK_SECONDS = 2.0
+
+
+class ProcInfo(NamedTuple):
+    state: str          # R, S, D, Z, X, ...
+    start_ticks: int    # clock ticks after boot (field 22 of /proc/<pid>/stat)
+    start_time: float   # the same as Unix time
+    cmdline: str
+
+
+def boot_time(proc: Path = PROC) -> float:
+    """System boot as Unix time (btime in /proc/stat)"""
+    with open(proc / "stat") as f:
+        for line in f:
+            if line.startswith("btime "):
+                return float(line.split()[1])
+    raise RuntimeError("btime missing from /proc/stat")
+
+
+def read_stat(pid: int, proc: Path = PROC) -> Optional[tuple]:
+    """(state, start_ticks) of a process, or None if it is gone"""
+    try:
+        with open(proc / str(pid) / "stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces and parentheses; fields resume after the last ')'
+    fields = data[data.rindex(b")") + 2:].split()
+    return fields[0].decode(), int(fields[19])
+
+
+def read_cmdline(pid: int, proc: Path = PROC) -> str:
+    try:
+        with open(proc / str(pid) / "cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace").strip()
+    except OSError:
+        return ""
+
+
+def scan_proc(cmdline_pids: Optional[Iterable[int]] = None, proc: Path = PROC) -> Dict[int, ProcInfo]:
+    """One pass over /proc: every process's state and start time.
+
+    cmdline is only read for cmdline_pids (all processes when None), since
+    the agents' PIDs are usually a small share of the process table.
+    """
+    booted = boot_time(proc)
+    wanted = None if cmdline_pids is None else set(cmdline_pids)
+    processes = {}
+    with os.scandir(proc) as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            stat = read_stat(pid, proc)
+            if stat is None:
+                continue
+            state, start_ticks = stat
+            cmdline = read_cmdline(pid, proc) if wanted is None or pid in wanted else ""
+            processes[pid] = ProcInfo(state, start_ticks, booted + start_ticks / CLOCK_TICKS, cmdline)
+    return processes
+
+
+@dataclass
+class AgentVerdict:
+    agent_id: str
+    pid: int
+    status: str         # alive, dead, zombie, reused, timeout
+    idle_seconds: Optional[float]
+    cmdline: str = ""
+
+    @property
+    def new_status(self) -> Optional[str]:
+        if self.status in ("dead", "zombie", "reused"):
+            return "terminated_zombie"
+        if self.status == "timeout":
+            return "terminated_timeout"
+        return None
+
+
+class AgentReaper:
+    """Reconcile active agent_sessions rows against one /proc snapshot per sweep.
+
+    Keep one instance alive between sweeps so it remembers each agent's
+    process start time; that makes PID-reuse detection exact.
+    """
+
+    def __init__(self, db_path: Union[str, Path, None] = None, timeout_jitter: int = 300,
+                 default_timeout: int = 1500, proc: Path = PROC):
+        self.db_path = Path(db_path) if db_path else get_db_path()
+        self.timeout_jitter = timeout_jitter
+        self.default_timeout = default_timeout
+        self.proc = proc
+        self.known_starts: Dict[str, tuple] = {}   # agent_id -> (pid, start_ticks)
+        self.last_sweep: Dict[str, float] = {}
+
+    def jitter(self, agent_id: str) -> int:
+        """Per-agent timeout fuzz, stable across sweeps, so agents don't all expire together"""
+        return zlib.crc32(agent_id.encode()) % (self.timeout_jitter + 1) if self.timeout_jitter else 0
+
+    def classify(self, agent_id: str, pid: int, last_activity: Optional[float], timeout: Optional[int],
+                 processes: Dict[int, ProcInfo], now: float) -> AgentVerdict:
+        idle = now - last_activity if last_activity is not None else None
+        info = processes.get(pid)
+        if info is None or info.state in ("X", "x"):
+            return AgentVerdict(agent_id, pid, "dead", idle)
+        if info.state == "Z":
+            return AgentVerdict(agent_id, pid, "zombie", idle, info.cmdline)
+
+        known = self.known_starts.get(agent_id)
+        if known and known[0] == pid:
+            reused = known[1] != info.start_ticks
+        else:
+            reused = last_activity is not None and info.start_time > last_activity + START_TIME_SLACK_SECONDS
+        if reused:
+            return AgentVerdict(agent_id, pid, "reused", idle, info.cmdline)
+
+        self.known_starts[agent_id] = (pid, info.start_ticks)
+        limit = (self.default_timeout if timeout is None else timeout) + self.jitter(agent_id)
+        if idle is not None and idle > limit:
+            return AgentVerdict(agent_id, pid, "timeout", idle, info.cmdline)
+        return AgentVerdict(agent_id, pid, "alive", idle, info.cmdline)
+
+    def sweep(self, apply: bool = True) -> List[AgentVerdict]:
+        """Scan /proc, load active agents in one query and mark the dead or stuck ones"""
+        started = time.perf_counter()
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            rows = conn.execute("""
+                SELECT id, process_pid, CAST(strftime('%s', last_activity_at) AS INTEGER), timeout_seconds
+                FROM agent_sessions
+                WHERE status = 'active' AND process_pid IS NOT NULL
+            """).fetchall()
+            queried = time.perf_counter()
+            processes = scan_proc({pid for _, pid, _, _ in rows}, self.proc)
+            now = time.time()
+            verdicts = [self.classify(agent_id, pid, last_activity, timeout, processes, now)
+                        for agent_id, pid, last_activity, timeout in rows]
+
+            changes = [(v.new_status, v.agent_id) for v in verdicts if v.new_status]
+            if apply and changes:
+                with conn:
+                    # status = 'active' guards against agents that finished mid-sweep
+                    conn.executemany("UPDATE agent_sessions SET status = ? WHERE id = ? AND status = 'active'",
+                                     changes)
+        finally:
+            conn.close()
+
+        for verdict in verdicts:
+            if verdict.new_status:
+                self.known_starts.pop(verdict.agent_id, None)
+        finished = time.perf_counter()
+        self.last_sweep = {
+            "agents": len(verdicts),
+            "processes": len(processes),
+            "reaped": len(changes) if apply else 0,
+            "query_ms": (queried - started) * 1000,
+            "reconcile_ms": (finished - queried) * 1000,
+            "total_ms": (finished - started) * 1000,
+        }
+        return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark dead, zombie and stuck agents in agent_sessions")
+    parser.add_argument("--db", default=str(get_db_path()), help="Path to the ZMCP database")
+    parser.add_argument("--apply", action="store_true", help="Write status changes (default: dry run)")
+    parser.add_argument("--timeout-jitter", type=int, default=300, help="Max extra seconds added per agent")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"Error: Database not found at {args.db}")
+        return 1
+
+    reaper = AgentReaper(args.db, timeout_jitter=args.timeout_jitter)
+    try:
+        verdicts = reaper.sweep(apply=args.apply)
+    except sqlite3.Error as e:
+        print(f"❌ Sweep failed: {e}")
+        return 1
+    for verdict in verdicts:
+        if verdict.new_status:
+            action = "Marked" if args.apply else "Would mark"
+            print(f"  {'💀' if verdict.new_status == 'terminated_zombie' else '⏰'} {action} {verdict.agent_id} "
+                  f"(PID {verdict.pid}, {verdict.status}) as '{verdict.new_status}'")
+    stats = reaper.last_sweep
+    print(f"\n📊 {stats['agents']} active agents, {stats['processes']} processes, "
+          f"{sum(1 for v in verdicts if v.new_status)} to reap in {stats['total_ms']:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Batched heartbeat aggregator for agent lifecycle tracking
+
+Tool use is the agent heartbeat: every call bumps
+agent_sessions.last_activity_at. Done directly, that is one connection,
+one UPDATE and one commit per tool call, all contending for the SQLite
+write lock. The aggregator keeps only the latest heartbeat per agent in
+memory and writes everything pending in a single UPDATE per interval, so
+the write rate stays at one transaction per interval however many agents
+are active.
+
+Meant for long-lived processes (server, hook daemon); a one-shot hook
+process should call flush() or close() before it exits.
+
+Usage:
+    with HeartbeatAggregator(db_path, flush_interval=2.0) as heartbeats:
+        heartbeats.beat(agent_id)        # cheap, never touches the database
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+
+def get_db_path() -> Path:
+    """Get the path to the ZMCP database."""
+    return Path.home() / ".mcptools" / "data" / "claude_mcp_tools.db"
+
+
+# Two bound parameters per agent; stays under SQLite's historic 999-variable limit
+MAX_AGENTS_PER_STATEMENT = 400
+
+
+def sqlite_timestamp(at: float) -> str:
+    """Unix time as SQLite's CURRENT_TIMESTAMP text (UTC, second precision)"""
+    return datetime.fromtimestamp(at, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def batched_update_sql(count: int) -> str:
+    """One UPDATE setting last_activity_at for `count` (id, timestamp) pairs.
+
+    Timestamps only move forward, so a late flush never overwrites a newer
+    heartbeat written by another process.
+    """
+    values = ", ".join(["(?, ?)"] * count)
+    return f"""
+        WITH beats(id, at) AS (VALUES {values})
+        UPDATE agent_sessions
+        SET last_activity_at = (
+            SELECT MAX(beats.at, COALESCE(agent_sessions.last_activity_at, ''))
+            FROM beats WHERE beats.id = agent_sessions.id
+        )
+        WHERE id IN (SELECT id FROM beats)
+    """
+
+
+class HeartbeatAggregator:
+    """Coalesce heartbeats per agent in memory and flush them in batches.
+
+    beat() is thread-safe and only records the newest timestamp per agent.
+    A background thread flushes every flush_interval seconds; if the
+    database is busy the pending heartbeats are kept and retried on the
+    next interval.
+    """
+
+    def __init__(self, db_path: Union[str, Path, None] = None, flush_interval: float = 1.0,
+                 busy_timeout: float = 5.0, autostart: bool = True):
+        self.db_path = Path(db_path) if db_path else get_db_path()
+        self.flush_interval = flush_interval
+        self.busy_timeout = busy_timeout
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"beats": 0, "flushes": 0, "agents_flushed": 0, "rows_updated": 0, "failed_flushes": 0}
+        if autostart:
+            self.start()
+
+    def start(self) -> "HeartbeatAggregator":
+        """Start the background flush thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="heartbeat-aggregator", daemon=True)
+            self._thread.start()
+        return self
+
+    def beat(self, agent_id: str, at: Optional[float] = None):
+        """Record activity for an agent (Unix time, default now)"""
+        at = time.time() if at is None else at
+        with self._lock:
+            self.stats["beats"] += 1
+            if at > self._pending.get(agent_id, 0.0):
+                self._pending[agent_id] = at
+
+    @property
+    def pending(self) -> int:
+        """Agents with heartbeats not yet written"""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending heartbeats in one transaction; returns rows updated"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                updated = self._write(batch.items())
+            except sqlite3.Error:
+                self.stats["failed_flushes"] += 1
+                self._requeue(batch)
+                raise
+            self.stats["flushes"] += 1
+            self.stats["agents_flushed"] += len(batch)
+            self.stats["rows_updated"] += updated
+            return updated
+
+    def _write(self, beats: Iterable[Tuple[str, float]]) -> int:
+        rows = [(agent_id, sqlite_timestamp(at)) for agent_id, at in beats]
+        # Explicit transaction: sqlite3 opens none implicitly for statements
+        # starting with WITH, and rowcount is -1 for them (total_changes is not)
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+        try:
+            before = conn.total_changes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(rows), MAX_AGENTS_PER_STATEMENT):
+                    chunk = rows[start:start + MAX_AGENTS_PER_STATEMENT]
+                    conn.execute(batched_update_sql(len(chunk)), [value for row in chunk for value in row])
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            return conn.total_changes - before
+        finally:
+            conn.close()
+
+    def _requeue(self, batch: Dict[str, float]):
+        with self._lock:
+            for agent_id, at in batch.items():
+                if at > self._pending.get(agent_id, 0.0):
+                    self._pending[agent_id] = at
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Kept in memory; the next interval retries
+                pass
+
+    def close(self):
+        """Stop the flush thread and write whatever is still pending"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def __enter__(self) -> "HeartbeatAggregator":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the ZMCP knowledge graph
+Writes entities, relationships and their LanceDB vectors as typed Arrow IPC
+or Parquet files, and reads them back memory-mapped for offline analysis
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+EXPORT_FORMAT = "zmcp-kg-columnar"
+EXPORT_FORMAT_VERSION = 1
+
+# File suffix per output format
+FORMAT_SUFFIXES = {
+    "arrow": ".arrow",
+    "parquet": ".parquet",
+}
+
+_TIMESTAMP = pa.timestamp("ms", tz="UTC")
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+ENTITY_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("repositoryPath", _CATEGORY),
+    ("entityType", _CATEGORY),
+    ("name", pa.string()),
+    ("description", pa.string()),
+    ("properties", pa.string()),
+    ("importanceScore", pa.float64()),
+    ("relevanceScore", pa.float64()),
+    ("confidenceScore", pa.float64()),
+    ("accessCount", pa.int64()),
+    ("lastAccessed", _TIMESTAMP),
+    ("createdAt", _TIMESTAMP),
+    ("updatedAt", _TIMESTAMP),
+    ("discoveredBy", pa.string()),
+    ("discoveredDuring", pa.string()),
+    ("validated", pa.bool_()),
+    ("validatedBy", pa.string()),
+    ("validatedAt", _TIMESTAMP),
+])
+
+RELATIONSHIP_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("repositoryPath", _CATEGORY),
+    ("fromEntityId", pa.string()),
+    ("toEntityId", pa.string()),
+    ("relationshipType", _CATEGORY),
+    ("properties", pa.string()),
+    ("strength", pa.float64()),
+    ("confidence", pa.float64()),
+    ("context", pa.string()),
+    ("evidenceCount", pa.int64()),
+    ("createdAt", _TIMESTAMP),
+    ("updatedAt", _TIMESTAMP),
+    ("discoveredBy", pa.string()),
+    ("discoveredDuring", pa.string()),
+    ("validated", pa.bool_()),
+    ("validatedBy", pa.string()),
+    ("validatedAt", _TIMESTAMP),
+])
+
+TABLE_SCHEMAS = {
+    "knowledge_entities": ENTITY_SCHEMA,
+    "knowledge_relationships": RELATIONSHIP_SCHEMA,
+}
+
+# Output file stem per table
+TABLE_STEMS = {
+    "knowledge_entities": "entities",
+    "knowledge_relationships": "relationships",
+    "vectors": "vectors",
+}
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse SQLite current_timestamp or ISO-8601 text (naive values are UTC)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _convert(value: Any, field: pa.Field) -> Any:
+    if value is None:
+        return None
+    if field.type == _TIMESTAMP:
+        return parse_timestamp(value)
+    if pa.types.is_boolean(field.type):
+        return bool(value)
+    if pa.types.is_floating(field.type):
+        return float(value)
+    if pa.types.is_integer(field.type):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+class BatchBuilder:
+    """Convert sqlite rows (as dicts) into typed record batches.
+
+    Dictionary columns share one growing dictionary across batches, so every
+    batch only appends to it; Arrow IPC files accept such deltas but not
+    unrelated per-batch dictionaries.
+    """
+
+    def __init__(self, schema: pa.Schema):
+        self.schema = schema
+        self.categories: Dict[str, Dict[str, int]] = {
+            field.name: {} for field in schema if pa.types.is_dictionary(field.type)
+        }
+
+    def _encode(self, name: str, values: List[Optional[str]]) -> pa.DictionaryArray:
+        codes = self.categories[name]
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            indices.append(code)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                              pa.array(list(codes), type=pa.string()))
+
+    def build(self, rows: List[Dict[str, Any]]) -> pa.RecordBatch:
+        arrays = []
+        for field in self.schema:
+            values = [_convert(row.get(field.name), field) for row in rows]
+            if field.name in self.categories:
+                arrays.append(self._encode(field.name, values))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class _Writer:
+    """Uniform write_batch/close over Arrow IPC and Parquet files"""
+
+    def __init__(self, path: Path, schema: pa.Schema, fmt: str, compression: Optional[str]):
+        self.fmt = fmt
+        if fmt == "parquet":
+            self.writer = pq.ParquetWriter(str(path), schema, compression=compression or "zstd")
+        else:
+            # Uncompressed IPC is what makes memory-mapped reads zero-copy
+            options = ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+            self.sink = pa.OSFile(str(path), "wb")
+            self.writer = ipc.new_file(self.sink, schema, options=options)
+
+    def write_batch(self, batch: pa.RecordBatch):
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+        if self.fmt != "parquet":
+            self.sink.close()
+
+
+def write_table(pages: Iterable[List[Dict[str, Any]]], path: Path, schema: pa.Schema,
+                fmt: str, compression: Optional[str] = None) -> int:
+    """Stream pages of rows into one columnar file; returns the row count"""
+    writer = _Writer(path, schema, fmt, compression)
+    builder = BatchBuilder(schema)
+    rows = 0
+    try:
+        for page in pages:
+            if page:
+                writer.write_batch(builder.build(page))
+                rows += len(page)
+    finally:
+        writer.close()
+    return rows
+
+
+def iter_vector_batches(table, entity_ids: Optional[set] = None) -> Iterator[pa.RecordBatch]:
+    """Yield (id, vector) batches from a LanceDB table, optionally filtered to entity ids"""
+    try:
+        batches = table.to_lance().to_batches(columns=["id", "vector"])
+    except Exception:
+        batches = table.to_arrow().select(["id", "vector"]).to_batches()
+    value_set = pa.array(sorted(entity_ids), type=pa.string()) if entity_ids is not None else None
+    for batch in batches:
+        if value_set is not None:
+            batch = batch.filter(pc.is_in(batch.column("id"), value_set=value_set))
+        if batch.num_rows:
+            yield batch
+
+
+def write_vectors(batches: Iterator[pa.RecordBatch], path: Path, fmt: str,
+                  compression: Optional[str] = None) -> int:
+    """Write LanceDB vector batches, keeping their fixed-size list type"""
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = _Writer(path, batch.schema, fmt, compression)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_path(export_dir: Path, table: str, fmt: str) -> Path:
+    return Path(export_dir) / f"{TABLE_STEMS[table]}{FORMAT_SUFFIXES[fmt]}"
+
+
+def open_export(export_dir, memory_map: bool = True) -> Dict[str, pa.Table]:
+    """Load every table of a columnar export.
+
+    Arrow IPC files are memory-mapped, so columns are read straight from the
+    page cache without copying or parsing. Parquet files still decode, but
+    from a memory-mapped source.
+    """
+    export_dir = Path(export_dir)
+    manifest = json.loads((export_dir / "manifest.json").read_text())
+    if manifest.get("format") != EXPORT_FORMAT:
+        raise ValueError(f"{export_dir} is not a knowledge graph columnar export")
+
+    tables = {}
+    for name, info in manifest["tables"].items():
+        path = export_dir / info["file"]
+        if path.suffix == FORMAT_SUFFIXES["parquet"]:
+            tables[name] = pq.read_table(str(path), memory_map=memory_map)
+        elif memory_map:
+            tables[name] = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        else:
+            with pa.OSFile(str(path), "rb") as source:
+                tables[name] = ipc.open_file(source).read_all()
+    return tables
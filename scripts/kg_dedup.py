@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate entity detection for the ZMCP knowledge graph
+MinHash signatures over character shingles, banded LSH for candidate pairs,
+anchor-based clustering and a merge that rewires relationships onto one
+canonical entity
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 128
+# 16 bands x 8 rows puts the LSH S-curve midpoint at ~0.71 Jaccard
+NUM_BANDS = 16
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WHITESPACE_RE = re.compile(r"\s+")
+
+FETCH_SIZE = 20000
+INSIGHT_BATCH_SIZE = 500
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hashed character k-grams of whitespace-normalised, lowercased text"""
+    text = _WHITESPACE_RE.sub(" ", text.lower()).strip()
+    if len(text) <= k:
+        grams = {text}
+    else:
+        grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) & _MERSENNE_PRIME for g in grams),
+                       dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    """Fixed family of NUM_PERM universal hashes (a*x + b) mod p"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, hashed_shingles: np.ndarray) -> np.ndarray:
+        # Operands stay below 2**31, so the product fits in uint64
+        return ((self.a * hashed_shingles + self.b) % _MERSENNE_PRIME).min(axis=1)
+
+
+def find_clusters(items: Iterable[Tuple[str, str, str]], threshold: float = DEFAULT_THRESHOLD,
+                  num_bands: int = NUM_BANDS, hasher: Optional[MinHasher] = None) -> List[List[str]]:
+    """Group (id, block_key, text) items into near-duplicate clusters.
+
+    Only items sharing block_key can match. Candidates come from LSH band
+    collisions, so cost grows with the number of candidates rather than n^2.
+    Each cluster is anchored on its first unclustered item and a candidate
+    joins only when its estimated Jaccard similarity to that anchor reaches
+    threshold, so chains A~B~C never pull in a C that is unlike A.
+    """
+    hasher = hasher or MinHasher()
+    rows = hasher.num_perm // num_bands
+
+    ids: List[str] = []
+    signatures = []
+    item_buckets: List[List[Tuple]] = []
+    buckets: Dict[Tuple, List[int]] = defaultdict(list)
+    for item_id, block_key, text in items:
+        index = len(ids)
+        ids.append(item_id)
+        signature = hasher.signature(shingles(text))
+        signatures.append(signature)
+        keys = [(block_key, band, signature[band * rows:(band + 1) * rows].tobytes())
+                for band in range(num_bands)]
+        for key in keys:
+            buckets[key].append(index)
+        item_buckets.append(keys)
+
+    if not ids:
+        return []
+    matrix = np.vstack(signatures)
+    clustered = np.zeros(len(ids), dtype=bool)
+    clusters: List[List[str]] = []
+    for anchor in range(len(ids)):
+        if clustered[anchor]:
+            continue
+        clustered[anchor] = True
+        candidates = {other for key in item_buckets[anchor] for other in buckets[key]}
+        candidates = np.fromiter(sorted(candidates), dtype=np.int64)
+        candidates = candidates[~clustered[candidates]]
+        if candidates.size == 0:
+            continue
+        similarity = (matrix[candidates] == matrix[anchor]).mean(axis=1)
+        members = candidates[similarity >= threshold]
+        if members.size:
+            clustered[members] = True
+            clusters.append([ids[anchor]] + [ids[m] for m in members])
+    return clusters
+
+
+def _entity_text(name: Optional[str], description: Optional[str]) -> str:
+    return f"{name or ''} {description or ''}"
+
+
+def load_candidates(conn: sqlite3.Connection, repository_path: Optional[str] = None):
+    """Stream (id, block_key, text) for every entity, blocked by repo and type"""
+    cursor = conn.cursor()
+    query = "SELECT id, repositoryPath, entityType, name, description FROM knowledge_entities"
+    params: Sequence = ()
+    if repository_path:
+        query += " WHERE repositoryPath = ?"
+        params = (repository_path,)
+    cursor.execute(query, params)
+    while True:
+        page = cursor.fetchmany(FETCH_SIZE)
+        if not page:
+            break
+        for entity_id, repo, entity_type, name, description in page:
+            yield entity_id, f"{repo}\x00{entity_type}", _entity_text(name, description)
+
+
+def _pick_canonical(rows: List[sqlite3.Row]) -> sqlite3.Row:
+    """Keep the most important entity, oldest first on ties"""
+    return min(rows, key=lambda r: (-(r["importanceScore"] or 0), r["createdAt"] or "", r["id"]))
+
+
+def find_referencing_insights(conn: sqlite3.Connection, entity_ids: List[str]) -> List[str]:
+    """Ids of insights whose relatedEntities array contains any of entity_ids"""
+    if not entity_ids:
+        return []
+    rows = conn.execute("""
+        SELECT DISTINCT i.id
+        FROM knowledge_insights i,
+             json_each(CASE WHEN json_valid(i.relatedEntities) THEN i.relatedEntities ELSE '[]' END) e
+        WHERE e.value IN (SELECT value FROM json_each(?))
+    """, (json.dumps(entity_ids),)).fetchall()
+    return [row[0] for row in rows]
+
+
+def merge_clusters(conn: sqlite3.Connection, clusters: List[List[str]]) -> Dict[str, Any]:
+    """Merge each cluster into its canonical entity in a single transaction.
+
+    Relationships of duplicates are pointed at the canonical entity; edges
+    that become self-loops are dropped and parallel edges of the same type
+    are collapsed, summing evidenceCount. Insight references are rewritten.
+    Returns counts plus the duplicate -> canonical id mapping.
+    """
+    now = datetime.now().isoformat()
+    mapping: Dict[str, str] = {}
+    stats = {"clusters": len(clusters), "entities_removed": 0,
+             "relationships_rewired": 0, "relationships_removed": 0, "insights_updated": 0,
+             "mapping": mapping}
+
+    # Find insights that mention any cluster member before taking the write lock
+    insight_ids = find_referencing_insights(conn, [m for members in clusters for m in members])
+
+    with conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        for members in clusters:
+            placeholders = ",".join("?" * len(members))
+            rows = cursor.execute(
+                f"SELECT * FROM knowledge_entities WHERE id IN ({placeholders})", members
+            ).fetchall()
+            if len(rows) < 2:
+                continue
+            canonical = _pick_canonical(rows)
+            duplicates = [r for r in rows if r["id"] != canonical["id"]]
+
+            try:
+                properties = json.loads(canonical["properties"]) if canonical["properties"] else {}
+            except (TypeError, ValueError):
+                properties = {}
+            if not isinstance(properties, dict):
+                properties = {"value": properties}
+            merged_from = properties.get("mergedFrom", [])
+            merged_from.extend(r["id"] for r in duplicates)
+            properties["mergedFrom"] = merged_from
+
+            description = canonical["description"]
+            if not description:
+                description = max((r["description"] or "" for r in duplicates), key=len) or None
+
+            cursor.execute("""
+                UPDATE knowledge_entities
+                SET description = ?, properties = ?, accessCount = ?,
+                    importanceScore = ?, confidenceScore = ?, updatedAt = ?
+                WHERE id = ?
+            """, (
+                description,
+                json.dumps(properties),
+                sum(r["accessCount"] or 0 for r in rows),
+                max(r["importanceScore"] or 0 for r in rows),
+                max(r["confidenceScore"] or 0 for r in rows),
+                now,
+                canonical["id"],
+            ))
+            for row in duplicates:
+                mapping[row["id"]] = canonical["id"]
+
+        if not mapping:
+            return stats
+
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS dedup_map (dupId TEXT PRIMARY KEY, canonicalId TEXT NOT NULL)")
+        cursor.execute("DELETE FROM dedup_map")
+        cursor.executemany("INSERT INTO dedup_map VALUES (?, ?)", mapping.items())
+
+        # Edges between members of one cluster would become self-loops
+        cursor.execute("""
+            DELETE FROM knowledge_relationships
+            WHERE (fromEntityId IN (SELECT dupId FROM dedup_map) OR toEntityId IN (SELECT dupId FROM dedup_map))
+              AND COALESCE((SELECT canonicalId FROM dedup_map WHERE dupId = fromEntityId), fromEntityId)
+                = COALESCE((SELECT canonicalId FROM dedup_map WHERE dupId = toEntityId), toEntityId)
+        """)
+        stats["relationships_removed"] += cursor.rowcount
+
+        rewired = 0
+        for column in ("fromEntityId", "toEntityId"):
+            cursor.execute(f"""
+                UPDATE knowledge_relationships
+                SET {column} = (SELECT canonicalId FROM dedup_map WHERE dupId = {column}), updatedAt = ?
+                WHERE {column} IN (SELECT dupId FROM dedup_map)
+            """, (now,))
+            rewired += cursor.rowcount
+        stats["relationships_rewired"] = rewired
+
+        # Collapse parallel edges that now share endpoints and type
+        cursor.execute("DROP TABLE IF EXISTS temp.dedup_edges")
+        cursor.execute("""
+            CREATE TEMP TABLE dedup_edges AS
+            SELECT fromEntityId, toEntityId, relationshipType, MIN(rowid) AS keepRowid,
+                   SUM(evidenceCount) AS evidenceCount, MAX(strength) AS strength, MAX(confidence) AS confidence
+            FROM knowledge_relationships
+            WHERE fromEntityId IN (SELECT DISTINCT canonicalId FROM dedup_map)
+               OR toEntityId IN (SELECT DISTINCT canonicalId FROM dedup_map)
+            GROUP BY fromEntityId, toEntityId, relationshipType
+            HAVING COUNT(*) > 1
+        """)
+        cursor.execute("""
+            UPDATE knowledge_relationships
+            SET evidenceCount = (SELECT evidenceCount FROM dedup_edges WHERE keepRowid = knowledge_relationships.rowid),
+                strength = (SELECT strength FROM dedup_edges WHERE keepRowid = knowledge_relationships.rowid),
+                confidence = (SELECT confidence FROM dedup_edges WHERE keepRowid = knowledge_relationships.rowid)
+            WHERE rowid IN (SELECT keepRowid FROM dedup_edges)
+        """)
+        cursor.execute("""
+            DELETE FROM knowledge_relationships
+            WHERE rowid NOT IN (SELECT keepRowid FROM dedup_edges)
+              AND EXISTS (
+                SELECT 1 FROM dedup_edges d
+                WHERE d.fromEntityId = knowledge_relationships.fromEntityId
+                  AND d.toEntityId = knowledge_relationships.toEntityId
+                  AND d.relationshipType = knowledge_relationships.relationshipType
+              )
+        """)
+        stats["relationships_removed"] += cursor.rowcount
+        cursor.execute("DROP TABLE temp.dedup_edges")
+
+        # Insights keep JSON arrays of entity ids; only the candidates found above are rewritten
+        for i in range(0, len(insight_ids), INSIGHT_BATCH_SIZE):
+            batch = insight_ids[i:i + INSIGHT_BATCH_SIZE]
+            rows = cursor.execute(
+                f"SELECT id, relatedEntities FROM knowledge_insights WHERE id IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            updates = []
+            for insight_id, related in rows:
+                try:
+                    entity_ids = json.loads(related or "[]")
+                except ValueError:
+                    continue
+                if not isinstance(entity_ids, list) or not any(e in mapping for e in entity_ids):
+                    continue
+                remapped = list(dict.fromkeys(mapping.get(e, e) for e in entity_ids))
+                updates.append((json.dumps(remapped), now, insight_id))
+            cursor.executemany("UPDATE knowledge_insights SET relatedEntities = ?, updatedAt = ? WHERE id = ?",
+                               updates)
+            stats["insights_updated"] += len(updates)
+
+        cursor.execute("DELETE FROM knowledge_entities WHERE id IN (SELECT dupId FROM dedup_map)")
+        stats["entities_removed"] = cursor.rowcount
+        cursor.execute("DELETE FROM dedup_map")
+
+    return stats
+
+
+def deduplicate(conn: sqlite3.Connection, threshold: float = DEFAULT_THRESHOLD,
+                repository_path: Optional[str] = None, dry_run: bool = False,
+                show: int = 10) -> Dict[str, Any]:
+    """Find near-duplicate clusters and (unless dry_run) merge them"""
+    start = time.perf_counter()
+    clusters = find_clusters(load_candidates(conn, repository_path), threshold=threshold)
+    detect_time = time.perf_counter() - start
+    duplicates = sum(len(c) - 1 for c in clusters)
+
+    print(f"\n🧬 Near-duplicate scan (threshold {threshold:.2f}): "
+          f"{len(clusters)} clusters, {duplicates} redundant entities in {detect_time:.2f}s")
+
+    if clusters and show:
+        largest = sorted(clusters, key=len, reverse=True)[:show]
+        names = dict(conn.execute(
+            f"SELECT id, name FROM knowledge_entities WHERE id IN ({','.join('?' * len(largest))})",
+            [c[0] for c in largest]
+        ).fetchall())
+        print("\n📦 Largest clusters:")
+        for cluster in largest:
+            print(f"   {len(cluster):4d} × {names.get(cluster[0], cluster[0])}")
+
+    if dry_run or not clusters:
+        if dry_run:
+            print("\n(dry run: nothing merged)")
+        return {"clusters": len(clusters), "entities_removed": 0, "mapping": {}}
+
+    merge_start = time.perf_counter()
+    stats = merge_clusters(conn, clusters)
+    print(f"\n✅ Merged {stats['entities_removed']} entities into {stats['clusters']} canonical entities "
+          f"in {time.perf_counter() - merge_start:.2f}s")
+    print(f"   Relationships rewired: {stats['relationships_rewired']}, "
+          f"removed: {stats['relationships_removed']}, insights updated: {stats['insights_updated']}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge near-duplicate knowledge graph entities")
+    parser.add_argument("command", choices=["dedup"],
+                        help="dedup: find and merge near-duplicate clusters, print stats as JSON")
+    parser.add_argument("--db", required=True, help="Path to the ZMCP SQLite database")
+    parser.add_argument("--repository", help="Only compare entities of this repository")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated Jaccard similarity at which entities are merged")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    try:
+        clusters = find_clusters(load_candidates(conn, args.repository), threshold=args.threshold)
+        stats = merge_clusters(conn, clusters)
+    finally:
+        conn.close()
+    json.dump(stats, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
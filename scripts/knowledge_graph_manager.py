@@ -4,13 +4,286 @@ Knowledge Graph Management Script for ZMCP
 Provides forward migration, editing, flushing, and repopulation capabilities
 """
 
+import io
+import os
+import re
+import gzip
+import time
+import hashlib
+import urllib.request
 import sqlite3
 import json
 import sys
 import argparse
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, IO, Optional
+
+BACKUP_FORMAT = "zmcp-kg-backup"
+BACKUP_FORMAT_VERSION = 1
+BACKUP_TABLES = ("knowledge_entities", "knowledge_relationships")
+BACKUP_PAGE_SIZE = 5000
+IMPORT_BATCH_SIZE = 50000
+
+# Direct embedding (migrate --direct)
+KNOWLEDGE_GRAPH_COLLECTION = "knowledge_graph"
+DEFAULT_LANCEDB_PATH = Path.home() / "dev/game1/var/storage/lancedb"
+DEFAULT_EMBEDDING_URL = "http://localhost:8765/embed"
+DEFAULT_EMBEDDING_MODEL = "qwen3-embedding-8b"
+EMBED_BATCH_SIZE = 64
+EMBED_TIMEOUT_SECONDS = 120
+
+# Compression name -> per-table file suffix
+COMPRESSION_SUFFIXES = {
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+    "none": ".jsonl",
+}
+
+
+def open_backup_stream(path, mode: str, compression: str = None) -> IO[str]:
+    """Open a (possibly compressed) JSONL backup file as a text stream.
+
+    mode is "r" or "w"; compression is inferred from the suffix when omitted.
+    """
+    path = Path(path)
+    if compression is None:
+        compression = "none"
+        for name, suffix in COMPRESSION_SUFFIXES.items():
+            if name != "none" and path.name.endswith(suffix):
+                compression = name
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression requires the 'zstandard' package (uv pip install zstandard)")
+        raw = open(path, mode + "b")
+        if mode == "w":
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    if compression == "none":
+        return open(path, mode, encoding="utf-8")
+    raise ValueError(f"Unknown compression: {compression}")
+
+# FTS5 shadow index over knowledge_entities, kept in sync by triggers.
+# src/database/knowledgeFts.ts creates the same objects; keep them identical.
+KNOWLEDGE_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_entities_fts USING fts5(
+  name,
+  description,
+  properties,
+  content = 'knowledge_entities',
+  content_rowid = 'rowid',
+  tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS knowledge_entities_fts_insert AFTER INSERT ON knowledge_entities
+BEGIN
+  INSERT INTO knowledge_entities_fts(rowid, name, description, properties)
+  VALUES (NEW.rowid, NEW.name, NEW.description, NEW.properties);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_entities_fts_delete AFTER DELETE ON knowledge_entities
+BEGIN
+  INSERT INTO knowledge_entities_fts(knowledge_entities_fts, rowid, name, description, properties)
+  VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.properties);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_entities_fts_update AFTER UPDATE OF name, description, properties ON knowledge_entities
+BEGIN
+  INSERT INTO knowledge_entities_fts(knowledge_entities_fts, rowid, name, description, properties)
+  VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.properties);
+  INSERT INTO knowledge_entities_fts(rowid, name, description, properties)
+  VALUES (NEW.rowid, NEW.name, NEW.description, NEW.properties);
+END;
+"""
+
+# bm25() column weights: name, description, properties
+KNOWLEDGE_FTS_WEIGHTS = "10.0, 4.0, 1.0"
+
+# Materialized per-(repository, kind, type) counters, kept current by triggers.
+# src/database/knowledgeStats.ts creates the same objects; keep them identical.
+STATS_COUNTED_TABLES = [
+    ("knowledge_entities", "entity", "entityType"),
+    ("knowledge_relationships", "relationship", "relationshipType"),
+    ("knowledge_insights", "insight", "insightType"),
+]
+
+
+def _stats_counter_triggers(table: str, kind: str, type_column: str) -> str:
+    def increment(row):
+        return f"""
+  INSERT INTO knowledge_graph_stats(repositoryPath, kind, type, count)
+  VALUES ({row}.repositoryPath, '{kind}', {row}.{type_column}, 1)
+  ON CONFLICT(repositoryPath, kind, type) DO UPDATE SET count = count + 1;"""
+
+    def decrement(row):
+        return f"""
+  UPDATE knowledge_graph_stats SET count = count - 1
+  WHERE repositoryPath = {row}.repositoryPath AND kind = '{kind}' AND type = {row}.{type_column};"""
+
+    return f"""
+CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table}
+BEGIN{increment('NEW')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table}
+BEGIN{decrement('OLD')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_stats_update AFTER UPDATE OF repositoryPath, {type_column} ON {table}
+WHEN OLD.repositoryPath IS NOT NEW.repositoryPath OR OLD.{type_column} IS NOT NEW.{type_column}
+BEGIN{decrement('OLD')}{increment('NEW')}
+END;
+"""
+
+
+KNOWLEDGE_STATS_DDL = """
+CREATE TABLE IF NOT EXISTS knowledge_graph_stats (
+  repositoryPath TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (repositoryPath, kind, type)
+) WITHOUT ROWID;
+""" + "".join(_stats_counter_triggers(*counted) for counted in STATS_COUNTED_TABLES)
+
+KNOWLEDGE_STATS_BACKFILL = "DELETE FROM knowledge_graph_stats;" + "".join(f"""
+INSERT INTO knowledge_graph_stats(repositoryPath, kind, type, count)
+SELECT repositoryPath, '{kind}', {type_column}, COUNT(*) FROM {table}
+GROUP BY repositoryPath, {type_column};""" for table, kind, type_column in STATS_COUNTED_TABLES)
+
+KNOWLEDGE_STATS_OBJECTS = {"knowledge_graph_stats"} | {
+    f"{table}_stats_{event}"
+    for table, _, _ in STATS_COUNTED_TABLES
+    for event in ("insert", "delete", "update")
+}
+
+
+def build_fts_query(text: str):
+    """Turn free text into an FTS5 MATCH expression (None if nothing to match).
+
+    "quoted phrases" match as phrases, other words as prefix terms, and all
+    parts must match. Each part is quoted so user input cannot inject FTS5
+    operators.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+        if phrase.strip():
+            parts.append('"' + phrase.strip().replace('"', '""') + '"')
+        elif word:
+            word = word.replace('"', '')
+            if re.search(r"\w", word):
+                parts.append(f'"{word}"*')
+    return " ".join(parts) or None
+
+
+def entity_embedding_text(entity: Dict[str, Any]) -> str:
+    """Text embedded for an entity (matches KnowledgeGraphService.addEntityToVectorStore)"""
+    return f"{entity['name']} {entity.get('description') or ''} {entity['entityType']}"
+
+
+def request_embeddings(url: str, texts: List[str], mode: str) -> List[List[float]]:
+    """POST texts to an embedding service speaking the {texts, mode} -> {embeddings} API"""
+    payload = json.dumps({"texts": texts, "mode": mode}).encode("utf-8")
+    req = urllib.request.Request(url, data=payload, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=EMBED_TIMEOUT_SECONDS) as response:
+        embeddings = json.loads(response.read())["embeddings"]
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Embedding service returned {len(embeddings)} vectors for {len(texts)} texts")
+    return embeddings
+
+
+def load_vector_fingerprints(table) -> Dict[str, tuple]:
+    """Map id -> (text_hash, model_fingerprint) for vectors already in a LanceDB table.
+
+    Only the id and metadata columns are read, not the vectors.
+    """
+    try:
+        data = table.to_lance().to_table(columns=["id", "metadata"])
+    except Exception:
+        data = table.to_arrow().select(["id", "metadata"])
+    stored = {}
+    for entity_id, metadata in zip(data.column("id").to_pylist(), data.column("metadata").to_pylist()):
+        try:
+            meta = json.loads(metadata) if metadata else {}
+        except ValueError:
+            meta = {}
+        stored[entity_id] = (meta.get("text_hash"), meta.get("model_fingerprint"))
+    return stored
+
+
+def delete_vectors(table, entity_ids: List[str], chunk_size: int = 500):
+    """Delete rows by id from a LanceDB table in bounded IN (...) batches"""
+    for i in range(0, len(entity_ids), chunk_size):
+        chunk = entity_ids[i:i + chunk_size]
+        table.delete("id IN (" + ", ".join("'" + e.replace("'", "''") + "'" for e in chunk) + ")")
+
+
+def read_manifest(backup_dir) -> Dict[str, Any]:
+    """Load and validate a backup directory's manifest"""
+    manifest_path = Path(backup_dir) / "manifest.json"
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No manifest.json in {backup_dir} (incomplete backup?)")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BACKUP_FORMAT:
+        raise ValueError(f"{backup_dir} is not a {BACKUP_FORMAT} backup")
+    return manifest
+
+
+def read_table_header(path) -> Dict[str, Any]:
+    """Read the header record of a JSONL table file"""
+    with open_backup_stream(path, "r") as f:
+        return json.loads(f.readline())["_header"]
+
+
+def find_latest_backup(root) -> Optional[Path]:
+    """Newest complete backup directory under root, or None.
+
+    Candidates are recognised by their manifest.json rather than their
+    name, so backups written with a custom --output are found too.
+    Directories with no manifest (unfinished) or another format (such as
+    columnar exports) are skipped.
+    """
+    root = Path(root or ".")
+    if not root.is_dir():
+        return None
+    candidates = []
+    for path in root.iterdir():
+        if not (path / "manifest.json").is_file():
+            continue
+        try:
+            manifest = read_manifest(path)
+        except (OSError, ValueError):
+            continue
+        if "timestamp" in manifest:
+            candidates.append((manifest["timestamp"], path))
+    return max(candidates)[1] if candidates else None
+
+
+def backup_chain(backup_dir) -> List[tuple]:
+    """Resolve a backup to [(dir, manifest), ...] from its full base to itself"""
+    chain = []
+    current = Path(backup_dir)
+    while True:
+        manifest = read_manifest(current)
+        chain.append((current, manifest))
+        if manifest.get("kind", "full") == "full":
+            break
+        parent = Path(manifest["parent"])
+        if not parent.exists():
+            # Backups moved together: fall back to a sibling with the same name
+            parent = current.parent / parent.name
+        current = parent
+    chain.reverse()
+    return chain
+
 
 class KnowledgeGraphManager:
     def __init__(self, db_path: str = None):
@@ -20,32 +293,284 @@ class KnowledgeGraphManager:
         self.db_path = db_path
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        self._stats_ready = False
         
-    def backup(self, backup_path: str = None):
-        """Create backup of current knowledge graph"""
+    def backup(self, backup_path: str = None, compression: str = "gzip",
+               delta: bool = False, base_path: str = None):
+        """Create a streaming backup of the knowledge graph.
+
+        Writes a directory holding one compressed JSONL file per table (first
+        line is a header record) and a small manifest.json. Rows are read from
+        the cursor page by page, so memory use does not grow with graph size.
+
+        With delta=True only rows whose updatedAt is at or after the previous
+        backup's high-water mark are exported. The previous backup is base_path,
+        or the newest backup next to the new one. Deletions are not captured
+        by deltas; take a periodic full backup to bound restore drift.
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
         if not backup_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"knowledge_graph_backup_{timestamp}.json"
-            
-        entities = self.export_entities()
-        relationships = self.export_relationships()
-        
-        backup_data = {
+            backup_path = f"knowledge_graph_backup_{timestamp}"
+
+        backup_dir = Path(backup_path)
+
+        parent = None
+        if delta:
+            parent_dir = Path(base_path) if base_path else find_latest_backup(backup_dir.parent)
+            if not parent_dir:
+                print("⚠️ No previous backup found, creating a full backup")
+            else:
+                parent = (parent_dir, read_manifest(parent_dir))
+
+        backup_dir.mkdir(parents=True, exist_ok=False)
+
+        manifest = {
+            "format": BACKUP_FORMAT,
+            "version": BACKUP_FORMAT_VERSION,
+            "kind": "delta" if parent else "full",
             "timestamp": datetime.now().isoformat(),
-            "entity_count": len(entities),
-            "relationship_count": len(relationships),
-            "entities": entities,
-            "relationships": relationships
+            "source_db": str(self.db_path),
+            "compression": compression,
+            "tables": {}
         }
-        
-        with open(backup_path, 'w') as f:
-            json.dump(backup_data, f, indent=2)
-            
-        print(f"✅ Backup created: {backup_path}")
-        print(f"   Entities: {len(entities)}")
-        print(f"   Relationships: {len(relationships)}")
-        return backup_path
-    
+        if parent:
+            manifest["parent"] = str(parent[0].resolve())
+
+        for table in BACKUP_TABLES:
+            # Mark is taken before the export so rows written during it are
+            # picked up again by the next delta rather than lost
+            high_water_mark = self.high_water_mark(table)
+            where, params = "", ()
+            since = parent[1]["tables"][table].get("high_water_mark") if parent else None
+            if since:
+                where, params = "WHERE datetime(updatedAt) >= datetime(?)", (since,)
+
+            file_name = table + COMPRESSION_SUFFIXES[compression]
+            rows = self.write_table_jsonl(table, backup_dir / file_name, compression, where, params)
+            manifest["tables"][table] = {
+                "file": file_name,
+                "rows": rows,
+                "since": since,
+                "high_water_mark": high_water_mark or since
+            }
+
+        # Manifest is written last so a partial backup is recognisable
+        with open(backup_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        print(f"✅ {manifest['kind'].capitalize()} backup created: {backup_dir}")
+        if parent:
+            print(f"   Base: {parent[0]}")
+        print(f"   Entities: {manifest['tables']['knowledge_entities']['rows']}")
+        print(f"   Relationships: {manifest['tables']['knowledge_relationships']['rows']}")
+        return str(backup_dir)
+
+    def high_water_mark(self, table: str):
+        """Latest updatedAt in a table, normalised to SQLite datetime format"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT MAX(datetime(updatedAt)) AS hwm FROM {table}")
+        return cursor.fetchone()["hwm"]
+
+    def restore(self, backup_path: str, drop_indexes: bool = False,
+                batch_size: int = IMPORT_BATCH_SIZE):
+        """Restore a backup, replaying its base backup and deltas in order.
+
+        Rows are upserted by id, so restoring over a live graph keeps any
+        entities that are not in the backup.
+        """
+        path = Path(backup_path)
+        if path.is_file() and path.suffix == ".json":
+            return self.restore_legacy_json(path)
+        return self.import_backup(path, drop_indexes=drop_indexes, batch_size=batch_size)
+
+    def import_backup(self, backup_path: str, drop_indexes: bool = False,
+                      batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+        """Bulk-load a backup directory (with its delta chain) or one table file.
+
+        Rows are upserted with executemany and committed every batch_size
+        rows. With drop_indexes=True the tables' secondary indexes are dropped
+        before the load and rebuilt once afterwards, which is much faster than
+        maintaining them row by row.
+        """
+        path = Path(backup_path)
+        if path.is_dir():
+            chain = backup_chain(path)
+            files = [(table, backup_dir / manifest["tables"][table]["file"])
+                     for backup_dir, manifest in chain for table in BACKUP_TABLES]
+            print(f"♻️ Importing {len(chain)} backup(s) into {self.db_path}")
+        else:
+            files = [(read_table_header(path)["table"], path)]
+            print(f"♻️ Importing {path} into {self.db_path}")
+
+        tables = sorted({table for table, _ in files})
+        totals = {table: 0 for table in tables}
+        dropped = self.drop_secondary_indexes(tables) if drop_indexes else []
+        start = time.perf_counter()
+        try:
+            with self.bulk_load_pragmas():
+                for table, file_path in files:
+                    file_start = time.perf_counter()
+                    rows = self.load_table_jsonl(table, file_path, batch_size)
+                    elapsed = time.perf_counter() - file_start
+                    totals[table] += rows
+                    print(f"   {file_path.parent.name}/{file_path.name}: "
+                          f"{rows} rows ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        finally:
+            if dropped:
+                index_start = time.perf_counter()
+                self.create_indexes(dropped)
+                print(f"   Rebuilt {len(dropped)} index(es) in {time.perf_counter() - index_start:.2f}s")
+
+        elapsed = time.perf_counter() - start
+        total_rows = sum(totals.values())
+        print(f"✅ Import complete: {total_rows} rows in {elapsed:.2f}s "
+              f"({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        for table, rows in totals.items():
+            print(f"   {table}: {rows}")
+        return totals
+
+    @contextmanager
+    def bulk_load_pragmas(self):
+        """Relax durability and enlarge the page cache for the duration of a load"""
+        cursor = self.conn.cursor()
+        synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+        cache_size = cursor.execute("PRAGMA cache_size").fetchone()[0]
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA cache_size = -262144")  # 256 MB
+        try:
+            yield
+        finally:
+            cursor.execute(f"PRAGMA synchronous = {int(synchronous)}")
+            cursor.execute(f"PRAGMA cache_size = {int(cache_size)}")
+
+    def drop_secondary_indexes(self, tables: List[str]) -> List[tuple]:
+        """Drop explicit indexes on tables, returning (name, sql) for rebuilding"""
+        cursor = self.conn.cursor()
+        placeholders = ", ".join("?" * len(tables))
+        cursor.execute(f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+        """, tuple(tables))
+        indexes = [(row["name"], row["sql"]) for row in cursor.fetchall()]
+        with self.conn:
+            for name, _ in indexes:
+                self.conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        if indexes:
+            print(f"   Dropped {len(indexes)} index(es) for the load")
+        return indexes
+
+    def create_indexes(self, indexes: List[tuple]):
+        with self.conn:
+            for _, sql in indexes:
+                self.conn.execute(sql)
+
+    def table_columns(self, table: str) -> List[str]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        return [row["name"] for row in cursor.fetchall()]
+
+    def upsert_rows(self, table: str, columns: List[str], rows,
+                    batch_size: int = IMPORT_BATCH_SIZE) -> int:
+        """Upsert an iterable of value tuples by id, committing every batch_size rows"""
+        placeholders = ", ".join("?" * len(columns))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+               f"ON CONFLICT(id) DO UPDATE SET {updates}")
+        cursor = self.conn.cursor()
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                self.conn.commit()
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            self.conn.commit()
+            count += len(batch)
+        return count
+
+    def load_table_jsonl(self, table: str, path: Path,
+                         batch_size: int = IMPORT_BATCH_SIZE) -> int:
+        """Stream a JSONL table file into table, returning the row count"""
+        target_columns = set(self.table_columns(table))
+        with open_backup_stream(path, "r") as f:
+            header = json.loads(f.readline())["_header"]
+            if header["table"] != table:
+                raise ValueError(f"{path} holds {header['table']}, expected {table}")
+            # Columns dropped from the schema since the backup are ignored
+            columns = [c for c in header["columns"] if c in target_columns]
+
+            def rows():
+                for line in f:
+                    record = json.loads(line)
+                    yield tuple(record.get(c) for c in columns)
+
+            return self.upsert_rows(table, columns, rows(), batch_size)
+
+    def restore_legacy_json(self, path: Path):
+        """Restore a pre-JSONL single-document backup"""
+        with open(path) as f:
+            data = json.load(f)
+        totals = {}
+        for table, key in (("knowledge_entities", "entities"), ("knowledge_relationships", "relationships")):
+            target_columns = self.table_columns(table)
+            records = data.get(key, [])
+            columns = [c for c in target_columns if records and c in records[0]]
+
+            def rows():
+                for record in records:
+                    if isinstance(record.get("properties"), (dict, list)):
+                        record["properties"] = json.dumps(record["properties"])
+                    yield tuple(record.get(c) for c in columns)
+
+            totals[table] = self.upsert_rows(table, columns, rows())
+        print(f"✅ Restored legacy backup {path}")
+        print(f"   Entities: {totals['knowledge_entities']}")
+        print(f"   Relationships: {totals['knowledge_relationships']}")
+        return totals
+
+    def iter_pages(self, table: str, where: str = "", params: tuple = (),
+                   page_size: int = BACKUP_PAGE_SIZE) -> Iterator[List[sqlite3.Row]]:
+        """Iterate a table in rowid order as pages of up to page_size rows"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {table} {where} ORDER BY rowid", params)
+        while True:
+            page = cursor.fetchmany(page_size)
+            if not page:
+                break
+            yield page
+
+    def iter_rows(self, table: str, where: str = "", params: tuple = (),
+                  page_size: int = BACKUP_PAGE_SIZE) -> Iterator[sqlite3.Row]:
+        """Iterate a table in rowid order, fetching page_size rows at a time"""
+        for page in self.iter_pages(table, where, params, page_size):
+            yield from page
+
+    def write_table_jsonl(self, table: str, path: Path, compression: str,
+                          where: str = "", params: tuple = ()) -> int:
+        """Stream one table into a JSONL file, returning the row count.
+
+        JSON columns such as properties are written as their stored strings
+        rather than being parsed and re-serialised.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = [row["name"] for row in cursor.fetchall()]
+
+        count = 0
+        with open_backup_stream(path, "w", compression) as out:
+            header = {"table": table, "columns": columns, "version": BACKUP_FORMAT_VERSION}
+            out.write(json.dumps({"_header": header}) + "\n")
+            for row in self.iter_rows(table, where, params):
+                out.write(json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n")
+                count += 1
+        return count
+
     def export_entities(self) -> List[Dict]:
         """Export all entities"""
         cursor = self.conn.cursor()
@@ -150,89 +675,155 @@ class KnowledgeGraphManager:
         
         cursor = self.conn.cursor()
         
+        # One existence query for the whole set instead of a SELECT per entity
+        placeholders = ", ".join("?" * len(discoveries))
+        cursor.execute(f"""
+            SELECT name, entityType FROM knowledge_entities
+            WHERE name IN ({placeholders})
+        """, tuple(d["name"] for d in discoveries))
+        existing = {(row["name"], row["entityType"]) for row in cursor.fetchall()}
+
+        now = datetime.now().isoformat()
+        rows = []
         for disc in discoveries:
-            # Check if already exists
-            cursor.execute("""
-                SELECT id FROM knowledge_entities 
-                WHERE entity_name = ? AND entity_type = ?
-            """, (disc["name"], disc["type"]))
-            
-            if not cursor.fetchone():
-                cursor.execute("""
-                    INSERT INTO knowledge_entities 
-                    (id, repository_path, agent_id, entity_type, entity_name, 
-                     entity_description, properties, importance_score, confidence_score, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    self.generate_id(),
-                    ".",
-                    "knowledge-manager",
-                    disc["type"],
-                    disc["name"],
-                    disc["description"],
-                    json.dumps(disc["properties"]),
-                    0.8,
-                    0.9,
-                    datetime.now().isoformat()
-                ))
-                print(f"✅ Added: {disc['name']}")
-            else:
+            if (disc["name"], disc["type"]) in existing:
                 print(f"⏭️ Skipped (exists): {disc['name']}")
-                
+                continue
+            rows.append((
+                self.generate_id(),
+                ".",
+                "knowledge-manager",
+                disc["type"],
+                disc["name"],
+                disc["description"],
+                json.dumps(disc["properties"]),
+                0.8,
+                0.9,
+                now,
+                now
+            ))
+            print(f"✅ Added: {disc['name']}")
+
+        cursor.executemany("""
+            INSERT INTO knowledge_entities
+            (id, repositoryPath, discoveredBy, entityType, name,
+             description, properties, importanceScore, confidenceScore, createdAt, updatedAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
         self.conn.commit()
     
-    def stats(self):
-        """Show knowledge graph statistics"""
+    def ensure_stats(self, rebuild: bool = False) -> bool:
+        """Create the stats counter table and triggers if missing.
+
+        Counters are backfilled when the table is first created or when
+        rebuild is set. Returns False if a knowledge table is missing.
+        sqlite_master is checked once per connection; the DDL (which takes
+        the write lock) only runs when an object is missing.
+        """
+        if self._stats_ready and not rebuild:
+            return True
         cursor = self.conn.cursor()
-        
-        # Entity stats
-        cursor.execute("SELECT COUNT(*) as count FROM knowledge_entities")
-        entity_count = cursor.fetchone()["count"]
-        
-        cursor.execute("""
-            SELECT entityType, COUNT(*) as count 
-            FROM knowledge_entities 
-            GROUP BY entityType 
-            ORDER BY count DESC
-        """)
-        entity_types = cursor.fetchall()
-        
-        # Relationship stats
-        cursor.execute("SELECT COUNT(*) as count FROM knowledge_relationships")
-        rel_count = cursor.fetchone()["count"]
-        
-        cursor.execute("""
-            SELECT relationshipType, COUNT(*) as count 
-            FROM knowledge_relationships 
-            GROUP BY relationshipType 
-            ORDER BY count DESC
-        """)
-        rel_types = cursor.fetchall()
-        
+        placeholders = ",".join("?" * len(KNOWLEDGE_STATS_OBJECTS))
+        cursor.execute(f"SELECT name FROM sqlite_master WHERE name IN ({placeholders})",
+                       sorted(KNOWLEDGE_STATS_OBJECTS))
+        existing = {row["name"] for row in cursor.fetchall()}
+        if existing == KNOWLEDGE_STATS_OBJECTS and not rebuild:
+            self._stats_ready = True
+            return True
+
+        backfill = KNOWLEDGE_STATS_BACKFILL if rebuild or "knowledge_graph_stats" not in existing else ""
+        try:
+            self.conn.executescript(f"BEGIN; {KNOWLEDGE_STATS_DDL} {backfill} COMMIT;")
+        except sqlite3.OperationalError as e:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            print(f"⚠️ Stats counters unavailable, counting rows instead: {e}")
+            return False
+        self._stats_ready = True
+        return True
+
+    def type_counts(self, kind: str) -> List[tuple]:
+        """(type, count) pairs across repositories, largest first"""
+        cursor = self.conn.cursor()
+        if self.ensure_stats():
+            cursor.execute("""
+                SELECT type, SUM(count) AS count
+                FROM knowledge_graph_stats
+                WHERE kind = ?
+                GROUP BY type
+                HAVING SUM(count) > 0
+                ORDER BY count DESC
+            """, (kind,))
+        else:
+            table, _, type_column = next(t for t in STATS_COUNTED_TABLES if t[1] == kind)
+            cursor.execute(f"""
+                SELECT {type_column} AS type, COUNT(*) AS count
+                FROM {table}
+                GROUP BY {type_column}
+                ORDER BY count DESC
+            """)
+        return [(row["type"], row["count"]) for row in cursor.fetchall()]
+
+    def stats(self, rebuild: bool = False):
+        """Show knowledge graph statistics (from the materialized counters)"""
+        if rebuild:
+            self.ensure_stats(rebuild=True)
+
+        entity_types = self.type_counts("entity")
+        rel_types = self.type_counts("relationship")
+        entity_count = sum(count for _, count in entity_types)
+        rel_count = sum(count for _, count in rel_types)
+
         print("\n📊 Knowledge Graph Statistics")
         print("="*50)
         print(f"Total Entities: {entity_count}")
         print(f"Total Relationships: {rel_count}")
         
         print("\n📌 Entity Types:")
-        for row in entity_types:
-            print(f"  {row['entityType']}: {row['count']}")
+        for entity_type, count in entity_types:
+            print(f"  {entity_type}: {count}")
             
         print("\n🔗 Relationship Types:")
-        for row in rel_types:
-            print(f"  {row['relationshipType']}: {row['count']}")
+        for rel_type, count in rel_types:
+            print(f"  {rel_type}: {count}")
     
-    def search(self, query: str):
-        """Search knowledge graph"""
+    def ensure_fts(self) -> bool:
+        """Create the FTS5 index and triggers if missing (False without FTS5)"""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT * FROM knowledge_entities 
-            WHERE name LIKE ? 
-               OR description LIKE ?
-               OR properties LIKE ?
-            ORDER BY importanceScore DESC
-            LIMIT 10
-        """, (f"%{query}%", f"%{query}%", f"%{query}%"))
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_entities_fts'")
+        exists = cursor.fetchone() is not None
+        # Backfill existing rows only when the index is first created
+        rebuild = "" if exists else "INSERT INTO knowledge_entities_fts(knowledge_entities_fts) VALUES ('rebuild');"
+        try:
+            self.conn.executescript(f"BEGIN; {KNOWLEDGE_FTS_DDL} {rebuild} COMMIT;")
+        except sqlite3.OperationalError as e:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            print(f"⚠️ FTS5 unavailable, falling back to LIKE search: {e}")
+            return False
+        return True
+
+    def search(self, query: str, limit: int = 10):
+        """Search knowledge graph (ranked FTS5 prefix/phrase match)"""
+        cursor = self.conn.cursor()
+        match_query = build_fts_query(query)
+        if match_query and self.ensure_fts():
+            cursor.execute(f"""
+                SELECT e.* FROM knowledge_entities_fts f
+                JOIN knowledge_entities e ON e.rowid = f.rowid
+                WHERE knowledge_entities_fts MATCH ?
+                ORDER BY bm25(knowledge_entities_fts, {KNOWLEDGE_FTS_WEIGHTS}), e.importanceScore DESC
+                LIMIT ?
+            """, (match_query, limit))
+        else:
+            cursor.execute("""
+                SELECT * FROM knowledge_entities 
+                WHERE name LIKE ? 
+                   OR description LIKE ?
+                   OR properties LIKE ?
+                ORDER BY importanceScore DESC
+                LIMIT ?
+            """, (f"%{query}%", f"%{query}%", f"%{query}%", limit))
         
         results = cursor.fetchall()
         print(f"\n🔍 Search results for '{query}':")
@@ -249,42 +840,267 @@ class KnowledgeGraphManager:
                 except:
                     pass
     
-    def migrate_to_gpu_embeddings(self):
-        """Prepare entities for GPU embedding migration"""
-        entities = self.export_entities()
-        
-        migration_data = []
-        for entity in entities:
-            # Combine relevant text fields for embedding
-            text_content = f"{entity['entity_name']} {entity['entity_description']}"
-            
-            if entity.get('properties'):
-                if isinstance(entity['properties'], dict):
-                    text_content += " " + " ".join(str(v) for v in entity['properties'].values())
-                    
-            migration_data.append({
-                "id": entity['id'],
-                "text": text_content,
-                "metadata": {
-                    "type": entity['entity_type'],
-                    "name": entity['entity_name'],
-                    "importance": entity.get('importance_score', 0.5)
-                }
-            })
-        
+    def migrate_to_gpu_embeddings(self, direct: bool = False, **options):
+        """Prepare entities for GPU embedding, or embed them directly.
+
+        Without direct, writes knowledge_graph_for_embedding.json for a manual
+        embedding run. With direct=True, delegates to embed_to_lancedb.
+        """
+        if direct:
+            return self.embed_to_lancedb(**options)
+
         output_path = "knowledge_graph_for_embedding.json"
+        count = 0
         with open(output_path, 'w') as f:
-            json.dump(migration_data, f, indent=2)
+            f.write("[\n")
+            for row in self.iter_rows("knowledge_entities"):
+                entity = dict(row)
+                item = {
+                    "id": entity['id'],
+                    "text": entity_embedding_text(entity),
+                    "metadata": {
+                        "type": entity['entityType'],
+                        "name": entity['name'],
+                        "importance": entity.get('importanceScore', 0.5)
+                    }
+                }
+                f.write((",\n" if count else "") + json.dumps(item))
+                count += 1
+            f.write("\n]\n")
             
-        print(f"✅ Prepared {len(migration_data)} entities for GPU embedding")
+        print(f"✅ Prepared {count} entities for GPU embedding")
         print(f"   Output: {output_path}")
         print("\nNext steps:")
         print("1. Run GPU embedding service: uv run talent-os/bin/zmcp_gpu_embedding_server.py")
         print("2. Process entities through embedding service")
         print("3. Store vectors in LanceDB for semantic search")
+        print("   (or run: knowledge_graph_manager.py migrate --direct)")
         
         return output_path
+
+    def embed_to_lancedb(self, embed_url: str = None, model: str = None, mode: str = None,
+                         lancedb_path: str = None, batch_size: int = EMBED_BATCH_SIZE,
+                         full: bool = False) -> Dict[str, int]:
+        """Stream entities through the embedding service into LanceDB.
+
+        Entities whose embedding text hash and model fingerprint match the
+        vector already stored are skipped, so after small graph edits only
+        changed entities are re-embedded. Vectors for entities that no longer
+        exist are removed. full=True re-embeds everything into a fresh table.
+        """
+        try:
+            import lancedb
+        except ImportError:
+            raise RuntimeError("Direct embedding requires the 'lancedb' package (uv pip install lancedb)")
+
+        embed_url = embed_url or os.environ.get("ZMCP_EMBEDDING_URL", DEFAULT_EMBEDDING_URL)
+        model = model or os.environ.get("ZMCP_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        mode = mode or os.environ.get("ZMCP_EMBEDDING_MODE", "gpu")
+        fingerprint = f"{model}:{mode}"
+        lancedb_path = Path(lancedb_path) if lancedb_path else DEFAULT_LANCEDB_PATH
+
+        db = lancedb.connect(str(lancedb_path))
+        table = None
+        stored: Dict[str, tuple] = {}
+        if KNOWLEDGE_GRAPH_COLLECTION in db.table_names():
+            if full:
+                db.drop_table(KNOWLEDGE_GRAPH_COLLECTION)
+            else:
+                table = db.open_table(KNOWLEDGE_GRAPH_COLLECTION)
+                stored = load_vector_fingerprints(table)
+
+        print(f"🧠 Embedding entities into {lancedb_path}/{KNOWLEDGE_GRAPH_COLLECTION}")
+        print(f"   Service: {embed_url} (model fingerprint: {fingerprint})")
+
+        stats = {"embedded": 0, "skipped": 0, "removed": 0}
+        seen = set()
+        batch = []
+        start = time.perf_counter()
+
+        def flush_batch():
+            nonlocal table
+            vectors = request_embeddings(embed_url, [item["content"] for item in batch], mode)
+            records = [dict(item, vector=vector) for item, vector in zip(batch, vectors)]
+            if table is None:
+                table = db.create_table(KNOWLEDGE_GRAPH_COLLECTION, records)
+            else:
+                (table.merge_insert("id")
+                    .when_matched_update_all()
+                    .when_not_matched_insert_all()
+                    .execute(records))
+            stats["embedded"] += len(records)
+            print(f"   ✅ Embedded batch of {len(records)} (total {stats['embedded']}, skipped {stats['skipped']})")
+            batch.clear()
+
+        for row in self.iter_rows("knowledge_entities"):
+            entity = dict(row)
+            seen.add(entity["id"])
+            content = entity_embedding_text(entity)
+            text_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if stored.get(entity["id"]) == (text_hash, fingerprint):
+                stats["skipped"] += 1
+                continue
+
+            batch.append({
+                "id": entity["id"],
+                "content": content,
+                "metadata": json.dumps({
+                    "type": "knowledge_graph",
+                    "collection": KNOWLEDGE_GRAPH_COLLECTION,
+                    "addedAt": datetime.now().isoformat(),
+                    "entityType": entity["entityType"],
+                    "repositoryPath": entity["repositoryPath"],
+                    "importanceScore": entity["importanceScore"],
+                    "relevanceScore": entity["relevanceScore"],
+                    "confidenceScore": entity["confidenceScore"],
+                    "createdAt": entity["createdAt"],
+                    "discoveredBy": entity["discoveredBy"],
+                    "discoveredDuring": entity["discoveredDuring"],
+                    "text_hash": text_hash,
+                    "model_fingerprint": fingerprint
+                })
+            })
+            if len(batch) >= batch_size:
+                flush_batch()
+        if batch:
+            flush_batch()
+
+        # Drop vectors of deleted entities (keep the TS service's init row)
+        stale = [entity_id for entity_id in stored if entity_id not in seen and entity_id != "init"]
+        delete_vectors(table, stale)
+        stats["removed"] = len(stale)
+
+        elapsed = time.perf_counter() - start
+        print(f"✅ Embedding sync complete in {elapsed:.1f}s")
+        print(f"   Embedded: {stats['embedded']}, unchanged: {stats['skipped']}, removed: {stats['removed']}")
+        return stats
     
+    def export_columnar(self, output_path: str = None, fmt: str = "parquet",
+                        compression: str = None, vectors: bool = True,
+                        lancedb_path: str = None) -> Path:
+        """Export entities, relationships and their vectors as typed columnar files.
+
+        fmt="arrow" writes uncompressed Arrow IPC files that kg_columnar.open_export
+        memory-maps without copying; fmt="parquet" writes zstd Parquet for
+        compact interchange with pandas/polars/DuckDB.
+        """
+        try:
+            import kg_columnar
+        except ImportError as e:
+            raise RuntimeError(f"Columnar export requires pyarrow (uv pip install pyarrow): {e}")
+        if fmt not in kg_columnar.FORMAT_SUFFIXES:
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        if not output_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"knowledge_graph_export_{timestamp}"
+
+        export_dir = Path(output_path)
+        export_dir.mkdir(parents=True, exist_ok=False)
+        manifest = {
+            "format": kg_columnar.EXPORT_FORMAT,
+            "version": kg_columnar.EXPORT_FORMAT_VERSION,
+            "timestamp": datetime.now().isoformat(),
+            "source_db": str(self.db_path),
+            "file_format": fmt,
+            "tables": {}
+        }
+
+        start = time.perf_counter()
+        print(f"📦 Exporting knowledge graph to {export_dir} ({fmt})")
+        for table, schema in kg_columnar.TABLE_SCHEMAS.items():
+            path = kg_columnar.export_path(export_dir, table, fmt)
+            pages = ([dict(row) for row in page] for page in self.iter_pages(table))
+            rows = kg_columnar.write_table(pages, path, schema, fmt, compression)
+            manifest["tables"][table] = {"file": path.name, "rows": rows}
+            print(f"   ✅ {table}: {rows} rows")
+
+        if vectors:
+            rows = self.export_vectors(export_dir, fmt, compression, lancedb_path)
+            if rows is not None:
+                path = kg_columnar.export_path(export_dir, "vectors", fmt)
+                manifest["tables"]["vectors"] = {"file": path.name, "rows": rows}
+
+        with open(export_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        print(f"✅ Export complete in {time.perf_counter() - start:.1f}s: {export_dir}")
+        return export_dir
+
+    def export_vectors(self, export_dir: Path, fmt: str,
+                       compression: str = None, lancedb_path: str = None):
+        """Write LanceDB vectors of current entities (None if there is no collection)"""
+        import kg_columnar
+        try:
+            import lancedb
+        except ImportError:
+            print("⚠️  lancedb not installed; skipping vectors")
+            return None
+
+        lancedb_path = Path(lancedb_path) if lancedb_path else DEFAULT_LANCEDB_PATH
+        if not lancedb_path.exists():
+            print(f"⚠️  No LanceDB at {lancedb_path}; skipping vectors")
+            return None
+        db = lancedb.connect(str(lancedb_path))
+        if KNOWLEDGE_GRAPH_COLLECTION not in db.table_names():
+            print(f"⚠️  No {KNOWLEDGE_GRAPH_COLLECTION} collection; skipping vectors")
+            return None
+
+        entity_ids = {row["id"] for row in self.iter_rows("knowledge_entities")}
+        batches = kg_columnar.iter_vector_batches(db.open_table(KNOWLEDGE_GRAPH_COLLECTION), entity_ids)
+        path = kg_columnar.export_path(export_dir, "vectors", fmt)
+        rows = kg_columnar.write_vectors(batches, path, fmt, compression)
+        print(f"   ✅ vectors: {rows} rows")
+        return rows
+
+    def analytics(self, damping: float = 0.85, dry_run: bool = False) -> Dict[str, Any]:
+        """Recompute importance scores from PageRank and degree centrality.
+
+        Replaces the per-relationship score bumps with one globally
+        consistent pass, written in a single transaction.
+        """
+        try:
+            import kg_analytics
+        except ImportError as e:
+            raise RuntimeError(f"Graph analytics requires numpy (uv pip install numpy scipy): {e}")
+        return kg_analytics.run_analytics(self.conn, damping=damping, dry_run=dry_run)
+
+    def dedup(self, threshold: float = 0.8, repository_path: str = None,
+              dry_run: bool = False, lancedb_path: str = None) -> Dict[str, Any]:
+        """Merge near-duplicate entities found by MinHash/LSH.
+
+        Relationships are rewired onto the surviving entity and vectors of
+        the removed entities are dropped from the LanceDB collection.
+        """
+        try:
+            import kg_dedup
+        except ImportError as e:
+            raise RuntimeError(f"Deduplication requires numpy (uv pip install numpy): {e}")
+
+        stats = kg_dedup.deduplicate(self.conn, threshold=threshold,
+                                     repository_path=repository_path, dry_run=dry_run)
+        removed = list(stats.get("mapping", {}))
+        if removed:
+            self.remove_vectors(removed, lancedb_path)
+        return stats
+
+    def remove_vectors(self, entity_ids: List[str], lancedb_path: str = None) -> int:
+        """Delete entity vectors from the knowledge_graph LanceDB collection"""
+        try:
+            import lancedb
+        except ImportError:
+            print("⚠️  lancedb not installed; run 'migrate --direct' to prune stale vectors")
+            return 0
+
+        lancedb_path = Path(lancedb_path) if lancedb_path else DEFAULT_LANCEDB_PATH
+        if not lancedb_path.exists():
+            return 0
+        db = lancedb.connect(str(lancedb_path))
+        if KNOWLEDGE_GRAPH_COLLECTION not in db.table_names():
+            return 0
+        delete_vectors(db.open_table(KNOWLEDGE_GRAPH_COLLECTION), entity_ids)
+        print(f"   Removed {len(entity_ids)} vectors from {KNOWLEDGE_GRAPH_COLLECTION}")
+        return len(entity_ids)
+
     def generate_id(self):
         """Generate UUID-like ID"""
         import uuid
@@ -292,19 +1108,60 @@ class KnowledgeGraphManager:
 
 def main():
     parser = argparse.ArgumentParser(description="ZMCP Knowledge Graph Manager")
-    parser.add_argument("command", choices=["stats", "backup", "flush", "populate", "search", "migrate"],
+    parser.add_argument("command", choices=["stats", "backup", "restore", "import", "flush", "populate", "search", "migrate", "analytics", "dedup", "export"],
                        help="Command to execute")
     parser.add_argument("--query", help="Search query")
     parser.add_argument("--confirm", action="store_true", help="Skip confirmation prompts")
+    parser.add_argument("--db", help="Database path (default: ~/.mcptools/data/claude_mcp_tools.db)")
+    parser.add_argument("--output", help="Output path for backup")
+    parser.add_argument("--input", help="Backup directory, table file or legacy .json file to restore/import")
+    parser.add_argument("--delta", action="store_true",
+                       help="Back up only rows changed since the previous backup")
+    parser.add_argument("--drop-indexes", action="store_true",
+                       help="Drop secondary indexes during restore/import and rebuild them afterwards")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                       help=f"Rows per import transaction (default: {IMPORT_BATCH_SIZE})")
+    parser.add_argument("--direct", action="store_true",
+                       help="migrate: embed entities and write vectors to LanceDB instead of a JSON file")
+    parser.add_argument("--full", action="store_true",
+                       help="migrate --direct: re-embed every entity into a fresh table")
+    parser.add_argument("--embed-url", help="Embedding service URL (default: $ZMCP_EMBEDDING_URL or :8765/embed)")
+    parser.add_argument("--model", help="Embedding model name recorded in the fingerprint (default: $ZMCP_EMBEDDING_MODEL)")
+    parser.add_argument("--lancedb", help=f"LanceDB directory (default: {DEFAULT_LANCEDB_PATH})")
+    parser.add_argument("--base", help="Previous backup for --delta (default: newest next to --output)")
+    parser.add_argument("--rebuild", action="store_true",
+                       help="stats: recount the materialized counters from the base tables")
+    parser.add_argument("--damping", type=float, default=0.85,
+                       help="analytics: PageRank damping factor (default: 0.85)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="analytics/dedup: report results without writing them")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                       help="dedup: estimated Jaccard similarity for a near-duplicate (default: 0.8)")
+    parser.add_argument("--repository", help="dedup: limit to one repositoryPath")
+    parser.add_argument("--compression", choices=sorted(COMPRESSION_SUFFIXES), default="gzip",
+                       help="Backup compression (default: gzip)")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet",
+                       help="export: Parquet (compact) or Arrow IPC (memory-mappable, zero-copy)")
+    parser.add_argument("--no-vectors", action="store_true",
+                       help="export: skip LanceDB vectors")
     
     args = parser.parse_args()
     
-    manager = KnowledgeGraphManager()
+    manager = KnowledgeGraphManager(args.db)
     
     if args.command == "stats":
-        manager.stats()
+        manager.stats(rebuild=args.rebuild)
     elif args.command == "backup":
-        manager.backup()
+        manager.backup(args.output, compression=args.compression,
+                       delta=args.delta, base_path=args.base)
+    elif args.command in ("restore", "import"):
+        if not args.input:
+            print(f"Error: --input required for {args.command}")
+            sys.exit(1)
+        if args.command == "restore":
+            manager.restore(args.input, drop_indexes=args.drop_indexes, batch_size=args.batch_size)
+        else:
+            manager.import_backup(args.input, drop_indexes=args.drop_indexes, batch_size=args.batch_size)
     elif args.command == "flush":
         manager.flush(confirm=args.confirm)
     elif args.command == "populate":
@@ -315,7 +1172,19 @@ def main():
             sys.exit(1)
         manager.search(args.query)
     elif args.command == "migrate":
-        manager.migrate_to_gpu_embeddings()
+        if args.direct:
+            manager.migrate_to_gpu_embeddings(direct=True, embed_url=args.embed_url, model=args.model,
+                                              lancedb_path=args.lancedb, full=args.full)
+        else:
+            manager.migrate_to_gpu_embeddings()
+    elif args.command == "analytics":
+        manager.analytics(damping=args.damping, dry_run=args.dry_run)
+    elif args.command == "export":
+        manager.export_columnar(args.output, fmt=args.format,
+                                vectors=not args.no_vectors, lancedb_path=args.lancedb)
+    elif args.command == "dedup":
+        manager.dedup(threshold=args.threshold, repository_path=args.repository,
+                      dry_run=args.dry_run, lancedb_path=args.lancedb)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+/**
+ * Knowledge entity FTS5 index tests
+ *
+ * Covers MATCH-expression building and the trigger-maintained shadow index
+ * used by KnowledgeEntityRepository.searchByText.
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import Database from 'better-sqlite3';
+import {
+  buildFtsMatchQuery,
+  ensureKnowledgeEntitiesFts,
+} from '../database/knowledgeFts.js';
+
+describe('buildFtsMatchQuery', () => {
+  it('turns words into quoted prefix terms', () => {
+    expect(buildFtsMatchQuery('graph search')).toBe('"graph"* "search"*');
+  });
+
+  it('keeps quoted phrases as phrases', () => {
+    expect(buildFtsMatchQuery('"vector store" lance')).toBe('"vector store" "lance"*');
+  });
+
+  it('neutralises FTS5 operators and punctuation', () => {
+    expect(buildFtsMatchQuery('foo OR bar*')).toBe('"foo"* "OR"* "bar*"*');
+    expect(buildFtsMatchQuery('a"b')).toBe('"ab"*');
+  });
+
+  it('returns null when nothing is searchable', () => {
+    expect(buildFtsMatchQuery('  - ')).toBeNull();
+  });
+
+  it('applies a column filter', () => {
+    expect(buildFtsMatchQuery('graph', ['name', 'description']))
+      .toBe('{name description} : ("graph"*)');
+  });
+});
+
+describe('ensureKnowledgeEntitiesFts', () => {
+  let db: Database.Database;
+
+  const search = (term: string) => db.prepare(`
+    SELECT e.id FROM knowledge_entities_fts f
+    JOIN knowledge_entities e ON e.rowid = f.rowid
+    WHERE knowledge_entities_fts MATCH ?
+    ORDER BY bm25(knowledge_entities_fts, 10.0, 4.0, 1.0)
+  `).all(buildFtsMatchQuery(term)).map((row: any) => row.id);
+
+  beforeEach(() => {
+    db = new Database(':memory:');
+    db.exec(`
+      CREATE TABLE knowledge_entities (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT,
+        properties TEXT
+      )
+    `);
+    db.prepare('INSERT INTO knowledge_entities VALUES (?, ?, ?, ?)')
+      .run('existing', 'Existing entity', 'indexed by the rebuild', null);
+  });
+
+  afterEach(() => {
+    db.close();
+  });
+
+  it('backfills rows that existed before the index', () => {
+    expect(ensureKnowledgeEntitiesFts(db)).toBe(true);
+    expect(search('rebuild')).toEqual(['existing']);
+  });
+
+  it('tracks inserts, updates and deletes through triggers', () => {
+    ensureKnowledgeEntitiesFts(db);
+    const insert = db.prepare('INSERT INTO knowledge_entities VALUES (?, ?, ?, ?)');
+    insert.run('a', 'LanceDB vector store', 'stores embeddings', null);
+    insert.run('b', 'Vector math', 'helpers for LanceDB', null);
+
+    // Name matches outrank description matches
+    expect(search('lance')).toEqual(['a', 'b']);
+
+    db.prepare('UPDATE knowledge_entities SET name = ? WHERE id = ?').run('Renamed', 'a');
+    expect(search('lance')).toEqual(['b']);
+
+    db.prepare('DELETE FROM knowledge_entities WHERE id = ?').run('b');
+    expect(search('lance')).toEqual([]);
+  });
+});
@@ -0,0 +1,69 @@
+/**
+ * Materialized knowledge graph counter tests
+ *
+ * Covers the trigger-maintained knowledge_graph_stats table read by
+ * KnowledgeGraphService.getStats.
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import Database from 'better-sqlite3';
+import {
+  ensureKnowledgeGraphStats,
+  readKnowledgeGraphCounts,
+} from '../database/knowledgeStats.js';
+
+describe('ensureKnowledgeGraphStats', () => {
+  let db: Database.Database;
+
+  const insertEntity = (id: string, repo: string, type: string) =>
+    db.prepare('INSERT INTO knowledge_entities VALUES (?, ?, ?)').run(id, repo, type);
+
+  beforeEach(() => {
+    db = new Database(':memory:');
+    db.exec(`
+      CREATE TABLE knowledge_entities (id TEXT PRIMARY KEY, repositoryPath TEXT NOT NULL, entityType TEXT NOT NULL);
+      CREATE TABLE knowledge_relationships (id TEXT PRIMARY KEY, repositoryPath TEXT NOT NULL, relationshipType TEXT NOT NULL);
+      CREATE TABLE knowledge_insights (id TEXT PRIMARY KEY, repositoryPath TEXT NOT NULL, insightType TEXT NOT NULL);
+    `);
+    insertEntity('existing', '/repo', 'concept');
+  });
+
+  afterEach(() => {
+    db.close();
+  });
+
+  it('backfills rows that existed before the counters', () => {
+    expect(ensureKnowledgeGraphStats(db)).toBe(true);
+    expect(readKnowledgeGraphCounts(db, '/repo').entity).toEqual({ concept: 1 });
+  });
+
+  it('tracks inserts, updates and deletes through triggers', () => {
+    ensureKnowledgeGraphStats(db);
+    insertEntity('a', '/repo', 'concept');
+    insertEntity('b', '/repo', 'file');
+    insertEntity('c', '/other', 'file');
+    db.prepare('INSERT INTO knowledge_relationships VALUES (?, ?, ?)').run('r', '/repo', 'depends_on');
+
+    expect(readKnowledgeGraphCounts(db, '/repo')).toEqual({
+      entity: { concept: 2, file: 1 },
+      relationship: { depends_on: 1 },
+      insight: {},
+    });
+
+    db.prepare('UPDATE knowledge_entities SET entityType = ? WHERE id = ?').run('file', 'a');
+    db.prepare('UPDATE knowledge_entities SET repositoryPath = ? WHERE id = ?').run('/other', 'b');
+    db.prepare('DELETE FROM knowledge_relationships WHERE id = ?').run('r');
+
+    expect(readKnowledgeGraphCounts(db, '/repo')).toEqual({
+      entity: { concept: 1, file: 1 },
+      relationship: {},
+      insight: {},
+    });
+    expect(readKnowledgeGraphCounts(db, '/other').entity).toEqual({ file: 2 });
+  });
+
+  it('reports failure when a counted table is missing', () => {
+    db.exec('DROP TABLE knowledge_insights');
+    expect(ensureKnowledgeGraphStats(db)).toBe(false);
+  });
+});
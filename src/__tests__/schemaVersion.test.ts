@@ -0,0 +1,121 @@
+/**
+ * Schema version fast path tests
+ *
+ * Covers ensureSchemaVersion, which skips a service's DDL once the database
+ * records its SCHEMA_VERSION in PRAGMA user_version.
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import Database from 'better-sqlite3';
+import { mkdtemp, rm } from 'fs/promises';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { ensureSchemaVersion, resetSchemaVersionCache } from '../database/schemaVersion.js';
+
+const userVersion = (db: Database.Database) => db.pragma('user_version', { simple: true });
+
+const tableNames = (db: Database.Database) =>
+  (db.prepare("SELECT name FROM sqlite_master WHERE type = 'table'").all() as { name: string }[])
+    .map(row => row.name);
+
+describe('ensureSchemaVersion', () => {
+  let tempDir: string;
+  let dbPath: string;
+  const open: Database.Database[] = [];
+
+  const connect = (file = dbPath) => {
+    const db = new Database(file);
+    open.push(db);
+    return db;
+  };
+
+  beforeEach(async () => {
+    resetSchemaVersionCache();
+    tempDir = await mkdtemp(join(tmpdir(), 'zmcp-schema-version-test-'));
+    dbPath = join(tempDir, 'test.db');
+  });
+
+  afterEach(async () => {
+    vi.restoreAllMocks();
+    open.splice(0).forEach(db => db.close());
+    await rm(tempDir, { recursive: true, force: true });
+  });
+
+  it('applies the schema once and records the version', () => {
+    const db = connect();
+    const apply = vi.fn(() => db.exec('CREATE TABLE items (id INTEGER PRIMARY KEY)'));
+
+    expect(ensureSchemaVersion(db, 2, apply)).toBe(true);
+    expect(ensureSchemaVersion(db, 2, apply)).toBe(false);
+
+    expect(apply).toHaveBeenCalledTimes(1);
+    expect(userVersion(db)).toBe(2);
+    expect(tableNames(db)).toEqual(['items']);
+  });
+
+  it('skips when the file already records the version', () => {
+    connect().pragma('user_version = 3');
+    const apply = vi.fn();
+
+    expect(ensureSchemaVersion(connect(), 2, apply)).toBe(false);
+    expect(apply).not.toHaveBeenCalled();
+  });
+
+  it('applies again when the version is bumped', () => {
+    const db = connect();
+    ensureSchemaVersion(db, 1, () => db.exec('CREATE TABLE items (id INTEGER PRIMARY KEY)'));
+
+    const apply = vi.fn(() => db.exec('ALTER TABLE items ADD COLUMN name TEXT'));
+    expect(ensureSchemaVersion(db, 2, apply)).toBe(true);
+    expect(apply).toHaveBeenCalledTimes(1);
+    expect(userVersion(db)).toBe(2);
+  });
+
+  it('checks each file once per process', () => {
+    ensureSchemaVersion(connect(), 1, vi.fn());
+
+    const db = connect();
+    const pragma = vi.spyOn(db, 'pragma');
+    expect(ensureSchemaVersion(db, 1, vi.fn())).toBe(false);
+    expect(pragma).not.toHaveBeenCalled();
+  });
+
+  it('re-checks the version once the write lock is held', () => {
+    const db = connect();
+    // Another server commits the schema between our unlocked read and the lock
+    connect().pragma('user_version = 1');
+    vi.spyOn(db, 'pragma').mockReturnValueOnce(0);
+    const apply = vi.fn();
+
+    expect(ensureSchemaVersion(db, 1, apply)).toBe(false);
+    expect(apply).not.toHaveBeenCalled();
+  });
+
+  it('rolls back and does not record the version when the schema fails', () => {
+    const db = connect();
+    const failing = () => {
+      db.exec('CREATE TABLE items (id INTEGER PRIMARY KEY)');
+      throw new Error('migration failed');
+    };
+
+    expect(() => ensureSchemaVersion(db, 1, failing)).toThrow('migration failed');
+    expect(userVersion(db)).toBe(0);
+    expect(tableNames(db)).toEqual([]);
+
+    // The failure was not cached, so the next start retries
+    const apply = vi.fn();
+    expect(ensureSchemaVersion(db, 1, apply)).toBe(true);
+    expect(apply).toHaveBeenCalledTimes(1);
+  });
+
+  it('never shares the verified cache between in-memory databases', () => {
+    const first = connect(':memory:');
+    const second = connect(':memory:');
+    const apply = vi.fn();
+
+    expect(ensureSchemaVersion(first, 1, apply)).toBe(true);
+    expect(ensureSchemaVersion(second, 1, apply)).toBe(true);
+    expect(ensureSchemaVersion(first, 1, apply)).toBe(false);
+    expect(apply).toHaveBeenCalledTimes(2);
+  });
+});
@@ -0,0 +1,113 @@
+/**
+ * FTS5 shadow index over knowledge_entities
+ *
+ * External-content FTS5 table keyed on the entity rowid and kept in sync by
+ * triggers, so text search is an index lookup instead of a LIKE scan.
+ * scripts/knowledge_graph_manager.py creates the same table and triggers;
+ * keep the two definitions identical.
+ */
+
+import type Database from 'better-sqlite3';
+
+export const KNOWLEDGE_ENTITIES_FTS_TABLE = 'knowledge_entities_fts';
+
+export const KNOWLEDGE_ENTITIES_FTS_DDL = `
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_entities_fts USING fts5(
+  name,
+  description,
+  properties,
+  content = 'knowledge_entities',
+  content_rowid = 'rowid',
+  tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS knowledge_entities_fts_insert AFTER INSERT ON knowledge_entities
+BEGIN
+  INSERT INTO knowledge_entities_fts(rowid, name, description, properties)
+  VALUES (NEW.rowid, NEW.name, NEW.description, NEW.properties);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_entities_fts_delete AFTER DELETE ON knowledge_entities
+BEGIN
+  INSERT INTO knowledge_entities_fts(knowledge_entities_fts, rowid, name, description, properties)
+  VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.properties);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_entities_fts_update AFTER UPDATE OF name, description, properties ON knowledge_entities
+BEGIN
+  INSERT INTO knowledge_entities_fts(knowledge_entities_fts, rowid, name, description, properties)
+  VALUES ('delete', OLD.rowid, OLD.name, OLD.description, OLD.properties);
+  INSERT INTO knowledge_entities_fts(rowid, name, description, properties)
+  VALUES (NEW.rowid, NEW.name, NEW.description, NEW.properties);
+END;
+`;
+
+/** bm25() column weights: name, description, properties */
+export const KNOWLEDGE_ENTITIES_FTS_WEIGHTS = [10.0, 4.0, 1.0] as const;
+
+const initializedConnections = new WeakSet<Database.Database>();
+
+/**
+ * Create the FTS index and triggers if missing, backfilling existing rows.
+ * Returns false when the SQLite build lacks FTS5 so callers can fall back.
+ */
+export function ensureKnowledgeEntitiesFts(db: Database.Database): boolean {
+  if (initializedConnections.has(db)) {
+    return true;
+  }
+
+  const exists = db
+    .prepare(`SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?`)
+    .get(KNOWLEDGE_ENTITIES_FTS_TABLE);
+
+  try {
+    db.transaction(() => {
+      db.exec(KNOWLEDGE_ENTITIES_FTS_DDL);
+      if (!exists) {
+        db.exec(`INSERT INTO knowledge_entities_fts(knowledge_entities_fts) VALUES ('rebuild')`);
+      }
+    })();
+  } catch {
+    return false;
+  }
+
+  initializedConnections.add(db);
+  return true;
+}
+
+/**
+ * Turn free text into an FTS5 MATCH expression.
+ *
+ * "quoted phrases" are matched as phrases, every other word as a prefix
+ * term, and all parts must match. Quoting each part keeps FTS5 operators
+ * and punctuation in user input from being interpreted as syntax.
+ */
+export function buildFtsMatchQuery(searchTerm: string, columns?: string[]): string | null {
+  const parts: string[] = [];
+  const tokenPattern = /"([^"]+)"|(\S+)/g;
+  let match: RegExpExecArray | null;
+
+  while ((match = tokenPattern.exec(searchTerm)) !== null) {
+    if (match[1] !== undefined) {
+      const phrase = match[1].trim();
+      if (phrase) {
+        parts.push(`"${phrase.replace(/"/g, '""')}"`);
+      }
+    } else {
+      // Skip tokens with no indexable characters (e.g. a lone "-")
+      const word = match[2].replace(/"/g, '');
+      if (/[\p{L}\p{N}]/u.test(word)) {
+        parts.push(`"${word}"*`);
+      }
+    }
+  }
+
+  if (parts.length === 0) {
+    return null;
+  }
+
+  const expression = parts.join(' ');
+  return columns && columns.length > 0
+    ? `{${columns.join(' ')}} : (${expression})`
+    : expression;
+}
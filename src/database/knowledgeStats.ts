@@ -0,0 +1,118 @@
+/**
+ * Materialized knowledge graph counters
+ *
+ * knowledge_graph_stats holds one row per (repository, kind, type) with the
+ * number of entities, relationships or insights of that type. Triggers keep
+ * it current on every write, so status queries read a handful of counter
+ * rows instead of scanning and grouping the full tables.
+ * scripts/knowledge_graph_manager.py creates the same table and triggers;
+ * keep the two definitions identical.
+ */
+
+import type Database from 'better-sqlite3';
+
+export const KNOWLEDGE_GRAPH_STATS_TABLE = 'knowledge_graph_stats';
+
+export type KnowledgeStatsKind = 'entity' | 'relationship' | 'insight';
+
+/** Counted table and the column holding each row's type */
+const COUNTED_TABLES: Array<{ table: string; kind: KnowledgeStatsKind; typeColumn: string }> = [
+  { table: 'knowledge_entities', kind: 'entity', typeColumn: 'entityType' },
+  { table: 'knowledge_relationships', kind: 'relationship', typeColumn: 'relationshipType' },
+  { table: 'knowledge_insights', kind: 'insight', typeColumn: 'insightType' },
+];
+
+function counterTriggers(table: string, kind: KnowledgeStatsKind, typeColumn: string): string {
+  const increment = (row: 'NEW' | 'OLD') => `
+  INSERT INTO knowledge_graph_stats(repositoryPath, kind, type, count)
+  VALUES (${row}.repositoryPath, '${kind}', ${row}.${typeColumn}, 1)
+  ON CONFLICT(repositoryPath, kind, type) DO UPDATE SET count = count + 1;`;
+  const decrement = (row: 'NEW' | 'OLD') => `
+  UPDATE knowledge_graph_stats SET count = count - 1
+  WHERE repositoryPath = ${row}.repositoryPath AND kind = '${kind}' AND type = ${row}.${typeColumn};`;
+
+  return `
+CREATE TRIGGER IF NOT EXISTS ${table}_stats_insert AFTER INSERT ON ${table}
+BEGIN${increment('NEW')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS ${table}_stats_delete AFTER DELETE ON ${table}
+BEGIN${decrement('OLD')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS ${table}_stats_update AFTER UPDATE OF repositoryPath, ${typeColumn} ON ${table}
+WHEN OLD.repositoryPath IS NOT NEW.repositoryPath OR OLD.${typeColumn} IS NOT NEW.${typeColumn}
+BEGIN${decrement('OLD')}${increment('NEW')}
+END;
+`;
+}
+
+export const KNOWLEDGE_GRAPH_STATS_DDL = `
+CREATE TABLE IF NOT EXISTS knowledge_graph_stats (
+  repositoryPath TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  type TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (repositoryPath, kind, type)
+) WITHOUT ROWID;
+${COUNTED_TABLES.map(({ table, kind, typeColumn }) => counterTriggers(table, kind, typeColumn)).join('')}`;
+
+/** Recount every counter from the base tables */
+export const KNOWLEDGE_GRAPH_STATS_BACKFILL = `
+DELETE FROM knowledge_graph_stats;
+${COUNTED_TABLES.map(({ table, kind, typeColumn }) => `
+INSERT INTO knowledge_graph_stats(repositoryPath, kind, type, count)
+SELECT repositoryPath, '${kind}', ${typeColumn}, COUNT(*) FROM ${table}
+GROUP BY repositoryPath, ${typeColumn};`).join('')}
+`;
+
+const initializedConnections = new WeakSet<Database.Database>();
+
+/**
+ * Create the counter table and triggers if missing, backfilling from the
+ * base tables on first creation. Returns false when they cannot be created
+ * (e.g. a knowledge table does not exist yet) so callers can fall back to
+ * aggregate queries.
+ */
+export function ensureKnowledgeGraphStats(db: Database.Database): boolean {
+  if (initializedConnections.has(db)) {
+    return true;
+  }
+
+  const exists = db
+    .prepare(`SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?`)
+    .get(KNOWLEDGE_GRAPH_STATS_TABLE);
+
+  try {
+    db.transaction(() => {
+      db.exec(KNOWLEDGE_GRAPH_STATS_DDL);
+      if (!exists) {
+        db.exec(KNOWLEDGE_GRAPH_STATS_BACKFILL);
+      }
+    })();
+  } catch {
+    return false;
+  }
+
+  initializedConnections.add(db);
+  return true;
+}
+
+export interface KnowledgeGraphCounts {
+  entity: Record<string, number>;
+  relationship: Record<string, number>;
+  insight: Record<string, number>;
+}
+
+/** Per-type counts for one repository, read from the counter table */
+export function readKnowledgeGraphCounts(db: Database.Database, repositoryPath: string): KnowledgeGraphCounts {
+  const counts: KnowledgeGraphCounts = { entity: {}, relationship: {}, insight: {} };
+  const rows = db
+    .prepare(`SELECT kind, type, count FROM knowledge_graph_stats WHERE repositoryPath = ? AND count > 0`)
+    .all(repositoryPath) as Array<{ kind: KnowledgeStatsKind; type: string; count: number }>;
+
+  for (const row of rows) {
+    counts[row.kind][row.type] = row.count;
+  }
+  return counts;
+}
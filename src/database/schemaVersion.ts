@@ -0,0 +1,59 @@
+/**
+ * Schema version fast path
+ *
+ * Each SQLite file records the schema version its owning service last
+ * applied in PRAGMA user_version (a field in the database header, so reading
+ * it needs no table lookup). On startup a service compares it with its own
+ * SCHEMA_VERSION and only runs its CREATE TABLE / ALTER TABLE / PRAGMA
+ * table_info work when the file is behind. A file is checked at most once
+ * per process.
+ *
+ * Bump a service's SCHEMA_VERSION whenever its DDL changes.
+ */
+
+import type Database from 'better-sqlite3';
+
+const verifiedFiles = new Map<string, number>();
+
+function readUserVersion(db: Database.Database): number {
+  return db.pragma('user_version', { simple: true }) as number;
+}
+
+/**
+ * Run `applySchema` unless the file already records `version` (or newer).
+ * The DDL and the version bump commit together under the write lock, and
+ * the version is re-read once the lock is held, so concurrently starting
+ * servers apply it once. Returns true when the schema was applied.
+ */
+export function ensureSchemaVersion(
+  db: Database.Database,
+  version: number,
+  applySchema: () => void
+): boolean {
+  const key = db.memory ? null : db.name;
+  if (key && (verifiedFiles.get(key) ?? 0) >= version) {
+    return false;
+  }
+
+  let applied = false;
+  if (readUserVersion(db) < version) {
+    db.transaction(() => {
+      if (readUserVersion(db) >= version) {
+        return;
+      }
+      applySchema();
+      db.pragma(`user_version = ${Math.trunc(version)}`);
+      applied = true;
+    }).immediate();
+  }
+
+  if (key) {
+    verifiedFiles.set(key, version);
+  }
+  return applied;
+}
+
+/** Forget which files were verified (tests, or after a file is replaced) */
+export function resetSchemaVersionCache(): void {
+  verifiedFiles.clear();
+}
@@ -7,7 +7,11 @@ Adds PID tracking and activity-based heartbeats.
 import sqlite3
 from pathlib import Path
 import sys
-from datetime import datetime
+
+from migration_runner import MigrationRunner
+
+# Version of this migration in migration_runner.MIGRATIONS
+MIGRATION_VERSION = 2
 
 def get_db_path():
     """Get the path to the ZMCP database."""
@@ -22,41 +26,11 @@ def migrate():
         return False
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
         print("Adding agent lifecycle columns...")
 
-        # Add columns for agent lifecycle management
-        cursor.execute("""
-            ALTER TABLE agent_sessions
-            ADD COLUMN last_activity_at TIMESTAMP
-        """)
-
-        cursor.execute("""
-            ALTER TABLE agent_sessions
-            ADD COLUMN process_pid INTEGER
-        """)
-
-        cursor.execute("""
-            ALTER TABLE agent_sessions
-            ADD COLUMN timeout_seconds INTEGER DEFAULT 1500
-        """)
-
-        # Create index for efficient queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_agent_activity
-            ON agent_sessions(last_activity_at, status)
-        """)
-
-        # Update existing active agents with current timestamp
-        cursor.execute("""
-            UPDATE agent_sessions
-            SET last_activity_at = CURRENT_TIMESTAMP
-            WHERE status = 'active' AND last_activity_at IS NULL
-        """)
-
-        conn.commit()
+        # Column adds are short transactions; the activity backfill is chunked
+        # so running agents are not locked out
+        MigrationRunner(db_path).migrate(only=MIGRATION_VERSION)
 
         print("✅ Successfully added agent lifecycle columns")
         print("   - last_activity_at: Tracks when agent last used a tool")
@@ -65,22 +39,18 @@ def migrate():
         print("   - Added index for efficient activity queries")
 
         # Show current schema
-        cursor.execute("PRAGMA table_info(agent_sessions)")
-        columns = cursor.fetchall()
+        conn = sqlite3.connect(db_path)
+        columns = conn.execute("PRAGMA table_info(agent_sessions)").fetchall()
+        conn.close()
         print("\n📋 Updated agent_sessions schema:")
         for col in columns:
             print(f"   {col[1]} ({col[2]})")
 
-        conn.close()
         return True
 
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e):
-            print("⚠️  Columns already exist - migration skipped")
-            return True
-        else:
-            print(f"❌ Migration failed: {e}")
-            return False
+    except sqlite3.Error as e:
+        print(f"❌ Migration failed: {e}")
+        return False
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         return False
@@ -15,6 +15,11 @@ from pathlib import Path
 import json
 import sys
 
+from migration_runner import MigrationRunner
+
+# Version of this migration in migration_runner.MIGRATIONS
+MIGRATION_VERSION = 1
+
 
 def get_db_path():
     """Get the path to the ZMCP tools database."""
@@ -49,48 +54,24 @@ def migrate_database():
 
         # Check existing columns
         missing_columns, existing_columns = check_columns_exist(cursor)
+        conn.close()
 
         print(f"📊 Current columns: {len(existing_columns)}")
         print(f"🔍 Missing result columns: {missing_columns}")
 
+        # Each column is added in its own short transaction and the
+        # migration is recorded in schema_migrations
+        MigrationRunner(db_path).migrate(only=MIGRATION_VERSION)
+
         if not missing_columns:
             print("✅ All result columns already exist!")
-            conn.close()
             return True
-
-        # Add missing columns
-        column_definitions = {
-            'results': 'JSON',
-            'artifacts': 'JSON',
-            'completion_message': 'TEXT',
-            'error_details': 'JSON'
-        }
-
-        migrations_applied = []
-
-        for column in missing_columns:
-            column_def = column_definitions[column]
-            migration_sql = f"ALTER TABLE agent_sessions ADD COLUMN {column} {column_def}"
-
-            try:
-                print(f"⚡ Adding column: {column} ({column_def})")
-                cursor.execute(migration_sql)
-                migrations_applied.append(column)
-                print(f"✅ Added: {column}")
-
-            except sqlite3.OperationalError as e:
-                if "duplicate column" in str(e).lower():
-                    print(f"ℹ️  Column {column} already exists, skipping")
-                else:
-                    print(f"❌ Failed to add {column}: {e}")
-                    raise
-
-        # Commit all changes
-        conn.commit()
         print(f"💾 Database migration committed successfully")
 
         # Verify the migration
         print("🔍 Verifying migration...")
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
         missing_after, existing_after = check_columns_exist(cursor)
 
         if not missing_after:
@@ -108,7 +89,7 @@ def migrate_database():
 
         conn.close()
 
-        return len(migrations_applied) > 0
+        return not missing_after
 
     except Exception as e:
         print(f"💥 Migration failed: {e}")
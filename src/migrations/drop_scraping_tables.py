@@ -12,44 +12,27 @@ These tables are no longer needed after removing browser automation
 and documentation scraping tools in favor of microsoft/playwright-mcp.
 """
 
-import sqlite3
 import sys
 from pathlib import Path
 
-def run_migration(db_path: str):
-    """Drop scraping tables from the database."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+from migration_runner import MigrationRunner
 
-    tables_to_drop = [
-        'documentation_sources',
-        'scrape_jobs',
-        'websites',
-        'website_pages'
-    ]
+# Version of this migration in migration_runner.MIGRATIONS
+MIGRATION_VERSION = 3
 
+def run_migration(db_path: str):
+    """Drop scraping tables from the database."""
     try:
-        for table in tables_to_drop:
-            # Check if table exists first
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-                (table,)
-            )
-            if cursor.fetchone():
-                print(f"Dropping table: {table}")
-                cursor.execute(f"DROP TABLE {table}")
-            else:
-                print(f"Table {table} does not exist, skipping")
-
-        conn.commit()
+        # Tables are emptied in chunks before each DROP so agents are not
+        # locked out while large tables are freed
+        reports = MigrationRunner(db_path).migrate(only=MIGRATION_VERSION)
+        if reports:
+            print(f"Removed {reports[0]['rows']} rows")
         print("✅ Successfully dropped all scraping tables")
 
     except Exception as e:
-        conn.rollback()
         print(f"❌ Error during migration: {e}", file=sys.stderr)
         raise
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
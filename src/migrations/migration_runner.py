@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Online migration runner for the ZMCP database.
+
+Applied migrations are recorded in a schema_migrations table, so each
+runs once. Schema changes run in their own short transactions. Backfills
+and table drops are chunked: every chunk is one transaction of at most
+chunk_size rows, its position is saved in schema_migration_progress in
+the same commit, and the runner sleeps between chunks so agents can take
+the write lock. An interrupted migration resumes from the last chunk.
+
+Every step is idempotent, so databases migrated by the older one-shot
+scripts are simply recorded as up to date.
+
+Usage:
+    python src/migrations/migration_runner.py status
+    python src/migrations/migration_runner.py dry-run      # timing estimates, changes nothing
+    python src/migrations/migration_runner.py migrate --chunk-size 2000 --pause 0.05
+"""
+
+import argparse
+import math
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+def get_db_path():
+    """Get the path to the ZMCP tools database."""
+    return Path.home() / ".mcptools" / "data" / "claude_mcp_tools.db"
+
+
+BOOKKEEPING_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    duration_ms REAL
+);
+CREATE TABLE IF NOT EXISTS schema_migration_progress (
+    version INTEGER NOT NULL,
+    step INTEGER NOT NULL,
+    last_rowid INTEGER NOT NULL DEFAULT 0,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (version, step)
+);
+"""
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+# ----------------------------------------------------------------------------
+# Steps
+# ----------------------------------------------------------------------------
+
+@dataclass
+class AddColumn:
+    """ALTER TABLE ... ADD COLUMN (metadata-only in SQLite, so one short transaction)"""
+    table: str
+    column: str
+    definition: str
+    chunked = False
+
+    def describe(self) -> str:
+        return f"add column {self.table}.{self.column} {self.definition}"
+
+    def applied(self, conn: sqlite3.Connection) -> bool:
+        return column_exists(conn, self.table, self.column)
+
+    def apply(self, conn: sqlite3.Connection):
+        conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.definition}")
+
+
+@dataclass
+class CreateIndex:
+    """CREATE INDEX IF NOT EXISTS; builds in one transaction, so keep these on modest tables"""
+    name: str
+    table: str
+    columns: str
+    chunked = False
+
+    def describe(self) -> str:
+        return f"create index {self.name} on {self.table}({self.columns})"
+
+    def applied(self, conn: sqlite3.Connection) -> bool:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                            (self.name,)).fetchone() is not None
+
+    def apply(self, conn: sqlite3.Connection):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table}({self.columns})")
+
+
+@dataclass
+class Backfill:
+    """UPDATE table SET assignments WHERE condition, in rowid-ordered chunks"""
+    table: str
+    assignments: str
+    condition: str = "1"
+    chunked = True
+
+    def describe(self) -> str:
+        return f"backfill {self.table} SET {self.assignments} WHERE {self.condition}"
+
+    def remaining(self, conn: sqlite3.Connection, after_rowid: int) -> int:
+        return conn.execute(f"SELECT COUNT(*) FROM {self.table} WHERE rowid > ? AND ({self.condition})",
+                            (after_rowid,)).fetchone()[0]
+
+    def chunk(self, conn: sqlite3.Connection, after_rowid: int, size: int) -> Tuple[int, int]:
+        """Update the next `size` matching rows; returns (rows changed, new cursor)"""
+        upper = conn.execute(f"""
+            SELECT MAX(rowid) FROM (
+                SELECT rowid FROM {self.table} WHERE rowid > ? AND ({self.condition}) ORDER BY rowid LIMIT ?
+            )
+        """, (after_rowid, size)).fetchone()[0]
+        if upper is None:
+            return 0, after_rowid
+        cursor = conn.execute(f"""
+            UPDATE {self.table} SET {self.assignments}
+            WHERE rowid > ? AND rowid <= ? AND ({self.condition})
+        """, (after_rowid, upper))
+        return cursor.rowcount, upper
+
+
+@dataclass
+class DropTable:
+    """Empty a table in chunks, then drop it, so freeing a large table never holds the lock for long"""
+    table: str
+    chunked = True
+
+    def describe(self) -> str:
+        return f"drop table {self.table}"
+
+    def remaining(self, conn: sqlite3.Connection, after_rowid: int) -> int:
+        if not table_exists(conn, self.table):
+            return 0
+        return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def chunk(self, conn: sqlite3.Connection, after_rowid: int, size: int) -> Tuple[int, int]:
+        if not table_exists(conn, self.table):
+            return 0, after_rowid
+        cursor = conn.execute(f"DELETE FROM {self.table} WHERE rowid IN (SELECT rowid FROM {self.table} LIMIT ?)",
+                              (size,))
+        if cursor.rowcount == 0:
+            conn.execute(f"DROP TABLE {self.table}")
+        return cursor.rowcount, after_rowid
+
+
+Step = Union[AddColumn, CreateIndex, Backfill, DropTable]
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    steps: List[Step]
+    description: str = ""
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "add_results_columns", [
+        AddColumn("agent_sessions", "results", "JSON"),
+        AddColumn("agent_sessions", "artifacts", "JSON"),
+        AddColumn("agent_sessions", "completion_message", "TEXT"),
+        AddColumn("agent_sessions", "error_details", "JSON"),
+    ], "Result collection columns on agent_sessions"),
+    Migration(2, "add_agent_lifecycle_columns", [
+        AddColumn("agent_sessions", "last_activity_at", "TIMESTAMP"),
+        AddColumn("agent_sessions", "process_pid", "INTEGER"),
+        AddColumn("agent_sessions", "timeout_seconds", "INTEGER DEFAULT 1500"),
+        CreateIndex("idx_agent_activity", "agent_sessions", "last_activity_at, status"),
+        Backfill("agent_sessions", "last_activity_at = CURRENT_TIMESTAMP",
+                 "status = 'active' AND last_activity_at IS NULL"),
+    ], "PID tracking and activity-based heartbeats"),
+    Migration(3, "drop_scraping_tables", [
+        DropTable("documentation_sources"),
+        DropTable("scrape_jobs"),
+        DropTable("websites"),
+        DropTable("website_pages"),
+    ], "Remove documentation scraping tables"),
+]
+
+
+# ----------------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------------
+
+class MigrationRunner:
+    """Apply MIGRATIONS to one database without long write-lock holds"""
+
+    def __init__(self, db_path: Union[str, Path, None] = None, chunk_size: int = 1000, pause: float = 0.05,
+                 busy_timeout: float = 30.0, migrations: Optional[List[Migration]] = None):
+        self.db_path = Path(db_path) if db_path else get_db_path()
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.busy_timeout = busy_timeout
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+
+    def connect(self) -> sqlite3.Connection:
+        # Autocommit mode: every transaction below is explicit and short
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+
+    def ensure_bookkeeping(self, conn: sqlite3.Connection):
+        conn.executescript(BOOKKEEPING_SQL)
+
+    def applied_versions(self, conn: sqlite3.Connection) -> Dict[int, str]:
+        if not table_exists(conn, "schema_migrations"):
+            return {}
+        return dict(conn.execute("SELECT version, applied_at FROM schema_migrations"))
+
+    def pending(self, conn: sqlite3.Connection, target: Optional[int] = None) -> List[Migration]:
+        applied = self.applied_versions(conn)
+        return [m for m in self.migrations
+                if m.version not in applied and (target is None or m.version <= target)]
+
+    def progress(self, conn: sqlite3.Connection, version: int, step: int) -> Tuple[int, int]:
+        row = conn.execute("SELECT last_rowid, rows_done FROM schema_migration_progress WHERE version = ? AND step = ?",
+                           (version, step)).fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def status(self) -> List[Dict[str, Any]]:
+        conn = self.connect()
+        try:
+            applied = self.applied_versions(conn)
+            has_progress = table_exists(conn, "schema_migration_progress")
+            rows = []
+            for migration in self.migrations:
+                resumed = 0
+                if has_progress and migration.version not in applied:
+                    resumed = conn.execute("SELECT COALESCE(SUM(rows_done), 0) FROM schema_migration_progress "
+                                           "WHERE version = ?", (migration.version,)).fetchone()[0]
+                rows.append({"version": migration.version, "name": migration.name,
+                             "applied_at": applied.get(migration.version), "rows_done": resumed})
+            return rows
+        finally:
+            conn.close()
+
+    def migrate(self, target: Optional[int] = None, only: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Apply pending migrations in order (or just version `only`); returns one report per migration"""
+        conn = self.connect()
+        try:
+            self.ensure_bookkeeping(conn)
+            migrations = [m for m in self.pending(conn, target) if only is None or m.version == only]
+            return [self._apply(conn, migration) for migration in migrations]
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, migration: Migration) -> Dict[str, Any]:
+        started = time.perf_counter()
+        longest_lock = 0.0
+        rows = 0
+        print(f"⚡ Migration {migration.version}: {migration.name}")
+        for index, step in enumerate(migration.steps):
+            if step.chunked:
+                step_rows, step_lock = self._run_chunked(conn, migration.version, index, step)
+                rows += step_rows
+                longest_lock = max(longest_lock, step_lock)
+                print(f"   ✅ {step.describe()} ({step_rows} rows)")
+                continue
+            held = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if step.applied(conn):
+                    print(f"   ℹ️  {step.describe()}: already applied")
+                else:
+                    step.apply(conn)
+                    print(f"   ✅ {step.describe()}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            longest_lock = max(longest_lock, time.perf_counter() - held)
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT INTO schema_migrations (version, name, duration_ms) VALUES (?, ?, ?)",
+                     (migration.version, migration.name, duration_ms))
+        conn.execute("DELETE FROM schema_migration_progress WHERE version = ?", (migration.version,))
+        conn.execute("COMMIT")
+        return {"version": migration.version, "name": migration.name, "rows": rows,
+                "duration_ms": duration_ms, "longest_lock_ms": longest_lock * 1000}
+
+    def _run_chunked(self, conn: sqlite3.Connection, version: int, index: int, step: Step) -> Tuple[int, float]:
+        """Commit one chunk at a time, saving the cursor with it; resumes from a saved cursor"""
+        cursor, done = self.progress(conn, version, index)
+        if done:
+            print(f"   ↪️  resuming {step.describe()} after {done} rows")
+        longest_lock = 0.0
+        while True:
+            held = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed, cursor = step.chunk(conn, cursor, self.chunk_size)
+                done += changed
+                conn.execute("""
+                    INSERT INTO schema_migration_progress (version, step, last_rowid, rows_done, updated_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(version, step) DO UPDATE SET
+                        last_rowid = excluded.last_rowid, rows_done = excluded.rows_done, updated_at = excluded.updated_at
+                """, (version, index, cursor, done))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            longest_lock = max(longest_lock, time.perf_counter() - held)
+            if changed == 0:
+                return done, longest_lock
+            # Let waiting writers in before taking the lock again
+            time.sleep(self.pause)
+
+    def dry_run(self, target: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Time each pending migration's steps without keeping any change.
+
+        Schema steps and one sample chunk per chunked step run inside a
+        transaction that is rolled back; totals are extrapolated from the
+        sample and the rows still to process.
+        """
+        conn = self.connect()
+        estimates = []
+        try:
+            for migration in self.pending(conn, target):
+                steps = []
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for index, step in enumerate(migration.steps):
+                        if step.chunked:
+                            cursor, _ = (self.progress(conn, migration.version, index)
+                                         if table_exists(conn, "schema_migration_progress") else (0, 0))
+                            rows = step.remaining(conn, cursor)
+                            sampled = time.perf_counter()
+                            sample_rows, _ = step.chunk(conn, cursor, self.chunk_size) if rows else (0, cursor)
+                            chunk_seconds = time.perf_counter() - sampled
+                            chunks = math.ceil(rows / self.chunk_size) if rows else 0
+                            per_chunk = chunk_seconds if sample_rows else 0.0
+                            steps.append({"step": step.describe(), "rows": rows, "chunks": chunks,
+                                          "lock_ms": per_chunk * 1000,
+                                          "estimated_s": chunks * per_chunk + max(0, chunks - 1) * self.pause})
+                        else:
+                            timed = time.perf_counter()
+                            needed = not step.applied(conn)
+                            if needed:
+                                step.apply(conn)
+                            elapsed = time.perf_counter() - timed
+                            steps.append({"step": step.describe(), "rows": 0, "chunks": 0, "applied": not needed,
+                                          "lock_ms": elapsed * 1000, "estimated_s": elapsed})
+                finally:
+                    conn.execute("ROLLBACK")
+                estimates.append({
+                    "version": migration.version, "name": migration.name, "steps": steps,
+                    "estimated_s": sum(s["estimated_s"] for s in steps),
+                    "longest_lock_ms": max((s["lock_ms"] for s in steps), default=0.0),
+                })
+            return estimates
+        finally:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online, resumable migrations for the ZMCP database")
+    parser.add_argument("command", nargs="?", choices=["status", "migrate", "dry-run"], default="status")
+    parser.add_argument("--db", default=str(get_db_path()), help="Path to the database")
+    parser.add_argument("--to", type=int, help="Stop after this version")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per backfill/delete transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to yield the write lock between chunks")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found at {args.db}")
+        return 1
+
+    runner = MigrationRunner(args.db, chunk_size=args.chunk_size, pause=args.pause)
+    try:
+        if args.command == "status":
+            print("📋 Migrations:")
+            for row in runner.status():
+                state = f"applied {row['applied_at']}" if row["applied_at"] else "pending"
+                if row["rows_done"]:
+                    state += f" (interrupted after {row['rows_done']} rows)"
+                print(f"   {row['version']:>3}  {row['name']:<32} {state}")
+        elif args.command == "dry-run":
+            estimates = runner.dry_run(args.to)
+            if not estimates:
+                print("✅ Nothing to migrate")
+            for estimate in estimates:
+                print(f"🔍 {estimate['version']}: {estimate['name']} ~{estimate['estimated_s']:.2f}s, "
+                      f"longest lock {estimate['longest_lock_ms']:.1f}ms")
+                for step in estimate["steps"]:
+                    detail = f"{step['rows']} rows in {step['chunks']} chunks" if step["chunks"] else \
+                        ("already applied" if step.get("applied") else f"{step['lock_ms']:.1f}ms")
+                    print(f"   - {step['step']}: {detail}")
+        else:
+            reports = runner.migrate(args.to)
+            if not reports:
+                print("✅ Database is up to date")
+            for report in reports:
+                print(f"💾 {report['version']}: {report['name']} in {report['duration_ms']:.0f}ms, "
+                      f"{report['rows']} rows, longest lock {report['longest_lock_ms']:.1f}ms")
+    except sqlite3.Error as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
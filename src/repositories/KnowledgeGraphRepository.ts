@@ -1,6 +1,11 @@
 import { eq, and, or, like, gte, lte, desc, asc, sql, inArray } from 'drizzle-orm';
 import { BaseRepository, createRepositoryConfig, RepositoryError } from './index.js';
 import { DatabaseManager } from '../database/index.js';
+import {
+  buildFtsMatchQuery,
+  ensureKnowledgeEntitiesFts,
+  KNOWLEDGE_ENTITIES_FTS_WEIGHTS,
+} from '../database/knowledgeFts.js';
 import {
   knowledgeEntities,
   knowledgeRelationships,
@@ -138,11 +143,61 @@ export class KnowledgeEntityRepository extends BaseRepository<
 
   /**
    * Search entities by name or description
+   *
+   * Uses the knowledge_entities_fts index (ranked prefix/phrase matching);
+   * falls back to a LIKE scan when the SQLite build has no FTS5.
    */
   async searchByText(
     repositoryPath: string,
     searchTerm: string,
-    entityType?: EntityType
+    entityType?: EntityType,
+    limit: number = 100
+  ): Promise<KnowledgeEntity[]> {
+    const db = this.drizzleManager.database;
+    const matchQuery = buildFtsMatchQuery(searchTerm, ['name', 'description']);
+
+    if (!matchQuery || !ensureKnowledgeEntitiesFts(db)) {
+      return this.searchByTextScan(repositoryPath, searchTerm, entityType, limit);
+    }
+
+    const [nameWeight, descriptionWeight, propertiesWeight] = KNOWLEDGE_ENTITIES_FTS_WEIGHTS;
+    const params: unknown[] = [matchQuery, repositoryPath];
+    let typeFilter = '';
+    if (entityType) {
+      typeFilter = 'AND e.entityType = ?';
+      params.push(entityType);
+    }
+    params.push(limit);
+
+    const ranked = db.prepare(`
+      SELECT e.id AS id
+      FROM knowledge_entities_fts f
+      JOIN knowledge_entities e ON e.rowid = f.rowid
+      WHERE knowledge_entities_fts MATCH ?
+        AND e.repositoryPath = ?
+        ${typeFilter}
+      ORDER BY bm25(knowledge_entities_fts, ${nameWeight}, ${descriptionWeight}, ${propertiesWeight}),
+               e.relevanceScore DESC
+      LIMIT ?
+    `).all(...params) as Array<{ id: string }>;
+
+    if (ranked.length === 0) {
+      return [];
+    }
+
+    // Load through drizzle so JSON/boolean columns are mapped as usual
+    const rank = new Map(ranked.map((row, index) => [row.id, index]));
+    const entities = await this.query()
+      .where(inArray(knowledgeEntities.id, ranked.map(row => row.id)))
+      .execute();
+    return entities.sort((a, b) => rank.get(a.id)! - rank.get(b.id)!);
+  }
+
+  private async searchByTextScan(
+    repositoryPath: string,
+    searchTerm: string,
+    entityType: EntityType | undefined,
+    limit: number
   ): Promise<KnowledgeEntity[]> {
     const conditions = [
       eq(knowledgeEntities.repositoryPath, repositoryPath),
@@ -160,6 +215,7 @@ export class KnowledgeEntityRepository extends BaseRepository<
     return this.query()
       .where(whereClause)
       .orderBy(knowledgeEntities.relevanceScore, 'desc')
+      .limit(limit)
       .execute();
   }
 
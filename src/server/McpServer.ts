@@ -67,6 +67,7 @@ import { Logger } from "../utils/logger.js";
 import type { McpTool, McpProgressContext } from "../schemas/tools/index.js";
 import { AgentCapabilityManager } from '../security/AgentCapabilities.js';
 import { debugIndexSubsetTool } from '../tools/DebugIndexSubsetTool.js';
+import { debugMemoryStatsTool } from '../tools/DebugMemoryStatsTool.js';
 
 // REMOVED unused imports (deprecated/undocumented tools):
 // - WebScrapingMcpTools, AnalysisMcpTools, TreeSummaryTools (deprecated)
@@ -676,6 +677,7 @@ export class McpToolsServer {
       // - search_knowledge_graph_unified: Search files using BM25/semantic/hybrid methods
       ...unifiedSearchTools,
       debugIndexSubsetTool,
+      debugMemoryStatsTool,
     ];
 
     // Conditionally add shared state tools (NOT in compat modes)
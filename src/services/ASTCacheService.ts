@@ -13,9 +13,13 @@ import Database from 'better-sqlite3';
 import { sql } from 'drizzle-orm';
 import { Logger } from '../utils/logger.js';
 import { StoragePathResolver } from './StoragePathResolver.js';
+import { ensureSchemaVersion } from '../database/schemaVersion.js';
 
 const logger = new Logger('ast-cache');
 
+/** Bump when the ast_cache.db DDL below changes */
+const SCHEMA_VERSION = 1;
+
 export interface CachedASTData {
   filePath: string;
   fileHash: string;
@@ -144,8 +148,10 @@ export class ASTCacheService {
       );
     `;
 
-    this.db.exec(schema);
-    logger.info('AST cache schema initialized');
+    const db = this.db;
+    if (ensureSchemaVersion(db, SCHEMA_VERSION, () => db.exec(schema))) {
+      logger.info('AST cache schema initialized', { version: SCHEMA_VERSION });
+    }
   }
 
   /**
@@ -17,6 +17,10 @@ import { StoragePathResolver } from './StoragePathResolver.js';
 import { SymbolIndexRepository } from '../repositories/SymbolIndexRepository.js';
 import type { FileSymbolMetadata } from '../repositories/SymbolIndexRepository.js';
 import { DatabaseManager } from '../database/index.js';
+import { ensureSchemaVersion } from '../database/schemaVersion.js';
+
+/** Bump when the bm25_index.db DDL in initializeDatabase changes */
+const BM25_SCHEMA_VERSION = 1;
 
 export interface BM25Document {
   id: string;
@@ -100,32 +104,35 @@ export class BM25Service {
       this.db.pragma('journal_mode = WAL');
       this.db.pragma('synchronous = NORMAL');
 
-      // Create FTS5 virtual table for full-text search
-      this.db.exec(`
-        CREATE VIRTUAL TABLE IF NOT EXISTS bm25_documents USING fts5(
-          id UNINDEXED,
-          text,
-          metadata UNINDEXED,
-          created_at UNINDEXED,
-          tokenize = 'porter unicode61 remove_diacritics 1'
-        )
-      `);
-
-      // Create metadata table for additional document info
-      this.db.exec(`
-        CREATE TABLE IF NOT EXISTS document_metadata (
-          id TEXT PRIMARY KEY,
-          metadata TEXT,
-          doc_length INTEGER,
-          created_at REAL,
-          updated_at REAL
-        )
-      `);
-
-      // Create index on created_at for efficient time-based queries
-      this.db.exec(`
-        CREATE INDEX IF NOT EXISTS idx_created_at ON document_metadata(created_at)
-      `);
+      const db = this.db;
+      ensureSchemaVersion(db, BM25_SCHEMA_VERSION, () => {
+        // Create FTS5 virtual table for full-text search
+        db.exec(`
+          CREATE VIRTUAL TABLE IF NOT EXISTS bm25_documents USING fts5(
+            id UNINDEXED,
+            text,
+            metadata UNINDEXED,
+            created_at UNINDEXED,
+            tokenize = 'porter unicode61 remove_diacritics 1'
+          )
+        `);
+
+        // Create metadata table for additional document info
+        db.exec(`
+          CREATE TABLE IF NOT EXISTS document_metadata (
+            id TEXT PRIMARY KEY,
+            metadata TEXT,
+            doc_length INTEGER,
+            created_at REAL,
+            updated_at REAL
+          )
+        `);
+
+        // Create index on created_at for efficient time-based queries
+        db.exec(`
+          CREATE INDEX IF NOT EXISTS idx_created_at ON document_metadata(created_at)
+        `);
+      });
 
       // Log database stats to verify we're using the right database
       const docCount = this.db.prepare('SELECT COUNT(*) as count FROM bm25_documents').get() as { count: number };
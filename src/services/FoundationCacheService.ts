@@ -6,6 +6,10 @@ import { mkdirSync, existsSync, statSync } from 'fs';
 import { readFile, access, stat, readdir } from 'fs/promises';
 import Database from 'better-sqlite3';
 import { StoragePathResolver } from './StoragePathResolver.js';
+import { ensureSchemaVersion } from '../database/schemaVersion.js';
+
+/** Bump when createTables or migrateFoundationSessionsTable changes */
+const FOUNDATION_CACHE_SCHEMA_VERSION = 1;
 
 export interface CacheEntry {
   id: string;
@@ -115,7 +119,7 @@ export class FoundationCacheService {
     this.db.pragma('temp_store = MEMORY');
     this.db.pragma('foreign_keys = ON');
 
-    this.createTables();
+    ensureSchemaVersion(this.db, FOUNDATION_CACHE_SCHEMA_VERSION, () => this.createTables());
   }
 
   private createTables(): void {
@@ -8,6 +8,8 @@ import { Logger } from '../utils/logger.js';
 import { VectorSearchService } from './VectorSearchService.js';
 import { DatabaseManager } from '../database/index.js';
 import { randomUUID } from 'crypto';
+import { spawn } from 'child_process';
+import * as path from 'path';
 import {
   type KnowledgeEntity,
   type NewKnowledgeEntity,
@@ -34,6 +36,11 @@ import {
   insertKnowledgeInsightSchema
 } from '../schemas/knowledge-graph.js';
 import { eq, and, or, gte, lte, like, desc, asc, sql, count } from 'drizzle-orm';
+import {
+  ensureKnowledgeGraphStats,
+  readKnowledgeGraphCounts,
+  type KnowledgeGraphCounts
+} from '../database/knowledgeStats.js';
 
 export interface KnowledgeGraphConfig {
   embeddingModel?: string;
@@ -41,6 +48,37 @@ export interface KnowledgeGraphConfig {
   insightDetectionInterval?: number;
   autoDetectInsights?: boolean;
   maxRelationshipDistance?: number;
+  /**
+   * Bump endpoint importance scores on every createRelationship. Off by
+   * default: scores are recomputed in one pass by
+   * `scripts/knowledge_graph_manager.py analytics` (PageRank + degree).
+   */
+  incrementalImportance?: boolean;
+  /** Periodically merge near-duplicate entities (MinHash/LSH) */
+  autoDeduplicate?: boolean;
+  deduplicationInterval?: number;
+  /** Estimated Jaccard similarity at which two entities are merged */
+  deduplicationThreshold?: number;
+}
+
+export interface DeduplicationResult {
+  clusters: number;
+  entitiesRemoved: number;
+  relationshipsRewired: number;
+  relationshipsRemoved: number;
+  insightsUpdated: number;
+  durationMs: number;
+}
+
+/** Output of `scripts/kg_dedup.py dedup` */
+interface DedupMergeStats {
+  clusters: number;
+  entities_removed: number;
+  relationships_rewired: number;
+  relationships_removed: number;
+  insights_updated: number;
+  /** Removed entity id -> canonical entity id */
+  mapping: Record<string, string>;
 }
 
 export interface EntityWithRelationships extends KnowledgeEntity {
@@ -85,6 +123,10 @@ export class KnowledgeGraphService {
       insightDetectionInterval: 300000, // 5 minutes
       autoDetectInsights: true,
       maxRelationshipDistance: 3,
+      incrementalImportance: false,
+      autoDeduplicate: false,
+      deduplicationInterval: 3600000, // 1 hour
+      deduplicationThreshold: 0.8,
       ...config
     };
 
@@ -101,6 +143,10 @@ export class KnowledgeGraphService {
         this.startInsightDetection();
       }
 
+      if (this.config.autoDeduplicate) {
+        this.startDeduplication();
+      }
+
       this.logger.info('Knowledge Graph Service initialized', {
         collection: this.KNOWLEDGE_GRAPH_COLLECTION,
         autoDetectInsights: this.config.autoDetectInsights
@@ -200,8 +246,11 @@ export class KnowledgeGraphService {
 
       const relationship = result[0] as KnowledgeRelationship;
 
-      // Update entity importance scores based on new relationship
-      await this.updateEntityImportanceScores(relationship);
+      // Importance normally comes from the offline analytics pass; the
+      // per-insert bump costs two extra writes per relationship
+      if (this.config.incrementalImportance) {
+        await this.updateEntityImportanceScores(relationship);
+      }
 
       // Trigger insight detection
       if (this.config.autoDetectInsights) {
@@ -834,6 +883,93 @@ export class KnowledgeGraphService {
     // This would analyze the entire knowledge graph for patterns
   }
 
+  private startDeduplication(): void {
+    setInterval(async () => {
+      try {
+        await this.deduplicateEntities();
+      } catch (error) {
+        this.logger.error('Failed during periodic entity deduplication', error);
+      }
+    }, this.config.deduplicationInterval);
+  }
+
+  /**
+   * Merge near-duplicate entities found by MinHash/LSH over name and
+   * description. Only entities with the same repository and type are
+   * compared. Each cluster collapses into its most important entity:
+   * relationships are rewired onto it, edges that become self-loops are
+   * dropped, parallel edges are collapsed and insight references updated,
+   * all in one transaction. Vectors of removed entities are then deleted.
+   *
+   * Detection and merge both run in scripts/kg_dedup.py (the same code as
+   * the `knowledge_graph_manager.py dedup` CLI), as a subprocess, so the
+   * entity scan stays out of the server process.
+   */
+  async deduplicateEntities(repositoryPath?: string, threshold?: number): Promise<DeduplicationResult> {
+    const started = Date.now();
+
+    const merged = await this.runDedup(
+      this.db.database.name,
+      threshold ?? this.config.deduplicationThreshold,
+      repositoryPath
+    );
+    const result: DeduplicationResult = {
+      clusters: merged.clusters,
+      entitiesRemoved: merged.entities_removed,
+      relationshipsRewired: merged.relationships_rewired,
+      relationshipsRemoved: merged.relationships_removed,
+      insightsUpdated: merged.insights_updated,
+      durationMs: 0
+    };
+
+    const removedIds = Object.keys(merged.mapping);
+    if (removedIds.length > 0) {
+      const removal = await this.vectorService.removeDocuments(this.KNOWLEDGE_GRAPH_COLLECTION, removedIds);
+      if (!removal.success) {
+        this.logger.warn('Failed to remove vectors of merged entities', { error: removal.error });
+      }
+    }
+
+    result.durationMs = Date.now() - started;
+    this.logger.info('Entity deduplication complete', { repositoryPath, ...result });
+    return result;
+  }
+
+  /**
+   * Run `scripts/kg_dedup.py dedup` on the database and return its stats
+   */
+  private runDedup(dbPath: string, threshold: number, repositoryPath?: string): Promise<DedupMergeStats> {
+    const __dirname = path.dirname(new URL(import.meta.url).pathname);
+    const script = path.join(__dirname, '../../scripts/kg_dedup.py');
+    const args = ['run', 'python', script, 'dedup', '--db', dbPath, '--threshold', String(threshold)];
+    if (repositoryPath) {
+      args.push('--repository', repositoryPath);
+    }
+
+    return new Promise((resolve, reject) => {
+      const child = spawn('uv', args, {
+        cwd: path.resolve(__dirname, '../..')
+      });
+
+      let stdout = '';
+      let stderr = '';
+      child.stdout.on('data', data => { stdout += data.toString(); });
+      child.stderr.on('data', data => { stderr += data.toString(); });
+      child.on('error', error => reject(new Error(`Failed to spawn entity deduplication: ${error.message}`)));
+      child.on('close', code => {
+        if (code !== 0) {
+          reject(new Error(`Entity deduplication exited with code ${code}: ${stderr.trim()}`));
+          return;
+        }
+        try {
+          resolve(JSON.parse(stdout) as DedupMergeStats);
+        } catch (error) {
+          reject(new Error(`Unreadable entity deduplication output: ${(error as Error).message}`));
+        }
+      });
+    });
+  }
+
   /**
    * Get knowledge graph statistics
    */
@@ -863,98 +999,85 @@ export class KnowledgeGraphService {
   }
 
   private async getStatsInternal(repositoryPath: string): Promise<KnowledgeGraphStats> {
-    // Use SQL aggregation instead of loading all rows into memory
-    // Execute all queries in parallel for better performance
-
-    const [
-      [entityCount],
-      [relationshipCount],
-      [insightCount],
-      entitiesByTypeRows,
-      relationshipsByTypeRows,
-      topEntitiesByImportance,
-      recentInsights
-    ] = await Promise.all([
-      // Count total entities
+    // Top entities and recent insights are index range scans; type counts
+    // come from the trigger-maintained knowledge_graph_stats table
+    const [counts, topEntitiesByImportance, recentInsights] = await Promise.all([
+      this.getTypeCounts(repositoryPath),
+
+      // Get top 10 entities by importance using SQL ORDER BY and LIMIT
       this.db.drizzle
-        .select({ count: count() })
+        .select()
         .from(knowledgeEntities)
         .where(eq(knowledgeEntities.repositoryPath, repositoryPath))
-        .execute(),
-
-      // Count total relationships
-      this.db.drizzle
-        .select({ count: count() })
-        .from(knowledgeRelationships)
-        .where(eq(knowledgeRelationships.repositoryPath, repositoryPath))
-        .execute(),
+        .orderBy(desc(knowledgeEntities.importanceScore))
+        .limit(10)
+        .execute() as Promise<KnowledgeEntity[]>,
 
-      // Count total insights
+      // Get 10 most recent insights using SQL ORDER BY and LIMIT
       this.db.drizzle
-        .select({ count: count() })
+        .select()
         .from(knowledgeInsights)
         .where(eq(knowledgeInsights.repositoryPath, repositoryPath))
-        .execute(),
+        .orderBy(desc(knowledgeInsights.createdAt))
+        .limit(10)
+        .execute() as Promise<KnowledgeInsight[]>
+    ]);
+
+    const sum = (byType: Record<string, number>) =>
+      Object.values(byType).reduce((total, value) => total + value, 0);
+
+    return {
+      totalEntities: sum(counts.entity),
+      totalRelationships: sum(counts.relationship),
+      totalInsights: sum(counts.insight),
+      entitiesByType: counts.entity as Record<EntityType, number>,
+      relationshipsByType: counts.relationship as Record<RelationshipType, number>,
+      topEntitiesByImportance,
+      recentInsights
+    };
+  }
+
+  /**
+   * Per-type entity, relationship and insight counts for a repository.
+   * Reads the materialized counters, falling back to GROUP BY aggregation
+   * when the counter table cannot be created.
+   */
+  private async getTypeCounts(repositoryPath: string): Promise<KnowledgeGraphCounts> {
+    const database = this.db.database;
+    if (ensureKnowledgeGraphStats(database)) {
+      return readKnowledgeGraphCounts(database, repositoryPath);
+    }
 
-      // Group entities by type using SQL
+    const [entityRows, relationshipRows, insightRows] = await Promise.all([
       this.db.drizzle
-        .select({
-          entityType: knowledgeEntities.entityType,
-          count: count()
-        })
+        .select({ type: knowledgeEntities.entityType, count: count() })
         .from(knowledgeEntities)
         .where(eq(knowledgeEntities.repositoryPath, repositoryPath))
         .groupBy(knowledgeEntities.entityType)
         .execute(),
 
-      // Group relationships by type using SQL
       this.db.drizzle
-        .select({
-          relationshipType: knowledgeRelationships.relationshipType,
-          count: count()
-        })
+        .select({ type: knowledgeRelationships.relationshipType, count: count() })
         .from(knowledgeRelationships)
         .where(eq(knowledgeRelationships.repositoryPath, repositoryPath))
         .groupBy(knowledgeRelationships.relationshipType)
         .execute(),
 
-      // Get top 10 entities by importance using SQL ORDER BY and LIMIT
       this.db.drizzle
-        .select()
-        .from(knowledgeEntities)
-        .where(eq(knowledgeEntities.repositoryPath, repositoryPath))
-        .orderBy(desc(knowledgeEntities.importanceScore))
-        .limit(10)
-        .execute() as Promise<KnowledgeEntity[]>,
-
-      // Get 10 most recent insights using SQL ORDER BY and LIMIT
-      this.db.drizzle
-        .select()
+        .select({ type: knowledgeInsights.insightType, count: count() })
         .from(knowledgeInsights)
         .where(eq(knowledgeInsights.repositoryPath, repositoryPath))
-        .orderBy(desc(knowledgeInsights.createdAt))
-        .limit(10)
-        .execute() as Promise<KnowledgeInsight[]>
+        .groupBy(knowledgeInsights.insightType)
+        .execute()
     ]);
 
-    const entitiesByType = {} as Record<EntityType, number>;
-    entitiesByTypeRows.forEach(row => {
-      entitiesByType[row.entityType as EntityType] = row.count;
-    });
-
-    const relationshipsByType = {} as Record<RelationshipType, number>;
-    relationshipsByTypeRows.forEach(row => {
-      relationshipsByType[row.relationshipType as RelationshipType] = row.count;
-    });
+    const toRecord = (rows: Array<{ type: string; count: number }>) =>
+      Object.fromEntries(rows.map(row => [row.type, row.count]));
 
     return {
-      totalEntities: entityCount.count,
-      totalRelationships: relationshipCount.count,
-      totalInsights: insightCount.count,
-      entitiesByType,
-      relationshipsByType,
-      topEntitiesByImportance,
-      recentInsights
+      entity: toRecord(entityRows),
+      relationship: toRecord(relationshipRows),
+      insight: toRecord(insightRows)
     };
   }
 
@@ -42,6 +42,12 @@ export interface VectorSearchResult {
   distance: number;
 }
 
+/** Per-stage durations of one similarity search, filled in by searchSimilar */
+export interface VectorSearchTimings {
+  embedding_ms?: number;
+  vector_search_ms?: number;
+}
+
 export interface Collection {
   name: string;
   count: number;
@@ -380,7 +386,7 @@ export class LanceDBService {
   async addDocuments(
     collectionName: string,
     documents: VectorDocument[]
-  ): Promise<{ success: boolean; addedCount: number; error?: string }> {
+  ): Promise<{ success: boolean; addedCount: number; error?: string; embeddingMs?: number; writeMs?: number }> {
     try {
       // Ensure collection exists
       const createResult = await this.createCollection(collectionName);
@@ -393,7 +399,9 @@ export class LanceDBService {
       // Generate embeddings for all documents
       const contents = documents.map(doc => doc.content);
       this.logger.info(`🔍 LanceDBService: Generating ${contents.length} embeddings using ${this.usingTalentOS ? 'TalentOS GPU' : 'HuggingFace'}...`);
+      const embeddingStart = Date.now();
       const embeddings = await this.embeddingFunction.embed(contents);
+      const embeddingMs = Date.now() - embeddingStart;
       this.logger.info(`✅ LanceDBService: Generated ${embeddings.length} embeddings (dimension: ${embeddings[0]?.length || 0})`);
       this.logger.info(`   First embedding sample: [${embeddings[0].slice(0, 5).map(v => v.toFixed(4)).join(', ')}]`);
 
@@ -411,12 +419,16 @@ export class LanceDBService {
       }));
 
       // Add to table
+      const writeStart = Date.now();
       await table.add(lanceData);
+      const writeMs = Date.now() - writeStart;
       
       this.logger.info(`Added ${documents.length} documents to collection ${collectionName}`);
       return {
         success: true,
-        addedCount: documents.length
+        addedCount: documents.length,
+        embeddingMs,
+        writeMs
       };
 
     } catch (error) {
@@ -834,7 +846,8 @@ export class LanceDBService {
     query: string,
     limit: number = 10,
     threshold: number = 0.7,
-    metadataFilter?: Record<string, any>
+    metadataFilter?: Record<string, any>,
+    timings?: VectorSearchTimings
   ): Promise<VectorSearchResult[]> {
     try {
       // Ensure collection exists
@@ -847,8 +860,12 @@ export class LanceDBService {
 
       // Generate embedding for query
       this.logger.info(`🔍 Generating query embedding for: "${query.substring(0, 50)}..."`);
+      const embeddingStart = Date.now();
       const queryEmbedding = await this.embeddingFunction.embed([query]);
       const queryVector = queryEmbedding[0];
+      if (timings) {
+        timings.embedding_ms = Date.now() - embeddingStart;
+      }
       this.logger.info(`✅ Query embedding generated (dimension: ${queryVector.length})`);
       this.logger.info(`   Sample: [${queryVector.slice(0, 5).map(v => v.toFixed(4)).join(', ')}]`);
 
@@ -876,7 +893,11 @@ export class LanceDBService {
       }
 
       // Perform vector similarity search
+      const vectorSearchStart = Date.now();
       const results = await searchQuery.toArray();
+      if (timings) {
+        timings.vector_search_ms = Date.now() - vectorSearchStart;
+      }
 
       // Convert to standard format and apply threshold
       const searchResults: VectorSearchResult[] = results
@@ -24,12 +24,13 @@ import { glob } from 'glob';
 import { TreeSitterASTTool } from '../tools/TreeSitterASTTool.js';
 import { BM25Service } from './BM25Service.js';
 import { EmbeddingClient } from './EmbeddingClient.js';
-import { LanceDBService } from './LanceDBService.js';
+import { LanceDBService, type VectorSearchTimings } from './LanceDBService.js';
 import { Logger } from '../utils/logger.js';
 import { StoragePathResolver } from './StoragePathResolver.js';
 import { getPartitionClassifier, type PartitionInfo } from './PartitionClassifier.js';
 import { SemanticChunker } from './SemanticChunker.js';
 import { DatabaseManager } from '../database/index.js';
+import { ensureSchemaVersion } from '../database/schemaVersion.js';
 import {
   SymbolIndexRepository,
   SymbolsRepository,
@@ -43,6 +44,9 @@ import { fileHashes } from '../schemas/analysis.js';
 
 const logger = new Logger('symbol-graph-indexer');
 
+/** Bump when migrateSchemaIfNeeded gains a step (stored in the main database's user_version) */
+const SCHEMA_VERSION = 1;
+
 // ============================================================================
 // Types
 // ============================================================================
@@ -103,6 +107,20 @@ export interface IndexStats {
   languages?: Record<string, number>;
   totalSymbols?: number;     // Total symbols extracted (for IndexSymbolGraphTool reporting)
   filesWithEmbeddings?: number;  // Files with embeddings generated
+  stageTimings?: IndexStageTimings;
+  chunksEmbedded?: number;        // Chunks sent to the embedder this run
+  embeddingBatchSizes?: number[]; // Chunks per embedding request, in order
+}
+
+/** Wall time per indexing stage (ms), summed over all files and batches */
+export interface IndexStageTimings {
+  discovery_ms: number;
+  ast_ms: number;
+  storage_ms: number;
+  bm25_ms: number;
+  chunking_ms: number;
+  embedding_ms: number;
+  lancedb_write_ms: number;
 }
 
 export interface SearchResult {
@@ -252,38 +270,37 @@ export class SymbolGraphIndexer {
 
   /**
    * Migrate schema from old format (start_line/end_line) to new format (location/parent_symbol)
+   *
+   * Runs inside ensureSchemaVersion's transaction: errors propagate so the
+   * version is not recorded and the migration is retried on the next start.
    */
-  private async migrateSchemaIfNeeded(): Promise<void> {
+  private migrateSchemaIfNeeded(): void {
     if (!this.db) {
       throw new Error('Database not initialized');
     }
 
-    try {
-      // Check if symbols table exists and has old schema
-      const tableInfo = this.db.prepare(`PRAGMA table_info(symbols)`).all() as any[];
+    // Check if symbols table exists and has old schema
+    const tableInfo = this.db.prepare(`PRAGMA table_info(symbols)`).all() as any[];
 
-      if (tableInfo.length === 0) {
-        // Table doesn't exist yet, no migration needed
-        return;
-      }
+    if (tableInfo.length === 0) {
+      // Table doesn't exist yet, no migration needed
+      return;
+    }
 
-      const hasOldSchema = tableInfo.some(col => col.name === 'start_line' || col.name === 'end_line');
-      const hasNewSchema = tableInfo.some(col => col.name === 'location');
+    const hasOldSchema = tableInfo.some(col => col.name === 'start_line' || col.name === 'end_line');
+    const hasNewSchema = tableInfo.some(col => col.name === 'location');
 
-      if (hasOldSchema && !hasNewSchema) {
-        logger.info('Migrating SymbolGraphIndexer schema to hierarchical format...');
+    if (hasOldSchema && !hasNewSchema) {
+      logger.info('Migrating SymbolGraphIndexer schema to hierarchical format...');
 
-        // Backup old symbols data
-        const oldSymbols = this.db.prepare('SELECT * FROM symbols').all();
+      // Backup old symbols data
+      const oldSymbols = this.db.prepare('SELECT * FROM symbols').all();
 
-        // Drop old table
-        this.db.exec('DROP TABLE IF EXISTS symbols');
+      // Drop old table
+      this.db.exec('DROP TABLE IF EXISTS symbols');
 
-        // New schema will be created by initializeSchema
-        logger.info(`Schema migration complete. Cleared ${oldSymbols.length} symbols for re-indexing.`);
-      }
-    } catch (error: any) {
-      logger.warn('Schema migration check failed', { error: error.message });
+      // New schema will be created by initializeSchema
+      logger.info(`Schema migration complete. Cleared ${oldSymbols.length} symbols for re-indexing.`);
     }
   }
 
@@ -296,8 +313,8 @@ export class SymbolGraphIndexer {
       throw new Error('Database not initialized');
     }
 
-    // Check if we need to migrate from old schema
-    await this.migrateSchemaIfNeeded();
+    // Check if we need to migrate from old schema (skipped once the database records SCHEMA_VERSION)
+    ensureSchemaVersion(this.db, SCHEMA_VERSION, () => this.migrateSchemaIfNeeded());
 
     // The schema is now managed by Drizzle in `src/schemas`.
     // The `pnpm db:push` command handles schema creation and migration.
@@ -484,6 +501,8 @@ export class SymbolGraphIndexer {
         // codeContent remains empty (no BM25 indexing for docs)
       } else {
         // Code file: Full AST extraction
+        const astStart = Date.now();
+
         // Parse symbols
         const parseResult = await this.astTool.executeByToolName('ast_extract_symbols', {
           file_path: filePath,
@@ -520,6 +539,10 @@ export class SymbolGraphIndexer {
         // Extract search content domains
         codeContent = await this.extractCodeContent(filePath);
         intentContent = await this.extractIntentContent(filePath);
+
+        if (stats.stageTimings) {
+          stats.stageTimings.ast_ms += Date.now() - astStart;
+        }
       }
 
       // Classify file into knowledge partition (Phase 1)
@@ -588,6 +611,7 @@ export class SymbolGraphIndexer {
         fileSize: fileStats.size,
       };
 
+      const storageStart = Date.now();
       await this.symbolIndexRepo.indexFiles([symbolIndexData]);
 
       // Insert into fileHashes first (required for symbols/imports_exports FK constraints)
@@ -624,12 +648,18 @@ export class SymbolGraphIndexer {
       );
 
       // Index in BM25 service
+      const bm25Start = Date.now();
       await this.bm25Service.indexDocument({
         id: relativePath,
         text: codeContent,
         metadata: { language, symbolCount: symbols.length }
       });
 
+      if (stats.stageTimings) {
+        stats.stageTimings.storage_ms += bm25Start - storageStart;
+        stats.stageTimings.bm25_ms += Date.now() - bm25Start;
+      }
+
       stats.indexedFiles++;
       logger.debug('File indexed', { filePath: relativePath, symbols: symbols.length });
 
@@ -644,8 +674,9 @@ export class SymbolGraphIndexer {
    * Generate embeddings for files that don't have them yet
    * Uses smart chunking for large files (>28.8K tokens)
    * Processes files in batches to avoid overwhelming the GPU service
+   * Stage timings and batch sizes are accumulated into stats when given.
    */
-  private async generatePendingEmbeddings(): Promise<void> {
+  private async generatePendingEmbeddings(stats?: IndexStats): Promise<void> {
     if (!this.lanceDBService || !this.db) {
       logger.error('LanceDB not initialized, skipping embedding generation.', {
         hasLanceDB: !!this.lanceDBService,
@@ -694,6 +725,7 @@ export class SymbolGraphIndexer {
         try {
           // Step 1: Process chunks in parallel for the entire batch
           logger.debug(`Chunking ${batch.length} files in parallel...`);
+          const chunkingStart = Date.now();
           const chunkPromises = batch.map(row => {
             const language = this.isDocumentationFile(row.file_path) ? 'markdown' : 'typescript';
             return this.semanticChunker.chunkDocument(
@@ -705,6 +737,9 @@ export class SymbolGraphIndexer {
           });
 
           const results = await Promise.all(chunkPromises);
+          if (stats?.stageTimings) {
+            stats.stageTimings.chunking_ms += Date.now() - chunkingStart;
+          }
           logger.debug(`Chunked ${results.length} files`);
 
           // Step 2: Flatten all chunks from the batch and prepare for DB insertion
@@ -771,6 +806,15 @@ export class SymbolGraphIndexer {
           const gpuDuration = Date.now() - gpuStartTime;
           logger.debug(`GPU processed ${allDocuments.length} docs in ${gpuDuration}ms`);
 
+          if (stats?.stageTimings) {
+            stats.stageTimings.embedding_ms += embeddingResult.embeddingMs ?? gpuDuration;
+            stats.stageTimings.lancedb_write_ms += embeddingResult.writeMs ?? 0;
+            stats.embeddingBatchSizes!.push(allDocuments.length);
+            if (embeddingResult.success) {
+              stats.chunksEmbedded! += allDocuments.length;
+            }
+          }
+
           // Step 4: Update database with success status
           if (embeddingResult.success) {
             logger.debug(`Updating DB with success status...`);
@@ -900,7 +944,18 @@ export class SymbolGraphIndexer {
       alreadyIndexed: 0,
       needsIndexing: 0,
       skipped: 0,
-      errors: []
+      errors: [],
+      stageTimings: {
+        discovery_ms: 0,
+        ast_ms: 0,
+        storage_ms: 0,
+        bm25_ms: 0,
+        chunking_ms: 0,
+        embedding_ms: 0,
+        lancedb_write_ms: 0
+      },
+      chunksEmbedded: 0,
+      embeddingBatchSizes: []
     };
 
     // Enable debug logging if requested or LOG_LEVEL=debug
@@ -931,7 +986,9 @@ export class SymbolGraphIndexer {
       } else {
         // DISCOVERY MODE: Use caller's ignore patterns (or defaults)
         const ignorePatterns = options.ignorePatterns || SymbolGraphIndexer.DEFAULT_IGNORE_PATTERNS;
+        const discoveryStart = Date.now();
         filesToProcess = await this.findIndexableFiles(repoPath, ignorePatterns);
+        stats.stageTimings!.discovery_ms = Date.now() - discoveryStart;
 
         logger.info('Indexing mode: discovery with ignore patterns', {
           fileCount: filesToProcess.length,
@@ -968,7 +1025,7 @@ export class SymbolGraphIndexer {
         if (debugMode) {
           logger.debug('Starting embedding generation');
         }
-        await this.generatePendingEmbeddings();
+        await this.generatePendingEmbeddings(stats);
       } else {
         logger.info('Skipping embedding generation (semantic search disabled)');
       }
@@ -1065,8 +1122,9 @@ export class SymbolGraphIndexer {
    * Uses LanceDB vector search to find semantically similar files
    *
    * Gracefully degrades to BM25 keyword search with explicit degradation tracking (#60)
+   * When timings is given it receives the query embedding and vector search durations.
    */
-  async searchSemantic(query: string, limit: number = 10): Promise<SearchResult[]> {
+  async searchSemantic(query: string, limit: number = 10, timings?: VectorSearchTimings): Promise<SearchResult[]> {
     if (!this.lanceDBService || !this.db) {
       logger.warn('LanceDB not initialized, falling back to keyword search');
       const fallbackResults = await this.searchKeyword(query, limit);
@@ -1090,7 +1148,9 @@ export class SymbolGraphIndexer {
         this.COLLECTION_NAME,
         query,
         limit * 3,
-        0.2  // threshold - return results with >20% similarity
+        0.2,  // threshold - return results with >20% similarity
+        undefined,
+        timings
       );
 
       // Map to SearchResult format with authority weighting
@@ -375,6 +375,16 @@ export class VectorSearchService {
     }
   }
 
+  /**
+   * Remove documents by id
+   */
+  async removeDocuments(
+    collectionName: string,
+    documentIds: string[]
+  ): Promise<{ success: boolean; removedCount: number; error?: string }> {
+    return await this.lanceDB.removeDocuments(collectionName, documentIds);
+  }
+
   /**
    * Delete a collection
    */
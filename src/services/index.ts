@@ -8,7 +8,7 @@ export {
   type ProgressReport,
   type AggregatedProgress
 } from './ProgressTracker.js';
-export { KnowledgeGraphService, type KnowledgeGraphConfig, type EntityWithRelationships, type InsightDetectionResult, type KnowledgeGraphStats } from './KnowledgeGraphService.js';
+export { KnowledgeGraphService, type KnowledgeGraphConfig, type EntityWithRelationships, type InsightDetectionResult, type KnowledgeGraphStats, type DeduplicationResult } from './KnowledgeGraphService.js';
 export { 
   FileOperationsService, 
   fileOperationsService,
@@ -0,0 +1,57 @@
+/**
+ * @file DebugMemoryStatsTool.ts
+ *
+ * A debug tool reporting the server process's memory: RSS, V8 heap and
+ * external/array buffer usage. Benchmarks poll it while indexing and
+ * searching to chart heap growth per indexed document.
+ */
+
+import v8 from 'v8';
+import { z } from 'zod';
+import type { McpTool } from '../schemas/tools/index.js';
+
+const DebugMemoryStatsSchema = z.object({
+  force_gc: z.boolean().default(false).describe('Run a full GC first (only when node was started with --expose-gc)'),
+  include_spaces: z.boolean().default(false).describe('Include per-space V8 heap statistics'),
+});
+
+const toMB = (bytes: number) => bytes / (1024 * 1024);
+
+export const debugMemoryStatsTool: McpTool = {
+  name: 'debug_memory_stats',
+  description: 'Reports memory usage of the MCP server process (RSS, V8 heap, external memory) for profiling.',
+  inputSchema: DebugMemoryStatsSchema,
+  handler: async (params: z.infer<typeof DebugMemoryStatsSchema>) => {
+    const gc = (globalThis as any).gc as (() => void) | undefined;
+    const gcRan = Boolean(params.force_gc && gc);
+    if (gcRan) {
+      gc!();
+    }
+
+    const usage = process.memoryUsage();
+    const heap = v8.getHeapStatistics();
+
+    return {
+      pid: process.pid,
+      timestamp: Date.now(),
+      uptime_s: process.uptime(),
+      gc_ran: gcRan,
+      rss_mb: toMB(usage.rss),
+      heap_used_mb: toMB(usage.heapUsed),
+      heap_total_mb: toMB(usage.heapTotal),
+      external_mb: toMB(usage.external),
+      array_buffers_mb: toMB(usage.arrayBuffers),
+      heap_size_limit_mb: toMB(heap.heap_size_limit),
+      malloced_mb: toMB(heap.malloced_memory),
+      peak_malloced_mb: toMB(heap.peak_malloced_memory),
+      native_contexts: heap.number_of_native_contexts,
+      ...(params.include_spaces && {
+        spaces: v8.getHeapSpaceStatistics().map(space => ({
+          name: space.space_name,
+          used_mb: toMB(space.space_used_size),
+          size_mb: toMB(space.space_size),
+        })),
+      }),
+    };
+  }
+};
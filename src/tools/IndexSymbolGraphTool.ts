@@ -287,7 +287,15 @@ async function indexSymbolGraphHandler(input: IndexSymbolGraphInput): Promise<an
         operation_resource: `logs://zmcp/content?file=index/${logStatus}-${timestamp}.log`
       },
       warnings: stats.errors,
-      cache_hit_rate: stats.totalFiles > 0 ? (stats.alreadyIndexed / stats.totalFiles) : 0
+      cache_hit_rate: stats.totalFiles > 0 ? (stats.alreadyIndexed / stats.totalFiles) : 0,
+      throughput: {
+        total_files: stats.totalFiles,
+        files_processed: stats.needsIndexing,
+        indexing_time_ms: stats.indexingTimeMs,
+        chunks_embedded: stats.chunksEmbedded || 0,
+        embedding_batch_sizes: stats.embeddingBatchSizes || [],
+        stage_timings: stats.stageTimings
+      }
     };
 
     logger.info('Symbol graph indexing completed', {
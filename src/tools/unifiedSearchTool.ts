@@ -8,6 +8,7 @@ import { z } from 'zod';
 import { zodToJsonSchema } from 'zod-to-json-schema';
 import { SymbolGraphIndexer } from '../services/SymbolGraphIndexer.js';
 import { EmbeddingClient } from '../services/EmbeddingClient.js';
+import type { VectorSearchTimings } from '../services/LanceDBService.js';
 import { DatabaseConnectionManager } from '../database/index.js';
 import { Logger } from '../utils/logger.js';
 
@@ -286,7 +287,8 @@ Returns real file paths, content snippets, and extracted code symbols (functions
         const semanticStart = Date.now();
 
         // Search files using semantic similarity (intent-only search domain)
-        const semanticSearchResults = await symbolGraphIndexer.searchSemantic(query, candidate_limit);
+        const semanticTimings: VectorSearchTimings = {};
+        const semanticSearchResults = await symbolGraphIndexer.searchSemantic(query, candidate_limit, semanticTimings);
 
         semanticResults = semanticSearchResults
           .filter(result => result.filePath) // Filter out null/undefined filePath
@@ -310,6 +312,12 @@ Returns real file paths, content snippets, and extracted code symbols (functions
         });
 
         metrics.stage_timings.semantic_ms = Date.now() - semanticStart;
+        if (semanticTimings.embedding_ms !== undefined) {
+          metrics.stage_timings.embedding_ms = semanticTimings.embedding_ms;
+        }
+        if (semanticTimings.vector_search_ms !== undefined) {
+          metrics.stage_timings.vector_search_ms = semanticTimings.vector_search_ms;
+        }
         metrics.component_scores.semantic_results = semanticResults.length;
       }
 
@@ -15,6 +15,12 @@ from typing import List, Dict, Any
 import concurrent.futures
 from datetime import datetime
 
+from file_discovery import (
+    DEFAULT_INCLUDE_PATTERNS, DEFAULT_SKIP_DIRS, DEFAULT_SKIP_FILE_PATTERNS,
+    discover_files
+)
+from code_chunker import DEFAULT_MAX_TOKENS, chunk_file
+
 # UV enforcement
 if not os.environ.get('VIRTUAL_ENV'):
     print("ERROR: This script must be run with 'uv run'", file=sys.stderr)
@@ -39,90 +45,19 @@ class AggressiveGPUIndexer:
         ]
         
         # File patterns to index
-        self.include_patterns = [
-            '*.py', '*.ts', '*.tsx', '*.js', '*.jsx',
-            '*.md', '*.json', '*.yaml', '*.yml',
-            '*.sh', '*.sql', 'Dockerfile*', '*.toml'
-        ]
+        self.include_patterns = list(DEFAULT_INCLUDE_PATTERNS)
         
-        # Skip patterns
-        self.skip_patterns = [
-            '**/node_modules/**', '**/.git/**', '**/build/**',
-            '**/dist/**', '**/__pycache__/**', '**/*.pyc',
-            '**/venv/**', '**/.venv/**', '**/cache/**'
-        ]
+        # Directories pruned during discovery, plus file-level skips
+        self.skip_dirs = set(DEFAULT_SKIP_DIRS)
+        self.skip_file_patterns = list(DEFAULT_SKIP_FILE_PATTERNS)
     
-    def chunk_file_content(self, file_path: Path, max_chunk_size: int = 2000) -> List[Dict]:
-        """Chunk file content for embedding"""
-        chunks = []
+    def chunk_file_content(self, file_path: Path, max_tokens: int = DEFAULT_MAX_TOKENS) -> List[Dict]:
+        """Chunk file content for embedding at definition boundaries"""
         try:
-            content = file_path.read_text(errors='ignore')
-            
-            # Smart chunking based on file type
-            if file_path.suffix in ['.py', '.ts', '.js']:
-                # Code files - chunk by functions/classes
-                lines = content.split('\n')
-                current_chunk = []
-                current_size = 0
-                
-                for line in lines:
-                    if (line.startswith('def ') or line.startswith('class ') or 
-                        line.startswith('function ') or line.startswith('export ')):
-                        if current_chunk and current_size > 100:
-                            chunks.append({
-                                'text': '\n'.join(current_chunk),
-                                'file': str(file_path),
-                                'type': 'code',
-                                'start_line': len(chunks) * 50
-                            })
-                            current_chunk = [line]
-                            current_size = len(line)
-                        else:
-                            current_chunk.append(line)
-                            current_size += len(line)
-                    else:
-                        current_chunk.append(line)
-                        current_size += len(line)
-                        
-                        if current_size > max_chunk_size:
-                            chunks.append({
-                                'text': '\n'.join(current_chunk),
-                                'file': str(file_path),
-                                'type': 'code',
-                                'start_line': len(chunks) * 50
-                            })
-                            current_chunk = []
-                            current_size = 0
-                
-                if current_chunk:
-                    chunks.append({
-                        'text': '\n'.join(current_chunk),
-                        'file': str(file_path),
-                        'type': 'code',
-                        'start_line': len(chunks) * 50
-                    })
-            else:
-                # Other files - chunk by size
-                if len(content) > max_chunk_size:
-                    for i in range(0, len(content), max_chunk_size):
-                        chunks.append({
-                            'text': content[i:i+max_chunk_size],
-                            'file': str(file_path),
-                            'type': file_path.suffix[1:] if file_path.suffix else 'text',
-                            'offset': i
-                        })
-                else:
-                    chunks.append({
-                        'text': content,
-                        'file': str(file_path),
-                        'type': file_path.suffix[1:] if file_path.suffix else 'text',
-                        'offset': 0
-                    })
-                    
+            return chunk_file(file_path, max_tokens=max_tokens)
         except Exception as e:
             print(f"  ⚠️  Error reading {file_path}: {e}")
-            
-        return chunks
+            return []
     
     def get_gpu_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """Get GPU embeddings for a batch of texts"""
@@ -150,21 +85,13 @@ class AggressiveGPUIndexer:
             print(f"  ⚠️  Directory not found: {dir_path}")
             return []
         
-        # Collect all files
-        files = []
-        for pattern in self.include_patterns:
-            files.extend(dir_path.rglob(pattern))
-        
-        # Filter out skipped patterns
-        filtered_files = []
-        for file in files:
-            skip = False
-            for skip_pattern in self.skip_patterns:
-                if file.match(skip_pattern):
-                    skip = True
-                    break
-            if not skip:
-                filtered_files.append(file)
+        # Collect all files in a single pruned walk
+        filtered_files = list(discover_files(
+            dir_path,
+            include_patterns=self.include_patterns,
+            skip_dirs=self.skip_dirs,
+            skip_file_patterns=self.skip_file_patterns
+        ))
         
         print(f"  📊 Found {len(filtered_files)} files to index")
         
@@ -186,8 +113,8 @@ class AggressiveGPUIndexer:
                     # Create entities
                     for i, (chunk, embedding) in enumerate(zip(batch_chunks, embeddings)):
                         entity = {
-                            'id': hashlib.md5(f"{chunk['file']}{chunk.get('offset', 0)}".encode()).hexdigest(),
-                            'name': f"{Path(chunk['file']).name}:{chunk.get('start_line', chunk.get('offset', 0))}",
+                            'id': hashlib.md5(f"{chunk['file']}{chunk['start_line']}".encode()).hexdigest(),
+                            'name': f"{Path(chunk['file']).name}:{chunk['start_line']}-{chunk['end_line']}",
                             'type': 'code' if chunk['type'] == 'code' else 'documentation',
                             'description': chunk['text'][:200] + '...' if len(chunk['text']) > 200 else chunk['text'],
                             'file': chunk['file'],
@@ -197,6 +124,10 @@ class AggressiveGPUIndexer:
                             'properties': {
                                 'file_type': chunk['type'],
                                 'chunk_size': len(chunk['text']),
+                                'chunk_tokens': chunk['tokens'],
+                                'start_line': chunk['start_line'],
+                                'end_line': chunk['end_line'],
+                                'symbols': chunk['symbols'],
                                 'indexed_at': datetime.now().isoformat()
                             }
                         }
@@ -212,8 +143,8 @@ class AggressiveGPUIndexer:
             embeddings = self.get_gpu_embeddings_batch(batch)
             for chunk, embedding in zip(batch_chunks, embeddings):
                 entity = {
-                    'id': hashlib.md5(f"{chunk['file']}{chunk.get('offset', 0)}".encode()).hexdigest(),
-                    'name': f"{Path(chunk['file']).name}:{chunk.get('start_line', chunk.get('offset', 0))}",
+                    'id': hashlib.md5(f"{chunk['file']}{chunk['start_line']}".encode()).hexdigest(),
+                    'name': f"{Path(chunk['file']).name}:{chunk['start_line']}-{chunk['end_line']}",
                     'type': 'code' if chunk['type'] == 'code' else 'documentation',
                     'description': chunk['text'][:200] + '...' if len(chunk['text']) > 200 else chunk['text'],
                     'file': chunk['file'],
@@ -223,6 +154,10 @@ class AggressiveGPUIndexer:
                     'properties': {
                         'file_type': chunk['type'],
                         'chunk_size': len(chunk['text']),
+                        'chunk_tokens': chunk['tokens'],
+                        'start_line': chunk['start_line'],
+                        'end_line': chunk['end_line'],
+                        'symbols': chunk['symbols'],
                         'indexed_at': datetime.now().isoformat()
                     }
                 }
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+AST-aware, token-budgeted chunker for the GPU indexers
+Cuts code at real definition boundaries (Python ast, tree-sitter for TS/JS)
+and packs small siblings together up to a token budget
+"""
+
+import re
+import ast
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_TOKENS = 512
+
+CODE_SUFFIXES = {'.py', '.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs'}
+
+# Rough BPE-like token count: identifiers/numbers and individual punctuation
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the embedding model's token count for text"""
+    return len(_TOKEN_RE.findall(text))
+
+
+@dataclass
+class Span:
+    """Line range (1-based, inclusive) of a syntactic unit"""
+    start: int
+    end: int
+    name: Optional[str] = None
+    children: List['Span'] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Span extraction
+# ---------------------------------------------------------------------------
+
+_PY_NAMED = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _python_span(node: ast.stmt) -> Span:
+    start = node.lineno
+    # Decorators belong to the definition they wrap
+    for dec in getattr(node, 'decorator_list', []):
+        start = min(start, dec.lineno)
+    children = [
+        _python_span(child) for child in ast.iter_child_nodes(node)
+        if isinstance(child, ast.stmt)
+    ]
+    name = node.name if isinstance(node, _PY_NAMED) else None
+    return Span(start, node.end_lineno, name, children)
+
+
+def python_spans(source: str) -> Optional[List[Span]]:
+    """Top-level statement spans of a Python module (None on syntax error)"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    return [_python_span(node) for node in tree.body]
+
+
+_TS_PARSERS: Dict[str, object] = {}
+
+
+def _tree_sitter_parser(suffix: str):
+    """Load a tree-sitter parser for TS/JS if the bindings are installed"""
+    if suffix in _TS_PARSERS:
+        return _TS_PARSERS[suffix]
+    parser = None
+    try:
+        from tree_sitter import Language, Parser
+        if suffix in ('.ts', '.tsx'):
+            import tree_sitter_typescript as grammar
+            lang = (grammar.language_tsx() if suffix == '.tsx'
+                    else grammar.language_typescript())
+        else:
+            import tree_sitter_javascript as grammar
+            lang = grammar.language()
+        parser = Parser(Language(lang))
+    except Exception:
+        parser = None
+    _TS_PARSERS[suffix] = parser
+    return parser
+
+
+_TS_NAMED_TYPES = {
+    'function_declaration', 'generator_function_declaration', 'class_declaration',
+    'abstract_class_declaration', 'method_definition', 'interface_declaration',
+    'type_alias_declaration', 'enum_declaration', 'lexical_declaration',
+    'variable_declaration', 'export_statement',
+}
+
+
+def _ts_span(node) -> Span:
+    name = None
+    if node.type in _TS_NAMED_TYPES:
+        name_node = node.child_by_field_name('name')
+        if name_node is not None:
+            name = name_node.text.decode('utf-8', errors='ignore')
+    children = [_ts_span(child) for child in node.named_children
+                if child.type != 'comment']
+    return Span(node.start_point[0] + 1, node.end_point[0] + 1, name, children)
+
+
+# Strings and comments are blanked out before brace counting
+_BRACE_NOISE_RE = re.compile(r"//.*$|'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|`(?:\\.|[^`\\])*`")
+_JS_DECL_RE = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?"
+    r"(?:function\*?|class|interface|enum|type|const|let|var)\s+([A-Za-z_$][\w$]*)"
+)
+
+
+def _brace_spans(source: str) -> List[Span]:
+    """Fallback TS/JS splitter: top-level statements by brace depth"""
+    lines = source.split('\n')
+    spans = []
+    depth = 0
+    start = None
+    for i, line in enumerate(lines, 1):
+        stripped = _BRACE_NOISE_RE.sub('', line)
+        if start is None:
+            if not stripped.strip():
+                continue
+            start = i
+        depth += stripped.count('{') - stripped.count('}')
+        if depth <= 0:
+            depth = 0
+            match = _JS_DECL_RE.match(lines[start - 1])
+            spans.append(Span(start, i, match.group(1) if match else None))
+            start = None
+    if start is not None:
+        spans.append(Span(start, len(lines)))
+    return spans
+
+
+def ts_spans(source: str, suffix: str) -> List[Span]:
+    """Top-level statement spans of a TS/JS file"""
+    parser = _tree_sitter_parser(suffix)
+    if parser is None:
+        return _brace_spans(source)
+    tree = parser.parse(source.encode('utf-8'))
+    return [_ts_span(child) for child in tree.root_node.named_children
+            if child.type != 'comment']
+
+
+# ---------------------------------------------------------------------------
+# Splitting and packing
+# ---------------------------------------------------------------------------
+
+class _Budget:
+    """Prefix sums of per-line token counts"""
+
+    def __init__(self, lines: List[str], max_tokens: int):
+        self.max_tokens = max_tokens
+        self.prefix = [0]
+        for line in lines:
+            self.prefix.append(self.prefix[-1] + estimate_tokens(line))
+
+    def tokens(self, start: int, end: int) -> int:
+        return self.prefix[end] - self.prefix[start - 1]
+
+    def windows(self, start: int, end: int) -> List[Span]:
+        """Split a line range into consecutive windows under the budget"""
+        out = []
+        while start <= end:
+            # Largest last line whose cumulative count stays within budget
+            limit = self.prefix[start - 1] + self.max_tokens
+            last = min(end, bisect_right(self.prefix, limit) - 1)
+            last = max(last, start)
+            out.append(Span(start, last))
+            start = last + 1
+        return out
+
+
+def _normalize(start: int, end: int, spans: List[Span]) -> List[Span]:
+    """Clip spans to [start, end], sort them and merge any that share lines"""
+    clipped = []
+    for span in sorted(spans, key=lambda s: (s.start, s.end)):
+        s, e = max(span.start, start), min(span.end, end)
+        if s > e:
+            continue
+        if clipped and s <= clipped[-1].end:
+            prev = clipped[-1]
+            clipped[-1] = Span(prev.start, max(prev.end, e), prev.name or span.name,
+                               prev.children + span.children)
+        else:
+            clipped.append(Span(s, e, span.name, span.children))
+    return clipped
+
+
+def _cover(start: int, end: int, spans: List[Span]) -> List[Span]:
+    """Fill gaps between spans (comments, blank lines, headers) with plain spans"""
+    out = []
+    cursor = start
+    for span in _normalize(start, end, spans):
+        if span.start > cursor:
+            out.append(Span(cursor, span.start - 1))
+        out.append(span)
+        cursor = span.end + 1
+    if cursor <= end:
+        out.append(Span(cursor, end))
+    return out
+
+
+def _split(span: Span, budget: _Budget) -> List[Span]:
+    """Recursively split an oversized span at its children's boundaries"""
+    if budget.tokens(span.start, span.end) <= budget.max_tokens:
+        return [span]
+    children = span.children
+    # Descend through wrappers that cover the whole range (e.g. export, class body)
+    while len(children) == 1 and (children[0].start, children[0].end) == (span.start, span.end):
+        children = children[0].children
+    if not children:
+        return budget.windows(span.start, span.end)
+    pieces = []
+    for child in _cover(span.start, span.end, children):
+        pieces.extend(_split(child, budget))
+    # The first piece carries the parent's name (class header, signature)
+    if pieces and pieces[0].name is None and span.name:
+        pieces[0] = Span(pieces[0].start, pieces[0].end, span.name)
+    return pieces
+
+
+def _pack(pieces: List[Span], budget: _Budget) -> List[List[Span]]:
+    """Greedily group adjacent pieces while the group stays within budget"""
+    groups: List[List[Span]] = []
+    current: List[Span] = []
+    for piece in pieces:
+        if current and budget.tokens(current[0].start, piece.end) > budget.max_tokens:
+            groups.append(current)
+            current = []
+        current.append(piece)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def chunk_source(source: str, file_path: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> List[Dict]:
+    """Chunk source text into token-budgeted pieces with true line ranges"""
+    lines = source.split('\n')
+    if not source.strip():
+        return []
+    suffix = Path(file_path).suffix
+    is_code = suffix in CODE_SUFFIXES
+
+    spans = None
+    if suffix == '.py':
+        spans = python_spans(source)
+    elif is_code:
+        spans = ts_spans(source, suffix)
+
+    budget = _Budget(lines, max_tokens)
+    if spans:
+        pieces = []
+        for span in _cover(1, len(lines), spans):
+            pieces.extend(_split(span, budget))
+    else:
+        pieces = budget.windows(1, len(lines))
+
+    chunks = []
+    for group in _pack(pieces, budget):
+        start, end = group[0].start, group[-1].end
+        # Trim blank edges so line ranges point at real content
+        while start < end and not lines[start - 1].strip():
+            start += 1
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        text = '\n'.join(lines[start - 1:end])
+        if not text.strip():
+            continue
+        chunks.append({
+            'text': text,
+            'file': str(file_path),
+            'type': 'code' if is_code else (suffix[1:] if suffix else 'text'),
+            'start_line': start,
+            'end_line': end,
+            'symbols': [p.name for p in group if p.name],
+            'tokens': budget.tokens(start, end)
+        })
+    return chunks
+
+
+def chunk_file(file_path: Path, max_tokens: int = DEFAULT_MAX_TOKENS) -> List[Dict]:
+    """Read and chunk a file (errors propagate to the caller)"""
+    content = Path(file_path).read_text(errors='ignore')
+    return chunk_source(content, str(file_path), max_tokens)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Shared file discovery for the GPU indexers
+Single os.scandir walk with directory pruning, .gitignore support and
+one precompiled include matcher
+"""
+
+import os
+import re
+import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+# File patterns indexed by default
+DEFAULT_INCLUDE_PATTERNS = [
+    '*.py', '*.ts', '*.tsx', '*.js', '*.jsx',
+    '*.md', '*.json', '*.yaml', '*.yml',
+    '*.sh', '*.sql', 'Dockerfile*', '*.toml'
+]
+
+# Directories never worth descending into
+DEFAULT_SKIP_DIRS = {
+    'node_modules', '.git', 'build', 'dist', '__pycache__',
+    'venv', '.venv', 'cache'
+}
+
+# Files skipped even when an include pattern matches
+DEFAULT_SKIP_FILE_PATTERNS = ['*.pyc']
+
+
+def compile_name_matcher(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Compile filename globs into a single regex (None if no patterns)"""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+
+
+def _translate_gitignore_glob(glob: str) -> str:
+    """Translate a gitignore glob to a regex body where '*' stops at '/'"""
+    i, n = 0, len(glob)
+    out = []
+    while i < n:
+        c = glob[i]
+        if c == '*':
+            if glob[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if glob[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = glob.find(']', i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:j]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class GitIgnore:
+    """Rules from a single .gitignore file, matched relative to its directory"""
+
+    def __init__(self, rules: List[Tuple[Pattern, bool, bool]]):
+        # (regex, negate, dir_only)
+        self.rules = rules
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> 'GitIgnore':
+        rules = []
+        for raw in lines:
+            line = raw.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ')
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            anchored = '/' in line
+            line = line.lstrip('/')
+            body = _translate_gitignore_glob(line)
+            prefix = '' if anchored else '(?:.*/)?'
+            rules.append((re.compile(f'^{prefix}{body}$'), negate, dir_only))
+        return cls(rules)
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional['GitIgnore']:
+        try:
+            with open(path, 'r', errors='ignore') as f:
+                ignore = cls.from_lines(f)
+        except OSError:
+            return None
+        return ignore if ignore.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True (ignored), False (re-included) or None (no rule matched)"""
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def _is_ignored(ignores: List[Tuple[str, GitIgnore]], rel_path: str, is_dir: bool) -> bool:
+    """Evaluate stacked .gitignore files, deeper files taking precedence"""
+    ignored = False
+    for base, ignore in ignores:
+        sub_path = rel_path[len(base) + 1:] if base else rel_path
+        verdict = ignore.match(sub_path, is_dir)
+        if verdict is not None:
+            ignored = verdict
+    return ignored
+
+
+def discover_files(root,
+                   include_patterns: Iterable[str] = DEFAULT_INCLUDE_PATTERNS,
+                   skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS,
+                   skip_file_patterns: Iterable[str] = DEFAULT_SKIP_FILE_PATTERNS,
+                   respect_gitignore: bool = True) -> Iterator[Path]:
+    """
+    Walk root once and yield files whose name matches an include pattern.
+
+    Skipped and gitignored directories are pruned before descending, so
+    large trees such as node_modules or .venv are never listed. Symlinked
+    directories are not followed. Results are yielded in sorted order per
+    directory so repeated runs are deterministic.
+    """
+    root = Path(root)
+    include = compile_name_matcher(include_patterns)
+    exclude = compile_name_matcher(skip_file_patterns)
+    skip_dirs = set(skip_dirs)
+
+    ignores: List[Tuple[str, GitIgnore]] = []
+    if respect_gitignore:
+        root_ignore = GitIgnore.from_file(root / '.gitignore')
+        if root_ignore:
+            ignores.append(('', root_ignore))
+
+    # Stack of (directory path, path relative to root, active .gitignore stack)
+    stack = [(str(root), '', ignores)]
+    while stack:
+        dir_path, rel_dir, dir_ignores = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel_path = f'{rel_dir}/{name}' if rel_dir else name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if name in skip_dirs:
+                    continue
+                if dir_ignores and _is_ignored(dir_ignores, rel_path, True):
+                    continue
+                subdirs.append((entry.path, rel_path))
+                continue
+
+            if include is not None and not include.match(name):
+                continue
+            if exclude is not None and exclude.match(name):
+                continue
+            if dir_ignores and _is_ignored(dir_ignores, rel_path, False):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            yield Path(entry.path)
+
+        # Push in reverse so directories are visited in sorted order
+        for sub_path, sub_rel in reversed(subdirs):
+            sub_ignores = dir_ignores
+            if respect_gitignore:
+                nested = GitIgnore.from_file(Path(sub_path) / '.gitignore')
+                if nested:
+                    sub_ignores = dir_ignores + [(sub_rel, nested)]
+            stack.append((sub_path, sub_rel, sub_ignores))
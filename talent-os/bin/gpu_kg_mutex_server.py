@@ -18,6 +18,8 @@ from typing import List, Dict, Any
 from datetime import datetime
 import sqlite3
 
+from file_discovery import discover_files
+
 # UV enforcement
 if not os.environ.get('VIRTUAL_ENV'):
     print("ERROR: This script must be run with 'uv run'", file=sys.stderr)
@@ -160,14 +162,10 @@ class UnifiedGPUServer:
             print(f"  ⚠️ Not found: {dir_path}")
             return
         
-        # Collect files
-        files = []
+        # Collect files in a single pruned walk
         patterns = ['*.py', '*.ts', '*.js', '*.md', '*.json']
-        for pattern in patterns:
-            files.extend(dir_path.rglob(pattern))
-        
-        # Filter
-        files = [f for f in files if 'node_modules' not in str(f) and '.git' not in str(f)]
+        files = list(discover_files(dir_path, include_patterns=patterns,
+                                    skip_dirs={'node_modules', '.git'}))
         print(f"  📊 Found {len(files)} files")
         
         # Process in chunks
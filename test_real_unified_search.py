@@ -5,62 +5,41 @@ Tests real file indexing, BM25, semantic search, and automatic routing
 """
 
 import asyncio
-import json
-import subprocess
+import sys
 import time
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "benchmarks"))
+from mcp_client import McpClient
+
 class RealUnifiedSearchTester:
     """Test the actual unified search tool with real file indexing"""
 
     def __init__(self):
         self.repository_path = "/home/jw/dev/game1/ZMCPTools"
         self.mcp_command = ["node", "/home/jw/dev/game1/ZMCPTools/dist/server/index.js"]
+        self.client: Optional[McpClient] = None
+
+    async def get_client(self) -> McpClient:
+        """Start the MCP server on first use; later calls reuse the session"""
+        if self.client is None or not self.client.running:
+            self.client = McpClient(self.mcp_command, cwd="/home/jw/dev/game1/ZMCPTools",
+                                    client_name="unified-search-integration-test", request_timeout=30)
+            await self.client.start(timeout=60)
+        return self.client
+
+    async def close(self):
+        if self.client:
+            await self.client.close()
+            self.client = None
 
     async def call_mcp_tool(self, tool_name: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Call an MCP tool and return the result"""
-        request = {
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": params
-            }
-        }
-
         try:
-            # Start MCP process
-            process = subprocess.Popen(
-                self.mcp_command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd="/home/jw/dev/game1/ZMCPTools"
-            )
-
-            # Send request
-            stdout, stderr = process.communicate(input=json.dumps(request) + "\n", timeout=30)
-
-            if stderr:
-                print(f"MCP stderr: {stderr}")
-
-            # Parse response
-            for line in stdout.strip().split('\n'):
-                if line:
-                    try:
-                        response = json.loads(line)
-                        if "result" in response:
-                            content = response["result"].get("content", [])
-                            if content and content[0].get("type") == "text":
-                                return json.loads(content[0]["text"])
-                    except json.JSONDecodeError:
-                        continue
-
-            return None
-
-        except subprocess.TimeoutExpired:
-            process.kill()
+            client = await self.get_client()
+            return await client.call_tool(tool_name, params)
+        except asyncio.TimeoutError:
             print("MCP call timed out")
             return None
         except Exception as e:
@@ -78,7 +57,7 @@ class RealUnifiedSearchTester:
             "repository_path": self.repository_path,
             "query": query,
             "use_bm25": True,
-            "use_qwen3_embeddings": False,
+            "use_gpu_embeddings": False,
             "use_reranker": False,
             "final_limit": 5
         })
@@ -129,7 +108,7 @@ class RealUnifiedSearchTester:
             "repository_path": self.repository_path,
             "query": query,
             "use_bm25": False,
-            "use_qwen3_embeddings": True,
+            "use_gpu_embeddings": True,
             "use_reranker": False,
             "final_limit": 5
         })
@@ -180,7 +159,7 @@ class RealUnifiedSearchTester:
             "repository_path": self.repository_path,
             "query": query,
             "use_bm25": True,
-            "use_qwen3_embeddings": True,
+            "use_gpu_embeddings": True,
             "use_reranker": False,
             "final_limit": 5
         })
@@ -251,7 +230,7 @@ class RealUnifiedSearchTester:
                 "repository_path": self.repository_path,
                 "query": case["query"],
                 "use_bm25": True,  # Use defaults to see what routing suggests
-                "use_qwen3_embeddings": True,
+                "use_gpu_embeddings": True,
                 "use_reranker": False,
                 "final_limit": 3
             })
@@ -305,7 +284,7 @@ class RealUnifiedSearchTester:
             "repository_path": self.repository_path,
             "query": query,
             "use_bm25": True,
-            "use_qwen3_embeddings": True,
+            "use_gpu_embeddings": True,
             "use_reranker": False,
             "final_limit": 5
         })
@@ -315,7 +294,7 @@ class RealUnifiedSearchTester:
             "repository_path": self.repository_path,
             "query": query,
             "use_bm25": True,
-            "use_qwen3_embeddings": True,
+            "use_gpu_embeddings": True,
             "use_reranker": True,
             "final_limit": 5
         })
@@ -366,19 +345,22 @@ class RealUnifiedSearchTester:
             self.test_reranker_precision
         ]
 
-        for test_func in tests:
-            try:
-                result = await test_func()
-                test_results.append(result)
-                print()  # Add spacing
-            except Exception as e:
-                print(f"❌ Test {test_func.__name__} failed: {e}")
-                test_results.append({
-                    "test": test_func.__name__,
-                    "success": False,
-                    "error": str(e)
-                })
-                print()
+        try:
+            for test_func in tests:
+                try:
+                    result = await test_func()
+                    test_results.append(result)
+                    print()  # Add spacing
+                except Exception as e:
+                    print(f"❌ Test {test_func.__name__} failed: {e}")
+                    test_results.append({
+                        "test": test_func.__name__,
+                        "success": False,
+                        "error": str(e)
+                    })
+                    print()
+        finally:
+            await self.close()
 
         # Generate summary
         total_tests = len(test_results)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-sweep /proc reaper.
+Uses real child processes for alive, dead and zombie agents.
+"""
+
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from .fixtures import isolated_db  # noqa: F401 (pytest fixture)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "python"))
+from agent_reaper import AgentReaper, scan_proc  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="requires Linux /proc")
+
+
+def insert_agent(db_path: Path, agent_id: str, pid: int, idle_seconds: int = 0, timeout_seconds: int = 1500):
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO agent_sessions
+        (id, agentName, agentType, repositoryPath, status, process_pid, last_activity_at, timeout_seconds)
+        VALUES (?, ?, 'testing', '/tmp', 'active', ?, datetime('now', ?), ?)
+    """, (agent_id, agent_id, pid, f"-{idle_seconds} seconds", timeout_seconds))
+    conn.commit()
+    conn.close()
+
+
+def statuses(db_path: Path) -> dict:
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, status FROM agent_sessions").fetchall())
+    conn.close()
+    return rows
+
+
+@pytest.fixture
+def sleeper():
+    process = subprocess.Popen(["sleep", "60"])
+    yield process
+    process.kill()
+    process.wait()
+
+
+@pytest.fixture
+def exited_pid():
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def zombie():
+    # Exits immediately but is not waited on, so it stays a zombie until reaped
+    process = subprocess.Popen(["true"])
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        with open(f"/proc/{process.pid}/stat") as f:
+            if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                break
+        time.sleep(0.01)
+    yield process
+    process.wait()
+
+
+class TestProcScan:
+    """The /proc snapshot."""
+
+    def test_scan_includes_self(self):
+        import os
+        processes = scan_proc()
+        me = processes[os.getpid()]
+        assert me.state in ("R", "S")
+        assert "python" in me.cmdline or "pytest" in me.cmdline
+        assert me.start_time <= time.time()
+
+    def test_cmdline_only_for_requested_pids(self, sleeper):
+        processes = scan_proc([sleeper.pid])
+        assert processes[sleeper.pid].cmdline == "sleep 60"
+        assert all(info.cmdline == "" for pid, info in processes.items() if pid != sleeper.pid)
+
+
+class TestAgentReaper:
+    """Reconciling agent_sessions against one /proc sweep."""
+
+    def test_classifies_agents(self, isolated_db, sleeper, exited_pid, zombie):
+        insert_agent(isolated_db, "alive", sleeper.pid)
+        insert_agent(isolated_db, "dead", exited_pid)
+        insert_agent(isolated_db, "zombie", zombie.pid)
+        insert_agent(isolated_db, "stuck", sleeper.pid, idle_seconds=0)
+        # Started before its last heartbeat, but idle beyond timeout plus jitter
+        conn = sqlite3.connect(isolated_db)
+        conn.execute("UPDATE agent_sessions SET timeout_seconds = 0 WHERE id = 'stuck'")
+        conn.commit()
+        conn.close()
+        time.sleep(1.1)
+
+        reaper = AgentReaper(isolated_db, timeout_jitter=0)
+        verdicts = {v.agent_id: v.status for v in reaper.sweep()}
+
+        assert verdicts == {"alive": "alive", "dead": "dead", "zombie": "zombie", "stuck": "timeout"}
+        assert statuses(isolated_db) == {
+            "alive": "active",
+            "dead": "terminated_zombie",
+            "zombie": "terminated_zombie",
+            "stuck": "terminated_timeout",
+        }
+
+    def test_pid_reuse_after_last_heartbeat(self, isolated_db, sleeper):
+        # The recorded heartbeat predates the process now holding the PID
+        insert_agent(isolated_db, "reused", sleeper.pid, idle_seconds=120)
+        verdicts = AgentReaper(isolated_db).sweep()
+        assert verdicts[0].status == "reused"
+        assert statuses(isolated_db)["reused"] == "terminated_zombie"
+
+    def test_pid_reuse_by_remembered_start_time(self, isolated_db, sleeper):
+        time.sleep(2.5)
+        insert_agent(isolated_db, "agent", sleeper.pid)
+        reaper = AgentReaper(isolated_db)
+        assert reaper.sweep()[0].status == "alive"
+
+        # Same PID, different process start: the PID was recycled between sweeps
+        pid, start_ticks = reaper.known_starts["agent"]
+        reaper.known_starts["agent"] = (pid, start_ticks - 1)
+        assert reaper.sweep()[0].status == "reused"
+
+    def test_dry_run_changes_nothing(self, isolated_db, exited_pid):
+        insert_agent(isolated_db, "dead", exited_pid)
+        verdicts = AgentReaper(isolated_db).sweep(apply=False)
+        assert verdicts[0].new_status == "terminated_zombie"
+        assert statuses(isolated_db)["dead"] == "active"
+
+    def test_sweep_over_1000_agents_is_fast(self, isolated_db, sleeper, exited_pid):
+        conn = sqlite3.connect(isolated_db)
+        conn.executemany("""
+            INSERT INTO agent_sessions
+            (id, agentName, agentType, repositoryPath, status, process_pid, last_activity_at, timeout_seconds)
+            VALUES (?, ?, 'testing', '/tmp', 'active', ?, datetime('now'), 1500)
+        """, [(f"load-{i}", f"load-{i}", sleeper.pid if i % 2 else exited_pid) for i in range(1000)])
+        conn.commit()
+        conn.close()
+
+        reaper = AgentReaper(isolated_db)
+        verdicts = reaper.sweep(apply=False)
+        print(f"Sweep stats: {reaper.last_sweep}")
+
+        assert len(verdicts) == 1000
+        assert sum(v.status == "dead" for v in verdicts) == 500
+        assert reaper.last_sweep["total_ms"] < 500
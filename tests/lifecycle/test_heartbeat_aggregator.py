@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched heartbeat aggregator.
+Heartbeats are coalesced per agent and written in one transaction per flush.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from .fixtures import isolated_db  # noqa: F401 (pytest fixture)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "python"))
+from heartbeat_aggregator import HeartbeatAggregator, sqlite_timestamp  # noqa: E402
+
+
+def insert_agents(db_path: Path, count: int, last_activity_at=None) -> list:
+    agent_ids = [f"hb-agent-{i}" for i in range(count)]
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO agent_sessions
+        (id, agentName, agentType, repositoryPath, status, process_pid, last_activity_at, timeout_seconds)
+        VALUES (?, ?, 'testing', '/tmp', 'active', 12345, ?, 1500)
+    """, [(agent_id, agent_id, last_activity_at) for agent_id in agent_ids])
+    conn.commit()
+    conn.close()
+    return agent_ids
+
+
+def activity(db_path: Path) -> dict:
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, last_activity_at FROM agent_sessions").fetchall())
+    conn.close()
+    return rows
+
+
+class TestHeartbeatAggregator:
+    """Coalescing and batched flushing of agent heartbeats."""
+
+    def test_coalesces_beats_into_one_flush(self, isolated_db):
+        agent_ids = insert_agents(isolated_db, 50)
+        now = time.time()
+
+        aggregator = HeartbeatAggregator(isolated_db, autostart=False)
+        for i in range(20):
+            for agent_id in agent_ids:
+                aggregator.beat(agent_id, now + i)
+        assert aggregator.pending == 50
+
+        assert aggregator.flush() == 50
+        assert aggregator.pending == 0
+        assert aggregator.stats["beats"] == 1000
+        assert aggregator.stats["flushes"] == 1
+
+        expected = sqlite_timestamp(now + 19)
+        assert all(value == expected for value in activity(isolated_db).values())
+
+    def test_one_transaction_per_flush(self, isolated_db, monkeypatch):
+        """More agents than fit in one statement still commit once."""
+        agent_ids = insert_agents(isolated_db, 900)
+        statements = []
+        original_connect = sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            conn = original_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        aggregator = HeartbeatAggregator(isolated_db, autostart=False)
+        for agent_id in agent_ids:
+            aggregator.beat(agent_id)
+        monkeypatch.setattr(sqlite3, "connect", traced_connect)
+        assert aggregator.flush() == 900
+
+        updates = [s for s in statements if "UPDATE agent_sessions" in s]
+        commits = [s for s in statements if s.strip().upper() == "COMMIT"]
+        assert len(updates) == 3
+        assert len(commits) == 1
+
+    def test_never_moves_activity_backwards(self, isolated_db):
+        newer = sqlite_timestamp(time.time() + 3600)
+        agent_id, = insert_agents(isolated_db, 1, last_activity_at=newer)
+
+        aggregator = HeartbeatAggregator(isolated_db, autostart=False)
+        aggregator.beat(agent_id, time.time())
+        aggregator.beat(agent_id, time.time() - 60)
+        aggregator.flush()
+
+        assert activity(isolated_db)[agent_id] == newer
+
+    def test_unknown_agents_are_ignored(self, isolated_db):
+        insert_agents(isolated_db, 2)
+        aggregator = HeartbeatAggregator(isolated_db, autostart=False)
+        aggregator.beat("hb-agent-0")
+        aggregator.beat("not-an-agent")
+        assert aggregator.flush() == 1
+
+    def test_background_flush_and_close(self, isolated_db):
+        agent_ids = insert_agents(isolated_db, 10)
+
+        with HeartbeatAggregator(isolated_db, flush_interval=0.05) as aggregator:
+            for agent_id in agent_ids[:5]:
+                aggregator.beat(agent_id)
+            deadline = time.time() + 5
+            while not aggregator.stats["flushes"] and time.time() < deadline:
+                time.sleep(0.01)
+            assert aggregator.pending == 0
+            assert sum(v is not None for v in activity(isolated_db).values()) == 5
+
+            aggregator._stop.set()
+            aggregator._thread.join()
+            for agent_id in agent_ids[5:]:
+                aggregator.beat(agent_id)
+
+        # close() writes what the stopped thread never flushed
+        assert all(value is not None for value in activity(isolated_db).values())
+
+    def test_busy_database_keeps_pending_beats(self, isolated_db):
+        agent_id, = insert_agents(isolated_db, 1)
+        aggregator = HeartbeatAggregator(isolated_db, busy_timeout=0.05, autostart=False)
+        aggregator.beat(agent_id)
+
+        blocker = sqlite3.connect(isolated_db)
+        blocker.execute("BEGIN EXCLUSIVE")
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                aggregator.flush()
+            assert aggregator.pending == 1
+            assert aggregator.stats["failed_flushes"] == 1
+        finally:
+            blocker.rollback()
+            blocker.close()
+
+        assert aggregator.flush() == 1
+        assert activity(isolated_db)[agent_id] is not None
+
+    def test_concurrent_beats_from_many_threads(self, isolated_db):
+        agent_ids = insert_agents(isolated_db, 100)
+
+        with HeartbeatAggregator(isolated_db, flush_interval=0.02) as aggregator:
+            def hammer(agent_id):
+                for _ in range(100):
+                    aggregator.beat(agent_id)
+
+            threads = [threading.Thread(target=hammer, args=(agent_id,)) for agent_id in agent_ids]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert aggregator.stats["beats"] == 10000
+        # Far fewer write transactions than heartbeats
+        assert aggregator.stats["flushes"] < 1000
+        assert all(value is not None for value in activity(isolated_db).values())
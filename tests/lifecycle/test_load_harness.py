@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the lifecycle load-test harness (benchmarks/lifecycle_load_test.py).
+Runs a short, small load level; full runs are done from the command line.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "benchmarks"))
+from lifecycle_load_test import LoadProfile, run_level, summarize, timed_write, with_busy_retry  # noqa: E402
+from heartbeat_aggregator import HeartbeatAggregator  # noqa: E402 (python/ added to the path by the harness)
+
+
+@pytest.mark.parametrize("heartbeats", ["direct", "aggregated"])
+def test_small_load_level(tmp_path, heartbeats):
+    profile = LoadProfile(tool_call_interval=0.2, message_interval=1.0, status_interval=2.0,
+                          heartbeats=heartbeats, flush_interval=0.2)
+    level = run_level(20, duration=1.5, processes=2, profile=profile, journal_mode="wal", seed=1, workdir=tmp_path)
+
+    assert level["agents"] == 20
+    assert level["total"]["failed"] == 0
+    operations = level["operations"]
+    assert operations["tool_call"]["writes"] > 20
+    assert operations["heartbeat"]["writes"] > 0
+    if heartbeats == "aggregated":
+        # Far fewer heartbeat writes than tool calls
+        assert operations["heartbeat"]["writes"] < operations["tool_call"]["writes"]
+    assert 0.0 <= level["total"]["busy_rate"] <= 1.0
+
+    conn = sqlite3.connect(tmp_path / "lifecycle-load-20.db")
+    logged = conn.execute("SELECT COUNT(*) FROM tool_call_logs").fetchone()[0]
+    conn.close()
+    assert logged == operations["tool_call"]["writes"]
+
+
+def test_timed_write_measures_lock_wait(tmp_path):
+    db_path = tmp_path / "locked.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+
+    conn.execute("BEGIN IMMEDIATE")
+    sample = timed_write(db_path, [("INSERT INTO t VALUES (1)", ())], deadline=0.05)
+    conn.rollback()
+    assert not sample["ok"]
+    assert sample["busy"] > 0
+
+    sample = timed_write(db_path, [("INSERT INTO t VALUES (1)", ())], deadline=1.0)
+    conn.close()
+    assert sample["ok"] and sample["busy"] == 0 and sample["lock_wait"] == 0.0
+
+    stats = summarize([sample], duration=1.0)
+    assert stats["writes"] == 1 and stats["busy_rate"] == 0.0
+
+
+def test_aggregated_flush_measures_lock_wait(tmp_path):
+    db_path = tmp_path / "agg.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("CREATE TABLE agent_sessions (id TEXT PRIMARY KEY, last_activity_at TEXT)")
+    conn.execute("INSERT INTO agent_sessions VALUES ('a', NULL)")
+    aggregator = HeartbeatAggregator(db_path, busy_timeout=0, autostart=False)
+    aggregator.beat("a")
+
+    conn.execute("BEGIN IMMEDIATE")
+    sample = with_busy_retry(aggregator.flush, deadline=0.05)
+    conn.execute("ROLLBACK")
+    assert not sample["ok"] and sample["busy"] > 0 and sample["lock_wait"] > 0
+    assert aggregator.pending == 1  # requeued for the next attempt
+
+    sample = with_busy_retry(aggregator.flush, deadline=1.0)
+    conn.close()
+    assert sample["ok"] and sample["busy"] == 0
+    assert aggregator.pending == 0
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the online migration runner (src/migrations/migration_runner.py).
+Chunked backfills commit as they go, resume after interruption and leave
+the write lock free between chunks.
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "migrations"))
+from migration_runner import AddColumn, Backfill, Migration, MigrationRunner  # noqa: E402
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """agent_sessions before any migration, plus a scraping table with rows"""
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("""
+        CREATE TABLE agent_sessions (
+            id TEXT PRIMARY KEY, agentName TEXT, agentType TEXT, repositoryPath TEXT, status TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO agent_sessions VALUES (?, ?, 'testing', '/tmp', ?)",
+                     [(f"agent-{i}", f"agent-{i}", "active" if i % 2 else "completed") for i in range(5000)])
+    conn.execute("CREATE TABLE websites (id INTEGER PRIMARY KEY, url TEXT)")
+    conn.executemany("INSERT INTO websites (url) VALUES (?)", [(f"https://example.com/{i}",) for i in range(3000)])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def query(db_path: Path, sql: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_migrates_legacy_database(legacy_db):
+    reports = MigrationRunner(legacy_db, chunk_size=700, pause=0).migrate()
+
+    assert [r["version"] for r in reports] == [1, 2, 3]
+    assert reports[1]["rows"] == 2500
+    assert reports[2]["rows"] == 3000
+    assert query(legacy_db, "SELECT COUNT(*) FROM agent_sessions WHERE status = 'active' "
+                            "AND last_activity_at IS NULL") == [(0,)]
+    assert query(legacy_db, "SELECT name FROM sqlite_master WHERE name = 'websites'") == []
+    assert query(legacy_db, "SELECT version FROM schema_migrations ORDER BY version") == [(1,), (2,), (3,)]
+    assert query(legacy_db, "SELECT COUNT(*) FROM schema_migration_progress") == [(0,)]
+
+    # Nothing left to do
+    assert MigrationRunner(legacy_db).migrate() == []
+
+
+def test_records_hand_migrated_database(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    for column in ("results JSON", "artifacts JSON", "completion_message TEXT", "error_details JSON"):
+        conn.execute(f"ALTER TABLE agent_sessions ADD COLUMN {column}")
+    conn.commit()
+    conn.close()
+
+    reports = MigrationRunner(legacy_db, pause=0).migrate(only=1)
+    assert [r["version"] for r in reports] == [1]
+    assert [row["version"] for row in MigrationRunner(legacy_db).status() if row["applied_at"]] == [1]
+
+
+def test_dry_run_changes_nothing(legacy_db):
+    estimates = MigrationRunner(legacy_db, chunk_size=1000).dry_run()
+
+    assert [e["version"] for e in estimates] == [1, 2, 3]
+    backfill = estimates[1]["steps"][-1]
+    assert backfill["rows"] == 2500 and backfill["chunks"] == 3
+    assert estimates[2]["steps"][2]["rows"] == 3000
+    columns = [row[1] for row in query(legacy_db, "PRAGMA table_info(agent_sessions)")]
+    assert "last_activity_at" not in columns
+    assert query(legacy_db, "SELECT COUNT(*) FROM websites") == [(3000,)]
+
+
+def test_resumes_interrupted_backfill(legacy_db, monkeypatch):
+    migration = Migration(1, "backfill_names", [
+        AddColumn("agent_sessions", "display_name", "TEXT"),
+        Backfill("agent_sessions", "display_name = upper(agentName)", "display_name IS NULL"),
+    ])
+    runner = MigrationRunner(legacy_db, chunk_size=1000, pause=0, migrations=[migration])
+
+    calls = {"n": 0}
+    original_chunk = Backfill.chunk
+
+    def failing_chunk(self, conn, after_rowid, size):
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise sqlite3.OperationalError("disk I/O error")
+        return original_chunk(self, conn, after_rowid, size)
+
+    monkeypatch.setattr(Backfill, "chunk", failing_chunk)
+    with pytest.raises(sqlite3.OperationalError):
+        runner.migrate()
+    assert query(legacy_db, "SELECT COUNT(*) FROM agent_sessions WHERE display_name IS NOT NULL") == [(2000,)]
+    assert runner.status()[0]["rows_done"] == 2000
+
+    seen = []
+    monkeypatch.setattr(Backfill, "chunk",
+                        lambda self, conn, after, size: seen.append(after) or original_chunk(self, conn, after, size))
+    report, = runner.migrate()
+    assert seen[0] > 0  # resumed from the saved cursor, not from the start
+    assert report["rows"] == 5000
+    assert query(legacy_db, "SELECT COUNT(*) FROM agent_sessions WHERE display_name IS NULL") == [(0,)]
+
+
+def test_writers_get_the_lock_between_chunks(legacy_db):
+    """A concurrent heartbeat writer is never blocked for the whole backfill"""
+    runner = MigrationRunner(legacy_db, chunk_size=100, pause=0.005)
+    waits = []
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(legacy_db, timeout=10)
+        while not stop.is_set():
+            started = time.perf_counter()
+            conn.execute("UPDATE agent_sessions SET status = status WHERE id = 'agent-1'")
+            conn.commit()
+            waits.append(time.perf_counter() - started)
+            time.sleep(0.002)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    started = time.perf_counter()
+    reports = runner.migrate()
+    total = time.perf_counter() - started
+    stop.set()
+    thread.join()
+
+    assert reports[1]["rows"] == 2500
+    assert len(waits) > 10
+    assert max(waits) < total
+    assert max(r["longest_lock_ms"] for r in reports) < total * 1000
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the AST-aware chunker used by the GPU indexers (talent-os/bin/code_chunker.py)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "talent-os" / "bin"))
+import code_chunker  # noqa: E402
+from code_chunker import chunk_file, chunk_source, estimate_tokens  # noqa: E402
+
+PYTHON_SOURCE = '''"""Module docstring"""
+
+import os
+
+
+def first(a, b):
+    return a + b
+
+
+@decorator
+def second():
+    return os.getcwd()
+
+
+class Widget:
+    def method(self):
+        return 1
+'''
+
+TS_SOURCE = '''import { x } from './x';
+
+export function alpha(a: number): number {
+  const s = "{ not a brace";
+  return a + 1;
+}
+
+// trailing comment }
+export class Beta {
+  run() {
+    return `}`;
+  }
+}
+
+export const gamma = 3;
+'''
+
+
+@pytest.fixture
+def no_tree_sitter(monkeypatch):
+    """Force the brace-counting fallback for TS/JS files"""
+    for suffix in ('.ts', '.tsx', '.js'):
+        monkeypatch.setitem(code_chunker._TS_PARSERS, suffix, None)
+
+
+def lines_of(source: str, chunk: dict) -> str:
+    return '\n'.join(source.split('\n')[chunk['start_line'] - 1:chunk['end_line']])
+
+
+def test_python_chunks_follow_definitions():
+    chunks = chunk_source(PYTHON_SOURCE, 'mod.py', max_tokens=20)
+
+    assert all(c['type'] == 'code' and c['file'] == 'mod.py' for c in chunks)
+    symbols = [name for c in chunks for name in c['symbols']]
+    assert symbols == ['first', 'second', 'Widget']
+    # The decorator stays with the function it wraps
+    second = next(c for c in chunks if 'second' in c['symbols'])
+    assert second['text'].startswith('@decorator')
+    # No definition is cut in half
+    for chunk in chunks:
+        assert chunk['text'].count('def ') == chunk['text'].count('return')
+
+
+def test_python_small_definitions_are_packed():
+    chunks = chunk_source(PYTHON_SOURCE, 'mod.py', max_tokens=512)
+    assert len(chunks) == 1
+    assert chunks[0]['symbols'] == ['first', 'second', 'Widget']
+    assert (chunks[0]['start_line'], chunks[0]['end_line']) == (1, 17)
+
+
+def test_python_syntax_error_falls_back_to_windows():
+    source = 'def broken(:\n' + 'x = 1\n' * 40
+    chunks = chunk_source(source, 'broken.py', max_tokens=20)
+    assert len(chunks) > 1
+    assert all(c['tokens'] <= 20 and c['symbols'] == [] for c in chunks)
+
+
+def test_ts_fallback_splits_on_top_level_braces(no_tree_sitter):
+    # Braces inside strings, template literals and comments are ignored
+    spans = [(s.start, s.end, s.name) for s in code_chunker.ts_spans(TS_SOURCE, '.ts')]
+    assert spans == [(1, 1, None), (3, 6, 'alpha'), (9, 13, 'Beta'), (15, 15, 'gamma')]
+
+    chunks = chunk_source(TS_SOURCE, 'mod.ts', max_tokens=40)
+    assert [c['symbols'] for c in chunks] == [['alpha'], ['Beta', 'gamma']]
+    assert [(c['start_line'], c['end_line']) for c in chunks] == [(1, 6), (8, 15)]
+
+
+def test_metadata_matches_text(no_tree_sitter):
+    for source, name in ((PYTHON_SOURCE, 'mod.py'), (TS_SOURCE, 'mod.ts')):
+        chunks = chunk_source(source, name, max_tokens=15)
+        previous_end = 0
+        for chunk in chunks:
+            assert 1 <= chunk['start_line'] <= chunk['end_line']
+            assert chunk['start_line'] > previous_end
+            assert chunk['text'] == lines_of(source, chunk)
+            assert chunk['tokens'] == estimate_tokens(chunk['text'])
+            assert chunk['text'].strip()
+            previous_end = chunk['end_line']
+
+
+def test_oversized_definition_is_split_under_budget():
+    body = '\n'.join(f'    value_{i} = {i} + {i}' for i in range(60))
+    source = f'def huge():\n{body}\n    return value_0\n'
+    chunks = chunk_source(source, 'huge.py', max_tokens=40)
+
+    assert len(chunks) > 1
+    assert all(c['tokens'] <= 40 for c in chunks)
+    assert chunks[0]['symbols'] == ['huge']
+    assert chunks[0]['start_line'] == 1 and chunks[-1]['end_line'] == 62
+
+
+def test_text_files_and_empty_input(tmp_path):
+    doc = tmp_path / 'notes.md'
+    doc.write_text('# Title\n\nSome words here.\n')
+    chunk, = chunk_file(doc)
+    assert chunk['type'] == 'md'
+    assert (chunk['start_line'], chunk['end_line']) == (1, 3)
+
+    assert chunk_source('   \n\n', 'empty.py') == []
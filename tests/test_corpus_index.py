@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached benchmark corpus index (benchmarks/corpus_index.py)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from corpus_index import CorpusIndex  # noqa: E402
+
+FILES = {
+    "client.ts": "const c = this.createEmbeddingClient();\nimport { chunker } from './reimported';",
+    "graph.ts": "export function searchKnowledgeGraph() { return db.prepare(sql); }",
+    "notes.md": "Chunking and re-indexing notes",
+    "util.py": "def ab(): pass",
+}
+
+QUERIES = ["chunk", "index", "import", "embeddingClient", "searchKnowledge", "db.prepare(",
+           "ab", "CHUNK", "()", "missing", "a b"]
+
+
+def test_substring_candidates_never_miss_a_match(tmp_path):
+    for name, text in FILES.items():
+        (tmp_path / name).write_text(text)
+    corpus = CorpusIndex.load(tmp_path, extensions=(".ts", ".md", ".py"), cache_dir=tmp_path / ".cache")
+
+    for query in QUERIES:
+        candidates = {corpus.paths[doc] for doc in corpus.substring_candidates(query)}
+        matches = {path for path in corpus if query.lower() in corpus[path].lower()}
+        assert matches <= candidates, query
+
+    assert {corpus.paths[d] for d in corpus.substring_candidates("chunk")} == {"client.ts", "notes.md"}
+    assert len(corpus.substring_candidates("()")) == len(FILES)
+    assert len(corpus.substring_candidates("missing")) == 0
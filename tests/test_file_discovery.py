@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared GPU indexer file walk (talent-os/bin/file_discovery.py)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "talent-os" / "bin"))
+from file_discovery import GitIgnore, discover_files  # noqa: E402
+
+
+def make_tree(root: Path, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def discovered(root: Path, **kwargs):
+    return [p.relative_to(root).as_posix() for p in discover_files(root, **kwargs)]
+
+
+def test_include_patterns_and_sorted_order(tmp_path):
+    # Each directory's files come before its subdirectories
+    make_tree(tmp_path, {
+        'b.py': '', 'a.ts': '', 'notes.md': '', 'image.png': '', 'mod.pyc': '',
+        'Dockerfile.dev': '', 'src/z.py': '', 'src/a.py': '',
+    })
+    assert discovered(tmp_path) == ['Dockerfile.dev', 'a.ts', 'b.py', 'notes.md', 'src/a.py', 'src/z.py']
+
+
+def test_skip_dirs_are_pruned(tmp_path):
+    make_tree(tmp_path, {
+        'keep.py': '',
+        'node_modules/pkg/index.js': '',
+        'src/node_modules/dep.js': '',
+        '.venv/lib/site.py': '',
+        'src/__pycache__/mod.py': '',
+        'src/cache/data.json': '',
+    })
+    assert discovered(tmp_path) == ['keep.py']
+    assert discovered(tmp_path, skip_dirs={'src'}) == ['keep.py', '.venv/lib/site.py', 'node_modules/pkg/index.js']
+
+
+def test_gitignore_negation(tmp_path):
+    make_tree(tmp_path, {
+        '.gitignore': '# logs\n*.json\n!package.json\ngenerated/\n',
+        'package.json': '', 'data.json': '', 'sub/other.json': '', 'sub/package.json': '',
+        'generated/out.py': '', 'app.py': '',
+    })
+    assert discovered(tmp_path) == ['app.py', 'package.json', 'sub/package.json']
+    assert 'data.json' in discovered(tmp_path, respect_gitignore=False)
+
+
+def test_nested_gitignore_is_relative_and_overrides_parent(tmp_path):
+    make_tree(tmp_path, {
+        '.gitignore': '*.md\n/top.py\n',
+        'top.py': '', 'README.md': '',
+        'pkg/.gitignore': '!README.md\n/local.py\n',
+        'pkg/top.py': '', 'pkg/local.py': '', 'pkg/README.md': '', 'pkg/other.md': '',
+        'pkg/deep/local.py': '',
+    })
+    # /top.py is anchored to the root, /local.py to pkg/; pkg re-includes its README
+    assert discovered(tmp_path) == ['pkg/README.md', 'pkg/top.py', 'pkg/deep/local.py']
+
+
+def test_gitignore_pattern_semantics():
+    ignore = GitIgnore.from_lines(['build/', 'docs/*.md', '**/tmp', r'\!literal', 'a?c'])
+    assert ignore.match('build', is_dir=True) is True
+    assert ignore.match('build', is_dir=False) is None
+    assert ignore.match('docs/api.md', is_dir=False) is True
+    assert ignore.match('docs/sub/api.md', is_dir=False) is None
+    assert ignore.match('x/y/tmp', is_dir=True) is True
+    assert ignore.match('!literal', is_dir=False) is True
+    assert ignore.match('sub/abc', is_dir=False) is True
+    assert ignore.match('a/c', is_dir=False) is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason='symlinks unavailable')
+def test_symlink_loops_are_not_followed(tmp_path):
+    make_tree(tmp_path, {'src/mod.py': '', 'outside/extra.py': ''})
+    try:
+        os.symlink(tmp_path, tmp_path / 'src' / 'loop', target_is_directory=True)
+    except OSError:
+        pytest.skip('cannot create symlinks')
+    os.symlink(tmp_path / 'outside', tmp_path / 'linked', target_is_directory=True)
+    os.symlink(tmp_path / 'outside' / 'extra.py', tmp_path / 'alias.py')
+    os.symlink(tmp_path / 'missing.py', tmp_path / 'dangling.py')
+
+    # Directory links are skipped; file links to real files are kept
+    assert discovered(tmp_path) == ['alias.py', 'outside/extra.py', 'src/mod.py']
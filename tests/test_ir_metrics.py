@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized IR metrics and paired tests (benchmarks/ir_metrics.py)
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from ir_metrics import (  # noqa: E402
+    build_run_matrices,
+    evaluate,
+    holm_adjust,
+    paired_bootstrap,
+    query_metrics,
+    randomization_p_value,
+)
+
+GRADES = {"a": 3.0, "b": 1.0, "c": 2.0, "x": 0.0}
+RELEVANT = ["a", "b", "c"]
+
+# Ideal ranking a, c, b: 3 + 2 / log2(3) + 1 / log2(4)
+IDCG = 3.0 + 2.0 / math.log2(3) + 0.5
+
+ZERO = {
+    "precision_1": 0.0, "precision_3": 0.0, "precision_5": 0.0, "precision_10": 0.0,
+    "recall_3": 0.0, "recall_5": 0.0, "recall_10": 0.0,
+    "mrr": 0.0, "ndcg_3": 0.0, "ndcg_5": 0.0, "ndcg_10": 0.0,
+}
+
+
+def test_query_metrics_match_hand_computed_values():
+    metrics = query_metrics(["a", "x", "b", "y"], RELEVANT, GRADES)
+
+    # a and b are hits at ranks 1 and 3; precision divides by min(k, 4 returned)
+    expected = {
+        "precision_1": 1.0, "precision_3": 2 / 3, "precision_5": 2 / 4, "precision_10": 2 / 4,
+        "recall_3": 2 / 3, "recall_5": 2 / 3, "recall_10": 2 / 3,
+        "mrr": 1.0,
+        # DCG: 3 / log2(2) + 1 / log2(4)
+        "ndcg_3": 3.5 / IDCG, "ndcg_5": 3.5 / IDCG, "ndcg_10": 3.5 / IDCG,
+    }
+    assert metrics == pytest.approx(expected)
+
+
+def test_query_metrics_first_hit_lower_down():
+    metrics = query_metrics(["x", "y", "c"], RELEVANT, GRADES)
+    assert metrics["mrr"] == pytest.approx(1 / 3)
+    assert metrics["precision_1"] == 0.0
+    assert metrics["precision_3"] == pytest.approx(1 / 3)
+    assert metrics["recall_10"] == pytest.approx(1 / 3)
+    assert metrics["ndcg_3"] == pytest.approx((2.0 / 2.0) / IDCG)
+
+
+def test_empty_ranking_scores_zero():
+    assert query_metrics([], RELEVANT, GRADES) == ZERO
+
+
+def test_empty_relevant_set_scores_zero():
+    assert query_metrics(["a", "b"], [], {}) == ZERO
+
+
+def test_evaluate_matches_query_metrics_per_method_and_query():
+    runs = {
+        "bm25": {"q1": ["a", "x", "b", "y"], "q2": ["x", "y", "c"]},
+        "vector": {"q1": ["c", "a"]},  # did not answer q2
+    }
+    qrels = {"q1": GRADES, "q2": GRADES}
+    matrices = build_run_matrices(runs, qrels, relevant_docs={"q1": RELEVANT, "q2": RELEVANT})
+    scores = evaluate(matrices)
+
+    assert matrices.methods == ["bm25", "vector"]
+    assert matrices.query_ids == ["q1", "q2"]
+    for name, values in scores.items():
+        assert values.shape == (2, 2)
+        for m, method in enumerate(matrices.methods):
+            for q, query_id in enumerate(matrices.query_ids):
+                ranking = runs[method].get(query_id, [])
+                assert values[m, q] == pytest.approx(query_metrics(ranking, RELEVANT, GRADES)[name]), \
+                    (name, method, query_id)
+
+
+def test_relevant_set_defaults_to_positive_grades():
+    matrices = build_run_matrices({"run": {"q": ["x", "b"]}}, {"q": GRADES})
+    assert matrices.num_relevant.tolist() == [3]
+    assert evaluate(matrices)["mrr"][0, 0] == pytest.approx(0.5)
+
+
+def test_holm_adjust():
+    # Sorted: 0.01 * 4, 0.03 * 3, 0.04 * 2 (raised to 0.09 to stay monotone), 0.5 * 1
+    assert holm_adjust([0.01, 0.04, 0.03, 0.5]) == pytest.approx([0.04, 0.09, 0.09, 0.5])
+    assert holm_adjust([0.6, 0.7]) == [1.0, 1.0]
+    assert holm_adjust([0.2]) == [0.2]
+    assert holm_adjust([]) == []
+
+
+def test_paired_bootstrap_p_value_is_never_zero():
+    a = np.zeros(30)
+    b = np.linspace(0.1, 0.5, 30)
+    result = paired_bootstrap(a, b, resamples=999)
+
+    assert result["p_value"] == pytest.approx(1 / 1000)
+    assert result["delta"] == pytest.approx(0.3)
+    assert 0.1 < result["ci_low"] < result["delta"] < result["ci_high"] < 0.5
+    assert randomization_p_value(b - a, resamples=999) == pytest.approx(1 / 1000)
+
+
+def test_paired_bootstrap_without_differences():
+    scores = np.linspace(0, 1, 10)
+    assert paired_bootstrap(scores, scores)["p_value"] == 1.0
+    assert paired_bootstrap([], [])["p_value"] == 1.0
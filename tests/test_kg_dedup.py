@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate detection and the entity merge (scripts/kg_dedup.py)
+"""
+
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+from kg_dedup import find_clusters, merge_clusters  # noqa: E402
+
+# Subset of the drizzle schema that the merge reads and writes
+SCHEMA = """
+CREATE TABLE knowledge_entities (
+  id TEXT PRIMARY KEY, repositoryPath TEXT NOT NULL, entityType TEXT NOT NULL, name TEXT NOT NULL,
+  description TEXT, properties TEXT, importanceScore REAL DEFAULT 0.5 NOT NULL,
+  confidenceScore REAL DEFAULT 0.5 NOT NULL, accessCount INTEGER DEFAULT 0 NOT NULL,
+  createdAt TEXT DEFAULT (current_timestamp) NOT NULL, updatedAt TEXT DEFAULT (current_timestamp) NOT NULL
+);
+CREATE TABLE knowledge_relationships (
+  id TEXT PRIMARY KEY, repositoryPath TEXT NOT NULL, fromEntityId TEXT NOT NULL, toEntityId TEXT NOT NULL,
+  relationshipType TEXT NOT NULL, strength REAL DEFAULT 0.5 NOT NULL, confidence REAL DEFAULT 0.5 NOT NULL,
+  evidenceCount INTEGER DEFAULT 1 NOT NULL, updatedAt TEXT DEFAULT (current_timestamp) NOT NULL
+);
+CREATE TABLE knowledge_insights (
+  id TEXT PRIMARY KEY, repositoryPath TEXT NOT NULL, relatedEntities TEXT DEFAULT '[]',
+  updatedAt TEXT DEFAULT (current_timestamp) NOT NULL
+);
+"""
+
+# Estimated Jaccard: A~B 0.72, B~C 0.71, A~C 0.48
+CHAIN = [
+    ("a", "parse configuration file and validate schema"),
+    ("b", "parse configuration file and validate schema entries strictly"),
+    ("c", "configuration file and validate schema entries strictly before load"),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "kg.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO knowledge_entities (id, repositoryPath, entityType, name, description, properties,"
+        " importanceScore, accessCount, createdAt) VALUES (?, '/repo', ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("keep", "concept", "Config loader", None, '{"source": "scan"}', 0.9, 2, "2025-01-02"),
+            ("dup1", "concept", "Config loader", "Loads the config", None, 0.4, 3, "2025-01-01"),
+            ("dup2", "concept", "Config loader", "", None, 0.4, 1, "2025-01-03"),
+            ("other", "file", "config.ts", None, None, 0.5, 0, "2025-01-01"),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO knowledge_relationships (id, repositoryPath, fromEntityId, toEntityId, relationshipType,"
+        " strength, evidenceCount) VALUES (?, '/repo', ?, ?, ?, ?, ?)",
+        [
+            ("r1", "keep", "other", "defined_in", 0.5, 1),
+            ("r2", "dup1", "other", "defined_in", 0.8, 2),  # parallel once rewired
+            ("r3", "other", "dup2", "uses", 0.5, 1),
+            ("r4", "dup1", "keep", "similar_to", 0.5, 1),  # becomes a self-loop
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO knowledge_insights (id, repositoryPath, relatedEntities) VALUES (?, '/repo', ?)",
+        [("i1", '["dup1", "keep", "other"]'), ("i2", '["other"]'), ("i3", "not json"), ("i4", '{"dup1": 1}')],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_chained_near_duplicates_are_not_merged():
+    # A~B and B~C pass the threshold, A~C does not: C must not join A's cluster
+    clusters = find_clusters([(i, "repo", text) for i, text in CHAIN], threshold=0.6, num_bands=32)
+    assert clusters == [["a", "b"]]
+
+    clusters = find_clusters([(i, "repo", text) for i, text in reversed(CHAIN)], threshold=0.6, num_bands=32)
+    assert clusters == [["c", "b"]]
+
+
+def test_clusters_respect_block_keys_and_threshold():
+    items = [
+        ("x1", "repo\x00concept", "Entity resolution pipeline"),
+        ("x2", "repo\x00concept", "entity   resolution PIPELINE"),
+        ("x3", "repo\x00file", "Entity resolution pipeline"),
+        ("y1", "repo\x00concept", "Completely unrelated text"),
+    ]
+    assert find_clusters(items) == [["x1", "x2"]]
+    assert find_clusters([]) == []
+
+
+def test_similar_numbered_entities_do_not_collapse():
+    items = [(f"e{i}", "repo", f"Entity number {i} widget") for i in range(1000)]
+    clusters = find_clusters(items)
+    assert max(len(c) for c in clusters) <= 5
+    assert sum(len(c) for c in clusters) < 100
+
+
+def test_merge_clusters_rewires_onto_canonical(db):
+    stats = merge_clusters(db, [["dup1", "keep", "dup2"]])
+
+    assert stats["mapping"] == {"dup1": "keep", "dup2": "keep"}
+    assert stats["entities_removed"] == 2
+    assert stats["insights_updated"] == 1
+
+    entities = {row[0]: row[1:] for row in db.execute(
+        "SELECT id, description, properties, importanceScore, accessCount FROM knowledge_entities")}
+    assert set(entities) == {"keep", "other"}
+    description, properties, importance, access = entities["keep"]
+    assert description == "Loads the config"
+    assert json.loads(properties) == {"source": "scan", "mergedFrom": ["dup1", "dup2"]}
+    assert (importance, access) == (0.9, 6)
+
+    edges = db.execute("SELECT fromEntityId, toEntityId, relationshipType, strength, evidenceCount"
+                       " FROM knowledge_relationships ORDER BY relationshipType").fetchall()
+    assert edges == [("keep", "other", "defined_in", 0.8, 3), ("other", "keep", "uses", 0.5, 1)]
+
+    insights = dict(db.execute("SELECT id, relatedEntities FROM knowledge_insights"))
+    assert json.loads(insights["i1"]) == ["keep", "other"]
+    assert insights["i3"] == "not json" and insights["i4"] == '{"dup1": 1}'
+
+
+def test_merge_clusters_ignores_missing_entities(db):
+    stats = merge_clusters(db, [["keep", "gone"]])
+    assert stats["mapping"] == {} and stats["entities_removed"] == 0
+    assert db.execute("SELECT COUNT(*) FROM knowledge_entities").fetchone()[0] == 4
+
+
+def test_dedup_cli_detects_and_merges(db, tmp_path):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "kg_dedup.py"), "dedup", "--db", str(tmp_path / "kg.db"),
+         "--repository", "/repo"],
+        capture_output=True, text=True, check=True,
+    )
+    stats = json.loads(result.stdout)
+    # keep and dup2 have no description, so only they share their text
+    assert stats["mapping"] == {"dup2": "keep"}
+    assert stats["clusters"] == 1
+    assert {row[0] for row in db.execute("SELECT id FROM knowledge_entities")} == {"keep", "dup1", "other"}